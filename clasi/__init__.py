@@ -3,8 +3,16 @@
 MCP server for AI-driven software engineering process.
 """
 
-try:
-    from importlib.metadata import version as _pkg_version
-    __version__ = _pkg_version("clasi")
-except Exception:
-    __version__ = "0.0.0-unknown"
+
+def __getattr__(name):
+    # __version__ is resolved on first use: importlib.metadata is slow to
+    # import, and hook commands import this package on every tool call.
+    if name == "__version__":
+        try:
+            from importlib.metadata import version as _pkg_version
+            value = _pkg_version("clasi")
+        except Exception:
+            value = "0.0.0-unknown"
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
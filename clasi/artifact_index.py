@@ -0,0 +1,381 @@
+"""ArtifactIndex: persistent, stat-keyed index of sprint and ticket frontmatter.
+
+Listing sprints or tickets used to re-parse every ``sprint.md`` and ticket
+file on each call. The index stores the parsed id, status, title, branch
+and TODO links of each file in an ``artifact_index`` table, keyed by path
+together with the file's mtime and size.
+
+The table lives in its own SQLite file under ``docs/clasi/log/`` rather
+than in ``.clasi.db``: it is a disposable, machine-local cache of absolute
+paths, and it must not dirty the committed state database or make it
+appear to exist in projects that have no sprint state yet.
+
+Each scan lists the directory and stats every file, but only re-parses
+files whose (mtime_ns, size) changed since they were indexed. Rows for
+files that disappeared are dropped. Lookups by id go straight to the
+table and only stat the single matching file to confirm it is current.
+
+Files modified within ``_RACY_NS`` of the moment they were indexed are
+never trusted from the index (the "racily clean" rule the frontmatter
+parse cache also applies), since a same-size rewrite inside one
+filesystem timestamp tick would otherwise go unnoticed.
+
+The index is purely a cache: if the database cannot be read or written,
+scans fall back to parsing the files directly.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from clasi.frontmatter import _RACY_NS, read_frontmatter
+from clasi.state_db_class import _connect
+
+if TYPE_CHECKING:
+    from clasi.project import Project
+
+INDEX_DB_NAME = "artifact-index.db"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS artifact_index (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed_ns INTEGER NOT NULL,
+    artifact_id TEXT,
+    status TEXT,
+    title TEXT,
+    branch TEXT,
+    todos TEXT NOT NULL DEFAULT '[]'
+);
+
+CREATE INDEX IF NOT EXISTS idx_artifact_index_scope
+    ON artifact_index(scope);
+
+CREATE INDEX IF NOT EXISTS idx_artifact_index_id
+    ON artifact_index(kind, artifact_id);
+"""
+
+_COLUMNS = (
+    "path",
+    "kind",
+    "scope",
+    "mtime_ns",
+    "size",
+    "indexed_ns",
+    "artifact_id",
+    "status",
+    "title",
+    "branch",
+    "todos",
+)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Normalize a frontmatter scalar for storage (None stays None)."""
+    if value is None:
+        return None
+    return str(value)
+
+
+def _todo_links(kind: str, fm: dict[str, Any]) -> list[str]:
+    """Extract TODO filenames linked from a sprint or ticket frontmatter."""
+    val = fm.get("todos" if kind == "sprint" else "todo")
+    if not val:
+        return []
+    if isinstance(val, str):
+        return [val]
+    if isinstance(val, list):
+        return [str(v) for v in val if v]
+    return []
+
+
+def _row_to_entry(row: sqlite3.Row) -> dict[str, Any]:
+    """Convert an artifact_index row to an entry dict."""
+    entry = {col: row[col] for col in _COLUMNS}
+    entry["todos"] = json.loads(row["todos"] or "[]")
+    return entry
+
+
+def _is_clean(entry: dict[str, Any], st: os.stat_result) -> bool:
+    """Return True if an index entry still describes the file on disk."""
+    return (
+        entry["mtime_ns"] == st.st_mtime_ns
+        and entry["size"] == st.st_size
+        and entry["indexed_ns"] - st.st_mtime_ns > _RACY_NS
+    )
+
+
+class ArtifactIndex:
+    """Incrementally refreshed index of a project's sprints and tickets.
+
+    Entries are dicts with keys: path, kind, scope, mtime_ns, size,
+    indexed_ns, artifact_id, status, title, branch, todos. Frontmatter
+    values are stored as text; missing fields are None so callers can
+    apply their own defaults.
+    """
+
+    def __init__(self, project: Project, db_path: str | Path | None = None):
+        self._project = project
+        self._db_path = (
+            Path(db_path) if db_path is not None
+            else project.log_dir / INDEX_DB_NAME
+        )
+        self._initialized = False
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    # --- Scans ---
+
+    def sprints(self) -> list[dict[str, Any]]:
+        """Return entries for every sprint.md, active first, then done.
+
+        Order matches a sorted directory walk of ``sprints/`` and
+        ``sprints/done/``.
+        """
+        results: list[dict[str, Any]] = []
+        sprints_dir = self._project.sprints_dir
+        for location in [sprints_dir, sprints_dir / "done"]:
+            if not location.exists():
+                continue
+            files = [
+                d / "sprint.md"
+                for d in sorted(location.iterdir())
+                if d.is_dir() and (d / "sprint.md").exists()
+            ]
+            results.extend(self._refresh("sprint", location, files))
+        return results
+
+    def tickets(self, sprint_path: Path) -> list[dict[str, Any]]:
+        """Return entries for a sprint's tickets, open first, then done."""
+        results: list[dict[str, Any]] = []
+        tickets_dir = Path(sprint_path) / "tickets"
+        for location in [tickets_dir, tickets_dir / "done"]:
+            if not location.exists():
+                continue
+            files = sorted(location.glob("*.md"))
+            results.extend(self._refresh("ticket", location, files))
+        return results
+
+    # --- Lookups ---
+
+    def find_sprint(self, sprint_id: str) -> Optional[dict[str, Any]]:
+        """Return the entry for the sprint with the given id, or None."""
+        entry = self._lookup("sprint", sprint_id)
+        if entry is not None:
+            return entry
+        for entry in self.sprints():
+            if entry["artifact_id"] == sprint_id:
+                return entry
+        return None
+
+    def find_ticket(
+        self, sprint_path: Path, ticket_id: str
+    ) -> Optional[dict[str, Any]]:
+        """Return the entry for a ticket id within one sprint, or None."""
+        tickets_dir = Path(sprint_path) / "tickets"
+        scopes = [str(tickets_dir), str(tickets_dir / "done")]
+        entry = self._lookup("ticket", ticket_id, scopes)
+        if entry is not None:
+            return entry
+        for entry in self.tickets(sprint_path):
+            if entry["artifact_id"] == ticket_id:
+                return entry
+        return None
+
+    # --- Internals ---
+
+    def _lookup(
+        self,
+        kind: str,
+        artifact_id: str,
+        scopes: Optional[list[str]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """Return an indexed entry by id if its file is unchanged on disk."""
+        try:
+            entry = self._find(kind, artifact_id, scopes)
+        except (sqlite3.Error, OSError):
+            return None
+        if entry is None:
+            return None
+        try:
+            st = os.stat(entry["path"])
+        except OSError:
+            return None
+        return entry if _is_clean(entry, st) else None
+
+    def _refresh(
+        self, kind: str, scope: Path, files: list[Path]
+    ) -> list[dict[str, Any]]:
+        """Stat-diff *files* against the index rows for *scope*.
+
+        Unchanged files are served from the index; new or modified files
+        are parsed and written back, and rows for vanished files are
+        deleted. Returns entries in the order of *files*.
+        """
+        scope_key = str(scope)
+        try:
+            cached = self._scope_entries(scope_key)
+        except (sqlite3.Error, OSError):
+            cached = {}
+
+        now = time.time_ns()
+        results: list[dict[str, Any]] = []
+        changed: list[dict[str, Any]] = []
+        for f in files:
+            key = str(f)
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entry = cached.pop(key, None)
+            if entry is None or not _is_clean(entry, st):
+                fm = read_frontmatter(f)
+                entry = {
+                    "path": key,
+                    "kind": kind,
+                    "scope": scope_key,
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "indexed_ns": now,
+                    "artifact_id": _as_text(fm.get("id")),
+                    "status": _as_text(fm.get("status")),
+                    "title": _as_text(fm.get("title")),
+                    "branch": _as_text(fm.get("branch")),
+                    "todos": _todo_links(kind, fm),
+                }
+                changed.append(entry)
+            results.append(entry)
+
+        if changed or cached:
+            try:
+                self._store(changed, removed=list(cached))
+            except (sqlite3.Error, OSError):
+                pass
+        return results
+
+    # --- Storage ---
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the index database, creating the schema on first use."""
+        if not self._initialized:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = _connect(self._db_path)
+        if not self._initialized:
+            try:
+                conn.executescript(_SCHEMA)
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._initialized = True
+        return conn
+
+    def _scope_entries(self, scope: str) -> dict[str, dict[str, Any]]:
+        """Return all indexed entries for a scope directory, keyed by path."""
+        conn = self._open()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM artifact_index WHERE scope = ?", (scope,)
+            ).fetchall()
+            return {row["path"]: _row_to_entry(row) for row in rows}
+        finally:
+            conn.close()
+
+    def _find(
+        self,
+        kind: str,
+        artifact_id: str,
+        scopes: Optional[list[str]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """Return the first indexed entry of *kind* with the given id."""
+        sql = "SELECT * FROM artifact_index WHERE kind = ? AND artifact_id = ?"
+        params: list[Any] = [kind, artifact_id]
+        if scopes is not None:
+            sql += " AND scope IN (%s)" % ", ".join("?" for _ in scopes)
+            params.extend(scopes)
+        sql += " ORDER BY path LIMIT 1"
+        conn = self._open()
+        try:
+            row = conn.execute(sql, params).fetchone()
+            return _row_to_entry(row) if row is not None else None
+        finally:
+            conn.close()
+
+    def _store(
+        self,
+        entries: list[dict[str, Any]],
+        removed: Optional[list[str]] = None,
+    ) -> None:
+        """Upsert entries and delete rows for removed paths."""
+        conn = self._open()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO artifact_index (%s) VALUES (%s)"
+                % (", ".join(_COLUMNS), ", ".join("?" for _ in _COLUMNS)),
+                [
+                    tuple(
+                        json.dumps(e["todos"]) if col == "todos" else e[col]
+                        for col in _COLUMNS
+                    )
+                    for e in entries
+                ],
+            )
+            if removed:
+                conn.executemany(
+                    "DELETE FROM artifact_index WHERE path = ?",
+                    [(p,) for p in removed],
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class TicketRefIndex:
+    """Resolves ``"{sprint_id}-{ticket_id}"`` ticket references.
+
+    TODO files record the tickets that implement them as
+    ``sprint_id-ticket_id`` strings. Checking those references one by one
+    used to cost a sprint lookup plus a ticket directory scan each. This
+    resolver is meant to live for a single tool call: each sprint's
+    tickets are loaded from the ``ArtifactIndex`` at most once, then every
+    reference into that sprint is a dict lookup.
+    """
+
+    def __init__(self, index: ArtifactIndex):
+        self._index = index
+        self._sprints: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def _sprint_tickets(self, sprint_id: str) -> dict[str, dict[str, Any]]:
+        """Return {ticket_id: entry} for a sprint, loading it on first use."""
+        tickets = self._sprints.get(sprint_id)
+        if tickets is None:
+            tickets = {}
+            sprint = self._index.find_sprint(sprint_id)
+            if sprint is not None:
+                for entry in self._index.tickets(Path(sprint["path"]).parent):
+                    if entry["artifact_id"]:
+                        tickets.setdefault(entry["artifact_id"], entry)
+            self._sprints[sprint_id] = tickets
+        return tickets
+
+    def resolve(self, ticket_ref: str) -> Optional[dict[str, Any]]:
+        """Return the index entry for a ``sprint-ticket`` reference, or None."""
+        parts = ticket_ref.split("-", 1)
+        if len(parts) != 2:
+            return None
+        sprint_id, ticket_id = parts
+        return self._sprint_tickets(sprint_id).get(ticket_id)
+
+    def is_done(self, ticket_ref: str) -> bool:
+        """True if the referenced ticket exists and has status 'done'."""
+        entry = self.resolve(ticket_ref)
+        return entry is not None and entry["status"] == "done"
@@ -0,0 +1,233 @@
+"""Run long MCP tools on worker threads, with progress and cancellation.
+
+FastMCP calls a synchronous tool directly on the event loop, so a tool
+that spends minutes in a subprocess (``close_sprint`` runs the test
+suite for up to 300 s) stalls every other request. Tools registered with
+``background_tool()`` (see ``clasi.mcp_server``) are instead run by
+``as_async()`` on a worker thread. Read-only calls such as
+``list_todos`` keep being served while they run.
+
+The tool body stays ordinary synchronous code and talks to its job
+through two functions, both no-ops when the tool is called directly
+(as the tests do):
+
+``report(message, progress, total, cancellable=True)``
+    Sends an MCP progress notification if the client asked for one, and
+    raises ``ToolCancelled`` once the request has been cancelled. Pass
+    ``cancellable=False`` past the point where stopping would leave the
+    project half-changed.
+
+``run_subprocess(cmd, ...)``
+    Like ``subprocess.run``, but the child is terminated when the
+    request is cancelled.
+
+Tools registered with ``exclusive=True`` (the ones that change the
+repository: ``close_sprint``, creating and closing GitHub issues) take
+a module-level lock around the tool body, so a second call waits for
+the first to finish instead of running git and gh against a half-changed
+tree. A call still waiting when its request is cancelled never starts.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import logging
+import subprocess
+import threading
+from typing import Any, Callable, Optional
+
+from clasi import metrics
+
+logger = logging.getLogger("clasi.mcp")
+
+# How often a waiting run_subprocess checks for cancellation (seconds).
+_POLL_SECONDS = 0.2
+
+# Held while an exclusive background tool runs.
+_exclusive_lock = threading.Lock()
+
+
+class ToolCancelled(Exception):
+    """Raised inside a background tool after its request was cancelled."""
+
+
+class Job:
+    """State shared between a background tool and the request awaiting it."""
+
+    def __init__(self, name: str, ctx: Any = None):
+        self.name = name
+        self.ctx = ctx
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._procs: list[subprocess.Popen] = []
+
+    def cancel(self) -> None:
+        """Flag the job as cancelled and terminate its running subprocesses."""
+        self.cancelled.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                proc.terminate()
+            except OSError:
+                pass
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise ToolCancelled(f"{self.name} was cancelled")
+
+    def track(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.append(proc)
+        if self.cancelled.is_set():
+            proc.terminate()
+
+    def untrack(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.remove(proc)
+
+    def send_progress(
+        self, message: str, progress: float, total: Optional[float],
+    ) -> None:
+        if self.ctx is None:
+            return
+        import anyio.from_thread
+
+        try:
+            anyio.from_thread.run(
+                functools.partial(self.ctx.report_progress, progress, total, message)
+            )
+        except Exception:
+            pass  # Progress is best-effort; the client may not want it
+
+
+_job: contextvars.ContextVar[Optional[Job]] = contextvars.ContextVar(
+    "clasi_background_job", default=None,
+)
+
+
+def current_job() -> Optional[Job]:
+    """Return the job of the background tool running in this thread."""
+    return _job.get()
+
+
+def report(
+    message: str,
+    progress: float = 0,
+    total: Optional[float] = None,
+    cancellable: bool = True,
+) -> None:
+    """Report progress for the running tool.
+
+    Raises ToolCancelled if the request was cancelled, unless
+    *cancellable* is False (the tool is past the point where stopping
+    would leave the project half-changed).
+    """
+    job = _job.get()
+    if job is None:
+        return
+    if cancellable:
+        job.check()
+    logger.info("[%s] %s", job.name, message)
+    job.send_progress(message, progress, total)
+
+
+def run_subprocess(
+    cmd: list[str], timeout: Optional[float] = None, **kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """``subprocess.run`` that stops the child if the request is cancelled.
+
+    Accepts the ``subprocess.run`` keyword arguments used in this
+    package (``capture_output``, ``text``, ``cwd``, ...). Outside a
+    background tool it simply calls ``subprocess.run``.
+    """
+    job = _job.get()
+    if job is None:
+        return subprocess.run(cmd, timeout=timeout, **kwargs)
+    job.check()
+    if kwargs.pop("capture_output", False):
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    with subprocess.Popen(cmd, **kwargs) as proc:
+        job.track(proc)
+        try:
+            waited = 0.0
+            while True:
+                try:
+                    stdout, stderr = proc.communicate(timeout=_POLL_SECONDS)
+                    break
+                except subprocess.TimeoutExpired:
+                    waited += _POLL_SECONDS
+                    if job.cancelled.is_set():
+                        proc.kill()
+                        proc.communicate()
+                        raise ToolCancelled(f"{job.name} was cancelled")
+                    if timeout is not None and waited >= timeout:
+                        proc.kill()
+                        proc.communicate()
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+        finally:
+            job.untrack(proc)
+    if job.cancelled.is_set():
+        raise ToolCancelled(f"{job.name} was cancelled")
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+def _acquire_exclusive(job: Job) -> None:
+    """Wait for the exclusive lock, giving up if *job* is cancelled."""
+    if _exclusive_lock.acquire(blocking=False):
+        return
+    logger.info("[%s] waiting for another repository tool to finish", job.name)
+    job.send_progress("Waiting for another repository tool to finish", 0, None)
+    while not _exclusive_lock.acquire(timeout=_POLL_SECONDS):
+        job.check()
+    if job.cancelled.is_set():
+        _exclusive_lock.release()
+        job.check()
+
+
+def as_async(
+    fn: Callable[..., Any],
+    get_context: Callable[[], Any] = lambda: None,
+    exclusive: bool = False,
+) -> Callable[..., Any]:
+    """Wrap a synchronous tool so it runs on a worker thread.
+
+    The wrapper keeps *fn*'s signature and docstring, so FastMCP builds
+    the same input schema. *get_context* returns the FastMCP request
+    context used for progress notifications. If the awaiting request is
+    cancelled, the job is cancelled and the wrapper returns at once; the
+    worker stops at its next ``report()`` or ``run_subprocess()``.
+    With *exclusive*, the tool body runs under the module-level lock
+    shared by all exclusive tools.
+    """
+    import anyio
+    import anyio.to_thread
+
+    @functools.wraps(fn)
+    async def wrapper(**kwargs: Any) -> Any:
+        job = Job(fn.__name__, get_context())
+
+        def work() -> Any:
+            _job.set(job)
+            if not exclusive:
+                with metrics.thread_cpu():
+                    return fn(**kwargs)
+            _acquire_exclusive(job)
+            try:
+                with metrics.thread_cpu():
+                    return fn(**kwargs)
+            finally:
+                _exclusive_lock.release()
+
+        context = contextvars.copy_context()
+        try:
+            return await anyio.to_thread.run_sync(
+                context.run, work, abandon_on_cancel=True,
+            )
+        except anyio.get_cancelled_exc_class():
+            job.cancel()
+            logger.info("[%s] cancelled", job.name)
+            raise
+
+    return wrapper
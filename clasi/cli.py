@@ -6,6 +6,9 @@ Subcommands:
     clasi install [target]          — Synonym for clasi init
     clasi uninstall [target]        — Remove CLASI platform integration files
     clasi mcp                       — Run the MCP server (stdio)
+    clasi hook <event>              — Handle a hook event in-process
+    clasi hook-server start|stop|status — Manage the resident hook server
+    clasi log query                 — Query the structured event log
     clasi tool plan-to-todo         — Convert plan file to TODO
     clasi version                   — Show the current project version
     clasi version bump              — Bump version, update files, tag
@@ -36,7 +39,10 @@ def cli():
               help="Use file copy instead of symlink for alias operations.")
 @click.option("--migrate", is_flag=True, default=False,
               help="Convert legacy direct-copy installs to symlinks.")
-def init(target, plugin, install_claude, install_codex, install_copilot, copy, migrate):
+@click.option("--dry-run", is_flag=True, default=False,
+              help="Report what would be created, updated or deleted without writing.")
+def init(target, plugin, install_claude, install_codex, install_copilot, copy, migrate,
+         dry_run):
     """Initialize a repository for the CLASI SE process.
 
     By default (no --claude, --codex, or --copilot flag), behavior depends on context:
@@ -53,6 +59,11 @@ def init(target, plugin, install_claude, install_codex, install_copilot, copy, m
     Code (plugin mode).  With --copy, alias operations use file copy instead of
     symlink (useful on Windows without Developer Mode).  With --migrate,
     converts legacy direct-copy installs to symlinks.
+
+    Only files whose content differs are written; the installed files are
+    recorded in docs/clasi/install-manifest.json so files a newer CLASI no
+    longer ships are removed.  With --dry-run, prints that plan and exits
+    without touching the project.
     """
     from clasi.init_command import run_init
 
@@ -64,6 +75,7 @@ def init(target, plugin, install_claude, install_codex, install_copilot, copy, m
         copilot=install_copilot,
         copy=copy,
         migrate=migrate,
+        dry_run=dry_run,
     )
 
 
@@ -245,3 +257,96 @@ def hook(event):
     from clasi.hook_handlers import handle_hook
 
     handle_hook(event)
+
+
+@cli.group("hook-server")
+def hook_server():
+    """Manage the resident hook server for this project.
+
+    While a server is running, ``clasi-hook <event>`` forwards hook
+    payloads to it instead of starting a full interpreter per event.
+    Without a server, ``clasi-hook`` handles events in-process.
+    """
+
+
+@hook_server.command("start")
+@click.option("--idle-timeout", default=3600.0, type=float, show_default=True,
+              help="Exit after this many seconds without requests.")
+def hook_server_start(idle_timeout):
+    """Start a hook server for the current directory in the background."""
+    from clasi import hook_server as hs
+
+    info = hs.status()
+    if info:
+        click.echo(f"Hook server already running (pid {info['pid']}).")
+        return
+    pid = hs.start(idle_timeout=idle_timeout)
+    click.echo(f"Hook server started (pid {pid}).")
+
+
+@hook_server.command("stop")
+def hook_server_stop():
+    """Stop the hook server for the current directory."""
+    from clasi import hook_server as hs
+
+    if hs.stop():
+        click.echo("Hook server stopped.")
+    else:
+        click.echo("No hook server running.")
+
+
+@hook_server.command("status")
+def hook_server_status():
+    """Show whether a hook server is running for the current directory."""
+    from clasi import hook_server as hs
+
+    info = hs.status()
+    if info:
+        click.echo(f"Hook server running (pid {info['pid']}) for {info['root']}.")
+    else:
+        click.echo("No hook server running.")
+
+
+@cli.group("log")
+def log():
+    """Inspect the structured event log (docs/clasi/log/events.db)."""
+
+
+@log.command("query")
+@click.option("--since", default=None,
+              help="Only events at or after this ISO timestamp (or prefix, e.g. 2026-10-18).")
+@click.option("--until", default=None,
+              help="Only events before this ISO timestamp (or prefix).")
+@click.option("--kind", default=None,
+              help="Event kind: hook, tool, dispatch, dispatch-result, subagent, task.")
+@click.option("--name", default=None, help="Hook event, tool or agent name.")
+@click.option("--agent", default=None, help="Agent that produced the event.")
+@click.option("--sprint", default=None, help="Sprint ID.")
+@click.option("--limit", default=50, type=int, show_default=True,
+              help="Maximum number of events (0 for all).")
+@click.option("--json", "as_json", is_flag=True, help="Print one JSON object per line.")
+def log_query(since, until, kind, name, agent, sprint, limit, as_json):
+    """Show matching events, newest first."""
+    import json
+    from pathlib import Path
+
+    from clasi.event_log import query
+
+    events = query(
+        Path("docs/clasi/log"), since=since, until=until, kind=kind,
+        name=name, agent=agent, sprint=sprint, limit=limit,
+    )
+    for event in events:
+        if as_json:
+            click.echo(json.dumps(event))
+            continue
+        duration = event.get("duration_ms")
+        click.echo(" ".join([
+            event["ts"],
+            f"{event['kind']:<15}",
+            f"{event['name']:<24}",
+            f"{event.get('agent', '-'):<16}",
+            f"{event.get('outcome', '-'):<12}",
+            f"{duration:.0f}ms" if duration is not None else "-",
+            event.get("sprint", ""),
+        ]).rstrip())
@@ -0,0 +1,127 @@
+"""In-memory catalog of the packaged process content.
+
+The agent, skill and instruction tools used to ``rglob`` ``clasi/plugin``
+and re-read markdown files on every call. That content ships inside the
+installed package and does not change while a process runs, so it is
+walked once per directory: ``get_catalog(directory)`` reads every
+markdown and YAML file below it, records its name, description and
+SHA-256, and keeps the text. Later listings and lookups are dictionary
+and list operations on that snapshot.
+
+A file that is not valid UTF-8 is logged and left out of the catalog,
+so it cannot break lookups of the rest of the tree.
+
+Catalogs are cached per resolved directory for the life of the process.
+Tests that build content trees on the fly call ``clear_catalogs()`` if
+they modify a tree after reading it.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Optional
+
+from clasi.frontmatter import _parse
+
+logger = logging.getLogger("clasi.mcp")
+
+# File types the catalog keeps in memory.
+TEXT_SUFFIXES = (".md", ".yaml")
+
+
+@dataclass(frozen=True)
+class Entry:
+    """One file in a content directory."""
+
+    path: PurePosixPath
+    """Path relative to the catalog root."""
+    name: str
+    """Frontmatter ``name``, or the file stem when there is none."""
+    description: str
+    has_name: bool
+    """True when the frontmatter has a ``name`` key."""
+    described: bool
+    """True when the frontmatter has a non-empty ``name`` or ``description``."""
+    sha256: str
+
+    def name_or(self, default: str) -> str:
+        """Frontmatter ``name``, or *default* when there is none."""
+        return self.name if self.has_name else default
+
+
+class Catalog:
+    """Snapshot of the text files below one content directory."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.entries: list[Entry] = []
+        self._text: dict[PurePosixPath, str] = {}
+        self._by_path: dict[PurePosixPath, Entry] = {}
+        if not root.is_dir():
+            return
+        for path in sorted(root.rglob("*")):
+            if path.suffix not in TEXT_SUFFIXES or not path.is_file():
+                continue
+            data = path.read_bytes()
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError as exc:
+                logger.warning("Skipping %s: not UTF-8 (%s)", path, exc)
+                continue
+            rel = PurePosixPath(path.relative_to(root).as_posix())
+            fm: dict = {}
+            if path.suffix == ".md":
+                fm, _ = _parse(text)
+            self.entries.append(Entry(
+                path=rel,
+                name=fm.get("name", path.stem),
+                description=fm.get("description", ""),
+                has_name="name" in fm,
+                described=bool(fm.get("name") or fm.get("description")),
+                sha256=hashlib.sha256(data).hexdigest(),
+            ))
+            self._text[rel] = text
+        self._by_path = {e.path: e for e in self.entries}
+
+    def get(self, relpath: str) -> Optional[Entry]:
+        """Return the entry at *relpath* (``"a/b.md"``), if present."""
+        return self._by_path.get(PurePosixPath(relpath))
+
+    def read(self, entry: Entry | str) -> str:
+        """Return the text of *entry* (an Entry or relative path)."""
+        key = entry.path if isinstance(entry, Entry) else PurePosixPath(entry)
+        return self._text[key]
+
+    def top_level(self, suffix: str = ".md") -> list[Entry]:
+        """Entries directly in the root with *suffix*, sorted by path."""
+        return [
+            e for e in self.entries
+            if len(e.path.parts) == 1 and e.path.suffix == suffix
+        ]
+
+    def named(self, filename: str) -> Iterator[Entry]:
+        """Entries at any depth whose file name is *filename*, sorted by path."""
+        return (e for e in self.entries if e.path.name == filename)
+
+    def markdown(self) -> Iterator[Entry]:
+        """All markdown entries, sorted by path."""
+        return (e for e in self.entries if e.path.suffix == ".md")
+
+
+@functools.lru_cache(maxsize=None)
+def _catalog(root: Path) -> Catalog:
+    return Catalog(root)
+
+
+def get_catalog(directory: str | Path) -> Catalog:
+    """Return the catalog of *directory*, building it on first use."""
+    return _catalog(Path(directory).resolve())
+
+
+def clear_catalogs() -> None:
+    """Drop every cached catalog; the next ``get_catalog`` rebuilds it."""
+    _catalog.cache_clear()
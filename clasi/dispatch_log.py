@@ -6,11 +6,12 @@ frontmatter for structured metadata.
 
 from __future__ import annotations
 
-import re
 from datetime import datetime, timezone
 from pathlib import Path
 
+from clasi import event_log
 from clasi.frontmatter import read_document, write_frontmatter
+from clasi.log_sequence import create_log_file
 from clasi.mcp_server import get_project
 
 
@@ -19,27 +20,6 @@ def _log_dir() -> Path:
     return get_project().log_dir
 
 
-def _next_sequence(directory: Path) -> int:
-    """Count all ``.md`` files in *directory* and return the next sequence number.
-
-    Uses a single sequential counter across all files in the directory,
-    regardless of agent name prefix.  Returns 1 if the directory is empty
-    or does not exist.
-    """
-    if not directory.is_dir():
-        return 1
-
-    pattern = re.compile(r"^(\d+)")
-
-    max_seq = 0
-    for entry in directory.iterdir():
-        if entry.suffix == ".md":
-            m = pattern.match(entry.name)
-            if m:
-                max_seq = max(max_seq, int(m.group(1)))
-    return max_seq + 1
-
-
 def _auto_context_documents(sprint_name: str, ticket_id: str | None = None) -> list[str]:
     """Derive standard planning documents from a sprint name.
 
@@ -97,14 +77,12 @@ def log_dispatch(
         suffix = ""
 
     directory.mkdir(parents=True, exist_ok=True)
-    seq = _next_sequence(directory)
-
-    if suffix:
-        filename = f"{seq:03d}-{suffix}.md"
-    else:
-        filename = f"{seq:03d}.md"
-
-    log_path = directory / filename
+    # Claim the name first; the frontmatter and body are written below.
+    log_path = create_log_file(
+        directory,
+        lambda seq: f"{seq:03d}-{suffix}.md" if suffix else f"{seq:03d}.md",
+        log_root=base,
+    )
 
     # Resolve context documents
     resolved_docs: list[str] | None = context_documents
@@ -143,6 +121,11 @@ def log_dispatch(
     content += body
     log_path.write_text(content, encoding="utf-8")
 
+    event_log.record(
+        base, "dispatch", child, agent=parent, sprint=sprint_name,
+        data={"scope": scope, "ticket": ticket_id,
+              "log_file": str(log_path), "template": template_used},
+    )
     return log_path
 
 
@@ -172,3 +155,9 @@ def update_dispatch_result(
     import yaml
     yaml_str = yaml.dump(fm, default_flow_style=False, sort_keys=False).strip()
     log_path.write_text(f"---\n{yaml_str}\n---\n{body}", encoding="utf-8")
+
+    event_log.record(
+        _log_dir(), "dispatch-result", fm.get("child", "subagent"),
+        agent=fm.get("parent"), sprint=fm.get("sprint"), outcome=result,
+        data={"log_file": str(log_path), "files_modified": files_modified},
+    )
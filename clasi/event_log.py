@@ -0,0 +1,271 @@
+"""Append-only structured event log: docs/clasi/log/events.db.
+
+``hooks.log``, the dispatch logs and ``mcp-server.log`` are written for
+people to read, so analysing them means grepping and re-parsing every
+file. Every hook decision, MCP tool call, dispatch and subagent/task
+completion is therefore also appended as one row of a SQLite table.
+The table has indexes on time, kind, agent and sprint, and ``query()``
+filters on those columns. ``clasi log query`` and the ``query_events``
+MCP tool use ``query()``.
+
+The database lives in the (git-ignored) log directory rather than in
+``.clasi.db``, which projects commit. This module imports only the
+standard library modules the hook fast path already uses, so the guards
+can record their decisions.
+
+The guards run before every Edit/Write, so they do not open the
+database: ``append()`` writes the event as one JSON line to
+``events.jsonl`` next to it. ``query()`` first moves the lines it has
+not seen yet into the table, remembering how far into the file it got,
+so appends never wait on the MCP server's writes.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+EVENTS_DB = "events.db"
+
+# Events queued by append(), moved into EVENTS_DB by query().
+QUEUE_FILE = "events.jsonl"
+
+# Event kinds written by clasi itself.
+KINDS = ("hook", "tool", "dispatch", "dispatch-result", "subagent", "task")
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    agent TEXT,
+    tier TEXT,
+    sprint TEXT,
+    outcome TEXT,
+    duration_ms REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+CREATE INDEX IF NOT EXISTS events_agent_ts ON events (agent, ts);
+CREATE INDEX IF NOT EXISTS events_sprint_ts ON events (sprint, ts);
+CREATE TABLE IF NOT EXISTS queue_imports (
+    file TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = ("id", "ts", "kind", "name", "agent", "tier", "sprint",
+            "outcome", "duration_ms", "data")
+
+_INSERT = (
+    "INSERT INTO events (ts, kind, name, agent, tier, sprint, "
+    "outcome, duration_ms, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def timestamp(seconds: "float | None" = None) -> str:
+    """Return a sortable UTC timestamp with millisecond precision."""
+    if seconds is None:
+        seconds = time.time()
+    ms = int(seconds * 1000) % 1000
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{ms:03d}Z"
+
+
+def _open(log_dir: str, create: bool) -> "sqlite3.Connection | None":
+    path = os.path.join(log_dir, EVENTS_DB)
+    if not create and not os.path.exists(path):
+        return None
+    if create:
+        os.makedirs(log_dir, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=2.0)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def record(
+    log_dir: "str | os.PathLike",
+    kind: str,
+    name: str,
+    *,
+    agent: "str | None" = None,
+    tier: "str | None" = None,
+    sprint: "str | None" = None,
+    outcome: "str | None" = None,
+    duration_ms: "float | None" = None,
+    data: "dict | None" = None,
+) -> None:
+    """Append one event to ``<log_dir>/events.db``.
+
+    *agent* and *tier* default to CLASI_AGENT_NAME ("team-lead") and
+    CLASI_AGENT_TIER ("0"). Errors are swallowed: recording an event
+    must never make a hook or tool fail.
+    """
+    try:
+        row = _row(timestamp(), kind, name, agent, tier, sprint, outcome,
+                   duration_ms, data)
+        conn = _open(os.fspath(log_dir), create=True)
+        try:
+            with conn:
+                conn.execute(_INSERT, row)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, TypeError, ValueError):
+        pass
+
+
+def append(
+    log_dir: "str | os.PathLike",
+    kind: str,
+    name: str,
+    *,
+    agent: "str | None" = None,
+    tier: "str | None" = None,
+    sprint: "str | None" = None,
+    outcome: "str | None" = None,
+    duration_ms: "float | None" = None,
+    data: "dict | None" = None,
+) -> None:
+    """Queue one event as a line of ``<log_dir>/events.jsonl``.
+
+    Takes the same arguments as ``record()`` but opens no database;
+    ``query()`` imports the event later. *log_dir* must exist. Errors
+    are swallowed.
+    """
+    try:
+        row = _row(timestamp(), kind, name, agent, tier, sprint, outcome,
+                   duration_ms, data)
+        line = json.dumps(dict(zip(_COLUMNS[1:], row))) + "\n"
+        # One write() on an O_APPEND descriptor: concurrent hooks never
+        # interleave their lines.
+        fd = os.open(os.path.join(os.fspath(log_dir), QUEUE_FILE),
+                     os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def _row(ts, kind, name, agent, tier, sprint, outcome, duration_ms, data) -> tuple:
+    """Return the values of an ``events`` row, with defaults filled in."""
+    if agent is None:
+        agent = os.environ.get("CLASI_AGENT_NAME") or "team-lead"
+    if tier is None:
+        tier = os.environ.get("CLASI_AGENT_TIER") or "0"
+    return (ts, kind, name, agent, tier, sprint, outcome, duration_ms,
+            json.dumps(data, default=str) if data else None)
+
+
+def _import_queue(conn: sqlite3.Connection, log_dir: str) -> None:
+    """Move the events appended to the queue file since the last import."""
+    path = os.path.join(log_dir, QUEUE_FILE)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    # IMMEDIATE: two readers importing at once must not both insert.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT position FROM queue_imports WHERE file = ?", (QUEUE_FILE,),
+        ).fetchone()
+        position = row[0] if row is not None else 0
+        if position > size:
+            position = 0  # the file was truncated or replaced
+        with open(path, "rb") as f:
+            f.seek(position)
+            chunk = f.read(size - position)
+        # A line without its newline is still being written.
+        end = chunk.rfind(b"\n") + 1
+        rows = []
+        for line in chunk[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict) or not all(
+                event.get(k) for k in ("ts", "kind", "name")
+            ):
+                continue
+            rows.append(tuple(event.get(k) for k in _COLUMNS[1:]))
+        conn.executemany(_INSERT, rows)
+        conn.execute(
+            "INSERT INTO queue_imports (file, position) VALUES (?, ?) "
+            "ON CONFLICT(file) DO UPDATE SET position = excluded.position",
+            (QUEUE_FILE, position + end),
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def query(
+    log_dir: "str | os.PathLike",
+    *,
+    since: "str | None" = None,
+    until: "str | None" = None,
+    kind: "str | None" = None,
+    name: "str | None" = None,
+    agent: "str | None" = None,
+    sprint: "str | None" = None,
+    limit: int = 100,
+) -> "list[dict]":
+    """Return matching events, newest first.
+
+    *since* and *until* are ISO timestamps or prefixes of one
+    ("2026-10-18", "2026-10-18T09:30"); *since* is inclusive and *until*
+    exclusive. The other filters match exactly. *limit* <= 0 means no limit.
+    Events queued by ``append()`` are imported first.
+    """
+    log_dir = os.fspath(log_dir)
+    queued = os.path.exists(os.path.join(log_dir, QUEUE_FILE))
+    conn = _open(log_dir, create=queued)
+    if conn is None:
+        return []
+    if queued:
+        try:
+            _import_queue(conn, log_dir)
+        except (OSError, sqlite3.Error):
+            pass  # still answer from what is already imported
+    where: list[str] = []
+    params: list = []
+    if since:
+        where.append("ts >= ?")
+        params.append(since)
+    if until:
+        where.append("ts < ?")
+        params.append(until)
+    for column, value in (("kind", kind), ("name", name),
+                          ("agent", agent), ("sprint", sprint)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM events"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC, id DESC"
+    if limit > 0:
+        sql += " LIMIT ?"
+        params.append(limit)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    events = []
+    for row in rows:
+        event = {k: row[k] for k in _COLUMNS if row[k] is not None}
+        if "data" in event:
+            event["data"] = json.loads(event["data"])
+        events.append(event)
+    return events
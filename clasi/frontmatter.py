@@ -9,24 +9,140 @@ Frontmatter is delimited by --- lines at the top of a file:
 
     Body content here.
 
-Implemented using the python-frontmatter package.
+Full documents are parsed with the python-frontmatter package.
+``read_frontmatter`` instead streams the file line by line, stops at the
+closing delimiter and YAML-parses only that block (with libyaml's
+``CSafeLoader`` when available), so large ticket bodies are never read
+just to look up an ``id`` or ``status``.
+
+Parsed results are kept in a bounded per-process LRU cache keyed by
+absolute path and validated against the file's (mtime_ns, size) on every
+read, so long-lived processes such as the MCP server do not re-parse hot
+artifacts. Header-only entries satisfy ``read_frontmatter``; full entries
+satisfy both readers. Writes through this module evict the entry. A file
+modified within ``_RACY_NS`` of when it was parsed is never served from
+the cache, because a same-size rewrite inside one filesystem timestamp
+tick would leave its stat signature unchanged.
 """
 
+import copy
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import frontmatter as _fm
 import yaml
 
+from clasi import metrics
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+# Same delimiter rule python-frontmatter uses for YAML blocks.
+_BOUNDARY = re.compile(r"-{3,}\s*$")
+
+# Maximum number of parsed documents kept in the cache.
+_CACHE_MAXSIZE = 512
+
+# Files modified this close to their parse time are always re-read.
+_RACY_NS = 2_000_000_000
+
+# abspath -> (mtime_ns, size, parsed_ns, frontmatter, body or None)
+_cache: "OrderedDict[str, tuple[int, int, int, dict[str, Any], Optional[str]]]" = (
+    OrderedDict()
+)
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def cache_info() -> dict[str, int]:
+    """Return parse-cache statistics: hits, misses, size, maxsize."""
+    with _cache_lock:
+        return {
+            "hits": _cache_stats["hits"],
+            "misses": _cache_stats["misses"],
+            "size": len(_cache),
+            "maxsize": _CACHE_MAXSIZE,
+        }
+
+
+def cache_clear() -> None:
+    """Drop all cached documents and reset the hit/miss counters."""
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats["hits"] = 0
+        _cache_stats["misses"] = 0
+
+
+def _invalidate(path: str | Path) -> None:
+    """Evict a single path from the parse cache."""
+    with _cache_lock:
+        _cache.pop(os.path.abspath(path), None)
+
+
+def _cache_get(
+    key: str, st: os.stat_result, need_body: bool
+) -> Optional[tuple[dict[str, Any], Optional[str]]]:
+    """Return a cached (frontmatter, body) if still valid, counting hit/miss."""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if (
+            entry is not None
+            and entry[0] == st.st_mtime_ns
+            and entry[1] == st.st_size
+            and entry[2] - st.st_mtime_ns > _RACY_NS
+            and (entry[4] is not None or not need_body)
+        ):
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return entry[3], entry[4]
+        _cache_stats["misses"] += 1
+        return None
+
+
+def _cache_put(
+    key: str,
+    st: os.stat_result,
+    parsed_ns: int,
+    fm: dict[str, Any],
+    body: Optional[str],
+) -> None:
+    """Store a parse result, evicting least-recently-used entries."""
+    with _cache_lock:
+        _cache[key] = (st.st_mtime_ns, st.st_size, parsed_ns, fm, body)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_MAXSIZE:
+            _cache.popitem(last=False)
+
 
 def read_document(path: str | Path) -> tuple[dict[str, Any], str]:
     """Read a markdown file and return (frontmatter_dict, body_str).
 
     If the file has no frontmatter, returns ({}, full_content).
+
+    The returned dict is a private copy; callers may mutate it freely.
     """
     path = Path(path)
+    key = os.path.abspath(path)
+    now = time.time_ns()
+    st = os.stat(key)
+
+    cached = _cache_get(key, st, need_body=True)
+    if cached is not None:
+        return copy.deepcopy(cached[0]), cached[1]
+
     content = path.read_text(encoding="utf-8")
-    return _parse(content)
+    metrics.count("files_read")
+    metrics.count("bytes_parsed", len(content))
+    fm, body = _parse(content)
+    _cache_put(key, st, now, fm, body)
+    return copy.deepcopy(fm), body
 
 
 def _parse(content: str) -> tuple[dict[str, Any], str]:
@@ -70,10 +186,40 @@ def _parse(content: str) -> tuple[dict[str, Any], str]:
 def read_frontmatter(path: str | Path) -> dict[str, Any]:
     """Read just the YAML frontmatter from a markdown file.
 
-    Returns an empty dict if the file has no frontmatter.
+    Returns an empty dict if the file has no frontmatter. Only the lines
+    up to the closing ``---`` are read.
     """
-    fm, _ = read_document(path)
-    return fm
+    key = os.path.abspath(path)
+    now = time.time_ns()
+    st = os.stat(key)
+
+    cached = _cache_get(key, st, need_body=False)
+    if cached is not None:
+        return copy.deepcopy(cached[0])
+
+    fm = _read_header(key)
+    _cache_put(key, st, now, fm, None)
+    return copy.deepcopy(fm)
+
+
+def _read_header(path: str) -> dict[str, Any]:
+    """Stream a file up to its closing delimiter and parse that block."""
+    metrics.count("files_read")
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        if not _BOUNDARY.match(first):
+            return {}
+        lines = []
+        for line in f:
+            if _BOUNDARY.match(line):
+                break
+            lines.append(line)
+        else:
+            return {}
+    header = "".join(lines)
+    metrics.count("bytes_parsed", len(header))
+    data = yaml.load(header, Loader=_SafeLoader)
+    return data if isinstance(data, dict) else {}
 
 
 def write_frontmatter(path: str | Path, data: dict[str, Any]) -> None:
@@ -95,4 +241,5 @@ def _write_document(path: Path, data: dict[str, Any], body: str) -> None:
     """Write frontmatter + body to path in the canonical format."""
     yaml_str = yaml.dump(data, default_flow_style=False, sort_keys=False).strip()
     content = f"---\n{yaml_str}\n---\n{body}"
+    _invalidate(path)
     path.write_text(content, encoding="utf-8")
@@ -0,0 +1,253 @@
+"""Read git refs without running git.
+
+CLASI asks git a handful of read-only questions: which branch is checked
+out, does a branch exist, which tags exist. ``handle_commit_check`` asks
+on every Bash tool call that mentions ``git commit``, and close_sprint
+asks several times. Each answer used to cost a ``git`` process; this
+module reads the answers from the repository files instead:
+
+    HEAD           ``<git-dir>/HEAD`` (per worktree)
+    loose refs     ``<common-dir>/refs/...``
+    packed refs    ``<common-dir>/packed-refs``
+
+The git directory is found by walking up from the start directory to a
+``.git`` directory or a ``.git`` file containing ``gitdir: <path>``
+(linked worktrees and submodules). A worktree's git directory names
+the shared repository in its ``commondir`` file. ``GIT_DIR`` is honoured
+when no start directory is given.
+
+Repositories using the reftable backend, and names that only git can
+resolve (abbreviated object ids, ``HEAD~1``), fall back to the git CLI.
+Everything that changes the repository still goes through the CLI.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+PathLike = Union[str, Path]
+
+# Refs under refs/ that live in a worktree's own git directory; pseudo
+# refs (HEAD, ORIG_HEAD ...) always do.
+_PER_WORKTREE = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+# How git expands a short name (``git help revisions``).
+_DWIM_RULES = (
+    "{}",
+    "refs/{}",
+    "refs/tags/{}",
+    "refs/heads/{}",
+    "refs/remotes/{}",
+    "refs/remotes/{}/HEAD",
+)
+
+_HEX = re.compile(r"^[0-9a-f]{4,64}$")
+_PSEUDO_REF = re.compile(r"^[A-Z_]*HEAD$")
+
+_MAX_SYMREF_DEPTH = 5
+
+
+class Unsupported(Exception):
+    """A ref store or revision syntax that needs the git CLI."""
+
+
+class GitRepo:
+    """The ref store of one repository (or linked worktree)."""
+
+    def __init__(self, git_dir: Path, common_dir: Optional[Path] = None):
+        self.git_dir = git_dir
+        self.common_dir = common_dir or git_dir
+
+    @property
+    def reftable(self) -> bool:
+        return (self.common_dir / "reftable").is_dir()
+
+    def _check(self) -> None:
+        if self.reftable:
+            raise Unsupported(str(self.common_dir))
+
+    def _loose_path(self, refname: str) -> Path:
+        if not refname.startswith("refs/") or refname.startswith(_PER_WORKTREE):
+            return self.git_dir / refname
+        return self.common_dir / refname
+
+    def packed_refs(self) -> Dict[str, str]:
+        """Return refname -> object id from ``packed-refs``."""
+        refs: Dict[str, str] = {}
+        try:
+            text = (self.common_dir / "packed-refs").read_text(encoding="utf-8")
+        except OSError:
+            return refs
+        for line in text.splitlines():
+            if not line or line[0] in "#^":
+                continue
+            oid, _, refname = line.partition(" ")
+            refs[refname.strip()] = oid
+        return refs
+
+    def read_ref(self, refname: str) -> Optional[str]:
+        """Return the raw value of *refname*: an object id or ``ref: <name>``."""
+        self._check()
+        try:
+            text = self._loose_path(refname).read_text(encoding="utf-8").strip()
+        except (IsADirectoryError, NotADirectoryError, FileNotFoundError):
+            text = ""
+        if text.startswith("ref:"):
+            return text.splitlines()[0]
+        if text:
+            return text.split()[0]  # FETCH_HEAD lines carry a description
+        if refname.startswith("refs/"):
+            return self.packed_refs().get(refname)
+        return None
+
+    def resolve_ref(self, refname: str) -> Optional[str]:
+        """Follow symbolic refs from *refname* to an object id."""
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self.read_ref(refname)
+            if value is None:
+                return None
+            if not value.startswith("ref:"):
+                return value
+            refname = value[4:].strip()
+        return None
+
+    def symbolic_head(self) -> Optional[str]:
+        """Return the ref HEAD points at, or None when HEAD is detached."""
+        value = self.read_ref("HEAD")
+        if value is not None and value.startswith("ref:"):
+            return value[4:].strip()
+        return None
+
+    def current_branch(self) -> str:
+        """Return the checked-out branch name, or ``"HEAD"`` when detached.
+
+        Matches ``git rev-parse --abbrev-ref HEAD``, except that an
+        unborn branch (no commits yet) is reported by name.
+        """
+        ref = self.symbolic_head()
+        if ref is None:
+            return "HEAD" if self.read_ref("HEAD") else ""
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Return the object id *name* names, as ``git rev-parse --verify``.
+
+        Returns None when no ref matches. Raises ``Unsupported`` for
+        names only git can resolve (object ids, ``HEAD~1``).
+        """
+        for rule in _DWIM_RULES:
+            refname = rule.format(name)
+            if not refname.startswith("refs/") and not _PSEUDO_REF.match(refname):
+                continue
+            oid = self.resolve_ref(refname)
+            if oid is not None:
+                return oid
+        if _HEX.match(name) or any(c in name for c in "~^:@{"):
+            raise Unsupported(name)
+        return None
+
+    def tags(self) -> List[str]:
+        """Return every tag name, sorted as ``git tag -l`` lists them."""
+        self._check()
+        names = {
+            refname[len("refs/tags/"):]
+            for refname in self.packed_refs()
+            if refname.startswith("refs/tags/")
+        }
+        tags_dir = self.common_dir / "refs" / "tags"
+        if tags_dir.is_dir():
+            for path in tags_dir.rglob("*"):
+                if path.is_file():
+                    names.add(path.relative_to(tags_dir).as_posix())
+        return sorted(names, key=lambda n: n.encode("utf-8"))
+
+
+def _read_gitdir_file(path: Path) -> Optional[Path]:
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    git_dir = Path(text[len("gitdir:"):].strip())
+    return git_dir if git_dir.is_absolute() else (path.parent / git_dir)
+
+
+def _common_dir(git_dir: Path) -> Path:
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    path = Path(common)
+    return path if path.is_absolute() else (git_dir / path).resolve()
+
+
+def open_repo(start: Optional[PathLike] = None) -> Optional[GitRepo]:
+    """Find the repository containing *start* (default: the cwd)."""
+    if start is None and os.environ.get("GIT_DIR"):
+        git_dir = Path(os.environ["GIT_DIR"]).resolve()
+        return GitRepo(git_dir, _common_dir(git_dir))
+    directory = Path(start if start is not None else os.getcwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            git_dir: Optional[Path] = dot_git
+        elif dot_git.is_file():
+            git_dir = _read_gitdir_file(dot_git)
+        else:
+            continue
+        if git_dir is not None and (git_dir / "HEAD").is_file():
+            git_dir = git_dir.resolve()
+            return GitRepo(git_dir, _common_dir(git_dir))
+    return None
+
+
+def _git(args: List[str], start: Optional[PathLike]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args],
+        capture_output=True,
+        text=True,
+        cwd=str(start) if start is not None else None,
+    )
+
+
+def current_branch(start: Optional[PathLike] = None) -> str:
+    """Return the current branch name, ``"HEAD"`` if detached, or ``""``
+    outside a repository."""
+    repo = open_repo(start)
+    if repo is None:
+        return ""
+    try:
+        return repo.current_branch()
+    except Unsupported:
+        result = _git(["rev-parse", "--abbrev-ref", "HEAD"], start)
+        return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def rev_exists(name: str, start: Optional[PathLike] = None) -> bool:
+    """True if *name* resolves like ``git rev-parse --verify <name>``."""
+    repo = open_repo(start)
+    if repo is None:
+        return False
+    try:
+        return repo.resolve(name) is not None
+    except Unsupported:
+        return _git(["rev-parse", "--verify", "--quiet", name], start).returncode == 0
+
+
+def list_tags(start: Optional[PathLike] = None) -> List[str]:
+    """Return all tag names, or ``[]`` outside a repository."""
+    repo = open_repo(start)
+    if repo is None:
+        return []
+    try:
+        return repo.tags()
+    except Unsupported:
+        result = _git(["tag", "-l"], start)
+        if result.returncode != 0:
+            return []
+        return [line.strip() for line in result.stdout.splitlines() if line.strip()]
@@ -0,0 +1,506 @@
+"""PreToolUse guard hooks: role-guard and mcp-guard.
+
+These run before every Edit/Write and every artifact-creation MCP call,
+so they are the hottest code path in CLASI. This module is kept on a
+strict import diet: it depends only on ``json``, ``os``, ``sys``,
+``sqlite3`` and the built-in ``time`` module, and reads the state
+database with plain SQL instead of going through ``StateDB``.
+``clasi-hook role-guard`` (see ``clasi.hook_client``) imports nothing
+else from the package.
+
+``tests/unit/test_hook_import_budget.py`` enforces this; add imports here
+only if they are already loaded at interpreter start-up. (``clasi.event_log``
+follows the same diet.)
+
+Both guards exit with code 0 (allow) or 2 (block, stderr fed back to the
+model).
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from clasi import event_log
+
+DB_PATH = "docs/clasi/.clasi.db"
+
+# Recovery records older than this are ignored (StateDB deletes them).
+_RECOVERY_TTL_SECONDS = 24 * 60 * 60
+
+
+def read_payload_text(text: str) -> dict:
+    """Decode a hook payload, returning {} for empty or invalid JSON."""
+    if not text.strip():
+        return {}
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+# ---------------------------------------------------------------------------
+# Hook activity log
+# ---------------------------------------------------------------------------
+
+
+def _log_hook_event(
+    event_type: str, payload: dict, exit_code: int, reason: str,
+) -> None:
+    """Append a single line to docs/clasi/log/hooks.log.
+
+    Called just before sys.exit(). Includes the exit code and a
+    fixed-width 12-char reason code. The same decision is queued as a
+    ``hook`` event for the structured event log (``event_log.append``,
+    which opens no database).
+
+    Creates docs/clasi/log/ if docs/clasi/ exists. Wraps everything in
+    try/except so logging never causes a hook to fail.
+    """
+    try:
+        base = os.path.join("docs", "clasi")
+        if not os.path.isdir(base):
+            return
+        log_dir = os.path.join(base, "log")
+        os.makedirs(log_dir, exist_ok=True)
+
+        timestamp = time.strftime("%H:%M:%SZ", time.gmtime())
+        reason_fixed = f"{reason:<12.12}"
+
+        # Build a short summary of key payload fields
+        key_fields: list[str] = []
+        data: dict = {"exit_code": exit_code}
+        for key in ("tool_name", "file_path", "path", "new_path", "task_id",
+                    "task_subject", "agent_type", "agent_id", "session_id"):
+            value = payload.get(key)
+            if value:
+                key_fields.append(f"{key}={value}")
+                data[key] = value
+
+        tier = os.environ.get("CLASI_AGENT_TIER", "")
+        name = os.environ.get("CLASI_AGENT_NAME", "")
+        if tier or name:
+            key_fields.append(f"tier={tier or '0'} name={name or 'team-lead'}")
+
+        line = f"{timestamp} {event_type:<16} {exit_code} {reason_fixed} {' '.join(key_fields)}\n"
+        hooks_log = os.path.join(log_dir, "hooks.log")
+        with open(hooks_log, "a", encoding="utf-8") as f:
+            f.write(line)
+
+        event_log.append(log_dir, "hook", event_type, outcome=reason, data=data)
+    except Exception:
+        pass  # Logging must never cause a hook to fail
+
+
+def _exit_hook(
+    event_type: str, payload: dict, exit_code: int, reason: str,
+) -> None:
+    """Log the hook event and exit with the given code."""
+    _log_hook_event(event_type, payload, exit_code, reason)
+    sys.exit(exit_code)
+
+
+# ---------------------------------------------------------------------------
+# Guard state: active tier and recovery paths
+# ---------------------------------------------------------------------------
+
+# Cached guard state is reused for at most this long, and only while the
+# state DB and its WAL file are unchanged on disk.
+_STATE_TTL_SECONDS = 1.0
+
+_STATE_SQL = (
+    "SELECT (SELECT tier FROM active_agents LIMIT 1) AS tier, "
+    "(SELECT allowed_paths FROM recovery_state WHERE id = 1) AS allowed_paths, "
+    "(SELECT recorded_at FROM recovery_state WHERE id = 1) AS recorded_at"
+)
+
+_EMPTY_STATE = {"tier": "", "allowed_paths": [], "recorded_at": ""}
+
+
+def _log_path(name: str) -> str:
+    return os.path.join("docs", "clasi", "log", name)
+
+
+def _stat_key(path: str) -> "list[int] | None":
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _read_state_db() -> dict:
+    """Read the active tier and recovery record in one query.
+
+    The guards only read, so no schema is created; a missing or unreadable
+    database simply means "no agent, no recovery".
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+    except sqlite3.Error:
+        return dict(_EMPTY_STATE)
+    try:
+        row = conn.execute(_STATE_SQL).fetchone()
+    except sqlite3.Error:
+        return dict(_EMPTY_STATE)
+    finally:
+        conn.close()
+    tier, allowed_json, recorded_at = row
+    try:
+        allowed = json.loads(allowed_json or "[]")
+    except json.JSONDecodeError:
+        allowed = []
+    return {
+        "tier": tier or "",
+        "allowed_paths": allowed if isinstance(allowed, list) else [],
+        "recorded_at": recorded_at or "",
+    }
+
+
+def guard_state() -> dict:
+    """Return {tier, allowed_paths, recorded_at} from the state DB.
+
+    Consecutive hook processes share the result through a small cache
+    file in docs/clasi/log/. The cache is keyed by the (mtime, size) of
+    the DB and its WAL file and expires after ``_STATE_TTL_SECONDS``, so
+    a registered agent or a new recovery record is seen immediately.
+    """
+    db_key = _stat_key(DB_PATH)
+    if db_key is None:
+        return dict(_EMPTY_STATE)
+    key = [db_key, _stat_key(DB_PATH + "-wal")]
+    cache_path = _log_path("guard-state.json")
+    now = time.time()
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if (
+            cached.get("key") == key
+            and 0 <= now - cached.get("checked_at", 0) < _STATE_TTL_SECONDS
+        ):
+            return cached["state"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    state = _read_state_db()
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "checked_at": now, "state": state}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return state
+
+
+def _recovery_allowed_paths(state: dict) -> list[str]:
+    """Return the recovery record's allowed paths unless it has expired."""
+    if not state["allowed_paths"]:
+        return []
+    # recorded_at is an ISO 8601 UTC timestamp, so it orders as a string.
+    cutoff = time.strftime(
+        "%Y-%m-%dT%H:%M:%S",
+        time.gmtime(time.time() - _RECOVERY_TTL_SECONDS),
+    )
+    if state["recorded_at"] < cutoff:
+        return []
+    return state["allowed_paths"]
+
+
+# ---------------------------------------------------------------------------
+# Role-guard write policy
+# ---------------------------------------------------------------------------
+
+SETTINGS_PATH = os.path.join("docs", "clasi", "settings.yaml")
+
+# The write matrix from handle_role_guard's docstring. Each rule covers
+# every path starting with its prefix; the longest matching prefix wins.
+# "allow" lists the tiers that may write ("*" = every tier) and "reason"
+# is the log reason for an allow. "block" optionally overrides the block
+# reason per tier. Tier 2 is unrestricted and never consults the table.
+#
+# Projects extend or override rules (matched by prefix) in
+# docs/clasi/settings.yaml:
+#
+#   role_guard:
+#     rules:
+#       - prefix: "docs/design/"
+#         allow: ["0", "1"]
+#         reason: design-docs
+DEFAULT_RULES = (
+    {"prefix": "", "allow": [], "reason": ""},
+    {"prefix": ".claude/", "allow": "*", "reason": "safe-prefix"},
+    {"prefix": "CLAUDE.md", "allow": "*", "reason": "safe-prefix"},
+    {"prefix": "AGENTS.md", "allow": "*", "reason": "safe-prefix"},
+    {"prefix": "docs/clasi/", "allow": ["0"], "reason": "clasi-docs"},
+    {"prefix": "docs/clasi/sprints/", "allow": ["1"], "reason": "tier-1",
+     "block": {"0": "blk-sprint"}},
+)
+
+# The policy's own inputs: the settings file it is read from and the
+# caches in docs/clasi/log/. Guarded tiers may not write them, or an
+# agent could loosen its own restrictions. These rules are applied after
+# the project's rules, so settings.yaml cannot override them. Tier 2
+# and the .clasi-oop bypass are not affected.
+PROTECTED_RULES = tuple(
+    {"prefix": prefix, "allow": [], "reason": "",
+     "block": {"0": "blk-guard", "1": "blk-guard"}}
+    for prefix in (
+        "docs/clasi/settings.yaml",
+        "docs/clasi/log/role-guard-policy.json",
+        "docs/clasi/log/guard-state.json",
+    )
+)
+
+# Bumped when compiled policies change shape, to retire old caches.
+_POLICY_FORMAT = 2
+
+UNRESTRICTED_TIERS = ("2",)
+
+_BLOCK_MESSAGES = {
+    "blk-sprint": (
+        "CLASI ROLE VIOLATION: team-lead cannot directly edit sprint artifacts.\n"
+        "Use MCP tools (create_sprint, create_ticket, update_ticket_status, etc.)."
+    ),
+    "blk-guard": (
+        "CLASI ROLE VIOLATION: docs/clasi/settings.yaml and the role-guard caches\n"
+        "define what agents may write, so agents cannot edit them.\n"
+        "Ask the stakeholder to make the change."
+    ),
+}
+
+
+def compile_policy(rules) -> dict:
+    """Compile rule dicts into a prefix table.
+
+    Returns {"table": {prefix: [allow_tiers_or_"*", reason, block]},
+    "lengths": [distinct prefix lengths, longest first]}. Lookup costs one
+    dict probe per distinct prefix length, however many rules there are.
+    Later rules replace earlier ones with the same prefix.
+    """
+    table = {}
+    for rule in rules:
+        if not isinstance(rule, dict) or not isinstance(rule.get("prefix"), str):
+            continue
+        allow = rule.get("allow", [])
+        if allow != "*":
+            allow = sorted(str(t) for t in (allow or []))
+        block = {str(k): str(v) for k, v in (rule.get("block") or {}).items()}
+        table[rule["prefix"]] = [allow, str(rule.get("reason") or "allowed"), block]
+    table.setdefault("", [[], "allowed", {}])
+    return {
+        "table": table,
+        "lengths": sorted({len(p) for p in table}, reverse=True),
+    }
+
+
+def _project_rules() -> list:
+    """Parse role_guard.rules from settings.yaml (imports yaml; slow path)."""
+    try:
+        import yaml
+
+        with open(SETTINGS_PATH, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    except Exception:
+        return []
+    if not isinstance(data, dict) or not isinstance(data.get("role_guard"), dict):
+        return []
+    rules = data["role_guard"].get("rules")
+    return rules if isinstance(rules, list) else []
+
+
+def load_policy() -> dict:
+    """Return the compiled policy for the current project.
+
+    Without a settings file this is the compiled DEFAULT_RULES (plus
+    PROTECTED_RULES, which always come last). Otherwise
+    the merged, compiled table is cached as JSON in docs/clasi/log/ keyed
+    by the settings file's (mtime, size), so YAML is parsed only after
+    the settings change.
+    """
+    key = _stat_key(SETTINGS_PATH)
+    if key is None:
+        return compile_policy(DEFAULT_RULES + PROTECTED_RULES)
+    key.append(_POLICY_FORMAT)
+    cache_path = _log_path("role-guard-policy.json")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return cached["policy"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    policy = compile_policy(
+        list(DEFAULT_RULES) + _project_rules() + list(PROTECTED_RULES)
+    )
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "policy": policy}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return policy
+
+
+def evaluate(policy: dict, tier: str, file_path: str) -> tuple:
+    """Return (allowed, reason) for a write by *tier* to *file_path*."""
+    table = policy["table"]
+    for length in policy["lengths"]:
+        if len(file_path) < length:
+            continue
+        rule = table.get(file_path[:length])
+        if rule is not None:
+            break
+    else:
+        rule = table[""]
+    allow, reason, block = rule
+    if allow == "*" or tier in allow:
+        return True, reason
+    return False, block.get(tier, "blk-write")
+
+
+# ---------------------------------------------------------------------------
+# Role Guard — PreToolUse hook for Edit/Write/MultiEdit
+# ---------------------------------------------------------------------------
+
+
+def handle_role_guard(payload: dict) -> None:
+    """Enforce directory write scopes based on agent tier.
+
+    Allowed/blocked write matrix
+    ─────────────────────────────────────────────────────────────────────────
+    Path                          tier 0   tier 1   tier 2   OOP
+    ────────────────────────────  ──────   ──────   ──────   ───
+    .claude/**  /  CLAUDE.md      ALLOW    ALLOW    ALLOW    ALLOW
+    AGENTS.md                     ALLOW    ALLOW    ALLOW    ALLOW
+    docs/clasi/  (non-sprint)     ALLOW    BLOCK    ALLOW    ALLOW
+    docs/clasi/settings.yaml,
+      role-guard caches           BLOCK    BLOCK    ALLOW    ALLOW
+    docs/clasi/sprints/**         BLOCK    ALLOW    ALLOW    ALLOW
+    Source / tests / config       BLOCK    BLOCK    ALLOW    ALLOW
+    (anything else)               BLOCK    BLOCK    ALLOW    ALLOW
+    ─────────────────────────────────────────────────────────────────────────
+
+    Tier 0 = team-lead / interactive session (CLASI_AGENT_TIER unset or "0")
+    Tier 1 = sprint-planner
+    Tier 2 = programmer
+    OOP    = .clasi-oop flag file present in cwd (out-of-process bypass)
+
+    The matrix is DEFAULT_RULES, compiled by load_policy() together with
+    any project rules from docs/clasi/settings.yaml and PROTECTED_RULES.
+
+    Exits with code 0 (allow) or 2 (block).  Code 1 is reserved for
+    unknown event names in the dispatcher.
+    """
+    tool_input = payload if payload else {}
+    file_path = (
+        tool_input.get("file_path")
+        or tool_input.get("path")
+        or tool_input.get("new_path")
+        or ""
+    )
+
+    # No path in payload — nothing to guard, allow through
+    if not file_path:
+        _exit_hook("role-guard", payload, 0, "no-path")
+
+    agent_tier = os.environ.get("CLASI_AGENT_TIER", "")
+    state = None
+
+    # If no env var, check the DB for the active agent tier
+    if not agent_tier:
+        state = guard_state()
+        agent_tier = state["tier"]
+
+    # Tier 2 (programmer) can write anywhere — that's their job.
+    # Checked first so programmer subagents never hit any later block.
+    if agent_tier in UNRESTRICTED_TIERS:
+        _exit_hook("role-guard", payload, 0, "tier-2")
+
+    # OOP bypass: .clasi-oop flag enables direct writes for any tier.
+    # Used for out-of-process changes reviewed manually by the team-lead.
+    if os.path.exists(".clasi-oop"):
+        _exit_hook("role-guard", payload, 0, "oop-bypass")
+
+    # Recovery state bypass: allows specific paths during sprint recovery
+    # (e.g. resolving merge conflicts) when recorded in the state DB.
+    if state is None:
+        state = guard_state()
+    if file_path in _recovery_allowed_paths(state):
+        _exit_hook("role-guard", payload, 0, "recovery")
+
+    allowed, reason = evaluate(load_policy(), agent_tier or "0", file_path)
+    if allowed:
+        _exit_hook("role-guard", payload, 0, reason)
+
+    # --- BLOCK ---
+    message = _BLOCK_MESSAGES.get(reason)
+    if message:
+        print(message, file=sys.stderr)
+        _exit_hook("role-guard", payload, 2, reason)
+
+    agent_name = os.environ.get("CLASI_AGENT_NAME", "team-lead")
+    print(
+        f"CLASI ROLE VIOLATION: {agent_name} (tier {agent_tier or '0'}) "
+        f"attempted direct file write to: {file_path}",
+        file=sys.stderr,
+    )
+    print(
+        "Dispatch to the appropriate agent for this write:",
+        file=sys.stderr,
+    )
+    if agent_tier == "1":
+        print("- programmer agent for source code and tests", file=sys.stderr)
+    else:
+        print(
+            "- sprint-planner agent for sprint/architecture/ticket artifacts",
+            file=sys.stderr,
+        )
+        print("- programmer agent for source code and tests", file=sys.stderr)
+    _exit_hook("role-guard", payload, 2, reason)
+
+
+# ---------------------------------------------------------------------------
+# MCP Guard — PreToolUse hook for create_ticket / create_sprint
+# ---------------------------------------------------------------------------
+
+
+def handle_mcp_guard(payload: dict) -> None:
+    """Block Tier 0 (team-lead) from calling artifact-creation MCP tools directly.
+
+    The sprint-planner (Tier 1) and programmer (Tier 2) are allowed.
+    OOP bypass: if .clasi-oop exists, allow all tiers.
+    """
+    # OOP bypass
+    if os.path.exists(".clasi-oop"):
+        _exit_hook("mcp-guard", payload, 0, "oop-bypass")
+
+    agent_tier = os.environ.get("CLASI_AGENT_TIER", "")
+
+    # If no env var, check the DB for the active agent tier
+    if not agent_tier:
+        agent_tier = guard_state()["tier"]
+
+    # Only block Tier 0 (team-lead / interactive session)
+    if agent_tier not in ("", "0"):
+        _exit_hook("mcp-guard", payload, 0, "tier-allowed")
+
+    tool_name = payload.get("tool_name", "")
+    print(
+        f"CLASI ROLE VIOLATION: team-lead cannot call {tool_name} directly.\n"
+        "Dispatch to sprint-planner agent to create planning artifacts.",
+        file=sys.stderr,
+    )
+    _exit_hook("mcp-guard", payload, 2, "blk-mcp")
+
+
+GUARDS = {
+    "role-guard": handle_role_guard,
+    "mcp-guard": handle_mcp_guard,
+}
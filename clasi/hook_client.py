@@ -0,0 +1,180 @@
+"""Minimal ``clasi-hook`` client.
+
+Hook commands run once per tool call, so their start-up cost is paid on
+every Edit/Write the agent makes. This entry point avoids click and the
+handler modules entirely when a resident hook server (see
+``clasi.hook_server``) is listening for the current project: it reads the
+payload from stdin, forwards it over a Unix socket, relays the server's
+stdout/stderr and exits with the server's exit code.
+
+When no server is running (or the platform has no Unix sockets), the
+event is handled in-process exactly as ``clasi hook <event>`` would. The
+PreToolUse guards (role-guard, mcp-guard) are then run from
+``clasi.guards`` directly, so that path imports only the standard
+library modules that module allows.
+
+The socket lives in a directory only its owner can use, and the client
+refuses a socket (or directory) that another user owns or can open: a
+server started by someone else could read the forwarded payload and
+answer "allow" to every guard. Only the environment variables the
+handlers read (``CLASI_*``, ``TOOL_INPUT`` and git's repository
+variables) are forwarded.
+
+Usage:
+    clasi-hook <event>  < payload.json
+"""
+
+import json
+import os
+import stat
+import sys
+import zlib
+
+# Seconds to wait for the server to answer before falling back.
+_TIMEOUT = 10.0
+
+# Environment variables the hook handlers read; nothing else is sent.
+_FORWARD_PREFIXES = ("CLASI_",)
+_FORWARD_NAMES = ("TOOL_INPUT", "GIT_DIR", "GIT_WORK_TREE")
+
+
+def is_forwarded(name):
+    """True if the environment variable *name* is sent to the server."""
+    return name in _FORWARD_NAMES or name.startswith(_FORWARD_PREFIXES)
+
+
+def socket_dir():
+    """Return the directory that holds this user's hook-server sockets.
+
+    $XDG_RUNTIME_DIR when set (private to the user by specification),
+    otherwise ``clasi-hook-<uid>`` in $TMPDIR, which the server creates
+    with mode 0700. Both are short, as Unix socket paths must be.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return runtime
+    tmp = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(tmp, f"clasi-hook-{os.getuid()}")
+
+
+def socket_path(root=None):
+    """Return the hook-server socket path for a project root (default: cwd).
+
+    The name is keyed by a checksum of the resolved project root.
+    """
+    root = os.path.realpath(root or os.getcwd())
+    digest = zlib.crc32(root.encode("utf-8"))
+    return os.path.join(socket_dir(), f"clasi-hook-{digest:08x}.sock")
+
+
+def is_private(path, kind):
+    """Return True if *path* is this user's and no one else can access it.
+
+    *kind* tests the file type (``stat.S_ISDIR``, ``stat.S_ISSOCK``); a
+    symlink never passes.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return kind(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def request(message, root=None, timeout=_TIMEOUT):
+    """Send one JSON message to the hook server and return its JSON reply.
+
+    Returns None if no server is reachable or the reply is unusable.
+    """
+    path = socket_path(root)
+    if not (is_private(os.path.dirname(path), stat.S_ISDIR)
+            and is_private(path, stat.S_ISSOCK)):
+        return None
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(message).encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    return reply if isinstance(reply, dict) else None
+
+
+def forward(event, stdin_text):
+    """Ask the resident server to handle *event*.
+
+    Returns (exit_code, stdout, stderr), or None if the event must be
+    handled in-process.
+    """
+    cwd = os.getcwd()
+    reply = request({
+        "command": "hook",
+        "event": event,
+        "cwd": cwd,
+        "env": {k: v for k, v in os.environ.items() if is_forwarded(k)},
+        "stdin": stdin_text,
+    }, root=cwd)
+    if reply is None or reply.get("fallback") or "exit_code" not in reply:
+        return None
+    return int(reply["exit_code"]), reply.get("stdout", ""), reply.get("stderr", "")
+
+
+def _run_in_process(event, stdin_text):
+    """Handle the event in this process, feeding it the already-read stdin."""
+    from clasi.guards import GUARDS, read_payload_text
+
+    guard = GUARDS.get(event)
+    if guard is not None:
+        guard(read_payload_text(stdin_text))
+        sys.exit(0)
+
+    import io
+
+    from clasi.hook_handlers import handle_hook
+
+    sys.stdin = io.StringIO(stdin_text)
+    handle_hook(event)
+    sys.exit(0)
+
+
+def main(argv=None):
+    """Entry point for the ``clasi-hook`` console script."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: clasi-hook <event>", file=sys.stderr)
+        sys.exit(1)
+    event = args[0]
+
+    try:
+        stdin_text = "" if sys.stdin.isatty() else sys.stdin.read()
+    except (OSError, ValueError):
+        stdin_text = ""
+
+    result = forward(event, stdin_text)
+    if result is None:
+        _run_in_process(event, stdin_text)
+        return
+
+    exit_code, out, err = result
+    if out:
+        sys.stdout.write(out)
+        sys.stdout.flush()
+    if err:
+        sys.stderr.write(err)
+        sys.stderr.flush()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,16 @@ import subprocess
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
+
+# The hook activity log and the PreToolUse guards live in clasi.guards so
+# the clasi-hook fast path can run them without importing this module.
+from clasi.guards import (
+    _exit_hook,
+    _log_hook_event,
+    handle_mcp_guard,
+    handle_role_guard,
+)
 
 
 def read_payload() -> dict:
@@ -30,232 +39,6 @@ def read_payload() -> dict:
         return {}
 
 
-# ---------------------------------------------------------------------------
-# Hook activity log
-# ---------------------------------------------------------------------------
-
-
-def _log_hook_event(
-    event_type: str, payload: dict, exit_code: int, reason: str,
-) -> None:
-    """Append a single line to docs/clasi/log/hooks.log.
-
-    Called just before sys.exit(). Includes the exit code and a
-    fixed-width 12-char reason code.
-
-    Creates docs/clasi/log/ if docs/clasi/ exists. Wraps everything in
-    try/except so logging never causes a hook to fail.
-    """
-    try:
-        base = Path("docs/clasi")
-        if not base.exists():
-            return
-        log_dir = base / "log"
-        log_dir.mkdir(exist_ok=True)
-
-        timestamp = datetime.now(timezone.utc).strftime("%H:%M:%SZ")
-        reason_fixed = f"{reason:<12.12}"
-
-        # Build a short summary of key payload fields
-        key_fields: list[str] = []
-        for key in ("tool_name", "file_path", "path", "new_path", "task_id",
-                    "task_subject", "agent_type", "agent_id", "session_id"):
-            value = payload.get(key)
-            if value:
-                key_fields.append(f"{key}={value}")
-
-        tier = os.environ.get("CLASI_AGENT_TIER", "")
-        name = os.environ.get("CLASI_AGENT_NAME", "")
-        if tier or name:
-            key_fields.append(f"tier={tier or '0'} name={name or 'team-lead'}")
-
-        line = f"{timestamp} {event_type:<16} {exit_code} {reason_fixed} {' '.join(key_fields)}\n"
-        hooks_log = log_dir / "hooks.log"
-        with open(hooks_log, "a", encoding="utf-8") as f:
-            f.write(line)
-    except Exception:
-        pass  # Logging must never cause a hook to fail
-
-
-def _exit_hook(
-    event_type: str, payload: dict, exit_code: int, reason: str,
-) -> None:
-    """Log the hook event and exit with the given code."""
-    _log_hook_event(event_type, payload, exit_code, reason)
-    sys.exit(exit_code)
-
-
-# ---------------------------------------------------------------------------
-# Role Guard — PreToolUse hook for Edit/Write/MultiEdit
-# ---------------------------------------------------------------------------
-
-
-def handle_role_guard(payload: dict) -> None:
-    """Enforce directory write scopes based on agent tier.
-
-    Allowed/blocked write matrix
-    ─────────────────────────────────────────────────────────────────────────
-    Path                          tier 0   tier 1   tier 2   OOP
-    ────────────────────────────  ──────   ──────   ──────   ───
-    .claude/**  /  CLAUDE.md      ALLOW    ALLOW    ALLOW    ALLOW
-    AGENTS.md                     ALLOW    ALLOW    ALLOW    ALLOW
-    docs/clasi/  (non-sprint)     ALLOW    ALLOW    ALLOW    ALLOW
-    docs/clasi/sprints/**         BLOCK    ALLOW    ALLOW    ALLOW
-    Source / tests / config       BLOCK    BLOCK    ALLOW    ALLOW
-    (anything else)               BLOCK    BLOCK    ALLOW    ALLOW
-    ─────────────────────────────────────────────────────────────────────────
-
-    Tier 0 = team-lead / interactive session (CLASI_AGENT_TIER unset or "0")
-    Tier 1 = sprint-planner
-    Tier 2 = programmer
-    OOP    = .clasi-oop flag file present in cwd (out-of-process bypass)
-
-    Exits with code 0 (allow) or 2 (block).  Code 1 is reserved for
-    unknown event names in the dispatcher.
-    """
-    tool_input = payload if payload else {}
-    file_path = (
-        tool_input.get("file_path")
-        or tool_input.get("path")
-        or tool_input.get("new_path")
-        or ""
-    )
-
-    # No path in payload — nothing to guard, allow through
-    if not file_path:
-        _exit_hook("role-guard", payload, 0, "no-path")
-
-    agent_tier = os.environ.get("CLASI_AGENT_TIER", "")
-
-    # If no env var, check the DB for the active agent tier
-    if not agent_tier:
-        try:
-            db_path_tier = Path("docs/clasi/.clasi.db")
-            if db_path_tier.exists():
-                from clasi.state_db import get_active_tier
-                agent_tier = get_active_tier(str(db_path_tier))
-        except Exception:
-            pass
-
-    # Tier 2 (programmer) can write anywhere — that's their job.
-    # Checked first so programmer subagents never hit any later block.
-    if agent_tier == "2":
-        _exit_hook("role-guard", payload, 0, "tier-2")
-
-    # OOP bypass: .clasi-oop flag enables direct writes for any tier.
-    # Used for out-of-process changes reviewed manually by the team-lead.
-    if Path(".clasi-oop").exists():
-        _exit_hook("role-guard", payload, 0, "oop-bypass")
-
-    # Recovery state bypass: allows specific paths during sprint recovery
-    # (e.g. resolving merge conflicts) when recorded in the state DB.
-    db_path = Path("docs/clasi/.clasi.db")
-    if db_path.exists():
-        try:
-            from clasi.state_db import get_recovery_state
-
-            recovery = get_recovery_state(str(db_path))
-            if recovery and file_path in recovery["allowed_paths"]:
-                _exit_hook("role-guard", payload, 0, "recovery")
-        except Exception:
-            pass
-
-    # Safe prefixes: always allowed for any tier (configuration / meta files).
-    # .claude/ — Claude Code settings, hooks, rules
-    # CLAUDE.md — project coding instructions
-    # AGENTS.md — agent instructions
-    safe_prefixes = [".claude/", "CLAUDE.md", "AGENTS.md"]
-    for prefix in safe_prefixes:
-        if file_path == prefix or file_path.startswith(prefix):
-            _exit_hook("role-guard", payload, 0, "safe-prefix")
-
-    # Team-lead (tier 0 or unset) can write to docs/clasi/ for planning
-    # artifacts (todo, reflections, log, overview, architecture) but CANNOT
-    # directly edit sprint artifacts — those must go through MCP tools.
-    if agent_tier in ("", "0") and file_path.startswith("docs/clasi/"):
-        if file_path.startswith("docs/clasi/sprints/"):
-            # Sprint artifacts are owned by sprint-planner (tier 1) and
-            # managed via MCP tools. Direct edits are blocked to prevent
-            # process violations (e.g. bypassing ticket status transitions).
-            print(
-                "CLASI ROLE VIOLATION: team-lead cannot directly edit sprint artifacts.\n"
-                "Use MCP tools (create_sprint, create_ticket, update_ticket_status, etc.).",
-                file=sys.stderr,
-            )
-            _exit_hook("role-guard", payload, 2, "blk-sprint")
-        # docs/clasi/ non-sprint paths (todo/, log/, reflections/, etc.) — ALLOW
-        _exit_hook("role-guard", payload, 0, "clasi-docs")
-
-    # Sprint-planner (tier 1) can write to sprint directories they own.
-    # All other paths (source, tests, config) are blocked — dispatch to tier 2.
-    if agent_tier == "1" and file_path.startswith("docs/clasi/sprints/"):
-        _exit_hook("role-guard", payload, 0, "tier-1")
-
-    # --- BLOCK ---
-    # If we reach here, the write is not permitted for this tier.
-    # tier 0 / unset: source code, tests, config, non-clasi docs → BLOCK
-    # tier 1:         source code, tests, config, non-sprint docs  → BLOCK
-    agent_name = os.environ.get("CLASI_AGENT_NAME", "team-lead")
-    print(
-        f"CLASI ROLE VIOLATION: {agent_name} (tier {agent_tier or '0'}) "
-        f"attempted direct file write to: {file_path}",
-        file=sys.stderr,
-    )
-    print(
-        "Dispatch to the appropriate agent for this write:",
-        file=sys.stderr,
-    )
-    if agent_tier == "1":
-        print("- programmer agent for source code and tests", file=sys.stderr)
-    else:
-        print(
-            "- sprint-planner agent for sprint/architecture/ticket artifacts",
-            file=sys.stderr,
-        )
-        print("- programmer agent for source code and tests", file=sys.stderr)
-    _exit_hook("role-guard", payload, 2, "blk-write")
-
-
-# ---------------------------------------------------------------------------
-# MCP Guard — PreToolUse hook for create_ticket / create_sprint
-# ---------------------------------------------------------------------------
-
-
-def handle_mcp_guard(payload: dict) -> None:
-    """Block Tier 0 (team-lead) from calling artifact-creation MCP tools directly.
-
-    The sprint-planner (Tier 1) and programmer (Tier 2) are allowed.
-    OOP bypass: if .clasi-oop exists, allow all tiers.
-    """
-    # OOP bypass
-    if Path(".clasi-oop").exists():
-        _exit_hook("mcp-guard", payload, 0, "oop-bypass")
-
-    agent_tier = os.environ.get("CLASI_AGENT_TIER", "")
-
-    # If no env var, check the DB for the active agent tier
-    if not agent_tier:
-        try:
-            db_path_tier = Path("docs/clasi/.clasi.db")
-            if db_path_tier.exists():
-                from clasi.state_db import get_active_tier
-                agent_tier = get_active_tier(str(db_path_tier))
-        except Exception:
-            pass
-
-    # Only block Tier 0 (team-lead / interactive session)
-    if agent_tier not in ("", "0"):
-        _exit_hook("mcp-guard", payload, 0, "tier-allowed")
-
-    tool_name = payload.get("tool_name", "")
-    print(
-        f"CLASI ROLE VIOLATION: team-lead cannot call {tool_name} directly.\n"
-        "Dispatch to sprint-planner agent to create planning artifacts.",
-        file=sys.stderr,
-    )
-    _exit_hook("mcp-guard", payload, 2, "blk-mcp")
-
-
 # ---------------------------------------------------------------------------
 # Log directory resolution
 # ---------------------------------------------------------------------------
@@ -394,9 +177,6 @@ def handle_subagent_start(payload: dict) -> None:
     tier = _AGENT_TYPE_TIERS.get(agent_type, "0")
 
     # Create the log file
-    _next = _next_log_number(log_dir)
-    log_file = log_dir / f"{_next:03d}-{agent_type}.md"
-
     lines = [
         "---",
         f"agent_type: {agent_type}",
@@ -409,7 +189,9 @@ def handle_subagent_start(payload: dict) -> None:
         f"# Subagent: {agent_type}",
         "",
     ]
-    log_file.write_text("\n".join(lines))
+    log_file = _create_log_file(
+        log_dir, lambda n: f"{n:03d}-{agent_type}.md", "\n".join(lines)
+    )
 
     # Register in DB so stop hook can find the log file and tier guard can check tier
     marker_id = agent_id or session_id or "unknown"
@@ -426,9 +208,24 @@ def handle_subagent_start(payload: dict) -> None:
     _exit_hook("sub-start", payload, 0, "logged")
 
 
+def _record_completion(
+    kind: str, name: str, sprint_id: str, duration_s: Optional[float],
+    data: dict,
+) -> None:
+    """Record a finished subagent or task in the structured event log."""
+    from clasi import event_log
+
+    event_log.record(
+        Path("docs/clasi/log"), kind, name, sprint=sprint_id or None,
+        outcome="done",
+        duration_ms=duration_s * 1000 if duration_s is not None else None,
+        data=data,
+    )
+
+
 def handle_subagent_stop(payload: dict) -> None:
     """Append transcript to the log file created by subagent-start."""
-    log_dir = _get_log_dir()
+    log_dir, sprint_id = _get_sprint_context()
     if log_dir is None:
         _exit_hook("sub-stop", payload, 0, "no-log-dir")
 
@@ -442,6 +239,7 @@ def handle_subagent_stop(payload: dict) -> None:
     marker_id = agent_id or session_id or "unknown"
     log_file = None
     started_at = None
+    agent_type = payload.get("agent_type", "")
     try:
         db_path = Path("docs/clasi/.clasi.db")
         if db_path.exists():
@@ -451,6 +249,7 @@ def handle_subagent_stop(payload: dict) -> None:
                 if record.get("log_file"):
                     log_file = Path(record["log_file"])
                 started_at = record.get("started_at")
+                agent_type = record.get("agent_type") or agent_type
             remove_active_agent(str(db_path), marker_id)
     except Exception:
         pass
@@ -458,10 +257,8 @@ def handle_subagent_stop(payload: dict) -> None:
     if not log_file or not log_file.exists():
         _exit_hook("sub-stop", payload, 0, "no-log-file")
 
-    # Build content to append
-    lines = []
-
     # Add duration to frontmatter by rewriting the file
+    duration_s = None
     if started_at:
         try:
             duration_s = (stop_time - datetime.fromisoformat(started_at)).total_seconds()
@@ -482,29 +279,14 @@ def handle_subagent_stop(payload: dict) -> None:
     if transcript_path:
         prompt = _extract_prompt_from_transcript(transcript_path)
 
-    if prompt:
-        lines.extend(["## Prompt", "", prompt, ""])
-
-    if last_message:
-        lines.extend(["## Result", "", last_message, ""])
-
-    # Append transcript as markdown + raw JSON
-    if transcript_path:
-        transcript_file = Path(transcript_path)
-        if transcript_file.exists():
-            try:
-                transcript_content = transcript_file.read_text(encoding="utf-8")
-                messages = []
-                for line in transcript_content.splitlines():
-                    if line.strip():
-                        messages.append(json.loads(line))
-                lines.extend(_render_transcript_lines(messages))
-            except OSError:
-                pass
-
-    if lines:
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+    # Append prompt, result and transcript (markdown + stored raw JSON)
+    _append_log_sections(
+        log_file, prompt, last_message, transcript_path, Path("docs/clasi/log"),
+    )
+    _record_completion(
+        "subagent", agent_type or "unknown", sprint_id, duration_s,
+        {"agent_id": agent_id, "log_file": str(log_file)},
+    )
 
     _exit_hook("sub-stop", payload, 0, "logged")
 
@@ -533,9 +315,7 @@ def handle_task_created(payload: dict) -> None:
     tickets_str = ", ".join(active_tickets)
 
     # Create the log file
-    _next = _next_log_number(log_dir)
     safe_subject = task_subject[:40].replace("/", "-").replace(" ", "-").lower() if task_subject else "task"
-    log_file = log_dir / f"{_next:03d}-{safe_subject}.md"
 
     lines = [
         "---",
@@ -550,7 +330,9 @@ def handle_task_created(payload: dict) -> None:
         f"# Task: {task_subject}",
         "",
     ]
-    log_file.write_text("\n".join(lines))
+    log_file = _create_log_file(
+        log_dir, lambda n: f"{n:03d}-{safe_subject}.md", "\n".join(lines)
+    )
 
     # Register in DB so task_completed can find the log file
     task_marker_id = f"task-{task_id}"
@@ -573,7 +355,7 @@ def handle_task_completed(payload: dict) -> None:
     Finds the .active marker, appends duration to frontmatter, extracts
     the prompt from the transcript, and appends the transcript content.
     """
-    log_dir = _get_log_dir()
+    log_dir, sprint_id = _get_sprint_context()
     if log_dir is None:
         _exit_hook("task-done", payload, 0, "no-log-dir")
 
@@ -602,6 +384,7 @@ def handle_task_completed(payload: dict) -> None:
         _exit_hook("task-done", payload, 0, "no-log-file")
 
     # Add duration to frontmatter by rewriting the file
+    duration_s = None
     if started_at:
         try:
             duration_s = (stop_time - datetime.fromisoformat(started_at)).total_seconds()
@@ -617,33 +400,19 @@ def handle_task_completed(payload: dict) -> None:
         except (ValueError, OSError):
             pass
 
-    lines = []
-
     # Extract prompt from transcript
     prompt = ""
     if transcript_path:
         prompt = _extract_prompt_from_transcript(transcript_path)
 
-    if prompt:
-        lines.extend(["## Prompt", "", prompt, ""])
-
-    # Append transcript as markdown + raw JSON
-    if transcript_path:
-        transcript_file = Path(transcript_path)
-        if transcript_file.exists():
-            try:
-                transcript_content = transcript_file.read_text(encoding="utf-8")
-                messages = []
-                for line in transcript_content.splitlines():
-                    if line.strip():
-                        messages.append(json.loads(line))
-                lines.extend(_render_transcript_lines(messages))
-            except OSError:
-                pass
-
-    if lines:
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+    # Append prompt and transcript (markdown + stored raw JSON)
+    _append_log_sections(
+        log_file, prompt, "", transcript_path, Path("docs/clasi/log"),
+    )
+    _record_completion(
+        "task", payload.get("task_subject") or task_id or "task", sprint_id,
+        duration_s, {"task_id": task_id, "log_file": str(log_file)},
+    )
 
     _exit_hook("task-done", payload, 0, "logged")
 
@@ -672,6 +441,182 @@ def _ext_to_language(path: str) -> str:
     return mapping.get(ext, "")
 
 
+def _iter_transcript(transcript_path: str | Path) -> Iterator[dict]:
+    """Yield the messages of a JSONL transcript one at a time.
+
+    Blank and malformed lines are skipped, and a read error ends the
+    stream, so memory use is bounded by the longest line rather than the
+    size of the transcript.
+    """
+    from clasi.transcript_store import iter_jsonl
+
+    try:
+        with open(transcript_path, encoding="utf-8") as f:
+            yield from iter_jsonl(f)
+    except OSError:
+        return
+
+
+def _render_message_lines(msg: dict) -> Iterator[str]:
+    """Yield the markdown lines for one transcript message."""
+    timestamp = msg.get("timestamp", "")
+    msg_type = msg.get("type", "")
+    git_branch = msg.get("gitBranch", "")
+    user_type = msg.get("userType", "")
+    cwd = msg.get("cwd", "")
+    inner = msg.get("message", {})
+    model = inner.get("model", "")
+    stop_reason = inner.get("stop_reason", "")
+
+    # Header
+    yield f"### {msg_type} — {timestamp}"
+    yield ""
+
+    # Metadata table
+    meta = []
+    if git_branch:
+        meta.append(f"branch: `{git_branch}`")
+    if user_type:
+        meta.append(f"userType: {user_type}")
+    if cwd:
+        meta.append(f"cwd: `{cwd}`")
+    if model:
+        meta.append(f"model: {model}")
+    if stop_reason:
+        meta.append(f"stop_reason: {stop_reason}")
+    if meta:
+        yield " | ".join(meta)
+        yield ""
+
+    # Content
+    content = inner.get("content", msg.get("content", ""))
+    if isinstance(content, str) and content:
+        yield content
+        yield ""
+    elif isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            block_type = block.get("type", "")
+            if block_type == "text":
+                yield block.get("text", "")
+                yield ""
+            elif block_type == "tool_use":
+                name = block.get("name", "")
+                tool_input = block.get("input", {})
+                if name == "Write":
+                    file_path = tool_input.get("file_path", "")
+                    content = tool_input.get("content", "")
+                    yield f"> **Write**: `{file_path}`"
+                    yield ""
+                    if content:
+                        # Truncate very long content
+                        MAX_CHARS = 3000
+                        truncated = content
+                        suffix = ""
+                        if len(content) > MAX_CHARS:
+                            truncated = content[:MAX_CHARS]
+                            suffix = "\n... (truncated)"
+                        ext = Path(file_path).suffix.lower()
+                        if ext == ".md":
+                            # Render markdown inline, no code fence
+                            yield truncated + suffix
+                        else:
+                            lang = _ext_to_language(file_path)
+                            yield f"```{lang}"
+                            yield truncated + suffix
+                            yield "```"
+                elif name == "Edit":
+                    file_path = tool_input.get("file_path", "")
+                    old_string = tool_input.get("old_string", "")
+                    new_string = tool_input.get("new_string", "")
+                    yield f"> **Edit**: `{file_path}`"
+                    yield ""
+                    yield "**Before:**"
+                    yield "```"
+                    yield old_string
+                    yield "```"
+                    yield ""
+                    yield "**After:**"
+                    yield "```"
+                    yield new_string
+                    yield "```"
+                else:
+                    yield f"> **Tool Use**: `{name}`"
+                    if tool_input:
+                        compact = json.dumps(tool_input, indent=2)
+                        # Truncate long tool inputs
+                        input_lines = compact.splitlines()
+                        if len(input_lines) > 15:
+                            input_lines = input_lines[:15] + ["  ..."]
+                        yield "> ```json"
+                        for il in input_lines:
+                            yield f"> {il}"
+                        yield "> ```"
+                yield ""
+            elif block_type == "tool_result":
+                tool_id = block.get("tool_use_id", "")
+                result_content = block.get("content", "")
+                yield f"> **Tool Result** (id: `{tool_id}`)"
+                if isinstance(result_content, str) and result_content:
+                    result_preview = result_content[:500]
+                    if len(result_content) > 500:
+                        result_preview += "..."
+                    yield "> ```"
+                    for rl in result_preview.splitlines():
+                        yield f"> {rl}"
+                    yield "> ```"
+                yield ""
+
+    yield "---"
+    yield ""
+
+
+def _raw_json_lines(messages: Iterable[dict]) -> Iterator[str]:
+    """Yield ``json.dumps(list(messages), indent=2)`` a message at a time."""
+    held: Optional[str] = None
+    for msg in messages:
+        if held is None:
+            yield "["
+        else:
+            yield held + ","
+        dumped = json.dumps(msg, indent=2).splitlines()
+        for line in dumped[:-1]:
+            yield "  " + line
+        held = "  " + dumped[-1]
+    if held is None:
+        yield "[]"
+    else:
+        yield held
+        yield "]"
+
+
+def _stream_transcript_lines(
+    read_messages: Callable[[], Iterable[dict]],
+    transcript_ref: Optional[str] = None,
+) -> Iterator[str]:
+    """Yield the ``## Transcript`` section line by line.
+
+    The raw JSON section is a reference line when the transcript has been
+    stored in the TranscriptStore (*transcript_ref* is its digest).
+    Otherwise it is an inline dump, and *read_messages* is called a
+    second time so a file-backed transcript is re-read rather than held
+    in memory.
+    """
+    yield from ["## Transcript", "", "---", ""]
+    for msg in read_messages():
+        yield from _render_message_lines(msg)
+    yield from ["", "# Raw JSON Transcript", ""]
+    if transcript_ref:
+        from clasi.transcript_store import reference_line
+
+        yield from [reference_line(transcript_ref), ""]
+        return
+    yield "```json"
+    yield from _raw_json_lines(read_messages())
+    yield from ["```", ""]
+
+
 def _render_transcript_lines(messages: list) -> list[str]:
     """Render transcript messages as markdown followed by raw JSON.
 
@@ -679,125 +624,59 @@ def _render_transcript_lines(messages: list) -> list[str]:
     first a human-readable markdown rendering of each message,
     then the full JSON dump in a fenced code block.
     """
-    lines: list[str] = ["## Transcript", "", "---", ""]
+    return list(_stream_transcript_lines(lambda: messages))
 
-    for msg in messages:
-        timestamp = msg.get("timestamp", "")
-        msg_type = msg.get("type", "")
-        git_branch = msg.get("gitBranch", "")
-        user_type = msg.get("userType", "")
-        cwd = msg.get("cwd", "")
-        inner = msg.get("message", {})
-        model = inner.get("model", "")
-        stop_reason = inner.get("stop_reason", "")
-
-        # Header
-        lines.append(f"### {msg_type} — {timestamp}")
-        lines.append("")
-
-        # Metadata table
-        meta = []
-        if git_branch:
-            meta.append(f"branch: `{git_branch}`")
-        if user_type:
-            meta.append(f"userType: {user_type}")
-        if cwd:
-            meta.append(f"cwd: `{cwd}`")
-        if model:
-            meta.append(f"model: {model}")
-        if stop_reason:
-            meta.append(f"stop_reason: {stop_reason}")
-        if meta:
-            lines.append(" | ".join(meta))
-            lines.append("")
-
-        # Content
-        content = inner.get("content", msg.get("content", ""))
-        if isinstance(content, str) and content:
-            lines.append(content)
-            lines.append("")
-        elif isinstance(content, list):
-            for block in content:
-                if not isinstance(block, dict):
-                    continue
-                block_type = block.get("type", "")
-                if block_type == "text":
-                    lines.append(block.get("text", ""))
-                    lines.append("")
-                elif block_type == "tool_use":
-                    name = block.get("name", "")
-                    tool_input = block.get("input", {})
-                    if name == "Write":
-                        file_path = tool_input.get("file_path", "")
-                        content = tool_input.get("content", "")
-                        lines.append(f"> **Write**: `{file_path}`")
-                        lines.append("")
-                        if content:
-                            # Truncate very long content
-                            MAX_CHARS = 3000
-                            truncated = content
-                            suffix = ""
-                            if len(content) > MAX_CHARS:
-                                truncated = content[:MAX_CHARS]
-                                suffix = "\n... (truncated)"
-                            ext = Path(file_path).suffix.lower()
-                            if ext == ".md":
-                                # Render markdown inline, no code fence
-                                lines.append(truncated + suffix)
-                            else:
-                                lang = _ext_to_language(file_path)
-                                lines.append(f"```{lang}")
-                                lines.append(truncated + suffix)
-                                lines.append("```")
-                    elif name == "Edit":
-                        file_path = tool_input.get("file_path", "")
-                        old_string = tool_input.get("old_string", "")
-                        new_string = tool_input.get("new_string", "")
-                        lines.append(f"> **Edit**: `{file_path}`")
-                        lines.append("")
-                        lines.append("**Before:**")
-                        lines.append("```")
-                        lines.append(old_string)
-                        lines.append("```")
-                        lines.append("")
-                        lines.append("**After:**")
-                        lines.append("```")
-                        lines.append(new_string)
-                        lines.append("```")
-                    else:
-                        lines.append(f"> **Tool Use**: `{name}`")
-                        if tool_input:
-                            compact = json.dumps(tool_input, indent=2)
-                            # Truncate long tool inputs
-                            input_lines = compact.splitlines()
-                            if len(input_lines) > 15:
-                                input_lines = input_lines[:15] + ["  ..."]
-                            lines.append("> ```json")
-                            for il in input_lines:
-                                lines.append(f"> {il}")
-                            lines.append("> ```")
-                    lines.append("")
-                elif block_type == "tool_result":
-                    tool_id = block.get("tool_use_id", "")
-                    result_content = block.get("content", "")
-                    lines.append(f"> **Tool Result** (id: `{tool_id}`)")
-                    if isinstance(result_content, str) and result_content:
-                        result_preview = result_content[:500]
-                        if len(result_content) > 500:
-                            result_preview += "..."
-                        lines.append("> ```")
-                        for rl in result_preview.splitlines():
-                            lines.append(f"> {rl}")
-                        lines.append("> ```")
-                    lines.append("")
-
-        lines.append("---")
-        lines.append("")
-
-    # Raw JSON
-    pretty = json.dumps(messages, indent=2)
-    lines.extend(["", "# Raw JSON Transcript", "", "```json", pretty, "```", ""])
-    return lines
+
+def _store_transcript(store_dir: Path, transcript_path: str) -> Optional[str]:
+    """Store a transcript under *store_dir*/transcripts/; return its digest.
+
+    Returns None if the blob cannot be written; the log then gets an
+    inline JSON dump instead.
+    """
+    from clasi.transcript_store import TranscriptStore
+
+    try:
+        return TranscriptStore(store_dir).put_file(transcript_path)
+    except OSError:
+        return None
+
+
+def _append_log_sections(
+    log_file: Path,
+    prompt: str,
+    result: str,
+    transcript_path: str,
+    store_dir: Optional[Path] = None,
+) -> None:
+    """Stream the prompt, result and transcript sections onto a log file.
+
+    Lines are written as they are rendered, so appending a transcript of
+    any size needs memory for one message at a time. With *store_dir*,
+    the raw transcript is stored once in its TranscriptStore and the log
+    only references it; without it the raw JSON is written inline.
+    """
+    sections: list[Iterable[str]] = []
+    if prompt:
+        sections.append(["## Prompt", "", prompt, ""])
+    if result:
+        sections.append(["## Result", "", result, ""])
+    if transcript_path and Path(transcript_path).exists():
+        digest = (
+            _store_transcript(store_dir, transcript_path) if store_dir else None
+        )
+        sections.append(_stream_transcript_lines(
+            lambda: _iter_transcript(transcript_path), digest,
+        ))
+    if not sections:
+        return
+    with open(log_file, "a", encoding="utf-8") as f:
+        first = True
+        for section in sections:
+            for line in section:
+                if not first:
+                    f.write("\n")
+                f.write(line)
+                first = False
 
 
 def _extract_prompt_from_transcript(transcript_path: str) -> str:
@@ -811,37 +690,38 @@ def _extract_prompt_from_transcript(transcript_path: str) -> str:
     if not path.exists():
         return ""
     try:
-        for line in path.read_text(encoding="utf-8").splitlines():
-            if not line.strip():
-                continue
-            msg = json.loads(line)
-            if msg.get("role") == "user":
-                # The content may be a string or a list of content blocks
-                content = msg.get("content", "")
-                if isinstance(content, list):
-                    parts = []
-                    for block in content:
-                        if isinstance(block, dict) and block.get("type") == "text":
-                            parts.append(block["text"])
-                        elif isinstance(block, str):
-                            parts.append(block)
-                    return "\n".join(parts)
-                return str(content)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                msg = json.loads(line)
+                if msg.get("role") == "user":
+                    # The content may be a string or a list of content blocks
+                    content = msg.get("content", "")
+                    if isinstance(content, list):
+                        parts = []
+                        for block in content:
+                            if isinstance(block, dict) and block.get("type") == "text":
+                                parts.append(block["text"])
+                            elif isinstance(block, str):
+                                parts.append(block)
+                        return "\n".join(parts)
+                    return str(content)
     except (json.JSONDecodeError, OSError, KeyError):
         pass
     return ""
 
 
-def _next_log_number(log_dir: Path) -> int:
-    """Find the next sequential log number in a directory."""
-    existing = sorted(log_dir.glob("[0-9][0-9][0-9]-*.md"))
-    if not existing:
-        return 1
-    try:
-        last = int(existing[-1].name[:3])
-        return last + 1
-    except (ValueError, IndexError):
-        return 1
+def _create_log_file(log_dir: Path, name: Callable[[int], str], text: str) -> Path:
+    """Create the next numbered log file in *log_dir* with *text*.
+
+    Numbers come from the counter in ``docs/clasi/log/``, so subagents
+    starting at the same time never share a number, and the file is
+    created exclusively so an existing log is never overwritten.
+    """
+    from clasi.log_sequence import create_log_file
+
+    return create_log_file(log_dir, name, text, log_root=Path("docs/clasi/log"))
 
 
 # ---------------------------------------------------------------------------
@@ -922,19 +802,16 @@ def handle_commit_check(payload: dict) -> None:
     """
     tool_input = os.environ.get("TOOL_INPUT", "")
     if "git commit" in tool_input:
+        from clasi import git_refs
+
         try:
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                capture_output=True,
-                text=True,
-            )
-            branch = result.stdout.strip()
-            if branch in ("master", "main"):
-                print(
-                    "CLASI: You committed on master. Call tag_version() to bump the version."
-                )
+            branch = git_refs.current_branch()
         except (OSError, subprocess.SubprocessError):
-            pass
+            branch = ""
+        if branch in ("master", "main"):
+            print(
+                "CLASI: You committed on master. Call tag_version() to bump the version."
+            )
     sys.exit(0)
 
 
@@ -0,0 +1,248 @@
+"""Resident hook server: handles hook events without a per-event interpreter.
+
+Started with ``clasi hook-server start`` from the project root. The server
+listens on the Unix socket given by ``clasi.hook_client.socket_path`` and
+handles one request at a time. Each request carries the event name, the
+raw stdin payload, the client's working directory and environment. The
+server reproduces that context around ``handle_hook``: it swaps in the
+environment, changes directory, captures stdout/stderr and turns
+``SystemExit`` into an exit code. The ``clasi-hook`` client then relays
+the result, so the agent sees the same output and exit status as an
+in-process run.
+
+The client forwards only the environment variables the handlers read
+(see ``clasi.hook_client``); they replace the server's own values of
+those variables, and the rest of the server's environment is kept.
+
+The server exits after ``idle_timeout`` seconds without requests. It also
+exits, telling the client to fall back, once any ``clasi`` source file
+changes on disk, so an upgraded package does not keep running stale
+code. The sources are checked at most once per second.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Optional
+
+from clasi.hook_client import is_forwarded, is_private, request, socket_path
+
+DEFAULT_IDLE_TIMEOUT = 3600.0
+
+# Minimum seconds between two scans of the package sources.
+_SOURCE_CHECK_SECONDS = 1.0
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+def _source_signature() -> tuple[tuple[str, int], ...]:
+    """Return (path, mtime_ns) for every module in the package."""
+    sig = []
+    for f in sorted(_PACKAGE_DIR.rglob("*.py")):
+        try:
+            sig.append((f.relative_to(_PACKAGE_DIR).as_posix(), f.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(sig)
+
+
+def run_event(
+    event: str, stdin_text: str, cwd: str, env: dict[str, str]
+) -> dict[str, Any]:
+    """Run ``handle_hook(event)`` as if in a fresh process.
+
+    *env* holds the client's forwarded variables; they replace the
+    server's own forwarded variables. Returns {exit_code, stdout,
+    stderr}. Process-global state (cwd, environment, std streams) is
+    restored afterwards.
+    """
+    from clasi.hook_handlers import handle_hook
+
+    out, err = io.StringIO(), io.StringIO()
+    saved_cwd = os.getcwd()
+    saved_env = dict(os.environ)
+    saved_stdin = sys.stdin
+    exit_code = 0
+    try:
+        os.chdir(cwd)
+        for name in [name for name in os.environ if is_forwarded(name)]:
+            del os.environ[name]
+        os.environ.update({k: v for k, v in env.items() if is_forwarded(k)})
+        sys.stdin = io.StringIO(stdin_text)
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                handle_hook(event)
+            except SystemExit as exc:
+                if exc.code is None:
+                    exit_code = 0
+                elif isinstance(exc.code, int):
+                    exit_code = exc.code
+                else:
+                    print(exc.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.stdin = saved_stdin
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+    return {
+        "exit_code": exit_code,
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+    }
+
+
+class HookServer:
+    """Unix-socket server for one project root."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ):
+        self._root = os.path.realpath(root)
+        self._path = socket_path(self._root)
+        self._idle_timeout = idle_timeout
+        self._signature = _source_signature()
+        self._checked_at = 0.0
+        self._running = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def handle_request(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Process one decoded request and return the reply dict."""
+        command = message.get("command")
+        if command == "ping":
+            return {"ok": True, "root": self._root, "pid": os.getpid()}
+        if command == "shutdown":
+            self._running = False
+            return {"ok": True}
+        if command != "hook":
+            return {"error": f"unknown command {command!r}"}
+
+        now = time.monotonic()
+        if now - self._checked_at >= _SOURCE_CHECK_SECONDS:
+            self._checked_at = now
+            if _source_signature() != self._signature:
+                self._running = False
+                return {"fallback": True, "reason": "source changed"}
+        cwd = message.get("cwd", "")
+        if os.path.realpath(cwd) != self._root:
+            return {"fallback": True, "reason": "different project root"}
+        return run_event(
+            str(message.get("event", "")),
+            str(message.get("stdin", "")),
+            cwd,
+            dict(message.get("env") or {}),
+        )
+
+    def serve_forever(self) -> None:
+        """Listen until shut down, idle for too long, or sources change.
+
+        Raises RuntimeError if the socket directory is not private to
+        this user.
+        """
+        directory = os.path.dirname(self._path)
+        with contextlib.suppress(FileExistsError):
+            os.mkdir(directory, 0o700)
+        if not is_private(directory, stat.S_ISDIR):
+            raise RuntimeError(
+                f"{directory} must be a directory owned by this user with "
+                "mode 0700"
+            )
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self._path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self._path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        sock.settimeout(self._idle_timeout)
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    break
+                with conn:
+                    self._serve_connection(conn)
+        finally:
+            sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        conn.settimeout(10.0)
+        chunks = []
+        try:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            message = json.loads(b"".join(chunks).decode("utf-8"))
+            reply = self.handle_request(message if isinstance(message, dict) else {})
+        except (OSError, ValueError) as exc:
+            reply = {"fallback": True, "reason": str(exc)}
+        with contextlib.suppress(OSError):
+            conn.sendall(json.dumps(reply).encode("utf-8"))
+
+
+def status(root: str | Path = ".") -> Optional[dict[str, Any]]:
+    """Return the running server's ping reply for *root*, or None."""
+    reply = request({"command": "ping"}, root=str(root), timeout=2.0)
+    return reply if reply and reply.get("ok") else None
+
+
+def stop(root: str | Path = ".") -> bool:
+    """Ask the server for *root* to shut down. Returns True if one was running."""
+    reply = request({"command": "shutdown"}, root=str(root), timeout=2.0)
+    return bool(reply and reply.get("ok"))
+
+
+def start(
+    root: str | Path = ".",
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> int:
+    """Start a detached server process for *root* and return its pid."""
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "clasi.hook_server",
+            os.path.realpath(root), str(idle_timeout),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    return proc.pid
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run a server in the foreground: ``python -m clasi.hook_server ROOT [IDLE]``."""
+    args = sys.argv[1:] if argv is None else argv
+    root = args[0] if args else "."
+    idle = float(args[1]) if len(args) > 1 else DEFAULT_IDLE_TIMEOUT
+    HookServer(root, idle_timeout=idle).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,12 +18,16 @@ choose Claude, Codex, or both, with a recommended default.  Non-interactive
 calls with no flag default to Claude-only (backward compatible).
 """
 
+import contextlib
+import io
 import json
 import sys
 from pathlib import Path
 
 import click
 
+from clasi.platforms import _plan
+
 # The plugin directory is bundled inside the clasi package.
 _PLUGIN_DIR = Path(__file__).parent / "plugin"
 
@@ -98,13 +102,12 @@ def _update_mcp_json(mcp_json_path: Path, target: Path) -> bool:
     mcp_servers = data.setdefault("mcpServers", {})
 
     if mcp_servers.get("clasi") == mcp_config:
+        _plan.record(mcp_json_path, "unchanged", owned=False)
         click.echo(f"  Unchanged: {rel}")
         return False
 
     mcp_servers["clasi"] = mcp_config
-    mcp_json_path.write_text(
-        json.dumps(data, indent=2) + "\n", encoding="utf-8"
-    )
+    _plan.write_text(mcp_json_path, json.dumps(data, indent=2) + "\n", owned=False)
     click.echo(f"  Updated: {rel}")
     return True
 
@@ -117,6 +120,7 @@ def run_init(
     copilot: bool = False,
     copy: bool = False,
     migrate: bool = False,
+    dry_run: bool = False,
 ) -> None:
     """Initialize a repository for the CLASI SE process.
 
@@ -135,11 +139,13 @@ def run_init(
         copilot: If True, run the Copilot platform installer.
         copy: If True, use file copy instead of symlink for alias operations.
         migrate: If True, convert legacy direct-copy installs to symlinks.
-    """
-    from clasi.platforms.claude import install as claude_install
-    from clasi.platforms.codex import install as codex_install
-    from clasi.platforms.copilot import install as copilot_install
+        dry_run: If True, only report the changes init would make.
 
+    Every file is compared with its desired content first and only
+    created, updated or deleted when it differs (see
+    ``clasi.platforms._plan``). The files installed are recorded in
+    ``docs/clasi/install-manifest.json``.
+    """
     # Track whether the user explicitly specified a platform.  --migrate is
     # platform-scoped: it only runs when an explicit platform flag is given.
     explicit_platform = claude or codex or copilot
@@ -161,6 +167,50 @@ def run_init(
             claude = True
 
     target_path = Path(target).resolve()
+    sections = ["shared"]
+    if not plugin_mode:
+        sections += [
+            name for name, selected in
+            (("claude", claude), ("codex", codex), ("copilot", copilot))
+            if selected
+        ]
+    previous = _plan.load_manifest(target_path)
+
+    with _plan.planning(target_path, dry_run=dry_run) as plan:
+        # A dry run only reports the plan, not the installers' progress.
+        quiet = (
+            contextlib.redirect_stdout(io.StringIO())
+            if dry_run else contextlib.nullcontext()
+        )
+        with quiet:
+            _install(
+                target_path, plan, plugin_mode, claude, codex, copilot,
+                copy, effective_migrate,
+            )
+            kept = _plan.prune(plan, previous, sections)
+        if not dry_run:
+            from clasi import __version__
+
+            _plan.save_manifest(plan, previous, sections, __version__)
+
+    _report(plan, kept)
+
+
+def _install(
+    target_path: Path,
+    plan: _plan.Plan,
+    plugin_mode: bool,
+    claude: bool,
+    codex: bool,
+    copilot: bool,
+    copy: bool,
+    migrate: bool,
+) -> None:
+    """Run the selected platform installers and the shared scaffolding."""
+    from clasi.platforms.claude import install as claude_install
+    from clasi.platforms.codex import install as codex_install
+    from clasi.platforms.copilot import install as copilot_install
+
     mode_label = "plugin" if plugin_mode else "project-local"
     click.echo(f"Initializing CLASI in {target_path} ({mode_label} mode)")
     click.echo()
@@ -177,16 +227,21 @@ def run_init(
     else:
         if claude:
             # Project-local mode: delegate all Claude-specific steps to the platform module.
-            claude_install(target_path, mcp_config, copy=copy, migrate=effective_migrate)
+            plan.section = "claude"
+            claude_install(target_path, mcp_config, copy=copy, migrate=migrate)
 
         if codex:
             # Codex platform install.
-            codex_install(target_path, mcp_config, copy=copy, migrate=effective_migrate)
+            plan.section = "codex"
+            codex_install(target_path, mcp_config, copy=copy, migrate=migrate)
 
         if copilot:
             # Copilot platform install.
+            plan.section = "copilot"
             copilot_install(target_path, mcp_config, copy=copy)
 
+        plan.section = "shared"
+
     # Configure MCP server in .mcp.json at project root (shared setup).
     click.echo("MCP server configuration:")
     _update_mcp_json(target_path / ".mcp.json", target_path)
@@ -198,20 +253,52 @@ def run_init(
     todo_in_progress = todo_dir / "in-progress"
     todo_done = todo_dir / "done"
     for d in [todo_dir, todo_in_progress, todo_done]:
-        d.mkdir(parents=True, exist_ok=True)
+        _plan.mkdir(d)
         gitkeep = d / ".gitkeep"
-        if not gitkeep.exists() and not any(d.iterdir()):
-            gitkeep.touch()
+        if gitkeep.exists():
+            _plan.record(gitkeep, "unchanged", owned=False)
+        elif not d.is_dir() or not any(d.iterdir()):
+            _plan.write_text(gitkeep, "", owned=False)
     click.echo("  Created: docs/clasi/todo/ (with in-progress/ and done/)")
 
     # Create log directory with .gitignore (shared setup).
     click.echo()
     click.echo("Log directory:")
     log_dir = target_path / "docs" / "clasi" / "log"
-    log_dir.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(log_dir)
     log_gitignore = log_dir / ".gitignore"
-    log_gitignore.write_text("# Ignore all log files\n*\n!.gitignore\n", encoding="utf-8")
+    _plan.write_text(log_gitignore, "# Ignore all log files\n*\n!.gitignore\n")
     click.echo("  Created: docs/clasi/log/ (with .gitignore)")
 
     click.echo()
-    click.echo("Done! The CLASI SE process is now configured.")
+
+
+_ACTION_LABELS = {
+    "create": "created",
+    "update": "updated",
+    "delete": "deleted",
+    "unchanged": "unchanged",
+}
+
+
+def _report(plan: _plan.Plan, kept: list[str]) -> None:
+    """Print the summary of what init changed (or would change)."""
+    counts = plan.counts()
+    summary = ", ".join(
+        f"{counts[action]} {_ACTION_LABELS[action]}" for action in _plan.ACTIONS
+    )
+    if plan.dry_run:
+        click.echo("Dry run: no files were changed.")
+        click.echo(f"Plan: {summary}")
+        for action, rel in plan.changes():
+            click.echo(f"  {action}: {rel}")
+    else:
+        click.echo(f"Changes: {summary}")
+        for action, rel in plan.changes():
+            if action == "delete":
+                click.echo(f"  Deleted: {rel}")
+    for rel in kept:
+        click.echo(f"  Kept (modified since install): {rel}")
+    if not plan.dry_run:
+        click.echo()
+        click.echo("Done! The CLASI SE process is now configured.")
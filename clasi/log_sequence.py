@@ -0,0 +1,146 @@
+"""Sequence numbers for the ``NNN-*.md`` files in the log directories.
+
+Dispatch logs and hook logs are numbered per directory. Scanning the
+directory for the highest number gets slower as logs accumulate, and two
+subagents starting together can both pick the same number. Numbers are
+therefore allocated from a counter in ``.sequences.db``, a small SQLite
+file in the log root (``docs/clasi/log/``). It lives next to the files
+it numbers, under the same ``.gitignore``, so a checkout or clone that
+restores an older ``.clasi.db`` cannot roll it back. The directory is
+scanned only to seed the counter the first time a directory is used.
+
+``create_log_file()`` creates the file with ``open(..., "x")``: if the
+name is taken anyway (the counter file was deleted, or a log was copied
+in by hand), it rescans, moves the counter past the existing files and
+tries again, so an existing log is never overwritten.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Callable, Optional
+
+SEQUENCE_DB = ".sequences.db"
+
+_NUMBER_RE = re.compile(r"^(\d+)")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS log_sequences ("
+    "directory TEXT PRIMARY KEY, last INTEGER NOT NULL)"
+)
+
+
+def highest_log_number(directory: Path) -> int:
+    """Return the highest ``NNN`` prefix of a ``.md`` file in *directory*.
+
+    Returns 0 if the directory is empty or does not exist.
+    """
+    if not directory.is_dir():
+        return 0
+    highest = 0
+    for entry in directory.iterdir():
+        if entry.suffix == ".md":
+            m = _NUMBER_RE.match(entry.name)
+            if m:
+                highest = max(highest, int(m.group(1)))
+    return highest
+
+
+def _sequence_key(directory: Path, log_root: Path) -> str:
+    """Name *directory* relative to *log_root* ("." for the root itself)."""
+    directory = directory.resolve()
+    try:
+        return directory.relative_to(log_root.resolve()).as_posix()
+    except ValueError:
+        return directory.as_posix()
+
+
+def _connect(log_root: Path) -> sqlite3.Connection:
+    # Autocommit: every statement below is a single atomic write, so
+    # concurrent processes always get distinct numbers.
+    conn = sqlite3.connect(
+        str(log_root / SEQUENCE_DB), timeout=10, isolation_level=None,
+    )
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _allocate(directory: Path, log_root: Path) -> int:
+    key = _sequence_key(directory, log_root)
+    conn = _connect(log_root)
+    try:
+        row = conn.execute(
+            "UPDATE log_sequences SET last = last + 1 "
+            "WHERE directory = ? RETURNING last",
+            (key,),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        # Another process may have seeded the row since the UPDATE.
+        row = conn.execute(
+            "INSERT INTO log_sequences (directory, last) VALUES (?, ?) "
+            "ON CONFLICT(directory) DO UPDATE SET last = last + 1 "
+            "RETURNING last",
+            (key, highest_log_number(directory) + 1),
+        ).fetchone()
+        return row[0]
+    finally:
+        conn.close()
+
+
+def _advance(directory: Path, log_root: Path, number: int) -> None:
+    """Move the counter for *directory* to at least *number*."""
+    conn = _connect(log_root)
+    try:
+        conn.execute(
+            "INSERT INTO log_sequences (directory, last) VALUES (?, ?) "
+            "ON CONFLICT(directory) DO UPDATE SET last = MAX(last, excluded.last)",
+            (_sequence_key(directory, log_root), number),
+        )
+    finally:
+        conn.close()
+
+
+def next_log_number(directory: Path, log_root: Optional[Path] = None) -> int:
+    """Return the next log number for *directory*.
+
+    With *log_root*, the number comes from the counter in
+    ``<log_root>/.sequences.db``. Without it, if *log_root* does not
+    exist, or if the counter cannot be used, the directory is scanned.
+    """
+    if log_root is not None and log_root.is_dir():
+        try:
+            return _allocate(directory, log_root)
+        except sqlite3.Error:
+            pass
+    return highest_log_number(directory) + 1
+
+
+def create_log_file(
+    directory: Path,
+    name: Callable[[int], str],
+    text: str = "",
+    log_root: Optional[Path] = None,
+) -> Path:
+    """Create a new numbered log file in *directory* and return its path.
+
+    *name* maps the allocated number to a file name. The file is created
+    exclusively; on a clash the number moves past the highest one in the
+    directory and the counter follows, so no existing file is replaced.
+    """
+    number = next_log_number(directory, log_root)
+    while True:
+        path = directory / name(number)
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                f.write(text)
+            return path
+        except FileExistsError:
+            number = max(number, highest_log_number(directory)) + 1
+            if log_root is not None and log_root.is_dir():
+                try:
+                    _advance(directory, log_root, number)
+                except sqlite3.Error:
+                    pass
@@ -5,11 +5,14 @@ Provides SE Process Access and Artifact Management tools via MCP.
 
 from __future__ import annotations
 
+import importlib
+import importlib.util
 import json
 import logging
 import os
 import sys
 from pathlib import Path
+from typing import Any, Callable
 
 from mcp.server.fastmcp import FastMCP
 
@@ -67,6 +70,29 @@ class Clasi:
         """
         return self.content_root.joinpath(*parts)
 
+    # -- Tool registration ---------------------------------------------------
+
+    def background_tool(
+        self, exclusive: bool = False,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Register a long-running tool that runs on a worker thread.
+
+        Use instead of ``@server.tool()`` for tools that block on
+        subprocesses or the network. Pass ``exclusive=True`` for tools
+        that change the repository; those run one at a time. The
+        decorated function itself is returned unchanged, so it can still
+        be called directly.
+        """
+        from clasi.background import as_async
+
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            self.server.add_tool(
+                as_async(fn, self.server.get_context, exclusive=exclusive)
+            )
+            return fn
+
+        return decorator
+
     # -- Logging -------------------------------------------------------------
 
     def _setup_logging(self) -> None:
@@ -113,38 +139,41 @@ class Clasi:
         logger.info("  python: %s", sys.executable)
         logger.info("  log_file: %s", self.project.log_dir / "mcp-server.log")
 
-        # Preflight: verify all required submodules are importable.
+        # Preflight: verify all required submodules can be found.
         # Catches stale editable installs or version mismatches at
-        # startup rather than producing confusing per-tool errors.
+        # startup rather than producing confusing per-tool errors. The
+        # modules are only located here; they are imported on first use.
         _required = [
             "clasi.artifact", "clasi.sprint", "clasi.ticket",
             "clasi.todo", "clasi.frontmatter", "clasi.versioning",
+            "clasi.tools.process_tools", "clasi.tools.artifact_tools",
         ]
         for _mod in _required:
-            try:
-                __import__(_mod)
-            except ImportError as e:
+            if importlib.util.find_spec(_mod) is None:
                 msg = (
-                    f"CLASI preflight failed: cannot import {_mod} ({e}). "
+                    f"CLASI preflight failed: cannot find {_mod}. "
                     "The MCP server source may be stale — restart the "
                     "session or reinstall the package."
                 )
                 logger.error(msg)
                 print(msg, file=sys.stderr)
-                raise SystemExit(1) from e
-        logger.info("  preflight: all required submodules importable")
+                raise SystemExit(1)
+        logger.info("  preflight: all required submodules found")
 
-        # Import tool modules to register their tools with the server
-        import clasi.tools.process_tools  # noqa: F401
-        import clasi.tools.artifact_tools  # noqa: F401
+        self._register_tools()
 
         tool_count = len(self.server._tool_manager._tools)
         logger.info("  tools registered: %d", tool_count)
         logger.info("CLASI MCP server ready")
 
-        # Wrap _tool_manager.call_tool to log every invocation
+        # Wrap _tool_manager.call_tool to log every invocation, measure it
+        # in the metrics registry and record it in the structured event log
+        from clasi import event_log, metrics
+
+        metrics.install_audit_hook()
         _tm = self.server._tool_manager
         _original_call_tool = _tm.call_tool
+        events_dir = self.project.log_dir
 
         async def _logged_call_tool(name, arguments, **kwargs):
             args_summary = {}
@@ -152,20 +181,71 @@ class Clasi:
                 s = str(v)
                 args_summary[k] = s[:200] + "..." if len(s) > 200 else s
             logger.info("[%s] CALL %s(%s)", agent_name, name, json.dumps(args_summary))
+            sprint = arguments.get("sprint_id")
             try:
-                result = await _original_call_tool(name, arguments, **kwargs)
+                with metrics.registry.call(name) as sample:
+                    result = await _original_call_tool(name, arguments, **kwargs)
                 result_str = str(result)
                 if len(result_str) > 500:
                     result_str = result_str[:500] + "..."
-                logger.info("[%s]   OK %s -> %s", agent_name, name, result_str)
+                logger.info("[%s]   OK %s -> %s (%.0f ms)", agent_name, name,
+                            result_str, sample["wall_ms"])
+                event_log.record(
+                    events_dir, "tool", name, agent=agent_name, tier=agent_tier,
+                    sprint=sprint, outcome="ok", duration_ms=sample["wall_ms"],
+                )
                 return result
             except Exception as e:
                 logger.error("[%s]   FAIL %s -> %s: %s", agent_name, name, type(e).__name__, e)
+                event_log.record(
+                    events_dir, "tool", name, agent=agent_name, tier=agent_tier,
+                    sprint=sprint, outcome="error", duration_ms=sample["wall_ms"],
+                    data={"error": f"{type(e).__name__}: {e}"},
+                )
                 raise
 
         _tm.call_tool = _logged_call_tool
 
-        self.server.run(transport="stdio")
+        try:
+            self.server.run(transport="stdio")
+        finally:
+            self._dump_metrics()
+
+    def _register_tools(self) -> None:
+        """Register the tools, lazily when the tool manifest is current.
+
+        With a current ``clasi/tools/manifest.json`` the tools are listed
+        from their recorded schemas and each tool module is imported on
+        its first call. Otherwise the modules are imported now.
+        """
+        from clasi.tools import manifest
+
+        data = manifest.load()
+        if data is not None:
+            count = manifest.register_lazy_tools(self.server, data)
+            logger.info("  tools registered lazily: %d", count)
+            return
+        logger.info("  tool manifest missing or stale; importing tool modules")
+        for module in manifest.MODULES:
+            importlib.import_module(module)
+
+    def _dump_metrics(self) -> None:
+        """Write the per-tool metrics to docs/clasi/log/mcp-metrics.json."""
+        from clasi import metrics
+
+        path = self.project.log_dir / "mcp-metrics.json"
+        try:
+            metrics.registry.dump(path)
+        except OSError as e:
+            logger.warning("could not write %s: %s", path, e)
+            return
+        for name, stats in metrics.registry.snapshot()["tools"].items():
+            logger.info(
+                "  metrics: %s calls=%d total=%.0fms p95<=%sms",
+                name, stats["calls"], stats["wall"]["total_ms"],
+                stats["wall"]["p95_ms"],
+            )
+        logger.info("CLASI MCP server stopped; metrics written to %s", path)
 
 
 # ---------------------------------------------------------------------------
@@ -176,8 +256,9 @@ app = Clasi()
 """The singleton CLASI application instance."""
 
 # Convenience aliases so existing code can do:
-#   from clasi.mcp_server import server, get_project, content_path
+#   from clasi.mcp_server import server, background_tool, get_project
 server = app.server
+background_tool = app.background_tool
 
 
 def get_project() -> Project:
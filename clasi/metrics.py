@@ -0,0 +1,222 @@
+"""Per-tool latency and resource metrics for the MCP server.
+
+``Clasi.run`` wraps every tool call in ``registry.call(name)``, which
+measures wall time and CPU time and collects the counters that
+the rest of the package reports through ``count()`` while the call is
+running:
+
+    files_read      markdown files read from disk (frontmatter cache misses)
+    bytes_parsed    characters handed to the frontmatter parser
+    db_queries      SQL statements run on StateDB connections
+    subprocesses    processes spawned (seen through an audit hook)
+
+Samples are aggregated per tool into histograms with fixed millisecond
+buckets. ``get_server_metrics`` returns ``registry.snapshot()`` and the
+server writes it to ``docs/clasi/log/mcp-metrics.json`` on shutdown.
+
+``count()`` is a no-op outside a measured call, so instrumented code
+pays one context-variable lookup when no tool is running.
+
+CPU time is per thread (``time.thread_time()``), so tools running at
+the same time on different threads are not charged for each other. A
+background tool's body runs on a worker thread; ``as_async`` wraps it
+in ``thread_cpu()`` so its ``cpu_ms`` is the worker's time rather than
+the event loop's.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+COUNTERS = ("files_read", "bytes_parsed", "db_queries", "subprocesses")
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current: contextvars.ContextVar[Optional[dict[str, int]]] = (
+    contextvars.ContextVar("clasi_metrics_sample", default=None)
+)
+
+
+def count(counter: str, n: int = 1) -> None:
+    """Add *n* to *counter* for the tool call in progress, if any."""
+    sample = _current.get()
+    if sample is not None:
+        sample[counter] = sample.get(counter, 0) + n
+
+
+@contextmanager
+def thread_cpu() -> Iterator[None]:
+    """Charge this thread's CPU time to the tool call in progress, if any."""
+    sample = _current.get()
+    if sample is None:
+        yield
+        return
+    cpu0 = time.thread_time()
+    try:
+        yield
+    finally:
+        ms = (time.thread_time() - cpu0) * 1000
+        sample["cpu_ms"] = sample.get("cpu_ms", 0) + ms
+
+
+def _on_audit(event: str, args: tuple) -> None:
+    if event == "subprocess.Popen":
+        count("subprocesses")
+
+
+_audit_installed = False
+
+
+def install_audit_hook() -> None:
+    """Count subprocess spawns via ``sys.addaudithook`` (once per process)."""
+    global _audit_installed
+    if not _audit_installed:
+        sys.addaudithook(_on_audit)
+        _audit_installed = True
+
+
+class Histogram:
+    """Count, sum, max and fixed-bucket counts of millisecond samples."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the bucket upper bound below which *q* of samples fall."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {k: n for k, n in zip(labels, self.buckets) if n},
+        }
+
+
+class _ToolStats:
+    __slots__ = ("wall", "cpu", "errors", "counters")
+
+    def __init__(self) -> None:
+        self.wall = Histogram()
+        self.cpu = Histogram()
+        self.errors = 0
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+
+class Metrics:
+    """Thread-safe per-tool aggregates."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tools: dict[str, _ToolStats] = {}
+        self._started = time.time()
+
+    @contextmanager
+    def call(self, name: str) -> Iterator[dict[str, Any]]:
+        """Measure one call of tool *name*.
+
+        Yields the sample dict; once the block exits it also holds
+        ``wall_ms`` and ``cpu_ms``. ``cpu_ms`` is the CPU time of the
+        calling thread, unless the work ran elsewhere under
+        ``thread_cpu()``. A block that raises counts as an error.
+        """
+        sample: dict[str, Any] = {}
+        token = _current.set(sample)
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        failed = False
+        try:
+            yield sample
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _current.reset(token)
+            sample["wall_ms"] = (time.perf_counter() - wall0) * 1000
+            if "cpu_ms" not in sample:
+                sample["cpu_ms"] = (time.thread_time() - cpu0) * 1000
+            self._add(name, sample, failed)
+
+    def _add(self, name: str, sample: dict[str, Any], failed: bool) -> None:
+        with self._lock:
+            stats = self._tools.get(name)
+            if stats is None:
+                stats = self._tools[name] = _ToolStats()
+            stats.wall.add(sample["wall_ms"])
+            stats.cpu.add(sample["cpu_ms"])
+            stats.errors += failed
+            for counter in COUNTERS:
+                stats.counters[counter] += sample.get(counter, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return all aggregates, tools ordered by total wall time."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": s.wall.count,
+                    "errors": s.errors,
+                    "wall": s.wall.to_dict(),
+                    "cpu": s.cpu.to_dict(),
+                    **s.counters,
+                }
+                for name, s in sorted(
+                    self._tools.items(), key=lambda kv: -kv[1].wall.total,
+                )
+            }
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._started)),
+            "uptime_s": round(time.time() - self._started, 1),
+            "buckets_ms": list(BUCKETS_MS),
+            "tools": tools,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._started = time.time()
+
+    def dump(self, path: str | Path) -> None:
+        """Write ``snapshot()`` to *path* as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+
+registry = Metrics()
+"""The process-wide metrics registry used by the MCP server."""
@@ -0,0 +1,169 @@
+"""
+clasi/platforms/_bundle.py
+
+Precomputed plugin content shared by the platform installers.
+
+The Claude, Codex and Copilot installers all install files derived from
+``clasi/plugin``: the canonical ``.agents/skills/<n>/SKILL.md`` copies,
+Claude's skill aliases and agent files, and the rendered Codex TOML and
+Copilot ``.agent.md`` sub-agents. ``build()`` produces every one of them
+once per process, as a list of ``Output`` records (target path, content,
+SHA-256, and the canonical path for link-or-copy aliases). Installing
+several platforms in one ``clasi init`` reuses the same bundle.
+
+``install_file`` and ``install_alias`` apply one output to a project as a
+diff through ``_plan``: a file that already holds the output's bytes, or
+an alias that already points at its canonical file, is left untouched.
+A re-run of ``clasi init`` on an up-to-date project therefore writes
+nothing from the bundle.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from clasi.content_catalog import get_catalog
+from clasi.frontmatter import _parse
+from clasi.platforms import _plan
+
+# The plugin directory is bundled inside the clasi package.
+_PLUGIN_DIR = Path(__file__).parent.parent / "plugin"
+
+# Bundle sections, one per group of installer outputs.
+SKILLS = "skills"                  # .agents/skills/<n>/SKILL.md
+CLAUDE_SKILLS = "claude-skills"    # .claude/skills/<n>/SKILL.md -> canonical
+CLAUDE_AGENTS = "claude-agents"    # .claude/agents/<n>/<file>.md
+CODEX_AGENTS = "codex-agents"      # .codex/agents/<n>.toml
+COPILOT_AGENTS = "copilot-agents"  # .github/agents/<n>.agent.md
+
+
+@dataclass(frozen=True)
+class Output:
+    """One file the installers place in a project."""
+
+    path: str
+    """Target path relative to the project root, with ``/`` separators."""
+    sha256: str
+    content: bytes = field(repr=False)
+    alias_of: Optional[str] = None
+    """For link-or-copy aliases, the project-relative canonical path."""
+
+
+Bundle = Dict[str, Tuple[Output, ...]]
+
+
+def _output(path: str, content: str | bytes) -> Output:
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return Output(path, hashlib.sha256(data).hexdigest(), data)
+
+
+def _alias(path: str, canonical: Output) -> Output:
+    return Output(path, canonical.sha256, canonical.content, canonical.path)
+
+
+@functools.lru_cache(maxsize=None)
+def build() -> Bundle:
+    """Render every installer output from the plugin content (once)."""
+    from clasi.platforms import codex, copilot
+
+    skills_catalog = get_catalog(_PLUGIN_DIR / "skills")
+    agents_catalog = get_catalog(_PLUGIN_DIR / "agents")
+
+    skills = []
+    claude_skills = []
+    for entry in skills_catalog.named("SKILL.md"):
+        if len(entry.path.parts) != 2:
+            continue
+        name = entry.path.parts[0]
+        canonical = _output(
+            f".agents/skills/{name}/SKILL.md", skills_catalog.read(entry),
+        )
+        skills.append(canonical)
+        claude_skills.append(_alias(f".claude/skills/{name}/SKILL.md", canonical))
+
+    claude_agents = [
+        _output(f".claude/agents/{e.path}", agents_catalog.read(e))
+        for e in agents_catalog.markdown()
+        if len(e.path.parts) == 2
+    ]
+
+    def agent_source(name: str) -> Optional[tuple[dict, str]]:
+        entry = agents_catalog.get(f"{name}/agent.md")
+        if entry is None:
+            return None
+        return _parse(agents_catalog.read(entry))
+
+    codex_agents = []
+    for name in codex._ACTIVE_AGENTS:
+        source = agent_source(name)
+        if source is not None:
+            codex_agents.append(_output(
+                f".codex/agents/{name}.toml", codex._render_agent(name, *source),
+            ))
+
+    copilot_agents = []
+    for name in copilot._AGENT_NAMES:
+        source = agent_source(name)
+        if source is not None:
+            copilot_agents.append(_output(
+                f".github/agents/{name}.agent.md",
+                copilot._render_agent(name, *source),
+            ))
+
+    return {
+        SKILLS: tuple(skills),
+        CLAUDE_SKILLS: tuple(claude_skills),
+        CLAUDE_AGENTS: tuple(claude_agents),
+        CODEX_AGENTS: tuple(codex_agents),
+        COPILOT_AGENTS: tuple(copilot_agents),
+    }
+
+
+def _matches(path: Path, output: Output) -> bool:
+    """True if the regular file at *path* already holds *output*'s bytes."""
+    try:
+        if path.is_symlink() or path.stat().st_size != len(output.content):
+            return False
+        return hashlib.sha256(path.read_bytes()).hexdigest() == output.sha256
+    except OSError:
+        return False
+
+
+def install_file(target: Path, output: Output) -> str:
+    """Write *output* under *target* unless it is already there.
+
+    Returns ``"unchanged"``, ``"create"`` or ``"update"`` (see
+    ``_plan``). A symlink at the destination is replaced by a regular
+    file.
+    """
+    return _plan.write_bytes(
+        target / output.path, output.content, replace_symlink=True,
+    )
+
+
+def install_alias(target: Path, output: Output, copy: bool = False) -> str:
+    """Point the alias *output* at its canonical file under *target*.
+
+    Returns ``"unchanged"`` when the alias is already a symlink to the
+    canonical file (or, with *copy*, a copy of it); otherwise the alias
+    is replaced via ``_plan.link`` and its result (``"symlink"`` or
+    ``"copy"``) is returned.
+    """
+    alias = target / output.path
+    canonical = target / output.alias_of
+    if copy:
+        unchanged = _matches(alias, output)
+    else:
+        unchanged = (
+            alias.is_symlink()
+            and os.path.realpath(alias) == os.path.realpath(canonical)
+        )
+    if unchanged:
+        _plan.record(alias, "unchanged", sha256=output.sha256, link=output.alias_of)
+        return "unchanged"
+    return _plan.link(canonical, alias, copy=copy)
@@ -28,6 +28,7 @@ from typing import Optional
 
 import click
 
+from clasi.platforms import _plan
 from clasi.templates import CLASI_SECTION_TEMPLATE
 
 MARKER_START = "<!-- CLASI:START -->"
@@ -64,21 +65,22 @@ def write_section(
     section = render_section(entry_point)
     label = file_path.name
 
-    if not file_path.exists():
-        file_path.write_text(section, encoding="utf-8")
+    if not _plan.exists(file_path):
+        _plan.write_text(file_path, section, owned=False)
         click.echo(f"  Created: {label}")
         return True
 
-    content = file_path.read_text(encoding="utf-8")
+    content = _plan.read_text(file_path)
 
     if MARKER_START in content and MARKER_END in content:
         start_idx = content.index(MARKER_START)
         end_idx = content.index(MARKER_END) + len(MARKER_END)
         new_content = content[:start_idx] + section.strip() + content[end_idx:]
         if new_content != content:
-            file_path.write_text(new_content, encoding="utf-8")
+            _plan.write_text(file_path, new_content, owned=False)
             click.echo(f"  Updated: {label} (replaced CLASI section)")
             return True
+        _plan.record(file_path, "unchanged", owned=False)
         click.echo(f"  Unchanged: {label}")
         return False
 
@@ -95,16 +97,17 @@ def write_section(
                 content[:start_idx] + section.strip() + "\n" + content[end_idx:]
             )
             if new_content != content:
-                file_path.write_text(new_content, encoding="utf-8")
+                _plan.write_text(file_path, new_content, owned=False)
                 click.echo(f"  Updated: {label} (added CLASI section markers)")
                 return True
+            _plan.record(file_path, "unchanged", owned=False)
             click.echo(f"  Unchanged: {label}")
             return False
 
     if not content.endswith("\n"):
         content += "\n"
     content += "\n" + section
-    file_path.write_text(content, encoding="utf-8")
+    _plan.write_text(file_path, content, owned=False)
     click.echo(f"  Updated: {label} (appended CLASI section)")
     return True
 
@@ -166,28 +169,29 @@ def write_named_section(file_path: Path, block_name: str, content: str) -> bool:
     section = f"{marker_start}\n{content}\n{marker_end}\n"
     label = file_path.name
 
-    if not file_path.exists():
-        file_path.write_text(section, encoding="utf-8")
+    if not _plan.exists(file_path):
+        _plan.write_text(file_path, section, owned=False)
         click.echo(f"  Created: {label}")
         return True
 
-    existing = file_path.read_text(encoding="utf-8")
+    existing = _plan.read_text(file_path)
 
     if marker_start in existing and marker_end in existing:
         start_idx = existing.index(marker_start)
         end_idx = existing.index(marker_end) + len(marker_end)
         new_content = existing[:start_idx] + section.strip() + existing[end_idx:]
         if new_content != existing:
-            file_path.write_text(new_content, encoding="utf-8")
+            _plan.write_text(file_path, new_content, owned=False)
             click.echo(f"  Updated: {label} (replaced CLASI:{block_name} section)")
             return True
+        _plan.record(file_path, "unchanged", owned=False)
         click.echo(f"  Unchanged: {label}")
         return False
 
     if not existing.endswith("\n"):
         existing += "\n"
     new_content = existing + "\n" + section
-    file_path.write_text(new_content, encoding="utf-8")
+    _plan.write_text(file_path, new_content, owned=False)
     click.echo(f"  Updated: {label} (appended CLASI:{block_name} section)")
     return True
 
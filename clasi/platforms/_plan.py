@@ -0,0 +1,407 @@
+"""
+clasi/platforms/_plan.py
+
+Change tracking, install manifest and dry-run support for ``clasi init``.
+
+``run_init`` opens a ``Plan`` with ``planning()``. While it is active,
+every file the installers produce goes through this module's write
+helpers, which compare the desired content with what is on disk and
+record one action per project-relative path:
+
+    create      the file does not exist yet
+    update      the file exists with different content
+    unchanged   the file already holds the desired content
+    delete      a file installed earlier is no longer produced
+
+A file is only written when its action is ``create`` or ``update``, so
+re-running init on an up-to-date project touches nothing. With
+``dry_run=True`` nothing is written at all: writes go to an in-memory
+overlay that later reads in the same run see, so the plan is the one a
+real run would apply.
+
+After a real run the plan's files are recorded in
+``docs/clasi/install-manifest.json`` with their SHA-256 and the platform
+section that produced them. On the next run, files that a re-installed
+section produced last time but no longer produces are deleted, provided
+they are still exactly what was installed. Only files CLASI owns
+outright are pruned; files merged with user content (``AGENTS.md``,
+``settings.json``, ``.mcp.json`` ...) are recorded with ``owned=False``
+and never deleted.
+
+Without an active plan the helpers still skip unchanged writes but
+record nothing.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from clasi.platforms import _links
+
+ACTIONS = ("create", "update", "delete", "unchanged")
+
+MANIFEST_PATH = Path("docs") / "clasi" / "install-manifest.json"
+
+# When one path is written twice in a run (AGENTS.md by Claude and
+# Codex), the stronger action is reported.
+_RANK = {"unchanged": 0, "update": 1, "create": 2, "delete": 3}
+
+
+class Plan:
+    """Actions and manifest entries collected during one ``clasi init``."""
+
+    def __init__(self, root: Path, dry_run: bool = False):
+        self.root = root
+        self.dry_run = dry_run
+        self.section = "shared"
+        self.actions: Dict[str, str] = {}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # SHA-256 of each written path before its first write this run
+        # (None if it did not exist), to spot files written back to
+        # their original content.
+        self._before: Dict[str, Optional[str]] = {}
+        # Dry-run writes: absolute path -> content (None once removed).
+        self._overlay: Dict[str, Optional[bytes]] = {}
+
+    def rel(self, path: Path) -> Optional[str]:
+        """Return *path* relative to the project root, or None if outside."""
+        try:
+            return Path(os.path.abspath(path)).relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def record(
+        self,
+        path: Path,
+        action: str,
+        sha256: Optional[str] = None,
+        link: Optional[str] = None,
+        owned: bool = True,
+        before: Any = ...,
+    ) -> None:
+        rel = self.rel(path)
+        if rel is None:
+            return
+        if before is not ...:
+            self._before.setdefault(rel, before)
+        previous = self.actions.get(rel)
+        if previous is None or _RANK[action] > _RANK[previous]:
+            self.actions[rel] = action
+        if action == "delete":
+            self.entries.pop(rel, None)
+            return
+        entry = self.entries.setdefault(rel, {"sections": []})
+        if self.section not in entry["sections"]:
+            entry["sections"].append(self.section)
+        entry["owned"] = entry.get("owned", True) and owned
+        if sha256 is None and action == "unchanged":
+            data = read_bytes(path)
+            sha256 = _digest(data) if data is not None else None
+        if sha256 is not None:
+            entry["sha256"] = sha256
+        if link is not None:
+            entry["link"] = link
+
+    def net_actions(self) -> Dict[str, str]:
+        """Actions with files that ended up as they started marked unchanged.
+
+        Claude and Codex both write the CLASI block of ``AGENTS.md``, so
+        an up-to-date file is rewritten twice and ends where it began.
+        """
+        net = dict(self.actions)
+        for rel, action in self.actions.items():
+            if action in ("create", "update") and rel in self._before:
+                if self._before[rel] == self.entries[rel].get("sha256"):
+                    net[rel] = "unchanged"
+        return net
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(ACTIONS, 0)
+        for action in self.net_actions().values():
+            counts[action] += 1
+        return counts
+
+    def changes(self) -> List[tuple[str, str]]:
+        """(action, path) for every path that is not unchanged, sorted."""
+        return sorted(
+            (action, rel) for rel, action in self.net_actions().items()
+            if action != "unchanged"
+        )
+
+
+_active: contextvars.ContextVar[Optional[Plan]] = contextvars.ContextVar(
+    "clasi_install_plan", default=None,
+)
+
+
+@contextmanager
+def planning(root: Path, dry_run: bool = False) -> Iterator[Plan]:
+    """Collect the changes made under *root* into a new Plan."""
+    plan = Plan(Path(os.path.abspath(root)), dry_run=dry_run)
+    token = _active.set(plan)
+    try:
+        yield plan
+    finally:
+        _active.reset(token)
+
+
+def current() -> Optional[Plan]:
+    """Return the active plan, if any."""
+    return _active.get()
+
+
+def is_dry_run() -> bool:
+    plan = _active.get()
+    return plan is not None and plan.dry_run
+
+
+def record(path: Path, action: str, **kwargs: Any) -> None:
+    """Record *action* for *path* in the active plan (no-op without one)."""
+    plan = _active.get()
+    if plan is not None:
+        plan.record(path, action, **kwargs)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_bytes(path: Path) -> Optional[bytes]:
+    """Return the content of *path* as this run sees it, or None if absent."""
+    plan = _active.get()
+    if plan is not None and plan.dry_run:
+        key = os.path.abspath(path)
+        if key in plan._overlay:
+            return plan._overlay[key]
+    try:
+        return Path(path).read_bytes()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def exists(path: Path) -> bool:
+    return read_bytes(path) is not None
+
+
+def read_text(path: Path) -> str:
+    """``Path.read_text`` that sees dry-run writes."""
+    data = read_bytes(path)
+    if data is None:
+        raise FileNotFoundError(str(path))
+    return data.decode("utf-8").replace("\r\n", "\n")
+
+
+def _action_for(path: Path, data: bytes) -> str:
+    plan = _active.get()
+    key = os.path.abspath(path)
+    if plan is not None and plan.dry_run and key in plan._overlay:
+        current_data = plan._overlay[key]
+        if current_data is None:
+            return "create"
+        return "unchanged" if current_data == data else "update"
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return "create"
+    if size != len(data):
+        return "update"  # A different size needs no read
+    return "unchanged" if read_bytes(path) == data else "update"
+
+
+def write_bytes(
+    path: Path, data: bytes, owned: bool = True, replace_symlink: bool = False,
+) -> str:
+    """Write *data* to *path* unless it already holds it.
+
+    With *replace_symlink*, a symlink at *path* is replaced by a regular
+    file instead of being written through. Returns the action:
+    ``"create"``, ``"update"`` or ``"unchanged"``.
+    """
+    path = Path(path)
+    plan = _active.get()
+    overlaid = (
+        plan is not None and plan.dry_run and os.path.abspath(path) in plan._overlay
+    )
+    before = None
+    if replace_symlink and not overlaid and path.is_symlink():
+        action = "update"
+        if plan is None or not plan.dry_run:
+            path.unlink()
+    else:
+        action = _action_for(path, data)
+        if action == "update":
+            before = _digest(read_bytes(path))
+    if action != "unchanged":
+        if plan is not None and plan.dry_run:
+            plan._overlay[os.path.abspath(path)] = data
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+    record(path, action, sha256=_digest(data), owned=owned, before=before)
+    return action
+
+
+def write_text(path: Path, content: str, owned: bool = True) -> str:
+    """Text counterpart of ``write_bytes`` (UTF-8, platform newlines)."""
+    path = Path(path)
+    data = content.encode("utf-8")
+    current_data = read_bytes(path)
+    before = None if current_data is None else _digest(current_data)
+    try:
+        unchanged = read_text(path) == content
+        action = "update"
+    except FileNotFoundError:
+        unchanged = False
+        action = "create"
+    except UnicodeDecodeError:
+        unchanged = False
+        action = "update"
+    if unchanged:
+        action = "unchanged"
+    elif is_dry_run():
+        _active.get()._overlay[os.path.abspath(path)] = data
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    record(path, action, sha256=_digest(data), owned=owned, before=before)
+    return action
+
+
+def link(canonical: Path, alias: Path, copy: bool = False, owned: bool = True) -> str:
+    """Replace *alias* with a symlink to (or copy of) *canonical*.
+
+    Uses ``_links.link_or_copy``; in a dry run the alias is only
+    recorded. Returns ``"symlink"`` or ``"copy"``. Callers decide
+    beforehand whether the alias is already correct.
+    """
+    plan = _active.get()
+    existed = alias.exists() or alias.is_symlink()
+    content = read_bytes(canonical)
+    details = {
+        "sha256": _digest(content) if content is not None else None,
+        "link": plan.rel(canonical) if plan is not None else None,
+        "owned": owned,
+    }
+    if plan is not None and plan.dry_run:
+        key = os.path.abspath(alias)
+        existed = plan._overlay[key] is not None if key in plan._overlay else existed
+        plan._overlay[key] = content
+        plan.record(alias, "update" if existed else "create", **details)
+        return "copy" if copy else "symlink"
+    if existed:
+        alias.unlink()
+    result = _links.link_or_copy(canonical, alias, copy=copy)
+    record(alias, "update" if existed else "create", **details)
+    return result
+
+
+def remove(path: Path) -> bool:
+    """Unlink *path* (a file or symlink) unless this is a dry run."""
+    plan = _active.get()
+    if plan is not None and plan.dry_run:
+        plan._overlay[os.path.abspath(path)] = None
+        return True
+    try:
+        Path(path).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def mkdir(path: Path) -> None:
+    """Create directory *path* (and parents) unless this is a dry run."""
+    if not is_dry_run():
+        Path(path).mkdir(parents=True, exist_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Install manifest
+# ---------------------------------------------------------------------------
+
+
+def load_manifest(root: Path) -> Dict[str, Dict[str, Any]]:
+    """Return the files recorded by the previous install (may be empty)."""
+    try:
+        data = json.loads((root / MANIFEST_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def _is_installed_copy(path: Path, entry: Dict[str, Any]) -> bool:
+    """True if *path* still holds exactly what the manifest recorded."""
+    if "link" in entry:
+        return path.is_symlink() or (
+            "sha256" in entry and _file_digest(path) == entry["sha256"]
+        )
+    if path.is_symlink():
+        return False
+    return _file_digest(path) == entry.get("sha256")
+
+
+def _file_digest(path: Path) -> Optional[str]:
+    try:
+        return _digest(path.read_bytes())
+    except OSError:
+        return None
+
+
+def prune(plan: Plan, previous: Dict[str, Dict[str, Any]], sections: List[str]) -> List[str]:
+    """Delete owned files the re-installed *sections* no longer produce.
+
+    Files that were modified since they were installed are kept and
+    returned.
+    """
+    kept = []
+    for rel, entry in sorted(previous.items()):
+        if rel in plan.entries or not entry.get("owned", True):
+            continue
+        if not set(entry.get("sections", [])) <= set(sections):
+            continue
+        path = plan.root / rel
+        if not (path.exists() or path.is_symlink()):
+            continue
+        if not _is_installed_copy(path, entry):
+            kept.append(rel)
+            continue
+        remove(path)
+        plan.record(path, "delete")
+    return kept
+
+
+def save_manifest(
+    plan: Plan,
+    previous: Dict[str, Dict[str, Any]],
+    sections: List[str],
+    version: str,
+) -> None:
+    """Write the manifest: this run's files plus other sections' entries."""
+    files = {
+        rel: entry for rel, entry in previous.items()
+        if rel not in plan.entries
+        and not set(entry.get("sections", [])) <= set(sections)
+    }
+    files.update(plan.entries)
+    data = {
+        "version": version,
+        "files": {
+            rel: {**files[rel], "sections": sorted(files[rel]["sections"])}
+            for rel in sorted(files)
+        },
+    }
+    path = plan.root / MANIFEST_PATH
+    content = json.dumps(data, indent=2, sort_keys=True) + "\n"
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
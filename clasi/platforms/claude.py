@@ -23,7 +23,7 @@ from typing import Dict
 
 import click
 
-from clasi.platforms import _links
+from clasi.platforms import _bundle, _links, _plan
 from clasi.platforms._rules import (
     CLASI_ARTIFACTS_BODY,
     GIT_COMMITS_BODY,
@@ -103,20 +103,28 @@ def _write_claude_md(target: Path, copy: bool = False) -> bool:
 
     # 2. Conflict guard: existing regular file that is not already our alias
     if claude_md.exists() and not claude_md.is_symlink():
-        if claude_md.read_bytes() != agents_md.read_bytes():
+        if claude_md.read_bytes() != _plan.read_bytes(agents_md):
             click.echo(
                 "  Error: CLAUDE.md exists with different content. "
                 "Use --migrate to convert."
             )
             return False
-        # Content matches — remove so link_or_copy can replace it
-        claude_md.unlink()
-
-    # 3. Create alias (or replace stale symlink pointing elsewhere)
-    if claude_md.is_symlink():
-        claude_md.unlink()
+        # Content matches — a copy is up to date, otherwise it is replaced
+        # by the alias below
+        unchanged = copy
+    else:
+        unchanged = (
+            not copy
+            and claude_md.is_symlink()
+            and claude_md.resolve() == agents_md.resolve()
+        )
+    if unchanged:
+        _plan.record(claude_md, "unchanged", link="AGENTS.md", owned=False)
+        click.echo("  Unchanged: CLAUDE.md -> AGENTS.md")
+        return True
 
-    result = _links.link_or_copy(agents_md, claude_md, copy=copy)
+    # 3. Create alias (or replace a stale one)
+    result = _plan.link(agents_md, claude_md, copy=copy, owned=False)
     verb = "Symlinked" if result == "symlink" else "Copied"
     click.echo(f"  {verb}: CLAUDE.md -> AGENTS.md")
     return True
@@ -238,73 +246,60 @@ def _install_plugin_content(
     symlink before the standard alias step (no-op if already a symlink or if
     a conflict is detected — conflict is reported to stdout and the alias is
     left unchanged).
+
+    Outputs come from the shared ``_bundle``; files and aliases that are
+    already up to date are not rewritten.
     """
     if not _PLUGIN_DIR.exists():
         click.echo("  Warning: plugin/ directory not found, skipping content install")
         return
 
+    bundle = _bundle.build()
+
     # Copy skills
-    plugin_skills = _PLUGIN_DIR / "skills"
-    if plugin_skills.exists():
+    if (_PLUGIN_DIR / "skills").exists():
         click.echo("Skills:")
-        for skill_dir in sorted(plugin_skills.iterdir()):
-            if not skill_dir.is_dir():
-                continue
-            skill_src = skill_dir / "SKILL.md"
-            if not skill_src.exists():
-                continue
-
+        for output, alias_output in zip(
+            bundle[_bundle.SKILLS], bundle[_bundle.CLAUDE_SKILLS]
+        ):
             # 1. Write canonical to .agents/skills/<n>/SKILL.md
-            canonical = target / ".agents" / "skills" / skill_dir.name / "SKILL.md"
-            canonical.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(skill_src, canonical)
+            _bundle.install_file(target, output)
+            canonical = target / output.path
 
             # 2. Create alias .claude/skills/<n>/SKILL.md
-            alias = target / ".claude" / "skills" / skill_dir.name / "SKILL.md"
+            alias = target / alias_output.path
 
             # Handle --migrate: convert legacy copy to symlink before alias step
             if migrate and alias.exists():
                 migrate_result = _links.migrate_to_symlink(canonical, alias)
                 if migrate_result == "conflict":
                     click.echo(
-                        f"  Conflict: .claude/skills/{skill_dir.name}/SKILL.md "
+                        f"  Conflict: {alias_output.path} "
                         f"differs from canonical — skipping migrate"
                     )
                     # Leave the alias unchanged; skip the normal alias step
-                    click.echo(f"  Canonical: .agents/skills/{skill_dir.name}/SKILL.md")
+                    click.echo(f"  Canonical: {output.path}")
                     continue
                 elif migrate_result == "migrated":
-                    click.echo(f"  Migrated: .claude/skills/{skill_dir.name}/SKILL.md -> symlink")
-                    click.echo(f"  Canonical: .agents/skills/{skill_dir.name}/SKILL.md")
+                    click.echo(f"  Migrated: {alias_output.path} -> symlink")
+                    click.echo(f"  Canonical: {output.path}")
                     continue
                 # "already-symlink" or "not-found" — fall through to normal alias step
 
-            # Remove stale alias if present so link_or_copy won't fail
-            if alias.exists() or alias.is_symlink():
-                alias.unlink()
-
-            result = _links.link_or_copy(canonical, alias, copy=copy)
-            verb = "Symlinked" if result == "symlink" else "Copied"
-            click.echo(f"  {verb}: .claude/skills/{skill_dir.name}/SKILL.md")
-            click.echo(f"  Canonical: .agents/skills/{skill_dir.name}/SKILL.md")
+            result = _bundle.install_alias(target, alias_output, copy=copy)
+            verb = {"symlink": "Symlinked", "copy": "Copied"}.get(result, "Unchanged")
+            click.echo(f"  {verb}: {alias_output.path}")
+            click.echo(f"  Canonical: {output.path}")
         click.echo()
 
     # Copy agents
-    plugin_agents = _PLUGIN_DIR / "agents"
-    if plugin_agents.exists():
-        target_agents = target / ".claude" / "agents"
+    if (_PLUGIN_DIR / "agents").exists():
         click.echo("Agents:")
-        for agent_dir in sorted(plugin_agents.iterdir()):
-            if not agent_dir.is_dir():
-                continue
-            for md_file in agent_dir.glob("*.md"):
-                dest_dir = target_agents / agent_dir.name
-                dest_dir.mkdir(parents=True, exist_ok=True)
-                dest = dest_dir / md_file.name
-                source_content = md_file.read_text(encoding="utf-8")
-                rel = f".claude/agents/{agent_dir.name}/{md_file.name}"
-                dest.write_text(source_content, encoding="utf-8")
-                click.echo(f"  Wrote: {rel}")
+        for output in bundle[_bundle.CLAUDE_AGENTS]:
+            if _bundle.install_file(target, output) == "unchanged":
+                click.echo(f"  Unchanged: {output.path}")
+            else:
+                click.echo(f"  Wrote: {output.path}")
         click.echo()
 
     # Overwrite hooks from plugin hooks.json into .claude/settings.json
@@ -313,7 +308,6 @@ def _install_plugin_content(
         click.echo("Hooks (from plugin):")
         hooks_data = json.loads(plugin_hooks.read_text(encoding="utf-8"))
         settings_path = target / ".claude" / "settings.json"
-        settings_path.parent.mkdir(parents=True, exist_ok=True)
 
         if settings_path.exists():
             try:
@@ -325,11 +319,12 @@ def _install_plugin_content(
 
         new_hooks = hooks_data.get("hooks", {})
         if settings.get("hooks") == new_hooks:
+            _plan.record(settings_path, "unchanged", owned=False)
             click.echo("  Unchanged: .claude/settings.json (hooks)")
         else:
             settings["hooks"] = new_hooks
-            settings_path.write_text(
-                json.dumps(settings, indent=2) + "\n", encoding="utf-8"
+            _plan.write_text(
+                settings_path, json.dumps(settings, indent=2) + "\n", owned=False,
             )
             click.echo("  Updated: .claude/settings.json (hooks)")
         click.echo()
@@ -346,8 +341,6 @@ def _update_settings_json(settings_path: Path) -> bool:
     Creates the file if it doesn't exist.
     Returns True if the file was written/updated, False if unchanged.
     """
-    settings_path.parent.mkdir(parents=True, exist_ok=True)
-
     if settings_path.exists():
         try:
             data = json.loads(settings_path.read_text(encoding="utf-8"))
@@ -361,13 +354,12 @@ def _update_settings_json(settings_path: Path) -> bool:
 
     target_perm = "mcp__clasi__*"
     if target_perm in allow:
+        _plan.record(settings_path, "unchanged", owned=False)
         click.echo("  Unchanged: .claude/settings.local.json")
         return False
 
     allow.append(target_perm)
-    settings_path.write_text(
-        json.dumps(data, indent=2) + "\n", encoding="utf-8"
-    )
+    _plan.write_text(settings_path, json.dumps(data, indent=2) + "\n", owned=False)
     click.echo("  Updated: .claude/settings.local.json")
     return True
 
@@ -383,15 +375,16 @@ def _create_rules(target: Path) -> bool:
     Returns True if any file was written/updated, False if all unchanged.
     """
     rules_dir = target / ".claude" / "rules"
-    rules_dir.mkdir(parents=True, exist_ok=True)
     changed = False
 
     for filename, content in RULES.items():
         path = rules_dir / filename
         rel = f".claude/rules/{filename}"
-        path.write_text(content, encoding="utf-8")
-        click.echo(f"  Wrote: {rel}")
-        changed = True
+        if _plan.write_text(path, content) == "unchanged":
+            click.echo(f"  Unchanged: {rel}")
+        else:
+            click.echo(f"  Wrote: {rel}")
+            changed = True
 
     return changed
 
@@ -428,7 +421,11 @@ def install(
             calls ``_links.migrate_to_symlink`` on each, and prints a summary
             line.  The standard install then proceeds normally.
     """
-    if migrate:
+    if migrate and _plan.is_dry_run():
+        click.echo("Migration pass: skipped in a dry run")
+        click.echo()
+        migrate = False
+    elif migrate:
         click.echo("Migration pass:")
         _migrate_claude(target)
         click.echo()
@@ -23,6 +23,7 @@ from pathlib import Path
 
 import click
 
+from clasi.platforms import _bundle, _plan
 from clasi.platforms._rules import (
     CLASI_ARTIFACTS_BODY,
     GIT_COMMITS_BODY,
@@ -129,7 +130,6 @@ def _write_codex_config(target: Path, mcp_config: dict) -> None:
     Reads existing TOML if present, merges the CLASI keys, and writes back.
     """
     config_path = target / ".codex" / "config.toml"
-    config_path.parent.mkdir(parents=True, exist_ok=True)
 
     if config_path.exists():
         try:
@@ -143,8 +143,10 @@ def _write_codex_config(target: Path, mcp_config: dict) -> None:
     mcp_servers["clasi"] = dict(mcp_config)
     data["codex_hooks"] = True
 
-    config_path.write_text(tomli_w.dumps(data), encoding="utf-8")
-    click.echo("  Wrote: .codex/config.toml")
+    if _plan.write_text(config_path, tomli_w.dumps(data), owned=False) == "unchanged":
+        click.echo("  Unchanged: .codex/config.toml")
+    else:
+        click.echo("  Wrote: .codex/config.toml")
 
 
 # ---------------------------------------------------------------------------
@@ -176,7 +178,6 @@ def _write_codex_hooks(target: Path) -> None:
     Firing limitation: see module-level comment on openai/codex#17532.
     """
     hooks_path = target / ".codex" / "hooks.json"
-    hooks_path.parent.mkdir(parents=True, exist_ok=True)
 
     if hooks_path.exists():
         try:
@@ -197,8 +198,11 @@ def _write_codex_hooks(target: Path) -> None:
     if not any(_is_clasi_wrapper_entry(e) for e in stop_list):
         stop_list.append(_CLASI_STOP_HOOK_WRAPPER)
 
-    hooks_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
-    click.echo("  Wrote: .codex/hooks.json")
+    content = json.dumps(data, indent=2) + "\n"
+    if _plan.write_text(hooks_path, content, owned=False) == "unchanged":
+        click.echo("  Unchanged: .codex/hooks.json")
+    else:
+        click.echo("  Wrote: .codex/hooks.json")
 
 
 # ---------------------------------------------------------------------------
@@ -211,27 +215,18 @@ def _install_skills(target: Path) -> None:
 
     Mirrors the Claude installer, which copies every skill in plugin/skills/
     to .claude/skills/. Codex needs the full skill set for the SE process
-    to function; installing only the `se` skill is not enough.
+    to function; installing only the `se` skill is not enough. Skills that
+    are already up to date are left untouched.
     """
-    plugin_skills = _PLUGIN_DIR / "skills"
-    if not plugin_skills.exists():
+    if not (_PLUGIN_DIR / "skills").exists():
         click.echo("  Warning: plugin/skills/ not found, skipping")
         return
 
-    target_skills = target / ".agents" / "skills"
-    for skill_dir in sorted(plugin_skills.iterdir()):
-        if not skill_dir.is_dir():
-            continue
-        source_skill_md = skill_dir / "SKILL.md"
-        if not source_skill_md.exists():
-            continue
-        dest_dir = target_skills / skill_dir.name
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest_skill_md = dest_dir / "SKILL.md"
-        dest_skill_md.write_text(
-            source_skill_md.read_text(encoding="utf-8"), encoding="utf-8"
-        )
-        click.echo(f"  Wrote: .agents/skills/{skill_dir.name}/SKILL.md")
+    for output in _bundle.build()[_bundle.SKILLS]:
+        if _bundle.install_file(target, output) == "unchanged":
+            click.echo(f"  Unchanged: {output.path}")
+        else:
+            click.echo(f"  Wrote: {output.path}")
 
 
 # ---------------------------------------------------------------------------
@@ -278,40 +273,42 @@ def _build_todo_dir_content() -> str:
     return f"# CLASI TODO Rules\n\n{TODO_DIR_BODY}\n"
 
 
+def _render_agent(agent_name: str, fm: dict, body: str) -> str:
+    """Render the .codex/agents/<name>.toml text for one agent.md."""
+    data = {
+        "name": fm.get("name", agent_name),
+        "description": fm.get("description", ""),
+        # Body is the markdown content after the frontmatter block, stripped
+        # of leading/trailing whitespace.
+        "developer_instructions": body.strip(),
+    }
+    return tomli_w.dumps(data)
+
+
 def _install_agents(target: Path) -> None:
     """Write .codex/agents/<name>.toml for each active CLASI agent.
 
     Reads plugin/agents/<name>/agent.md, extracts frontmatter (description,
     title) and body, then writes a TOML file with the fields required by the
     Codex sub-agent spec (https://developers.openai.com/codex/subagents):
-    name, description, developer_instructions.
+    name, description, developer_instructions. The TOML is rendered once
+    per process by ``_bundle.build()``; files already up to date are not
+    rewritten.
     """
-    from clasi.frontmatter import read_document
-
-    agents_dir = target / ".codex" / "agents"
-    agents_dir.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(target / ".codex" / "agents")
 
+    rendered = {o.path: o for o in _bundle.build()[_bundle.CODEX_AGENTS]}
     for agent_name in _ACTIVE_AGENTS:
-        agent_md = _PLUGIN_DIR / "agents" / agent_name / "agent.md"
-        if not agent_md.exists():
+        output = rendered.get(f".codex/agents/{agent_name}.toml")
+        if output is None:
             click.echo(
                 f"  Warning: plugin/agents/{agent_name}/agent.md not found, skipping"
             )
             continue
-
-        fm, body = read_document(agent_md)
-
-        data = {
-            "name": fm.get("name", agent_name),
-            "description": fm.get("description", ""),
-            # Body is the markdown content after the frontmatter block, stripped
-            # of leading/trailing whitespace.
-            "developer_instructions": body.strip(),
-        }
-
-        dest = agents_dir / f"{agent_name}.toml"
-        dest.write_text(tomli_w.dumps(data), encoding="utf-8")
-        click.echo(f"  Wrote: .codex/agents/{agent_name}.toml")
+        if _bundle.install_file(target, output) == "unchanged":
+            click.echo(f"  Unchanged: {output.path}")
+        else:
+            click.echo(f"  Wrote: {output.path}")
 
 
 def _uninstall_agents(target: Path) -> None:
@@ -353,20 +350,16 @@ def _install_rules(target: Path) -> None:
     Each file is written in full (not marker-managed) and owned by the
     Codex installer.
     """
-    docs_clasi = target / "docs" / "clasi"
-    docs_clasi.mkdir(parents=True, exist_ok=True)
-    (docs_clasi / "AGENTS.md").write_text(_build_docs_clasi_content(), encoding="utf-8")
-    click.echo("  Wrote: docs/clasi/AGENTS.md")
-
-    docs_clasi_todo = target / "docs" / "clasi" / "todo"
-    docs_clasi_todo.mkdir(parents=True, exist_ok=True)
-    (docs_clasi_todo / "AGENTS.md").write_text(_build_todo_dir_content(), encoding="utf-8")
-    click.echo("  Wrote: docs/clasi/todo/AGENTS.md")
-
-    clasi_src = target / "clasi"
-    clasi_src.mkdir(parents=True, exist_ok=True)
-    (clasi_src / "AGENTS.md").write_text(_CLASI_SRC_RULES, encoding="utf-8")
-    click.echo("  Wrote: clasi/AGENTS.md")
+    rules = {
+        "docs/clasi/AGENTS.md": _build_docs_clasi_content(),
+        "docs/clasi/todo/AGENTS.md": _build_todo_dir_content(),
+        "clasi/AGENTS.md": _CLASI_SRC_RULES,
+    }
+    for rel, content in rules.items():
+        if _plan.write_text(target / rel, content) == "unchanged":
+            click.echo(f"  Unchanged: {rel}")
+        else:
+            click.echo(f"  Wrote: {rel}")
 
 
 def _uninstall_rules(target: Path) -> None:
@@ -25,7 +25,7 @@ from pathlib import Path
 import click
 import yaml
 
-from clasi.platforms import _links
+from clasi.platforms import _bundle, _links, _plan
 from clasi.platforms._markers import strip_section, write_section
 from clasi.platforms._rules import (
     CLASI_ARTIFACTS_BODY,
@@ -60,30 +60,13 @@ def _ensure_canonical_skills(target: Path) -> None:
     does not already exist with matching content.  This means Claude or Codex
     installers that already wrote the canonical files are not disturbed.
     """
-    plugin_skills = _PLUGIN_DIR / "skills"
-    if not plugin_skills.exists():
+    if not (_PLUGIN_DIR / "skills").exists():
         click.echo("  Warning: plugin/skills/ not found, skipping canonical skills write")
         return
 
-    agents_skills = target / ".agents" / "skills"
-    for skill_dir in sorted(plugin_skills.iterdir()):
-        if not skill_dir.is_dir():
-            continue
-        skill_src = skill_dir / "SKILL.md"
-        if not skill_src.exists():
-            continue
-
-        dest_dir = agents_skills / skill_dir.name
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        dest = dest_dir / "SKILL.md"
-
-        src_content = skill_src.read_text(encoding="utf-8")
-        if dest.exists() and dest.read_text(encoding="utf-8") == src_content:
-            # Already up to date — idempotent no-op
-            continue
-
-        shutil.copy2(skill_src, dest)
-        click.echo(f"  Wrote: .agents/skills/{skill_dir.name}/SKILL.md")
+    for output in _bundle.build()[_bundle.SKILLS]:
+        if _bundle.install_file(target, output) != "unchanged":
+            click.echo(f"  Wrote: {output.path}")
 
 
 # ---------------------------------------------------------------------------
@@ -99,8 +82,8 @@ def _install_skills(target: Path, copy: bool = False) -> None:
        With copy=False (default), this is a directory symlink.
        With copy=True, the entire directory tree is copied (shutil.copytree).
 
-    Idempotent: an existing symlink pointing at the correct target is replaced
-    (removed then re-created) to handle stale symlinks on re-install.
+    Idempotent: an existing symlink pointing at the correct target is left
+    alone; a stale symlink is removed and re-created.
     """
     _ensure_canonical_skills(target)
 
@@ -108,19 +91,33 @@ def _install_skills(target: Path, copy: bool = False) -> None:
     github_skills = target / ".github" / "skills"
 
     # Ensure .agents/skills/ exists even if there are no plugin skills
-    agents_skills.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(agents_skills)
+
+    if (
+        not copy
+        and github_skills.is_symlink()
+        and github_skills.resolve() == agents_skills.resolve()
+    ):
+        _plan.record(github_skills, "unchanged", link=".agents/skills")
+        click.echo("  Unchanged: .github/skills/ -> .agents/skills/")
+        return
+
+    stale = github_skills.is_symlink()
+    if github_skills.exists() and not stale:
+        # It's a real directory — do not delete; leave it and skip
+        click.echo(
+            "  Warning: .github/skills/ exists as a real directory; "
+            "skipping alias creation"
+        )
+        return
+
+    _plan.record(github_skills, "update" if stale else "create", link=".agents/skills")
+    if _plan.is_dry_run():
+        return
 
     # Remove stale alias if present
-    if github_skills.is_symlink() or github_skills.exists():
-        if github_skills.is_symlink():
-            github_skills.unlink()
-        else:
-            # It's a real directory — do not delete; leave it and skip
-            click.echo(
-                "  Warning: .github/skills/ exists as a real directory; "
-                "skipping alias creation"
-            )
-            return
+    if stale:
+        github_skills.unlink()
 
     github_skills.parent.mkdir(parents=True, exist_ok=True)
 
@@ -173,7 +170,7 @@ def _install_global_instructions(target: Path, copy: bool = False) -> None:
     - Global-scope rules: MCP Required and Git Commits (from _rules.py)
     """
     path = target / ".github" / "copilot-instructions.md"
-    path.parent.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(path.parent)
     body = (
         f"{_COPILOT_ENTRY_POINT}\n\n"
         "## Global Rules\n\n"
@@ -221,11 +218,13 @@ def _install_path_rules(target: Path) -> None:
     The directory ``.github/instructions/`` is created if absent.
     """
     rules_dir = target / ".github" / "instructions"
-    rules_dir.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(rules_dir)
     for fname, apply_to, body in _PATH_RULES:
         content = f'---\napplyTo: "{apply_to}"\n---\n\n{body}\n'
-        (rules_dir / fname).write_text(content, encoding="utf-8")
-        click.echo(f"  Wrote: .github/instructions/{fname}")
+        if _plan.write_text(rules_dir / fname, content) == "unchanged":
+            click.echo(f"  Unchanged: .github/instructions/{fname}")
+        else:
+            click.echo(f"  Wrote: .github/instructions/{fname}")
 
 
 def _uninstall_path_rules(target: Path) -> None:
@@ -249,35 +248,35 @@ def _uninstall_path_rules(target: Path) -> None:
 _AGENT_NAMES = ["team-lead", "sprint-planner", "programmer"]
 
 
+def _render_agent(agent_name: str, fm: dict, body: str) -> str:
+    """Render the .github/agents/<n>.agent.md text for one agent.md."""
+    description = fm.get("description", f"CLASI {agent_name} agent")
+    copilot_fm: dict = {"name": fm.get("name", agent_name), "description": description}
+    return "---\n" + yaml.dump(copilot_fm, default_flow_style=False) + "---\n\n" + body
+
+
 def _install_agents(target: Path, copy: bool = False) -> None:
     """Write .github/agents/<n>.agent.md for each active CLASI agent.
 
     Reads plugin/agents/<name>/agent.md, maps frontmatter to the Copilot
     agent schema (``description`` required; ``name`` optional), and writes
     the body verbatim.  The directory ``.github/agents/`` is created if absent.
+    Files already up to date are not rewritten.
     """
-    from clasi.frontmatter import read_document
-
-    agents_dir = target / ".github" / "agents"
-    agents_dir.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(target / ".github" / "agents")
 
+    rendered = {o.path: o for o in _bundle.build()[_bundle.COPILOT_AGENTS]}
     for agent_name in _AGENT_NAMES:
-        agent_md = _PLUGIN_DIR / "agents" / agent_name / "agent.md"
-        if not agent_md.exists():
+        output = rendered.get(f".github/agents/{agent_name}.agent.md")
+        if output is None:
             click.echo(
                 f"  Warning: plugin/agents/{agent_name}/agent.md not found, skipping"
             )
             continue
-
-        fm, body = read_document(agent_md)
-
-        description = fm.get("description", f"CLASI {agent_name} agent")
-        copilot_fm: dict = {"name": fm.get("name", agent_name), "description": description}
-
-        content = "---\n" + yaml.dump(copilot_fm, default_flow_style=False) + "---\n\n" + body
-        dest = agents_dir / f"{agent_name}.agent.md"
-        dest.write_text(content, encoding="utf-8")
-        click.echo(f"  Wrote: .github/agents/{agent_name}.agent.md")
+        if _bundle.install_file(target, output) == "unchanged":
+            click.echo(f"  Unchanged: {output.path}")
+        else:
+            click.echo(f"  Wrote: {output.path}")
 
 
 def _uninstall_agents(target: Path) -> None:
@@ -319,7 +318,7 @@ def _install_vscode_mcp(target: Path, mcp_config: dict) -> None:
     not rewritten.
     """
     vscode_dir = target / ".vscode"
-    vscode_dir.mkdir(parents=True, exist_ok=True)
+    _plan.mkdir(vscode_dir)
     mcp_path = vscode_dir / "mcp.json"
 
     if mcp_path.exists():
@@ -335,11 +334,12 @@ def _install_vscode_mcp(target: Path, mcp_config: dict) -> None:
 
     # Idempotency check — skip write if nothing would change.
     if servers.get("clasi") == mcp_config:
+        _plan.record(mcp_path, "unchanged", owned=False)
         click.echo("  .vscode/mcp.json already up to date.")
         return
 
     servers["clasi"] = mcp_config
-    mcp_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    _plan.write_text(mcp_path, json.dumps(data, indent=2) + "\n", owned=False)
     click.echo("  Wrote: .vscode/mcp.json")
 
 
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from clasi.agent import Agent
+    from clasi.artifact_index import ArtifactIndex
     from clasi.sprint import Sprint
     from clasi.state_db_class import StateDB
     from clasi.todo import Todo
@@ -18,6 +19,7 @@ class Project:
     def __init__(self, root: str | Path):
         self._root = Path(root).resolve()
         self._db: StateDB | None = None
+        self._index: ArtifactIndex | None = None
 
     @property
     def root(self) -> Path:
@@ -67,47 +69,36 @@ class Project:
             self._db = StateDB(self.clasi_dir / ".clasi.db")
         return self._db
 
+    @property
+    def index(self) -> ArtifactIndex:
+        """Lazily-initialized persistent sprint/ticket index."""
+        if self._index is None:
+            from clasi.artifact_index import ArtifactIndex
+
+            self._index = ArtifactIndex(self)
+        return self._index
+
     # --- Sprint management ---
 
     def get_sprint(self, sprint_id: str) -> Sprint:
         """Find a sprint by its ID (checks active and done directories)."""
         from clasi.sprint import Sprint
-        from clasi.frontmatter import read_frontmatter
 
-        for location in [self.sprints_dir, self.sprints_dir / "done"]:
-            if not location.exists():
-                continue
-            for d in sorted(location.iterdir()):
-                if not d.is_dir():
-                    continue
-                sprint_file = d / "sprint.md"
-                if not sprint_file.exists():
-                    continue
-                fm = read_frontmatter(sprint_file)
-                if fm.get("id") == sprint_id:
-                    return Sprint(d, self)
-        raise ValueError(f"Sprint '{sprint_id}' not found")
+        entry = self.index.find_sprint(sprint_id)
+        if entry is None:
+            raise ValueError(f"Sprint '{sprint_id}' not found")
+        return Sprint(Path(entry["path"]).parent, self)
 
     def list_sprints(self, status: str | None = None) -> list[Sprint]:
         """List all sprints, optionally filtered by status."""
         from clasi.sprint import Sprint
-        from clasi.frontmatter import read_frontmatter
 
         results: list[Sprint] = []
-        for location in [self.sprints_dir, self.sprints_dir / "done"]:
-            if not location.exists():
+        for entry in self.index.sprints():
+            sprint_status = entry["status"] or "unknown"
+            if status and sprint_status != status:
                 continue
-            for d in sorted(location.iterdir()):
-                if not d.is_dir():
-                    continue
-                sprint_file = d / "sprint.md"
-                if not sprint_file.exists():
-                    continue
-                fm = read_frontmatter(sprint_file)
-                sprint_status = fm.get("status", "unknown")
-                if status and sprint_status != status:
-                    continue
-                results.append(Sprint(d, self))
+            results.append(Sprint(Path(entry["path"]).parent, self))
         return results
 
     def create_sprint(self, title: str) -> Sprint:
@@ -147,20 +138,13 @@ class Project:
 
     def _next_sprint_id(self) -> str:
         """Determine the next sprint number (NNN format)."""
-        from clasi.frontmatter import read_frontmatter
-
         max_id = 0
-        for location in [self.sprints_dir, self.sprints_dir / "done"]:
-            if not location.exists():
-                continue
-            for d in location.iterdir():
-                if d.is_dir() and (d / "sprint.md").exists():
-                    fm = read_frontmatter(d / "sprint.md")
-                    try:
-                        num = int(fm.get("id", "0"))
-                        max_id = max(max_id, num)
-                    except (ValueError, TypeError):
-                        pass
+        for entry in self.index.sprints():
+            try:
+                num = int(entry["artifact_id"] or "0")
+                max_id = max(max_id, num)
+            except (ValueError, TypeError):
+                pass
         return f"{max_id + 1:03d}"
 
     # --- Agent management ---
@@ -0,0 +1,169 @@
+"""Immutable point-in-time views of a sprint, produced by Sprint.snapshot().
+
+Review and close tools used to rescan the sprint directory, its tickets
+and the TODO directories several times per call. A snapshot reads all of
+that once: the planning docs' frontmatter, every ticket with its
+frontmatter, the TODOs linked to the sprint, and the sprint's DB state.
+
+Snapshots never change after construction. Frontmatter is exposed as a
+read-only mapping, and collections are tuples. Code that needs to modify
+an artifact builds a ``Ticket``/``Todo`` from the snapshot's path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+PLANNING_DOCS = ("sprint.md", "usecases.md", "architecture-update.md")
+
+
+def resolve_completes_todo(frontmatter: Mapping[str, Any], filename: str) -> bool:
+    """Resolve a ticket's ``completes_todo`` field for one TODO filename.
+
+    See ``Ticket.completes_todo_for`` for the resolution rules.
+    """
+    val = frontmatter.get("completes_todo")
+    if val is None or val is True:
+        return True
+    if val is False:
+        return False
+    if isinstance(val, dict):
+        return bool(val.get(filename, True))
+    return True  # fallback for unexpected types
+
+
+def _as_list(val: Any) -> list[str]:
+    if not val:
+        return []
+    if isinstance(val, str):
+        return [val]
+    return [str(v) for v in val]
+
+
+@dataclass(frozen=True, slots=True)
+class TicketSnapshot:
+    """A ticket file as read by Sprint.snapshot()."""
+
+    path: Path
+    frontmatter: Mapping[str, Any]
+    in_done_dir: bool
+
+    @property
+    def id(self) -> str:
+        return self.frontmatter.get("id", "")
+
+    @property
+    def title(self) -> str:
+        return self.frontmatter.get("title", "")
+
+    @property
+    def status(self) -> str:
+        return self.frontmatter.get("status", "todo")
+
+    @property
+    def todo_refs(self) -> list[str]:
+        """TODO filenames from the ticket's 'todo' field."""
+        return _as_list(self.frontmatter.get("todo"))
+
+    def completes_todo_for(self, filename: str) -> bool:
+        return resolve_completes_todo(self.frontmatter, filename)
+
+
+@dataclass(frozen=True, slots=True)
+class TodoSnapshot:
+    """A pending or in-progress TODO linked to the snapshotted sprint."""
+
+    path: Path
+    frontmatter: Mapping[str, Any]
+    in_progress: bool
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+    @property
+    def status(self) -> str:
+        return self.frontmatter.get("status", "pending")
+
+    @property
+    def sprint(self) -> Optional[str]:
+        val = self.frontmatter.get("sprint")
+        return str(val) if val else None
+
+
+@dataclass(frozen=True, slots=True)
+class SprintSnapshot:
+    """Everything the review and close tools need to know about a sprint.
+
+    ``docs`` maps each planning doc filename to its frontmatter, or None
+    if the file does not exist. ``db_state`` is the StateDB record from
+    ``get_sprint_state`` (None when there is no DB or the sprint is not
+    registered).
+    """
+
+    path: Path
+    docs: Mapping[str, Optional[Mapping[str, Any]]]
+    tickets: tuple[TicketSnapshot, ...]
+    todos: tuple[TodoSnapshot, ...]
+    db_state: Optional[Mapping[str, Any]]
+
+    @property
+    def frontmatter(self) -> Mapping[str, Any]:
+        """sprint.md frontmatter (empty if sprint.md is missing)."""
+        return self.docs.get("sprint.md") or {}
+
+    @property
+    def id(self) -> str:
+        return self.frontmatter.get("id", "")
+
+    @property
+    def title(self) -> str:
+        return self.frontmatter.get("title", "")
+
+    @property
+    def status(self) -> str:
+        return self.frontmatter.get("status", "unknown")
+
+    @property
+    def branch(self) -> str:
+        return self.frontmatter.get("branch", "")
+
+    @property
+    def archived(self) -> bool:
+        return self.path.parent.name == "done"
+
+    @property
+    def phase(self) -> Optional[str]:
+        return self.db_state["phase"] if self.db_state else None
+
+    @property
+    def locked(self) -> bool:
+        return bool(self.db_state and self.db_state.get("lock"))
+
+    @property
+    def tickets_dir(self) -> Path:
+        return self.path / "tickets"
+
+    def ticket_counts(self) -> dict[str, int]:
+        """Count tickets with a non-empty id by status (todo, in_progress, done)."""
+        counts = {"todo": 0, "in_progress": 0, "done": 0}
+        for ticket in self.tickets:
+            if not ticket.id:
+                continue
+            s = ticket.status
+            if s == "in-progress":
+                s = "in_progress"
+            if s in counts:
+                counts[s] += 1
+        return counts
+
+    def todo_is_deferred(self, todo_filename: str) -> bool:
+        """True if a ticket linked to the TODO has completes_todo: false for it."""
+        for ticket in self.tickets:
+            if todo_filename not in ticket.todo_refs:
+                continue
+            if not ticket.completes_todo_for(todo_filename):
+                return True
+        return False
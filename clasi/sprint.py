@@ -6,6 +6,8 @@ import subprocess
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from clasi import git_refs
+
 
 class MergeConflictError(RuntimeError):
     """Raised by Sprint.merge_branch() when a merge conflict occurs.
@@ -29,6 +31,7 @@ from clasi.templates import (
 
 if TYPE_CHECKING:
     from clasi.project import Project
+    from clasi.snapshot import SprintSnapshot
     from clasi.ticket import Ticket
 
 
@@ -145,34 +148,24 @@ class Sprint:
     def list_tickets(self, status: str | None = None) -> list[Ticket]:
         """List tickets in this sprint, optionally filtered by status."""
         from clasi.ticket import Ticket
-        from clasi.frontmatter import read_frontmatter
 
         results: list[Ticket] = []
-
-        for location in [self.tickets_dir, self.tickets_done_dir]:
-            if not location.exists():
+        for entry in self._project.index.tickets(self._path):
+            if status and entry["status"] != status:
                 continue
-            for f in sorted(location.glob("*.md")):
-                fm = read_frontmatter(f)
-                if status and fm.get("status") != status:
-                    continue
-                results.append(Ticket(f, self))
-
+            results.append(Ticket(Path(entry["path"]), self))
         return results
 
     def get_ticket(self, ticket_id: str) -> Ticket:
         """Get a ticket by its ID."""
         from clasi.ticket import Ticket
-        from clasi.frontmatter import read_frontmatter
 
-        for location in [self.tickets_dir, self.tickets_done_dir]:
-            if not location.exists():
-                continue
-            for f in sorted(location.glob("*.md")):
-                fm = read_frontmatter(f)
-                if fm.get("id") == ticket_id:
-                    return Ticket(f, self)
-        raise ValueError(f"Ticket '{ticket_id}' not found in sprint {self.id}")
+        entry = self._project.index.find_ticket(self._path, ticket_id)
+        if entry is None:
+            raise ValueError(
+                f"Ticket '{ticket_id}' not found in sprint {self.id}"
+            )
+        return Ticket(Path(entry["path"]), self)
 
     def create_ticket(self, title: str, todo: str | None = None) -> Ticket:
         """Create a new ticket in this sprint's tickets/ directory.
@@ -209,19 +202,13 @@ class Sprint:
 
     def _next_ticket_id(self) -> str:
         """Determine the next ticket number within this sprint."""
-        from clasi.frontmatter import read_frontmatter
-
         max_id = 0
-        for location in [self.tickets_dir, self.tickets_done_dir]:
-            if not location.exists():
-                continue
-            for f in location.glob("*.md"):
-                fm = read_frontmatter(f)
-                try:
-                    num = int(fm.get("id", "0"))
-                    max_id = max(max_id, num)
-                except (ValueError, TypeError):
-                    pass
+        for entry in self._project.index.tickets(self._path):
+            try:
+                num = int(entry["artifact_id"] or "0")
+                max_id = max(max_id, num)
+            except (ValueError, TypeError):
+                pass
         return f"{max_id + 1:03d}"
 
     # --- Git branch management ---
@@ -231,6 +218,8 @@ class Sprint:
 
         Uses the branch name from sprint.md frontmatter.  If the branch
         already exists, checks it out instead of creating a new one.
+        Whether it exists is read from the ref store, so only the checkout
+        runs git.
 
         Returns the branch name on success.
         Raises RuntimeError if git operations fail.
@@ -241,38 +230,33 @@ class Sprint:
                 f"Sprint {self.id} has no 'branch' field in sprint.md frontmatter"
             )
 
-        result = subprocess.run(
-            ["git", "checkout", "-b", branch_name],
-            capture_output=True,
-            text=True,
-        )
+        if git_refs.rev_exists(f"refs/heads/{branch_name}"):
+            command = ["git", "checkout", branch_name]
+        else:
+            command = ["git", "checkout", "-b", branch_name]
+        result = subprocess.run(command, capture_output=True, text=True)
         if result.returncode != 0:
-            # Branch may already exist — try checking it out
-            result = subprocess.run(
-                ["git", "checkout", branch_name],
-                capture_output=True,
-                text=True,
+            raise RuntimeError(
+                f"Failed to create/checkout branch '{branch_name}': "
+                f"{result.stderr.strip()}"
             )
-            if result.returncode != 0:
-                raise RuntimeError(
-                    f"Failed to create/checkout branch '{branch_name}': "
-                    f"{result.stderr.strip()}"
-                )
         return branch_name
 
-    def merge_branch(self, main_branch: str = "master") -> dict:
-        """Merge the sprint branch into main_branch using --no-ff.
+    def check_merge(self, main_branch: str = "master") -> dict:
+        """Predict merging the sprint branch into main_branch.
 
-        Idempotent: if the branch no longer exists or is already an
-        ancestor of main_branch, returns without error.
+        A dry run that touches neither the working tree nor the index:
+        ancestry comes from ``git merge-base --is-ancestor`` and conflicts
+        from ``git merge-tree --write-tree``, which merges in the object
+        store only.
 
         Returns a dict with keys:
           - branch_exists (bool)
-          - merged (bool)
-          - already_merged (bool)
-
-        Raises RuntimeError on checkout or merge failure (conflict
-        information is included in the message).
+          - already_merged (bool): the branch is an ancestor of main_branch
+          - fast_forward (bool): main_branch is an ancestor of the branch
+          - clean (bool | None): the merge has no conflicts; None when
+            this git (older than 2.38) has no ``merge-tree --write-tree``
+          - conflicted_files (list[str])
         """
         branch_name = self.branch
         if not branch_name:
@@ -280,39 +264,93 @@ class Sprint:
                 f"Sprint {self.id} has no 'branch' field in sprint.md frontmatter"
             )
 
-        branch_exists = subprocess.run(
-            ["git", "rev-parse", "--verify", branch_name],
+        result = {
+            "branch_exists": True,
+            "already_merged": False,
+            "fast_forward": False,
+            "clean": True,
+            "conflicted_files": [],
+        }
+        if not git_refs.rev_exists(branch_name):
+            return {**result, "branch_exists": False, "already_merged": True}
+
+        def is_ancestor(ancestor: str, descendant: str) -> bool:
+            return subprocess.run(
+                ["git", "merge-base", "--is-ancestor", ancestor, descendant],
+                capture_output=True,
+                text=True,
+            ).returncode == 0
+
+        if is_ancestor(branch_name, main_branch):
+            return {**result, "already_merged": True}
+        if is_ancestor(main_branch, branch_name):
+            return {**result, "fast_forward": True}
+
+        # Exit status 0 = clean, 1 = conflicts; output is the merged tree
+        # id, then (with --name-only) one conflicted path per line.
+        merge_tree = subprocess.run(
+            ["git", "merge-tree", "--write-tree", "--name-only", "--no-messages",
+             main_branch, branch_name],
             capture_output=True,
             text=True,
-        ).returncode == 0
+        )
+        if merge_tree.returncode == 1:
+            lines = merge_tree.stdout.splitlines()[1:]
+            conflicted = []
+            for line in lines:
+                if not line.strip():
+                    break
+                if line.strip() not in conflicted:
+                    conflicted.append(line.strip())
+            return {**result, "clean": False, "conflicted_files": conflicted}
+        if merge_tree.returncode != 0:
+            return {**result, "clean": None}
+        return result
 
-        if not branch_exists:
-            return {"branch_exists": False, "merged": True, "already_merged": True}
+    def merge_branch(self, main_branch: str = "master") -> dict:
+        """Merge the sprint branch into main_branch using --no-ff.
 
-        is_ancestor = subprocess.run(
-            ["git", "merge-base", "--is-ancestor", branch_name, main_branch],
-            capture_output=True,
-            text=True,
-        ).returncode == 0
+        Idempotent: if the branch no longer exists or is already an
+        ancestor of main_branch, returns without error.
 
-        if is_ancestor:
-            return {"branch_exists": True, "merged": True, "already_merged": True}
+        The merge is checked with ``check_merge`` first, so a conflict is
+        reported before the working tree is touched. A branch that
+        already contains main_branch is not rebased.
 
-        # Rebase sprint branch onto main before merging.
-        # Two-argument form avoids requiring a checkout first:
-        #   git rebase <upstream> <branch>
-        rebase = subprocess.run(
-            ["git", "rebase", main_branch, branch_name],
-            capture_output=True,
-            text=True,
-        )
-        if rebase.returncode != 0:
-            subprocess.run(["git", "rebase", "--abort"], capture_output=True)
-            raise RuntimeError(
-                f"Rebase of {branch_name} onto {main_branch} failed: "
-                f"{rebase.stderr.strip()}"
+        Returns a dict with keys:
+          - branch_exists (bool)
+          - merged (bool)
+          - already_merged (bool)
+          - fast_forward (bool)
+
+        Raises MergeConflictError when the merge would conflict, and
+        RuntimeError on rebase, checkout or merge failure.
+        """
+        check = self.check_merge(main_branch)
+        branch_name = self.branch
+
+        if not check["branch_exists"]:
+            return {
+                "branch_exists": False, "merged": True,
+                "already_merged": True, "fast_forward": False,
+            }
+
+        if check["already_merged"]:
+            return {
+                "branch_exists": True, "merged": True,
+                "already_merged": True, "fast_forward": False,
+            }
+
+        if check["clean"] is False:
+            raise MergeConflictError(
+                f"Merge conflict: {branch_name} does not merge cleanly into "
+                f"{main_branch}",
+                conflicted_files=check["conflicted_files"],
             )
 
+        if not check["fast_forward"]:
+            self._rebase_onto(main_branch)
+
         checkout = subprocess.run(
             ["git", "checkout", main_branch],
             capture_output=True,
@@ -345,7 +383,28 @@ class Sprint:
                 conflicted_files=conflicted,
             )
 
-        return {"branch_exists": True, "merged": True, "already_merged": False}
+        return {
+            "branch_exists": True, "merged": True,
+            "already_merged": False, "fast_forward": check["fast_forward"],
+        }
+
+    def _rebase_onto(self, main_branch: str) -> None:
+        """Rebase the sprint branch onto main_branch."""
+        branch_name = self.branch
+        # Rebase sprint branch onto main before merging.
+        # Two-argument form avoids requiring a checkout first:
+        #   git rebase <upstream> <branch>
+        rebase = subprocess.run(
+            ["git", "rebase", main_branch, branch_name],
+            capture_output=True,
+            text=True,
+        )
+        if rebase.returncode != 0:
+            subprocess.run(["git", "rebase", "--abort"], capture_output=True)
+            raise RuntimeError(
+                f"Rebase of {branch_name} onto {main_branch} failed: "
+                f"{rebase.stderr.strip()}"
+            )
 
     def delete_branch(self) -> bool:
         """Delete the sprint branch locally.
@@ -361,11 +420,7 @@ class Sprint:
                 f"Sprint {self.id} has no 'branch' field in sprint.md frontmatter"
             )
 
-        branch_exists = subprocess.run(
-            ["git", "rev-parse", "--verify", branch_name],
-            capture_output=True,
-            text=True,
-        ).returncode == 0
+        branch_exists = git_refs.rev_exists(branch_name)
 
         if not branch_exists:
             return False
@@ -388,16 +443,92 @@ class Sprint:
         Only counts tickets that have a non-empty id field.
         """
         counts: dict[str, int] = {"todo": 0, "in_progress": 0, "done": 0}
-        for ticket in self.list_tickets():
-            if not ticket.id:
+        for entry in self._project.index.tickets(self._path):
+            if not entry["artifact_id"]:
                 continue
-            s = ticket.status
+            s = entry["status"] or "todo"
             if s == "in-progress":
                 s = "in_progress"
             if s in counts:
                 counts[s] += 1
         return counts
 
+    def snapshot(self) -> SprintSnapshot:
+        """Read the sprint's docs, tickets, linked TODOs and DB state once.
+
+        TODOs are included when they are pending or in-progress and either
+        name this sprint in their ``sprint`` field or are linked from
+        sprint.md or one of its tickets.
+        """
+        from types import MappingProxyType
+
+        from clasi.frontmatter import read_frontmatter
+        from clasi.snapshot import (
+            PLANNING_DOCS,
+            SprintSnapshot,
+            TicketSnapshot,
+            TodoSnapshot,
+        )
+
+        docs = {}
+        for name in PLANNING_DOCS:
+            doc = self._path / name
+            docs[name] = (
+                MappingProxyType(read_frontmatter(doc)) if doc.exists() else None
+            )
+        sprint_fm = docs["sprint.md"] or {}
+        sprint_id = str(sprint_fm.get("id", "") or "")
+
+        tickets = []
+        for location, in_done in [
+            (self.tickets_dir, False),
+            (self.tickets_done_dir, True),
+        ]:
+            if not location.exists():
+                continue
+            for f in sorted(location.glob("*.md")):
+                tickets.append(
+                    TicketSnapshot(f, MappingProxyType(read_frontmatter(f)), in_done)
+                )
+
+        linked = {ref for t in tickets for ref in t.todo_refs}
+        sprint_todos = sprint_fm.get("todos") or []
+        if isinstance(sprint_todos, str):
+            sprint_todos = [sprint_todos]
+        linked.update(str(t) for t in sprint_todos)
+
+        todos = []
+        todo_dir = self._project.todo_dir
+        for location, in_progress in [
+            (todo_dir, False),
+            (todo_dir / "in-progress", True),
+        ]:
+            if not location.exists():
+                continue
+            for f in sorted(location.glob("*.md")):
+                fm = read_frontmatter(f)
+                todo_sprint = fm.get("sprint")
+                if f.name in linked or (
+                    sprint_id and todo_sprint and str(todo_sprint) == sprint_id
+                ):
+                    todos.append(TodoSnapshot(f, MappingProxyType(fm), in_progress))
+
+        db_state = None
+        db = self._project.db
+        if sprint_id and db.path.exists():
+            try:
+                db_state = MappingProxyType(db.get_sprint_state(sprint_id))
+            except ValueError:
+                pass
+
+        return SprintSnapshot(
+            path=self._path,
+            docs=MappingProxyType(docs),
+            tickets=tuple(tickets),
+            todos=tuple(todos),
+            db_state=db_state,
+        )
+
     def archive(self) -> dict:
         """Archive this sprint by updating status to 'done' and moving to sprints/done/.
 
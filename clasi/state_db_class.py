@@ -2,16 +2,32 @@
 
 All database logic lives here. The module-level functions in state_db.py
 are thin wrappers that instantiate StateDB and delegate to these methods.
+
+StateDB instances are cheap: connections live in a small process-wide
+pool keyed by database path, so every StateDB for the same file shares
+one connection, its statement cache, and a flag recording that the schema
+has been created. A pooled connection is serialized by its own lock,
+reopened if the database file is replaced or the process forks, and
+closed after a few idle seconds so the WAL is checkpointed back into
+the main file between bursts of activity.
 """
 
 from __future__ import annotations
 
+import atexit
 import json as _json
+import os
 import sqlite3
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+from clasi import metrics
 
 
 PHASES = [
@@ -69,6 +85,25 @@ CREATE TABLE IF NOT EXISTS active_agents (
     log_file TEXT,
     started_at TEXT NOT NULL
 );
+
+CREATE TABLE IF NOT EXISTS test_results (
+    tree_hash TEXT NOT NULL,
+    command TEXT NOT NULL,
+    returncode INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (tree_hash, command)
+);
+
+CREATE TABLE IF NOT EXISTS close_journal (
+    sprint_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    inputs_hash TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    duration REAL NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (sprint_id, step)
+);
 """
 
 # Gate requirements for each transition: {from_phase: required_gate_name or None}
@@ -89,15 +124,163 @@ def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _connect(db_path: str | Path) -> sqlite3.Connection:
+def _connect(
+    db_path: str | Path, check_same_thread: bool = True,
+) -> sqlite3.Connection:
     """Open a connection with WAL mode and foreign keys enabled."""
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.set_trace_callback(_count_query)
     return conn
 
 
+def _count_query(statement: str) -> None:
+    metrics.count("db_queries")
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+# Maximum number of databases with an open pooled connection.
+_POOL_MAXSIZE = 8
+
+# Pooled connections unused for this long are closed by the reaper thread.
+_IDLE_SECONDS = 5.0
+
+
+class _PooledConnection:
+    """One shared connection to a database file."""
+
+    __slots__ = ("conn", "lock", "file_id", "pid", "depth", "schema_ready",
+                 "last_used", "closed")
+
+    def __init__(self, conn: sqlite3.Connection, file_id: Optional[tuple]):
+        self.conn = conn
+        self.lock = threading.RLock()
+        self.file_id = file_id
+        self.pid = os.getpid()
+        self.depth = 0
+        self.schema_ready = False
+        self.last_used = time.monotonic()
+        self.closed = False
+
+    def close(self) -> None:
+        """Close the connection (caller holds self.lock)."""
+        self.closed = True
+        self.conn.close()
+
+
+_pool: OrderedDict[str, _PooledConnection] = OrderedDict()
+_pool_lock = threading.Lock()
+_reaper: Optional[threading.Thread] = None
+
+
+def _file_id(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _discard(entry: _PooledConnection) -> None:
+    """Close a connection dropped from the pool unless a thread is using it.
+
+    A connection that is still in use is closed by garbage collection
+    once its last user lets go.
+    """
+    if entry.pid != os.getpid():
+        return  # inherited across fork; never touch the parent's handle
+    if entry.lock.acquire(blocking=False):
+        try:
+            entry.close()
+        finally:
+            entry.lock.release()
+
+
+def _pooled(path: Path) -> _PooledConnection:
+    """Return the pooled connection for *path*, opening it if needed."""
+    key = os.path.abspath(path)
+    file_id = _file_id(key)
+    with _pool_lock:
+        entry = _pool.get(key)
+        if entry is not None and (
+            entry.pid != os.getpid() or entry.file_id != file_id
+        ):
+            del _pool[key]
+            _discard(entry)
+            entry = None
+        if entry is None:
+            conn = _connect(key, check_same_thread=False)
+            entry = _PooledConnection(conn, _file_id(key))
+            _pool[key] = entry
+            while len(_pool) > _POOL_MAXSIZE:
+                _, old = _pool.popitem(last=False)
+                _discard(old)
+            _start_reaper()
+        _pool.move_to_end(key)
+        entry.last_used = time.monotonic()
+        return entry
+
+
+def _reap_idle() -> None:
+    """Close pooled connections that have been idle for _IDLE_SECONDS."""
+    cutoff = time.monotonic() - _IDLE_SECONDS
+    with _pool_lock:
+        for key, entry in list(_pool.items()):
+            if entry.last_used > cutoff or entry.depth:
+                continue
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                del _pool[key]
+                entry.close()
+            finally:
+                entry.lock.release()
+
+
+def _reaper_loop() -> None:
+    while True:
+        time.sleep(_IDLE_SECONDS)
+        _reap_idle()
+
+
+def _start_reaper() -> None:
+    """Start the idle-connection reaper (caller holds _pool_lock)."""
+    global _reaper
+    if _reaper is None or not _reaper.is_alive():
+        _reaper = threading.Thread(
+            target=_reaper_loop, name="clasi-statedb-reaper", daemon=True,
+        )
+        _reaper.start()
+
+
+def close_connections(db_path: str | Path | None = None) -> None:
+    """Close pooled connections (all of them, or just *db_path*'s).
+
+    Closing the last connection checkpoints the WAL into the database
+    file, so call this before copying or committing the file.
+    """
+    with _pool_lock:
+        if db_path is None:
+            entries = list(_pool.values())
+            _pool.clear()
+        else:
+            entry = _pool.pop(os.path.abspath(db_path), None)
+            entries = [entry] if entry is not None else []
+    for entry in entries:
+        if entry.pid != os.getpid():
+            continue
+        with entry.lock:
+            entry.close()
+
+
+atexit.register(close_connections)
+
+
 class StateDB:
     """CLASI SQLite state database.
 
@@ -114,12 +297,54 @@ class StateDB:
 
     def init(self) -> None:
         """Create the database file and all tables if they do not exist."""
-        self._path.parent.mkdir(parents=True, exist_ok=True)
-        conn = _connect(self._path)
+        with self.transaction():
+            pass
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold this database's pooled connection for a unit of work.
+
+        Creates the database and schema on first use. Commits when the
+        outermost block exits normally and rolls back if it raises, so
+        nested blocks (a method called inside a caller's transaction)
+        join the enclosing transaction. Other threads using the same
+        database wait until the block exits.
+        """
+        entry = _pooled(self._ensure_parent())
+        entry.lock.acquire()
+        while entry.closed:
+            # Reaped or closed between checkout and locking; get a new one.
+            entry.lock.release()
+            entry = _pooled(self._path)
+            entry.lock.acquire()
         try:
-            conn.executescript(_SCHEMA)
+            if not entry.schema_ready:
+                entry.conn.executescript(_SCHEMA)
+                entry.schema_ready = True
+            entry.depth += 1
+            try:
+                yield entry.conn
+            except BaseException:
+                if entry.depth == 1:
+                    entry.conn.rollback()
+                raise
+            else:
+                if entry.depth == 1:
+                    entry.conn.commit()
+            finally:
+                entry.depth -= 1
+                entry.last_used = time.monotonic()
         finally:
-            conn.close()
+            entry.lock.release()
+
+    def close(self) -> None:
+        """Close this database's pooled connection, checkpointing the WAL."""
+        close_connections(self._path)
+
+    def _ensure_parent(self) -> Path:
+        if not self._path.parent.exists():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        return self._path
 
     def register_sprint(
         self,
@@ -133,17 +358,14 @@ class StateDB:
 
         Raises ValueError if the sprint is already registered.
         """
-        self.init()
         now = _now()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             try:
                 conn.execute(
                     "INSERT INTO sprints (id, slug, phase, branch, created_at, updated_at) "
                     "VALUES (?, ?, 'planning-docs', ?, ?, ?)",
                     (sprint_id, slug, branch, now, now),
                 )
-                conn.commit()
             except sqlite3.IntegrityError:
                 raise ValueError(f"Sprint '{sprint_id}' is already registered")
             return {
@@ -154,17 +376,13 @@ class StateDB:
                 "created_at": now,
                 "updated_at": now,
             }
-        finally:
-            conn.close()
 
     def get_sprint_state(self, sprint_id: str) -> dict[str, Any]:
         """Return a dict with the sprint's phase, gates, and lock status.
 
         Raises ValueError if the sprint is not registered.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT id, slug, phase, branch, created_at, updated_at "
                 "FROM sprints WHERE id = ?",
@@ -206,8 +424,6 @@ class StateDB:
                 "gates": gates,
                 "lock": lock,
             }
-        finally:
-            conn.close()
 
     def advance_phase(self, sprint_id: str) -> dict[str, Any]:
         """Advance a sprint to the next lifecycle phase.
@@ -217,9 +433,7 @@ class StateDB:
 
         Raises ValueError if conditions are not met or the sprint is already done.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT phase FROM sprints WHERE id = ?", (sprint_id,)
             ).fetchone()
@@ -263,11 +477,8 @@ class StateDB:
                 "UPDATE sprints SET phase = ?, updated_at = ? WHERE id = ?",
                 (next_phase, now, sprint_id),
             )
-            conn.commit()
 
             return {"sprint_id": sprint_id, "old_phase": current, "new_phase": next_phase}
-        finally:
-            conn.close()
 
     def record_gate(
         self,
@@ -294,9 +505,7 @@ class StateDB:
                 f"Must be one of: {', '.join(sorted(VALID_GATE_RESULTS))}"
             )
 
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             # Verify sprint exists
             row = conn.execute(
                 "SELECT id FROM sprints WHERE id = ?", (sprint_id,)
@@ -313,7 +522,6 @@ class StateDB:
                 "notes = excluded.notes",
                 (sprint_id, gate, result, now, notes),
             )
-            conn.commit()
 
             return {
                 "sprint_id": sprint_id,
@@ -322,8 +530,6 @@ class StateDB:
                 "recorded_at": now,
                 "notes": notes,
             }
-        finally:
-            conn.close()
 
     def acquire_lock(self, sprint_id: str) -> dict[str, Any]:
         """Acquire the execution lock for a sprint.
@@ -333,9 +539,7 @@ class StateDB:
 
         Raises ValueError if another sprint holds the lock.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             # Verify sprint exists
             row = conn.execute(
                 "SELECT id FROM sprints WHERE id = ?", (sprint_id,)
@@ -366,20 +570,15 @@ class StateDB:
                 "VALUES (1, ?, ?)",
                 (sprint_id, now),
             )
-            conn.commit()
 
             return {"sprint_id": sprint_id, "acquired_at": now, "reentrant": False}
-        finally:
-            conn.close()
 
     def release_lock(self, sprint_id: str) -> dict[str, Any]:
         """Release the execution lock held by a sprint.
 
         Raises ValueError if the sprint does not hold the lock.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             lock_row = conn.execute(
                 "SELECT sprint_id FROM execution_locks WHERE id = 1"
             ).fetchone()
@@ -393,11 +592,8 @@ class StateDB:
                 )
 
             conn.execute("DELETE FROM execution_locks WHERE id = 1")
-            conn.commit()
 
             return {"sprint_id": sprint_id, "released": True}
-        finally:
-            conn.close()
 
     def rename_sprint(
         self,
@@ -413,9 +609,7 @@ class StateDB:
 
         Raises ValueError if old_id is not registered or new_id already exists.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT id, slug, phase, branch FROM sprints WHERE id = ?",
                 (old_id,),
@@ -432,8 +626,9 @@ class StateDB:
             now = _now()
             branch = new_branch if new_branch is not None else row["branch"]
 
-            # Update sprint_gates first (foreign key references)
-            conn.execute("PRAGMA foreign_keys=OFF")
+            # Both tables change inside one transaction, so defer the
+            # foreign key check to commit time (resets after the commit).
+            conn.execute("PRAGMA defer_foreign_keys=ON")
             conn.execute(
                 "UPDATE sprint_gates SET sprint_id = ? WHERE sprint_id = ?",
                 (new_id, old_id),
@@ -442,22 +637,16 @@ class StateDB:
                 "UPDATE sprints SET id = ?, branch = ?, updated_at = ? WHERE id = ?",
                 (new_id, branch, now, old_id),
             )
-            conn.execute("PRAGMA foreign_keys=ON")
-            conn.commit()
 
             return {
                 "old_id": old_id,
                 "new_id": new_id,
                 "branch": branch,
             }
-        finally:
-            conn.close()
 
     def get_lock_holder(self) -> Optional[dict[str, Any]]:
         """Return the current lock holder, or None if no lock is held."""
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             lock_row = conn.execute(
                 "SELECT sprint_id, acquired_at FROM execution_locks WHERE id = 1"
             ).fetchone()
@@ -467,8 +656,6 @@ class StateDB:
                 "sprint_id": lock_row["sprint_id"],
                 "acquired_at": lock_row["acquired_at"],
             }
-        finally:
-            conn.close()
 
     def write_recovery_state(
         self,
@@ -482,17 +669,14 @@ class StateDB:
         Only one recovery record exists at a time (id=1). Calling this
         again replaces any previous record.
         """
-        self.init()
         now = _now()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             conn.execute(
                 "INSERT OR REPLACE INTO recovery_state "
                 "(id, sprint_id, step, allowed_paths, reason, recorded_at) "
                 "VALUES (1, ?, ?, ?, ?, ?)",
                 (sprint_id, step, _json.dumps(allowed_paths), reason, now),
             )
-            conn.commit()
             return {
                 "sprint_id": sprint_id,
                 "step": step,
@@ -500,8 +684,6 @@ class StateDB:
                 "reason": reason,
                 "recorded_at": now,
             }
-        finally:
-            conn.close()
 
     def get_recovery_state(self) -> Optional[dict[str, Any]]:
         """Read the recovery state record, auto-clearing stale entries.
@@ -510,9 +692,7 @@ class StateDB:
         recorded_at -- or None if no record exists. Records older than 24
         hours are automatically deleted with a warning on stderr.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT sprint_id, step, allowed_paths, reason, recorded_at "
                 "FROM recovery_state WHERE id = 1"
@@ -523,7 +703,6 @@ class StateDB:
             recorded_at = datetime.fromisoformat(row["recorded_at"])
             if datetime.now(timezone.utc) - recorded_at > _RECOVERY_TTL:
                 conn.execute("DELETE FROM recovery_state WHERE id = 1")
-                conn.commit()
                 print(
                     f"[CLASI] Stale recovery state for sprint '{row['sprint_id']}' "
                     f"(recorded {row['recorded_at']}) auto-cleared after 24h TTL",
@@ -538,8 +717,6 @@ class StateDB:
                 "reason": row["reason"],
                 "recorded_at": row["recorded_at"],
             }
-        finally:
-            conn.close()
 
     def clear_recovery_state(self) -> dict[str, Any]:
         """Delete the recovery state record.
@@ -547,14 +724,9 @@ class StateDB:
         Returns {"cleared": True} if a record was removed,
         {"cleared": False} if no record existed.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             cursor = conn.execute("DELETE FROM recovery_state WHERE id = 1")
-            conn.commit()
             return {"cleared": cursor.rowcount > 0}
-        finally:
-            conn.close()
 
     # ------------------------------------------------------------------
     # Active agent tracking
@@ -572,10 +744,8 @@ class StateDB:
         Uses upsert semantics: re-registering the same agent_id overwrites
         the previous record.
         """
-        self.init()
         now = _now()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             conn.execute(
                 "INSERT INTO active_agents (agent_id, agent_type, tier, log_file, started_at) "
                 "VALUES (?, ?, ?, ?, ?) "
@@ -584,7 +754,6 @@ class StateDB:
                 "log_file = excluded.log_file, started_at = excluded.started_at",
                 (agent_id, agent_type, tier, log_file, now),
             )
-            conn.commit()
             return {
                 "agent_id": agent_id,
                 "agent_type": agent_type,
@@ -592,14 +761,10 @@ class StateDB:
                 "log_file": log_file,
                 "started_at": now,
             }
-        finally:
-            conn.close()
 
     def get_active_agent(self, agent_id: str) -> Optional[dict[str, Any]]:
         """Return the active agent record for the given agent_id, or None."""
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT agent_id, agent_type, tier, log_file, started_at "
                 "FROM active_agents WHERE agent_id = ?",
@@ -614,8 +779,6 @@ class StateDB:
                 "log_file": row["log_file"],
                 "started_at": row["started_at"],
             }
-        finally:
-            conn.close()
 
     def remove_active_agent(self, agent_id: str) -> dict[str, Any]:
         """Remove the active agent record for the given agent_id.
@@ -623,16 +786,11 @@ class StateDB:
         Returns {"removed": True} if a record was deleted,
         {"removed": False} if no record existed.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             cursor = conn.execute(
                 "DELETE FROM active_agents WHERE agent_id = ?", (agent_id,)
             )
-            conn.commit()
             return {"removed": cursor.rowcount > 0}
-        finally:
-            conn.close()
 
     def get_active_tier(self) -> str:
         """Return the tier of any active agent, or empty string if none.
@@ -640,32 +798,122 @@ class StateDB:
         Reads the first row from active_agents. This replaces the
         .clasi-agent-tier file check.
         """
-        self.init()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             row = conn.execute(
                 "SELECT tier FROM active_agents LIMIT 1"
             ).fetchone()
             if row is None:
                 return ""
             return row["tier"]
-        finally:
-            conn.close()
 
     def clear_stale_agents(self, ttl_hours: int = 24) -> dict[str, Any]:
         """Delete active_agents records older than ttl_hours.
 
         Returns {"cleared": count} with the number of records removed.
         """
-        self.init()
         cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
         cutoff_str = cutoff.isoformat()
-        conn = _connect(self._path)
-        try:
+        with self.transaction() as conn:
             cursor = conn.execute(
                 "DELETE FROM active_agents WHERE started_at < ?", (cutoff_str,)
             )
-            conn.commit()
             return {"cleared": cursor.rowcount}
-        finally:
-            conn.close()
+
+    # ------------------------------------------------------------------
+    # Test results
+    # ------------------------------------------------------------------
+
+    def record_test_result(
+        self,
+        tree_hash: str,
+        command: str,
+        returncode: int,
+        duration: float,
+    ) -> dict[str, Any]:
+        """Record the outcome of running *command* against *tree_hash*.
+
+        A later run of the same command on the same tree replaces the
+        earlier record.
+        """
+        now = _now()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO test_results "
+                "(tree_hash, command, returncode, duration, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (tree_hash, command, returncode, duration, now),
+            )
+        return {
+            "tree_hash": tree_hash,
+            "command": command,
+            "returncode": returncode,
+            "duration": duration,
+            "recorded_at": now,
+        }
+
+    def get_test_result(
+        self, tree_hash: str, command: str,
+    ) -> Optional[dict[str, Any]]:
+        """Return the recorded outcome of *command* on *tree_hash*, or None."""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT tree_hash, command, returncode, duration, recorded_at "
+                "FROM test_results WHERE tree_hash = ? AND command = ?",
+                (tree_hash, command),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    # ------------------------------------------------------------------
+    # close_sprint step journal
+    # ------------------------------------------------------------------
+
+    def record_close_step(
+        self,
+        sprint_id: str,
+        step: str,
+        inputs_hash: str,
+        outputs: dict[str, Any],
+        duration: float,
+    ) -> dict[str, Any]:
+        """Record that close_sprint completed *step* for *sprint_id*.
+
+        *inputs_hash* identifies the arguments the step ran with;
+        *outputs* is whatever later steps need from it. Recording a step
+        again replaces the earlier entry.
+        """
+        now = _now()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO close_journal "
+                "(sprint_id, step, inputs_hash, outputs, duration, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (sprint_id, step, inputs_hash, _json.dumps(outputs), duration, now),
+            )
+        return {
+            "sprint_id": sprint_id,
+            "step": step,
+            "inputs_hash": inputs_hash,
+            "outputs": outputs,
+            "duration": duration,
+            "completed_at": now,
+        }
+
+    def get_close_journal(self, sprint_id: str) -> list[dict[str, Any]]:
+        """Return the journaled close_sprint steps for *sprint_id*, oldest first."""
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT sprint_id, step, inputs_hash, outputs, duration, completed_at "
+                "FROM close_journal WHERE sprint_id = ? ORDER BY completed_at, rowid",
+                (sprint_id,),
+            ).fetchall()
+        return [
+            {**dict(row), "outputs": _json.loads(row["outputs"])} for row in rows
+        ]
+
+    def clear_close_journal(self, sprint_id: str) -> dict[str, Any]:
+        """Delete the close_sprint journal for *sprint_id*."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM close_journal WHERE sprint_id = ?", (sprint_id,)
+            )
+            return {"cleared": cursor.rowcount}
@@ -0,0 +1,287 @@
+"""Run a pytest suite as N parallel shards for close_sprint.
+
+close_sprint normally runs the test command as one process and keeps
+the tail of its captured output. With ``test_shards=N`` it calls
+``run_sharded()`` instead:
+
+1. ``<cmd> --no-cov --collect-only -q`` lists the test ids. They are
+   grouped by file, and the files are dealt to the N shards, largest
+   first, each to the shard with the fewest tests so far.
+2. The shards run concurrently as ``<cmd> --no-cov <files...>
+   --junitxml=...``,
+   where ``<cmd>`` is the command without its positional paths (``uv
+   run pytest tests`` becomes ``uv run pytest``): the paths only select
+   what is collected, so each shard runs just its own files.
+   Each shard's output streams to ``shard-<k>.log`` in the log directory
+   (``docs/clasi/log/tests/sprint-<id>/``, git-ignored) rather than
+   into memory.
+3. The JUnit reports are merged into one summary: totals, the failing
+   tests, the slowest tests, and one line per shard. The summary is
+   also written to ``summary.json`` next to the logs.
+
+A shard passes when it exits 0 and its report lists tests, none of
+them failed. A collection that finds no tests fails the run, as pytest's
+exit code 5 fails a serial run.
+
+Coverage is not measured when sharding. ``--no-cov`` keeps pytest-cov
+from starting in every shard: concurrent shards would all write the
+same ``.coverage`` and report files, and no single shard covers enough
+of the code base to meet a coverage threshold. Without pytest-cov the
+option is unknown, so when pytest rejects it the run goes on without it.
+close_sprint records a sharded pass under its own cache key, so it does
+not stand in for a serial run that checks coverage.
+
+Sharding works on pytest commands only (``uv run pytest``, ``python -m
+pytest -x``, ...); ``is_pytest_command()`` tells close_sprint when to
+fall back to a serial run.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from clasi import background
+
+SUMMARY_FILE = "summary.json"
+
+# How many entries the summary lists.
+_SLOWEST = 10
+_MAX_FAILED = 50
+
+_PYTEST_NAMES = ("pytest", "py.test")
+
+# pytest-cov's switch that turns coverage off for a run.
+_NO_COV = "--no-cov"
+
+# pytest (and common plugin) options that take the next argument as
+# their value, so that argument is not a test path.
+_VALUE_OPTIONS = frozenset({
+    "-k", "-m", "-p", "-c", "-o", "-n", "-W", "-r",
+    "--rootdir", "--confcutdir", "--basetemp", "--ignore", "--ignore-glob",
+    "--deselect", "--maxfail", "--durations", "--tb", "--junitxml",
+    "--junit-xml", "--override-ini", "--log-level", "--import-mode",
+    "--cov", "--cov-report", "--cov-config", "--cov-fail-under",
+    "--numprocesses", "--dist", "--timeout",
+})
+
+
+def is_pytest_command(cmd: list[str]) -> bool:
+    """True if *cmd* runs pytest (directly, via ``uv run`` or ``-m``)."""
+    return any(Path(part).name in _PYTEST_NAMES for part in cmd)
+
+
+def split_paths(cmd: list[str]) -> tuple[list[str], list[str]]:
+    """Split *cmd* into the command with its options and its test paths.
+
+    Everything up to the pytest executable or module is kept as is.
+    After it, an argument that is neither an option nor an option's
+    value is a path (or node id) selecting the tests to run.
+    """
+    start = next(
+        (i + 1 for i, part in enumerate(cmd) if Path(part).name in _PYTEST_NAMES),
+        len(cmd),
+    )
+    command, paths = list(cmd[:start]), []
+    for i, arg in enumerate(cmd[start:], start):
+        if not arg.startswith("-") and cmd[i - 1] not in _VALUE_OPTIONS:
+            paths.append(arg)
+        else:
+            command.append(arg)
+    return command, paths
+
+
+def collect(
+    cmd: list[str], cwd: Optional[Path] = None, timeout: Optional[float] = None,
+) -> tuple[dict[str, int], subprocess.CompletedProcess]:
+    """Return ``{test file: number of tests}`` and the collection process.
+
+    The mapping is empty when collection failed.
+    """
+    result = background.run_subprocess(
+        [*cmd, "--collect-only", "-q"],
+        capture_output=True, text=True, cwd=cwd, timeout=timeout,
+    )
+    counts: dict[str, int] = {}
+    if result.returncode != 0:
+        return counts, result
+    for line in result.stdout.splitlines():
+        if "::" in line:
+            path = line.split("::", 1)[0].strip()
+            counts[path] = counts.get(path, 0) + 1
+    return counts, result
+
+
+def plan(counts: dict[str, int], shards: int) -> list[list[str]]:
+    """Deal test files to at most *shards* groups of similar size."""
+    groups: list[list[str]] = [[] for _ in range(max(1, min(shards, len(counts))))]
+    sizes = [0] * len(groups)
+    for path in sorted(counts, key=lambda p: (-counts[p], p)):
+        smallest = sizes.index(min(sizes))
+        groups[smallest].append(path)
+        sizes[smallest] += counts[path]
+    return [sorted(group) for group in groups if group]
+
+
+def read_junit(path: Path) -> list[dict[str, Any]]:
+    """Return one ``{test, duration, outcome}`` dict per test case."""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return []
+    cases = []
+    for case in root.iter("testcase"):
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed"
+                break
+            if child.tag == "skipped":
+                outcome = "skipped"
+        name = case.get("name", "")
+        classname = case.get("classname", "")
+        cases.append({
+            "test": f"{classname}::{name}" if classname else name,
+            "duration": float(case.get("time") or 0.0),
+            "outcome": outcome,
+        })
+    return cases
+
+
+def _run_shard(
+    cmd: list[str],
+    number: int,
+    files: list[str],
+    log_dir: Path,
+    cwd: Optional[Path],
+    timeout: Optional[float],
+) -> dict[str, Any]:
+    log_path = log_dir / f"shard-{number}.log"
+    junit_path = log_dir / f"shard-{number}.xml"
+    started = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        result = background.run_subprocess(
+            [*cmd, *files, f"--junitxml={junit_path}"],
+            stdout=log, stderr=subprocess.STDOUT, text=True,
+            cwd=cwd, timeout=timeout,
+        )
+    cases = read_junit(junit_path)
+    failed = [c["test"] for c in cases if c["outcome"] == "failed"]
+    return {
+        "shard": number,
+        "files": len(files),
+        "tests": len(cases),
+        "failed": len(failed),
+        "skipped": sum(1 for c in cases if c["outcome"] == "skipped"),
+        "returncode": result.returncode,
+        "duration": round(time.monotonic() - started, 3),
+        "log": str(log_path),
+        # A missing or unreadable report means the shard never got to
+        # run its tests (crash, bad arguments).
+        "passed": result.returncode == 0 and bool(cases) and not failed,
+        "_failed_tests": failed,
+        "_cases": cases,
+    }
+
+
+def run_sharded(
+    cmd: list[str],
+    shards: int,
+    log_dir: Path,
+    cwd: Optional[Path] = None,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    """Run *cmd* as up to *shards* parallel pytest processes.
+
+    *timeout* applies to the collection and to each shard. Returns the
+    summary described in the module docstring; ``passed`` is its
+    overall verdict.
+    """
+    started = time.monotonic()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    for stale in (*log_dir.glob("shard-*.log"), *log_dir.glob("shard-*.xml")):
+        stale.unlink()
+
+    command, paths = split_paths(cmd)
+    counts, collection = collect([*command, _NO_COV, *paths], cwd, timeout)
+    if _NO_COV in (collection.stderr or "") and collection.returncode == 4:
+        # pytest-cov is not installed, so there is no coverage to turn off.
+        counts, collection = collect([*command, *paths], cwd, timeout)
+    else:
+        command.append(_NO_COV)
+    if not counts:
+        output = (collection.stdout or "") + (collection.stderr or "")
+        summary: dict[str, Any] = {
+            "passed": False,
+            "shards": [],
+            "tests": 0,
+            "failures": 0,
+            "skipped": 0,
+            "failed_tests": [],
+            "slowest": [],
+            "collection_output": output[-2000:].strip(),
+            "duration": round(time.monotonic() - started, 3),
+        }
+        _write_summary(log_dir, summary)
+        return summary
+
+    groups = plan(counts, shards)
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        # Each shard thread runs in a copy of this context so that
+        # run_subprocess sees the background job and can cancel it.
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                _run_shard, command, number, files, log_dir, cwd, timeout,
+            )
+            for number, files in enumerate(groups, 1)
+        ]
+        results = [future.result() for future in futures]
+
+    cases = [case for result in results for case in result.pop("_cases")]
+    failed_tests = [test for result in results for test in result.pop("_failed_tests")]
+    slowest = sorted(cases, key=lambda c: -c["duration"])[:_SLOWEST]
+    summary = {
+        "passed": all(result["passed"] for result in results),
+        "shards": results,
+        "tests": len(cases),
+        "failures": len(failed_tests),
+        "skipped": sum(result["skipped"] for result in results),
+        "failed_tests": failed_tests[:_MAX_FAILED],
+        "slowest": [
+            {"test": c["test"], "duration": round(c["duration"], 3)} for c in slowest
+        ],
+        "duration": round(time.monotonic() - started, 3),
+    }
+    _write_summary(log_dir, summary)
+    return summary
+
+
+def _write_summary(log_dir: Path, summary: dict[str, Any]) -> None:
+    (log_dir / SUMMARY_FILE).write_text(
+        json.dumps(summary, indent=2) + "\n", encoding="utf-8",
+    )
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Render *summary* as the short text close_sprint shows on failure."""
+    if not summary["shards"]:
+        return "Test collection failed:\n" + summary.get("collection_output", "")
+    lines = [
+        f"{summary['tests']} tests, {summary['failures']} failed, "
+        f"{summary['skipped']} skipped in {len(summary['shards'])} shards"
+    ]
+    for shard in summary["shards"]:
+        status = "ok" if shard["passed"] else "FAILED"
+        lines.append(
+            f"  shard {shard['shard']}: {status} ({shard['tests']} tests, "
+            f"exit {shard['returncode']}, {shard['duration']}s) {shard['log']}"
+        )
+    lines.extend(f"FAILED {test}" for test in summary["failed_tests"])
+    return "\n".join(lines)
@@ -68,14 +68,9 @@ class Ticket:
           if the key is absent.
         - Any other unexpected type: return ``True`` (safe default).
         """
-        val = self.frontmatter.get("completes_todo")
-        if val is None or val is True:
-            return True
-        if val is False:
-            return False
-        if isinstance(val, dict):
-            return bool(val.get(filename, True))
-        return True  # fallback for unexpected types
+        from clasi.snapshot import resolve_completes_todo
+
+        return resolve_completes_todo(self.frontmatter, filename)
 
     @property
     def use_cases(self) -> list[str]:
@@ -4,20 +4,25 @@ Read-write tools for creating, querying, and updating SE artifacts
 (sprints, tickets, briefs, architecture, use cases).
 """
 
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
 import subprocess
+import time
 import urllib.error
 import urllib.request
 from pathlib import Path
 from typing import Optional
 
 from clasi.artifact import Artifact
+from clasi.artifact_index import TicketRefIndex
 from clasi.frontmatter import read_document, read_frontmatter
-from clasi.mcp_server import server, get_project
+from clasi import background, git_refs
+from clasi.mcp_server import background_tool, server, get_project
+from clasi.snapshot import SprintSnapshot, TicketSnapshot, resolve_completes_todo
 from clasi.sprint import MergeConflictError, Sprint
 from clasi.state_db import (
     PHASES as _PHASES,
@@ -30,6 +35,7 @@ from clasi.templates import (
     SPRINT_ARCHITECTURE_UPDATE_TEMPLATE,
     TICKET_TEMPLATE,
 )
+from clasi.test_shards import format_summary, is_pytest_command, run_sharded
 from clasi.ticket import Ticket
 from clasi.todo import Todo
 from clasi.versioning import (
@@ -77,44 +83,38 @@ def resolve_artifact_path(path: str) -> Path:
 
 
 
-def _is_ticket_done(ticket_ref: str) -> bool:
+def _is_ticket_done(ticket_ref: str, refs: TicketRefIndex | None = None) -> bool:
     """Check if a ticket (referenced as 'sprint_id-ticket_id') has status done.
 
     Searches both active and done ticket directories across all sprints.
     Returns True if the ticket is found with status 'done', False otherwise.
+    Pass ``refs`` to share one resolver across many lookups.
     """
-    parts = ticket_ref.split("-", 1)
-    if len(parts) != 2:
-        return False
-    sprint_id, ticket_id = parts
-    try:
-        sprint = get_project().get_sprint(sprint_id)
-        ticket = sprint.get_ticket(ticket_id)
-        return ticket.status == "done"
-    except ValueError:
-        return False
+    if refs is None:
+        refs = TicketRefIndex(get_project().index)
+    return refs.is_done(ticket_ref)
 
 
-def _any_ticket_suppresses_todo(ticket_refs: list[str], todo_filename: str) -> bool:
+def _any_ticket_suppresses_todo(
+    ticket_refs: list[str],
+    todo_filename: str,
+    refs: TicketRefIndex | None = None,
+) -> bool:
     """Return True if any referencing ticket has completes_todo: false for the given TODO.
 
     Iterates over all ticket references (as 'sprint_id-ticket_id' strings) and
-    calls ``Ticket.completes_todo_for(todo_filename)`` on each one that can be
-    loaded.  If any ticket returns ``False``, archival should be suppressed.
+    resolves ``completes_todo`` on each one that can be found. If any ticket
+    returns ``False``, archival should be suppressed.
 
     Returns False (do not suppress) if no tickets can be loaded or all return True.
     """
+    if refs is None:
+        refs = TicketRefIndex(get_project().index)
     for ticket_ref in ticket_refs:
-        parts = ticket_ref.split("-", 1)
-        if len(parts) != 2:
-            continue
-        sprint_id, ticket_id = parts
-        try:
-            sprint = get_project().get_sprint(sprint_id)
-            ticket = sprint.get_ticket(ticket_id)
-        except ValueError:
+        entry = refs.resolve(ticket_ref)
+        if entry is None:
             continue
-        if not ticket.completes_todo_for(todo_filename):
+        if not resolve_completes_todo(read_frontmatter(entry["path"]), todo_filename):
             return True
     return False
 
@@ -494,13 +494,16 @@ def list_sprints(status: Optional[str] = None) -> str:
     Returns JSON array of {id, title, status, path, branch}.
     """
     results = []
-    for s in get_project().list_sprints(status=status):
+    for entry in get_project().index.sprints():
+        sprint_status = entry["status"] or "unknown"
+        if status and sprint_status != status:
+            continue
         results.append({
-            "id": s.id,
-            "title": s.title,
-            "status": s.status,
-            "path": str(s.path),
-            "branch": s.branch,
+            "id": entry["artifact_id"] or "",
+            "title": entry["title"] or "",
+            "status": sprint_status,
+            "path": str(Path(entry["path"]).parent),
+            "branch": entry["branch"] or "",
         })
 
     return json.dumps(results, indent=2)
@@ -516,27 +519,30 @@ def list_tickets(sprint_id: Optional[str] = None, status: Optional[str] = None)
 
     Returns JSON array of {id, title, status, sprint_id, path}.
     """
-    project = get_project()
+    index = get_project().index
     results = []
 
     if sprint_id:
-        try:
-            sprints_to_scan = [project.get_sprint(sprint_id)]
-        except ValueError:
+        entry = index.find_sprint(sprint_id)
+        if entry is None:
             return json.dumps([], indent=2)
+        sprints_to_scan = [entry]
     else:
-        sprints_to_scan = project.list_sprints()
+        sprints_to_scan = index.sprints()
 
-    for sprint in sprints_to_scan:
-        for ticket in sprint.list_tickets(status=status):
-            if not ticket.id:
+    for sprint_entry in sprints_to_scan:
+        sprint_dir = Path(sprint_entry["path"]).parent
+        for ticket in index.tickets(sprint_dir):
+            if status and ticket["status"] != status:
+                continue
+            if not ticket["artifact_id"]:
                 continue
             results.append({
-                "id": ticket.id,
-                "title": ticket.title,
-                "status": ticket.status,
-                "sprint_id": sprint.id,
-                "path": str(ticket.path),
+                "id": ticket["artifact_id"],
+                "title": ticket["title"] or "",
+                "status": ticket["status"] or "todo",
+                "sprint_id": sprint_entry["artifact_id"] or "",
+                "path": ticket["path"],
             })
 
     return json.dumps(results, indent=2)
@@ -551,14 +557,14 @@ def get_sprint_status(sprint_id: str) -> str:
 
     Returns JSON with {id, title, status, branch, tickets: {todo, in_progress, done}}.
     """
-    sprint = get_project().get_sprint(sprint_id)
+    snap = get_project().get_sprint(sprint_id).snapshot()
 
     return json.dumps({
-        "id": sprint.id,
-        "title": sprint.title,
-        "status": sprint.status,
-        "branch": sprint.branch,
-        "tickets": sprint.ticket_counts(),
+        "id": snap.id,
+        "title": snap.title,
+        "status": snap.status,
+        "branch": snap.branch,
+        "tickets": snap.ticket_counts(),
     }, indent=2)
 
 
@@ -627,30 +633,131 @@ def move_ticket_to_done(path: str) -> str:
     todo_refs = ticket.todo_ref
     if todo_refs is not None:
         todo_list = [todo_refs] if isinstance(todo_refs, str) else list(todo_refs)
-        completed_todos: list[str] = []
-        for todo_filename in todo_list:
-            try:
-                todo = project.get_todo(todo_filename)
-            except ValueError:
-                continue
-            # Only process in-progress TODOs
-            if todo.status != "in-progress":
-                continue
-            ref_tickets = todo.tickets
-            # Check if ALL referencing tickets are done
-            all_done = all(_is_ticket_done(ref_ticket_id) for ref_ticket_id in ref_tickets)
-            if all_done and ref_tickets:
-                # Check if any referencing ticket suppresses archival for this TODO
-                any_suppressed = _any_ticket_suppresses_todo(ref_tickets, todo_filename)
-                if not any_suppressed:
-                    todo.move_to_done()
-                    completed_todos.append(todo_filename)
+        completed_todos = _archive_completed_todos(todo_list)
         if completed_todos:
             result["completed_todos"] = completed_todos
 
     return json.dumps(result, indent=2)
 
 
+def _archive_completed_todos(todo_filenames: list[str]) -> list[str]:
+    """Move in-progress TODOs to done when all their referencing tickets are done.
+
+    A TODO is archived only if every ticket it lists is done and none of
+    them sets ``completes_todo: false`` for it. Returns the filenames of
+    the TODOs that were moved.
+    """
+    project = get_project()
+    refs = TicketRefIndex(project.index)
+    completed_todos: list[str] = []
+    for todo_filename in todo_filenames:
+        try:
+            todo = project.get_todo(todo_filename)
+        except ValueError:
+            continue
+        # Only process in-progress TODOs
+        if todo.status != "in-progress":
+            continue
+        ref_tickets = todo.tickets
+        # Check if ALL referencing tickets are done
+        all_done = all(_is_ticket_done(ref_ticket_id, refs) for ref_ticket_id in ref_tickets)
+        if all_done and ref_tickets:
+            # Check if any referencing ticket suppresses archival for this TODO
+            any_suppressed = _any_ticket_suppresses_todo(ref_tickets, todo_filename, refs)
+            if not any_suppressed:
+                todo.move_to_done()
+                completed_todos.append(todo_filename)
+    return completed_todos
+
+
+@server.tool()
+def batch_update_tickets(operations: list[dict]) -> str:
+    """Apply status changes and moves to several tickets in one call.
+
+    Each operation is a dict with:
+        path: Path to the ticket file (required)
+        status: New status (todo, in-progress, done) — optional
+        move_to_done: Move the ticket (and plan file) to tickets/done/
+            after updating its status — optional, default false
+
+    All operations are validated before any is applied; a ticket may
+    appear in only one operation. Each sprint
+    touched is read once into a snapshot, and TODO archival for the
+    moved tickets is evaluated once after every operation has run.
+
+    Args:
+        operations: List of {path, status, move_to_done} operations
+
+    Returns JSON with {results: [{path, old_status, new_status, new_path}],
+    completed_todos}.
+    """
+    valid_statuses = {"todo", "in-progress", "done"}
+
+    planned = []
+    for op in operations:
+        if not isinstance(op, dict) or "path" not in op:
+            raise ValueError(f"Each operation needs a 'path': {op!r}")
+        status = op.get("status")
+        if status is not None and status not in valid_statuses:
+            raise ValueError(f"Invalid status '{status}'. Must be one of: {', '.join(sorted(valid_statuses))}")
+        try:
+            ticket_path = resolve_artifact_path(op["path"])
+        except FileNotFoundError:
+            raise ValueError(f"Ticket not found: {op['path']}")
+        if any(ticket_path == seen for seen, _, _ in planned):
+            raise ValueError(
+                f"Ticket appears more than once in the batch: {op['path']}"
+            )
+        planned.append((ticket_path, status, bool(op.get("move_to_done", False))))
+
+    project = get_project()
+    sprints: dict[Path, Sprint] = {}
+    snapshot_tickets: dict[Path, TicketSnapshot] = {}
+    results = []
+    todo_filenames: list[str] = []
+
+    for ticket_path, status, move in planned:
+        tickets_dir = ticket_path.parent
+        if tickets_dir.name == "done":
+            tickets_dir = tickets_dir.parent
+        sprint_dir = tickets_dir.parent
+        if sprint_dir not in sprints:
+            sprints[sprint_dir] = Sprint(sprint_dir, project)
+            for t in sprints[sprint_dir].snapshot().tickets:
+                snapshot_tickets[t.path] = t
+        sprint = sprints[sprint_dir]
+
+        snap = snapshot_tickets.get(ticket_path)
+        if snap is None:
+            snap = TicketSnapshot(
+                ticket_path,
+                Artifact(ticket_path).frontmatter,
+                ticket_path.parent.name == "done",
+            )
+        old_status = snap.frontmatter.get("status", "unknown")
+
+        ticket = Ticket(ticket_path, sprint)
+        if status is not None and status != old_status:
+            ticket.set_status(status)
+        if move:
+            ticket.move_to_done_with_plan()
+            for todo_filename in snap.todo_refs:
+                if todo_filename not in todo_filenames:
+                    todo_filenames.append(todo_filename)
+
+        results.append({
+            "path": str(ticket_path),
+            "old_status": old_status,
+            "new_status": status if status is not None else old_status,
+            "new_path": str(ticket.path),
+        })
+
+    return json.dumps({
+        "results": results,
+        "completed_todos": _archive_completed_todos(todo_filenames),
+    }, indent=2)
+
+
 @server.tool()
 def reopen_ticket(path: str) -> str:
     """Reopen a completed ticket by moving it from done/ back to the sprint's tickets/ directory.
@@ -686,7 +793,7 @@ def reopen_ticket(path: str) -> str:
     return json.dumps(result, indent=2)
 
 
-@server.tool()
+@background_tool(exclusive=True)
 def close_sprint(
     sprint_id: str,
     branch_name: Optional[str] = None,
@@ -694,12 +801,27 @@ def close_sprint(
     push_tags: bool = True,
     delete_branch: bool = True,
     test_command: Optional[str] = None,
+    force_tests: bool = False,
+    test_shards: int = 0,
 ) -> str:
     """Close a sprint by updating its status and moving it to sprints/done/.
 
     When branch_name is provided, executes the full lifecycle including
     pre-condition verification with self-repair, test run, archive, state
     DB update, version bump, git merge, push tags, and branch deletion.
+    The merge is dry-run (git merge-tree) during pre-condition
+    verification, so a conflicting branch fails before anything changes.
+    A passing test run is recorded in the state DB against a hash of the
+    working tree; retries on an unchanged tree skip the tests.
+
+    Each completed step is journaled in the state DB. A retry after a
+    failure resumes at the step that failed: earlier steps are not run
+    again (in particular the version is not bumped twice). If the sprint
+    or main branch has moved since (other than by close_sprint's own
+    commits), the journal is dropped and the close starts over; the tests
+    run again whenever the working tree has changed. The result's
+    ``steps`` list gives each step's duration in seconds and whether it
+    was resumed from the journal.
 
     When branch_name is omitted, falls back to legacy behavior (archive
     + state only, no git operations).
@@ -713,13 +835,21 @@ def close_sprint(
         delete_branch: Whether to delete the sprint branch after merge (default: True)
         test_command: Shell command to run tests. Defaults to 'uv run pytest'.
             Pass empty string to skip tests entirely (for non-Python projects).
+        force_tests: Run the tests even if they already passed on the
+            current tree (default: False)
+        test_shards: Split a pytest suite across this many parallel
+            processes (default: 0, one process). Each shard's output is
+            written to docs/clasi/log/tests/sprint-<id>/, and the result
+            gains a test_summary with failing and slowest tests. Shards
+            run without coverage, so a coverage threshold is not checked.
 
     Returns JSON with structured result (success or error).
     """
     if branch_name is not None:
         return _close_sprint_full(
             sprint_id, branch_name, main_branch, push_tags, delete_branch,
-            test_command=test_command,
+            test_command=test_command, force_tests=force_tests,
+            test_shards=test_shards,
         )
     return _close_sprint_legacy(sprint_id)
 
@@ -802,6 +932,218 @@ def _close_sprint_legacy(sprint_id: str) -> str:
     return json.dumps(result, indent=2)
 
 
+# Progress notifications count the eight close_sprint steps.
+_CLOSE_STEP_COUNT = 8
+
+
+def _worktree_tree_hash(root: Path, *exclude: Path) -> Optional[str]:
+    """Return a hash of the working tree under *root*.
+
+    Keys the close_sprint test cache. Unchanged tracked files contribute
+    the blob ids already in the index; modified and untracked
+    (non-ignored) files are hashed with ``git hash-object`` without
+    ``-w``, so nothing is staged and no objects are written. The
+    *exclude* paths (files or directories) are left out. Returns None
+    when the hash cannot be computed, e.g. outside a repository.
+    """
+    if git_refs.open_repo(root) is None:
+        return None
+    pathspec = ["--", "."]
+    for path in exclude:
+        try:
+            rel = path.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            continue
+        pathspec.append(f":(exclude){rel}")
+
+    def git(*args: str, stdin: Optional[str] = None) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                ["git", *args], input=stdin,
+                capture_output=True, text=True, cwd=str(root),
+            )
+        except OSError:
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    staged = git("ls-files", "-z", "--stage", *pathspec)
+    changed = git(
+        "ls-files", "-z", "-t", "--modified", "--deleted", "--others",
+        "--exclude-standard", *pathspec,
+    )
+    if staged is None or changed is None:
+        return None
+
+    # path -> "<mode> <blob>"
+    entries: dict[str, str] = {}
+    for record in filter(None, staged.split("\0")):
+        info, path = record.split("\t", 1)
+        mode, blob, _stage = info.split()
+        entries[path] = f"{mode} {blob}"
+
+    # -t tags: C modified, R deleted (also listed as C), ? untracked.
+    removed: set[str] = set()
+    dirty: set[str] = set()
+    for record in filter(None, changed.split("\0")):
+        tag, path = record[0], record[2:]
+        if tag == "R":
+            removed.add(path)
+        elif not path.endswith("/"):  # skip nested repositories
+            dirty.add(path)
+    for path in removed:
+        entries.pop(path, None)
+    dirty_paths = sorted(dirty - removed)
+    if dirty_paths:
+        hashes = git(
+            "hash-object", "--no-filters", "--stdin-paths",
+            stdin="".join(f"{path}\n" for path in dirty_paths),
+        )
+        if hashes is None:
+            return None
+        for path, blob in zip(dirty_paths, hashes.split()):
+            mode = "100755" if os.access(root / path, os.X_OK) else "100644"
+            entries[path] = f"{mode} {blob}"
+
+    listing = "".join(f"{entries[path]}\t{path}\0" for path in sorted(entries))
+    return hashlib.sha256(listing.encode("utf-8")).hexdigest()
+
+
+def _test_cache_key(project) -> Optional[str]:
+    """Return the tree hash that keys the close_sprint test cache.
+
+    Leaves out what close_sprint itself rewrites after the tests pass:
+    the CLASI docs directory and the version file it bumps and commits.
+    """
+    exclude = [project.clasi_dir]
+    detected = detect_version_file(project.root)
+    if detected is not None:
+        exclude.append(detected[0])
+    return _worktree_tree_hash(project.root, *exclude)
+
+
+class _CloseJournal:
+    """Checkpoints for one close_sprint call, persisted in the state DB.
+
+    Each step that completes is recorded with a hash of the arguments it
+    depended on and the outputs later steps need. When close_sprint is
+    retried, a step with a matching entry is not run again: its outputs
+    come from the journal. A changed argument (say, a different
+    main_branch) invalidates that step's entry. ``timings`` lists every
+    step with its duration, including the ones skipped this time.
+
+    The precondition step's inputs include the commits of the sprint and
+    main branches. When they have moved since the journal was written,
+    the whole journal is stale and close_sprint drops it (``clear``).
+    close_sprint's own commits do not count: ``rekey`` follows the
+    version bump, and commits that only touch ``.clasi.db`` are skipped.
+    """
+
+    def __init__(self, db, sprint_id: str):
+        self.db = db
+        self.sprint_id = sprint_id
+        self.entries: dict[str, dict] = {}
+        if db.path.exists():
+            self.entries = {
+                entry["step"]: entry for entry in db.get_close_journal(sprint_id)
+            }
+        self.timings: list[dict] = []
+        self._step: Optional[str] = None
+        self._inputs_hash = ""
+        self._started = 0.0
+
+    @staticmethod
+    def inputs_hash(inputs: dict) -> str:
+        data = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+    def resume(self, step: str, inputs: dict, rerun: bool = False) -> Optional[dict]:
+        """Return *step*'s journaled outputs, or None if it must run.
+
+        When it must run, the step's clock starts; call ``complete``
+        when it has finished.
+        """
+        inputs_hash = self.inputs_hash(inputs)
+        entry = self.entries.get(step)
+        if not rerun and entry is not None and entry["inputs_hash"] == inputs_hash:
+            self.timings.append(
+                {"step": step, "duration": entry["duration"], "resumed": True}
+            )
+            return entry["outputs"]
+        self._step = step
+        self._inputs_hash = inputs_hash
+        self._started = time.monotonic()
+        return None
+
+    def complete(self, outputs: Optional[dict] = None) -> None:
+        """Record the step started by the last ``resume`` as done."""
+        duration = round(time.monotonic() - self._started, 3)
+        self.timings.append({"step": self._step, "duration": duration, "resumed": False})
+        entry = {
+            "step": self._step, "inputs_hash": self._inputs_hash,
+            "outputs": outputs or {}, "duration": duration,
+        }
+        self.entries[self._step] = entry
+        if self.db.path.exists():
+            self.db.record_close_step(
+                self.sprint_id, self._step, self._inputs_hash,
+                entry["outputs"], duration,
+            )
+
+    def rekey(self, step: str, inputs: dict) -> None:
+        """Keep *step*'s entry but record it under new *inputs*."""
+        entry = self.entries.get(step)
+        if entry is None:
+            return
+        entry["inputs_hash"] = self.inputs_hash(inputs)
+        if self.db.path.exists():
+            self.db.record_close_step(
+                self.sprint_id, step, entry["inputs_hash"],
+                entry["outputs"], entry["duration"],
+            )
+
+    def clear(self) -> None:
+        self.entries = {}
+        if self.db.path.exists():
+            self.db.clear_close_journal(self.sprint_id)
+
+
+def _branch_commits(
+    root: Path, *names: str, ignore: Optional[Path] = None,
+) -> dict[str, Optional[str]]:
+    """Return the commit each branch in *names* points to (None if unknown).
+
+    With *ignore*, commits that change nothing but that file are skipped:
+    the result is the newest commit on the branch that changed anything
+    else.
+    """
+    repo = git_refs.open_repo(root)
+    commits: dict[str, Optional[str]] = {}
+    for name in names:
+        try:
+            commits[name] = repo.resolve(name) if repo is not None else None
+        except git_refs.Unsupported:
+            commits[name] = None
+    if ignore is None:
+        return commits
+    try:
+        ignored = ignore.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return commits
+    for name, commit in commits.items():
+        if commit is None:
+            continue
+        try:
+            result = subprocess.run(
+                ["git", "rev-list", "-1", commit, "--", ".", f":(exclude){ignored}"],
+                capture_output=True, text=True, cwd=str(root),
+            )
+        except OSError:
+            continue
+        if result.returncode == 0 and result.stdout.strip():
+            commits[name] = result.stdout.strip()
+    return commits
+
+
 def _close_sprint_full(
     sprint_id: str,
     branch_name: str,
@@ -809,14 +1151,20 @@ def _close_sprint_full(
     push_tags_flag: bool,
     delete_branch_flag: bool,
     test_command: Optional[str] = None,
+    force_tests: bool = False,
+    test_shards: int = 0,
 ) -> str:
     """Full lifecycle close: preconditions, tests, archive, git ops."""
     project = get_project()
     db = project.db
     completed_steps: list[str] = []
     repairs: list[str] = []
+    test_summary: Optional[dict] = None
+    # Steps finished by an earlier, failed call are not run again.
+    journal = _CloseJournal(db, sprint_id)
 
     # ── Step 1: Pre-condition verification with self-repair ──
+    background.report("precondition_verification", 0, _CLOSE_STEP_COUNT)
 
     # 1a. Check tickets — all should be in tickets/done/ with status done
     try:
@@ -835,12 +1183,28 @@ def _close_sprint_full(
             "remaining_steps": ["precondition", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"],
         }, indent=2)
 
-    if sprint.tickets_dir.exists():
-        for ticket_file in sorted(sprint.tickets_dir.glob("*.md")):
-            if ticket_file.name == "done":
+    branch_inputs = {"branch_name": branch_name, "main_branch": main_branch}
+
+    def precondition_inputs() -> dict:
+        # close_sprint commits .clasi.db on the sprint branch after writing
+        # the journal; that commit must not make the journal look stale.
+        commits = _branch_commits(
+            project.root, branch_name, main_branch, ignore=db.path,
+        )
+        return {**branch_inputs, "commits": commits}
+
+    if journal.resume("precondition_verification", precondition_inputs()) is None:
+        # A journal written against other commits belongs to an abandoned
+        # close; none of its steps can be trusted.
+        journal.clear()
+        snap = sprint.snapshot()
+
+        for ticket_snap in snap.tickets:
+            if ticket_snap.in_done_dir:
                 continue
-            ticket = Ticket(ticket_file, sprint)
-            if ticket.status == "done":
+            ticket_file = ticket_snap.path
+            if ticket_snap.status == "done":
+                ticket = Ticket(ticket_file, sprint)
                 # Self-repair: move to done/
                 ticket.move_to_done()
                 # Also move plan file if exists
@@ -848,10 +1212,10 @@ def _close_sprint_full(
                 if plan_file.exists():
                     sprint.tickets_done_dir.mkdir(parents=True, exist_ok=True)
                     plan_file.rename(sprint.tickets_done_dir / plan_file.name)
-                repairs.append(f"moved ticket {ticket.id or ticket_file.stem} to done/")
+                repairs.append(f"moved ticket {ticket_snap.id or ticket_file.stem} to done/")
             else:
                 # Ticket not done — unrepairable
-                error_msg = f"Ticket {ticket.id or ticket_file.stem} has status '{ticket.status}', not 'done'"
+                error_msg = f"Ticket {ticket_snap.id or ticket_file.stem} has status '{ticket_snap.status}', not 'done'"
                 if db.path.exists():
                     db.write_recovery_state(
                         sprint_id, "precondition",
@@ -865,66 +1229,61 @@ def _close_sprint_full(
                         "recovery": {
                             "recorded": db.path.exists(),
                             "allowed_paths": [str(ticket_file)],
-                            "instruction": f"Complete ticket {ticket.id or ticket_file.stem} and set status to 'done', then call close_sprint again.",
+                            "instruction": f"Complete ticket {ticket_snap.id or ticket_file.stem} and set status to 'done', then call close_sprint again.",
                         },
                     },
                     "completed_steps": [],
                     "remaining_steps": ["precondition", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"],
                 }, indent=2)
 
-    # 1b. Check TODOs — in-progress TODOs for this sprint must be resolved
-    todo_directory = project.todo_dir
-    in_progress_todo_dir = todo_directory / "in-progress"
-    if in_progress_todo_dir.exists():
-        for todo_file in sorted(in_progress_todo_dir.glob("*.md")):
-            todo = Todo(todo_file, project)
-            if todo.sprint == sprint_id:
-                if todo.status in ("done", "complete", "completed"):
-                    # Self-repair: move to done/
-                    todo.move_to_done()
-                    repairs.append(f"moved TODO {todo_file.name} to done/")
-                else:
-                    # TODO still in-progress — check if intentionally deferred
-                    if _todo_is_deferred(sprint, todo_file.name):
-                        # At least one ticket in this sprint has completes_todo: false
-                        # for this TODO — it spans future sprints; allow close to proceed
-                        continue
-                    # TODO is unresolved and not deferred — unrepairable
-                    error_msg = f"TODO {todo_file.name} is still in-progress for sprint {sprint_id}"
-                    if db.path.exists():
-                        db.write_recovery_state(
-                            sprint_id, "precondition",
-                            [str(todo_file)], error_msg,
-                        )
-                    return json.dumps({
-                        "status": "error",
-                        "error": {
-                            "step": "precondition",
-                            "message": error_msg,
-                            "recovery": {
-                                "recorded": db.path.exists(),
-                                "allowed_paths": [str(todo_file)],
-                                "instruction": f"Complete all tickets referencing {todo_file.name}, then call close_sprint again.",
-                            },
+        # 1b. Check TODOs — in-progress TODOs for this sprint must be resolved
+        for todo_snap in snap.todos:
+            if not todo_snap.in_progress or todo_snap.sprint != sprint_id:
+                continue
+            todo_file = todo_snap.path
+            if todo_snap.status in ("done", "complete", "completed"):
+                # Self-repair: move to done/
+                Todo(todo_file, project).move_to_done()
+                repairs.append(f"moved TODO {todo_file.name} to done/")
+            else:
+                # TODO still in-progress — check if intentionally deferred
+                if snap.todo_is_deferred(todo_file.name):
+                    # At least one ticket in this sprint has completes_todo: false
+                    # for this TODO — it spans future sprints; allow close to proceed
+                    continue
+                # TODO is unresolved and not deferred — unrepairable
+                error_msg = f"TODO {todo_file.name} is still in-progress for sprint {sprint_id}"
+                if db.path.exists():
+                    db.write_recovery_state(
+                        sprint_id, "precondition",
+                        [str(todo_file)], error_msg,
+                    )
+                return json.dumps({
+                    "status": "error",
+                    "error": {
+                        "step": "precondition",
+                        "message": error_msg,
+                        "recovery": {
+                            "recorded": db.path.exists(),
+                            "allowed_paths": [str(todo_file)],
+                            "instruction": f"Complete all tickets referencing {todo_file.name}, then call close_sprint again.",
                         },
-                        "completed_steps": [],
-                        "remaining_steps": ["precondition", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"],
-                    }, indent=2)
-    # Also check pending TODOs in todo/ that are tagged with this sprint (legacy)
-    if todo_directory.exists():
-        for todo_file in sorted(todo_directory.glob("*.md")):
-            todo = Todo(todo_file, project)
-            if todo.sprint == sprint_id:
-                if todo.status in ("done", "complete", "completed"):
-                    # Self-repair: move to done/
-                    todo.move_to_done()
-                    repairs.append(f"moved TODO {todo_file.name} to done/")
+                    },
+                    "completed_steps": [],
+                    "remaining_steps": ["precondition", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"],
+                }, indent=2)
+        # Also check pending TODOs in todo/ that are tagged with this sprint (legacy)
+        for todo_snap in snap.todos:
+            if todo_snap.in_progress or todo_snap.sprint != sprint_id:
+                continue
+            if todo_snap.status in ("done", "complete", "completed"):
+                # Self-repair: move to done/
+                Todo(todo_snap.path, project).move_to_done()
+                repairs.append(f"moved TODO {todo_snap.filename} to done/")
 
-    # 1c. Check state DB phase — self-repair: advance if behind
-    if db.path.exists():
-        try:
-            state = db.get_sprint_state(sprint_id)
-            phase = state["phase"]
+        # 1c. Check state DB phase — self-repair: advance if behind
+        if db.path.exists() and snap.db_state is not None:
+            phase = snap.phase
             if phase != "done":
                 phase_idx = _PHASES.index(phase)
                 # We need to be at least in 'closing' before we proceed
@@ -937,96 +1296,194 @@ def _close_sprint_full(
                     except ValueError:
                         # Can't advance further (missing gate, etc.) — skip
                         break
-        except ValueError:
-            pass  # Sprint not in DB — skip DB checks
 
-    # 1d. Check execution lock — self-repair: re-acquire if not held
-    if db.path.exists():
+        # 1d. Check execution lock — self-repair: re-acquire if not held
+        if db.path.exists() and snap.db_state is not None and not snap.locked:
+            try:
+                db.acquire_lock(sprint_id)
+                repairs.append("re-acquired execution lock")
+            except ValueError:
+                pass  # Another sprint holds it — continue anyway
+
+        # 1e. Dry-run the merge — a conflict stops the close before tests,
+        # archive and version bump run, without touching the working tree
         try:
-            state = db.get_sprint_state(sprint_id)
-            if not state["lock"]:
-                try:
-                    db.acquire_lock(sprint_id)
-                    repairs.append("re-acquired execution lock")
-                except ValueError:
-                    pass  # Another sprint holds it — continue anyway
-        except ValueError:
-            pass
+            merge_check = sprint.check_merge(main_branch)
+        except RuntimeError:
+            merge_check = None  # No branch in frontmatter; merge step reports it
+        if merge_check is not None and merge_check["clean"] is False:
+            conflicted = merge_check["conflicted_files"]
+            error_msg = (
+                f"Sprint branch does not merge cleanly into {main_branch}: "
+                f"{len(conflicted)} conflicted file(s)"
+            )
+            if db.path.exists():
+                db.write_recovery_state(sprint_id, "precondition", conflicted, error_msg)
+            return json.dumps({
+                "status": "error",
+                "error": {
+                    "step": "precondition",
+                    "message": error_msg,
+                    "conflicted_files": conflicted,
+                    "recovery": {
+                        "recorded": db.path.exists(),
+                        "allowed_paths": conflicted,
+                        "instruction": f"Merge {main_branch} into the sprint branch and resolve the conflicts in the listed files, then call close_sprint again.",
+                    },
+                },
+                "completed_steps": [],
+                "remaining_steps": ["precondition", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"],
+            }, indent=2)
+        journal.complete()
 
     completed_steps.append("precondition_verification")
 
     # ── Step 2: Run tests ──
     all_steps = ["precondition_verification", "tests", "archive", "db_update", "version_bump", "merge", "push_tags", "delete_branch"]
 
-    if test_command == "":
-        # Explicitly skip tests (non-Python projects, etc.)
-        repairs.append("skipped tests (test_command is empty)")
-    else:
-        # Determine the command to run
-        if test_command is not None:
-            test_cmd = test_command.split()
+    background.report("tests", 1, _CLOSE_STEP_COUNT)
+    # The tree hash makes a retry after source changes (say, resolved
+    # merge conflicts) run the tests again.
+    tree_hash = _test_cache_key(project) if db.path.exists() else None
+    tests_inputs = {"test_command": test_command, "tree": tree_hash}
+    if journal.resume("tests", tests_inputs, rerun=force_tests) is None:
+        if test_command == "":
+            # Explicitly skip tests (non-Python projects, etc.)
+            repairs.append("skipped tests (test_command is empty)")
         else:
-            test_cmd = ["uv", "run", "pytest"]
+            # Determine the command to run
+            if test_command is not None:
+                test_cmd = test_command.split()
+            else:
+                test_cmd = ["uv", "run", "pytest"]
+
+            # A passing run is recorded against the working tree, so a retry
+            # on an unchanged tree does not run the suite again. Shards run
+            # without coverage, so a sharded pass gets its own key: a serial
+            # run never reuses it, while a sharded run accepts either.
+            sharded = test_shards > 1 and is_pytest_command(test_cmd)
+            run_key = " ".join(test_cmd)
+            cache_keys = [run_key]
+            if sharded:
+                run_key += f" --shards={test_shards}"
+                cache_keys.append(run_key)
+            cached = None
+            if tree_hash is not None and not force_tests:
+                for key in cache_keys:
+                    cached = db.get_test_result(tree_hash, key)
+                    if cached is not None:
+                        break
 
-        try:
-            test_result = subprocess.run(
-                test_cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-            )
-            if test_result.returncode != 0:
-                error_msg = f"Tests failed (exit code {test_result.returncode})"
-                test_output = test_result.stdout[-2000:] if test_result.stdout else ""
-                if test_result.stderr:
-                    test_output += "\n" + test_result.stderr[-500:]
-                if db.path.exists():
-                    db.write_recovery_state(
-                        sprint_id, "tests", [], error_msg,
+            try:
+                if cached is not None and cached["returncode"] == 0:
+                    repairs.append(
+                        f"skipped tests (passed on tree {tree_hash[:12]} "
+                        f"at {cached['recorded_at']})"
+                    )
+                    test_result = None
+                elif sharded:
+                    started = time.monotonic()
+                    test_summary = run_sharded(
+                        test_cmd, test_shards,
+                        project.log_dir / "tests" / f"sprint-{sprint_id}",
+                        timeout=300,
+                    )
+                    test_result = subprocess.CompletedProcess(
+                        test_cmd, 0 if test_summary["passed"] else 1,
+                        format_summary(test_summary), "",
+                    )
+                else:
+                    if test_shards > 1:
+                        repairs.append(
+                            "ran tests in one process (sharding needs a pytest command)"
+                        )
+                    started = time.monotonic()
+                    test_result = background.run_subprocess(
+                        test_cmd,
+                        capture_output=True,
+                        text=True,
+                        timeout=300,
                     )
+                if (
+                    test_result is not None and test_result.returncode == 0
+                    and tree_hash is not None
+                ):
+                    # The run may rewrite tracked or unignored files
+                    # (coverage reports), so record the tree it left.
+                    after = _test_cache_key(project)
+                    if after is not None:
+                        db.record_test_result(
+                            after, run_key, test_result.returncode,
+                            time.monotonic() - started,
+                        )
+                if test_result is not None and test_result.returncode != 0:
+                    if test_summary is not None:
+                        error_msg = (
+                            f"Tests failed ({test_summary['failures']} failing "
+                            f"test(s) in a {test_shards}-shard run)"
+                        )
+                    else:
+                        error_msg = f"Tests failed (exit code {test_result.returncode})"
+                    test_output = test_result.stdout[-2000:] if test_result.stdout else ""
+                    if test_result.stderr:
+                        test_output += "\n" + test_result.stderr[-500:]
+                    if db.path.exists():
+                        db.write_recovery_state(
+                            sprint_id, "tests", [], error_msg,
+                        )
+                    error: dict = {
+                        "step": "tests",
+                        "message": error_msg,
+                        "output": test_output.strip(),
+                        "recovery": {
+                            "recorded": db.path.exists(),
+                            "allowed_paths": [],
+                            "instruction": "Fix failing tests, then call close_sprint again.",
+                        },
+                    }
+                    if test_summary is not None:
+                        error["test_summary"] = test_summary
+                    return json.dumps({
+                        "status": "error",
+                        "error": error,
+                        "completed_steps": completed_steps,
+                        "remaining_steps": [s for s in all_steps if s not in completed_steps],
+                    }, indent=2)
+            except FileNotFoundError:
+                # Test command not available — skip tests
+                repairs.append(f"skipped tests ({test_cmd[0]} not found)")
+            except subprocess.TimeoutExpired:
+                error_msg = "Test suite timed out after 300 seconds"
+                if db.path.exists():
+                    db.write_recovery_state(sprint_id, "tests", [], error_msg)
                 return json.dumps({
                     "status": "error",
                     "error": {
                         "step": "tests",
                         "message": error_msg,
-                        "output": test_output.strip(),
                         "recovery": {
                             "recorded": db.path.exists(),
                             "allowed_paths": [],
-                            "instruction": "Fix failing tests, then call close_sprint again.",
+                            "instruction": "Investigate slow tests, then call close_sprint again.",
                         },
                     },
                     "completed_steps": completed_steps,
                     "remaining_steps": [s for s in all_steps if s not in completed_steps],
-                }, indent=2)
-        except FileNotFoundError:
-            # Test command not available — skip tests
-            repairs.append(f"skipped tests ({test_cmd[0]} not found)")
-        except subprocess.TimeoutExpired:
-            error_msg = "Test suite timed out after 300 seconds"
-            if db.path.exists():
-                db.write_recovery_state(sprint_id, "tests", [], error_msg)
-            return json.dumps({
-                "status": "error",
-                "error": {
-                    "step": "tests",
-                    "message": error_msg,
-                    "recovery": {
-                        "recorded": db.path.exists(),
-                        "allowed_paths": [],
-                        "instruction": "Investigate slow tests, then call close_sprint again.",
-                    },
-                },
-                "completed_steps": completed_steps,
-                "remaining_steps": [s for s in all_steps if s not in completed_steps],
-        }, indent=2)
+            }, indent=2)
+        journal.complete()
 
     completed_steps.append("tests")
 
     # ── Step 3: Archive sprint directory ──
+    # Last chance to cancel: from here on the sprint is being closed.
+    background.report("archive", 2, _CLOSE_STEP_COUNT)
+    resumed = journal.resume("archive", {})
     already_archived = sprint_dir.parent.name == "done"
 
-    if already_archived:
+    if resumed is not None:
+        new_path = Path(resumed["new_path"])
+        old_path_str = resumed["old_path"]
+    elif already_archived:
         new_path = sprint_dir
         old_path_str = str(new_path)
     else:
@@ -1039,72 +1496,86 @@ def _close_sprint_full(
         archive_result = sprint.archive()
         new_path = sprint.path  # Sprint.archive() updates self._path
         old_path_str = archive_result["old_path"]
+    if resumed is None:
+        journal.complete({"old_path": old_path_str, "new_path": str(new_path)})
 
     completed_steps.append("archive")
 
     # ── Step 4: Update state DB ──
-    if db.path.exists():
-        try:
-            state = db.get_sprint_state(sprint_id)
-            if state["phase"] != "done":
-                phase_idx = _PHASES.index(state["phase"])
-                done_idx = _PHASES.index("done")
-                while phase_idx < done_idx:
+    background.report("db_update", 3, _CLOSE_STEP_COUNT, cancellable=False)
+    if journal.resume("db_update", {}) is None:
+        if db.path.exists():
+            try:
+                state = db.get_sprint_state(sprint_id)
+                if state["phase"] != "done":
+                    phase_idx = _PHASES.index(state["phase"])
+                    done_idx = _PHASES.index("done")
+                    while phase_idx < done_idx:
+                        try:
+                            db.advance_phase(sprint_id)
+                        except ValueError:
+                            break
+                        phase_idx += 1
+                if state["lock"]:
                     try:
-                        db.advance_phase(sprint_id)
+                        db.release_lock(sprint_id)
                     except ValueError:
-                        break
-                    phase_idx += 1
-            if state["lock"]:
-                try:
-                    db.release_lock(sprint_id)
-                except ValueError:
-                    pass
-        except (ValueError, Exception):
-            pass
+                        pass
+            except (ValueError, Exception):
+                pass
+        journal.complete()
+    if db.path.exists():
+        # Checkpoint the WAL into .clasi.db before the commits below.
+        db.close()
 
     completed_steps.append("db_update")
 
     # ── Step 5: Version bump ──
-    version = None
-    try:
-        trigger = load_version_trigger()
-        if should_version(trigger, "sprint_close"):
-            version = compute_next_version()
-            detected = detect_version_file(project.root)
-            if detected:
-                update_version_file(detected[0], detected[1], version)
-            # Commit the version bump so the working tree is clean for merge
-            subprocess.run(
-                ["git", "add", "-A"],
-                cwd=str(project.root), capture_output=True, text=True,
-            )
-            subprocess.run(
-                ["git", "commit", "-m", f"chore: bump version to {version}"],
-                cwd=str(project.root), capture_output=True, text=True,
-            )
-            create_version_tag(version)
-    except Exception as exc:
-        import sys
-        print(f"[CLASI] Versioning failed: {exc}", file=sys.stderr)
+    background.report("version_bump", 4, _CLOSE_STEP_COUNT, cancellable=False)
+    # Never bump twice: a retry reuses the version (and tag) made before.
+    resumed = journal.resume("version_bump", {})
+    version = resumed["version"] if resumed is not None else None
+    if resumed is None:
+        try:
+            trigger = load_version_trigger()
+            if should_version(trigger, "sprint_close"):
+                version = compute_next_version()
+                detected = detect_version_file(project.root)
+                if detected:
+                    update_version_file(detected[0], detected[1], version)
+                # Commit the version bump so the working tree is clean for merge
+                subprocess.run(
+                    ["git", "add", "-A"],
+                    cwd=str(project.root), capture_output=True, text=True,
+                )
+                subprocess.run(
+                    ["git", "commit", "-m", f"chore: bump version to {version}"],
+                    cwd=str(project.root), capture_output=True, text=True,
+                )
+                create_version_tag(version)
+        except Exception as exc:
+            import sys
+            print(f"[CLASI] Versioning failed: {exc}", file=sys.stderr)
+        journal.complete({"version": version})
 
     completed_steps.append("version_bump")
 
+    # The version bump moved the sprint branch; a retry on the branch as
+    # it is now still resumes. Recorded before step 5b so the entry is
+    # checkpointed and committed with the rest of .clasi.db.
+    journal.rekey("precondition_verification", precondition_inputs())
+
     # ── Step 5b: Commit .clasi.db if still dirty after version_bump ──
     db_file = project.root / "docs" / "clasi" / ".clasi.db"
     if db_file.exists():
+        db.close()  # checkpoint the journal entries written since step 4
         status_result = subprocess.run(
             ["git", "status", "--porcelain", str(db_file)],
             capture_output=True, text=True, cwd=str(project.root),
         )
         if status_result.stdout.strip():  # non-empty means dirty/staged
             # Verify we're on the sprint branch before committing
-            head_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                capture_output=True, text=True, cwd=str(project.root),
-            )
-            head_branch = head_result.stdout.strip()
-            if head_branch == branch_name:
+            if git_refs.current_branch(project.root) == branch_name:
                 subprocess.run(
                     ["git", "add", str(db_file)],
                     cwd=str(project.root), capture_output=True, text=True,
@@ -1115,77 +1586,110 @@ def _close_sprint_full(
                 )
 
     # ── Step 6: Git merge ──
-    merged = False
-    branch_exists = False
+    background.report("merge", 5, _CLOSE_STEP_COUNT, cancellable=False)
     # Use a Sprint wrapper pointing to the archived location for git operations
     archived_sprint = Sprint(new_path, project)
-    merge_error_result: Optional[str] = None
-    try:
-        merge_result = archived_sprint.merge_branch(main_branch)
-        branch_exists = merge_result["branch_exists"]
-        merged = merge_result["merged"]
-    except RuntimeError as e:
-        error_msg = str(e)
-        conflicted: list[str] = (
-            e.conflicted_files if isinstance(e, MergeConflictError) else []
-        )
-        if db.path.exists():
-            db.write_recovery_state(sprint_id, "merge", conflicted, error_msg)
-        merge_error_result = json.dumps({
-            "status": "error",
-            "error": {
-                "step": "merge",
-                "message": error_msg,
-                "recovery": {
-                    "recorded": db.path.exists(),
-                    "allowed_paths": conflicted,
-                    "instruction": "Resolve the merge conflicts in the listed files, then call close_sprint again.",
+    resumed = journal.resume("merge", branch_inputs)
+    if resumed is not None:
+        merged = resumed["merged"]
+        branch_exists = resumed["branch_exists"]
+        fast_forward = resumed["fast_forward"]
+    else:
+        merged = False
+        branch_exists = False
+        fast_forward = False
+        merge_error_result: Optional[str] = None
+        try:
+            merge_result = archived_sprint.merge_branch(main_branch)
+            branch_exists = merge_result["branch_exists"]
+            merged = merge_result["merged"]
+            fast_forward = merge_result.get("fast_forward", False)
+        except RuntimeError as e:
+            error_msg = str(e)
+            conflicted: list[str] = (
+                e.conflicted_files if isinstance(e, MergeConflictError) else []
+            )
+            if db.path.exists():
+                db.write_recovery_state(sprint_id, "merge", conflicted, error_msg)
+            merge_error_result = json.dumps({
+                "status": "error",
+                "error": {
+                    "step": "merge",
+                    "message": error_msg,
+                    "recovery": {
+                        "recorded": db.path.exists(),
+                        "allowed_paths": conflicted,
+                        "instruction": "Resolve the merge conflicts in the listed files, then call close_sprint again.",
+                    },
                 },
-            },
-            "completed_steps": completed_steps,
-            "remaining_steps": [s for s in all_steps if s not in completed_steps],
-        }, indent=2)
-    finally:
-        # Release lock regardless of merge outcome (idempotent: no-op if already released)
-        if db.path.exists():
-            try:
-                db.release_lock(sprint_id)
-            except ValueError:
-                pass  # Already released (success path releases in db_update)
+                "completed_steps": completed_steps,
+                "remaining_steps": [s for s in all_steps if s not in completed_steps],
+            }, indent=2)
+        finally:
+            # Release lock regardless of merge outcome (idempotent: no-op if already released)
+            if db.path.exists():
+                try:
+                    db.release_lock(sprint_id)
+                except ValueError:
+                    pass  # Already released (success path releases in db_update)
 
-    if merge_error_result is not None:
-        return merge_error_result
+        if merge_error_result is not None:
+            journal.rekey("precondition_verification", precondition_inputs())
+            if db.path.exists():
+                db.close()  # checkpoint the recovery state and journal
+            return merge_error_result
+        journal.complete({
+            "merged": merged,
+            "branch_exists": branch_exists,
+            "fast_forward": fast_forward,
+        })
 
     completed_steps.append("merge")
 
     # ── Step 7: Push tags ──
-    tags_pushed = False
-    if push_tags_flag and version:
-        tag_name = f"v{version}"
-        push_result = subprocess.run(
-            ["git", "push", "--tags"],
-            capture_output=True, text=True,
-        )
-        tags_pushed = push_result.returncode == 0
+    background.report("push_tags", 6, _CLOSE_STEP_COUNT, cancellable=False)
+    resumed = journal.resume("push_tags", {"push_tags": push_tags_flag, "version": version})
+    if resumed is not None:
+        tags_pushed = resumed["tags_pushed"]
+    else:
+        tags_pushed = False
+        if push_tags_flag and version:
+            tag_name = f"v{version}"
+            push_result = subprocess.run(
+                ["git", "push", "--tags"],
+                capture_output=True, text=True,
+            )
+            tags_pushed = push_result.returncode == 0
+        journal.complete({"tags_pushed": tags_pushed})
 
     completed_steps.append("push_tags")
 
     # ── Step 8: Delete branch ──
-    branch_deleted = False
-    if delete_branch_flag:
-        try:
-            branch_deleted = archived_sprint.delete_branch()
-        except RuntimeError:
-            branch_deleted = False
+    background.report("delete_branch", 7, _CLOSE_STEP_COUNT, cancellable=False)
+    resumed = journal.resume(
+        "delete_branch",
+        {"delete_branch": delete_branch_flag, "branch_name": branch_name},
+    )
+    if resumed is not None:
+        branch_deleted = resumed["branch_deleted"]
+    else:
+        branch_deleted = False
+        if delete_branch_flag:
+            try:
+                branch_deleted = archived_sprint.delete_branch()
+            except RuntimeError:
+                branch_deleted = False
+        journal.complete({"branch_deleted": branch_deleted})
 
     completed_steps.append("delete_branch")
 
-    # ── Step 9: Clear recovery state ──
+    # ── Step 9: Clear recovery state and the step journal ──
     if db.path.exists():
         try:
             db.clear_recovery_state()
         except Exception:
             pass
+    journal.clear()
 
     # ── Step 10: Return structured result ──
     result: dict = {
@@ -1199,12 +1703,17 @@ def _close_sprint_full(
         result["tag"] = f"v{version}"
     result["git"] = {
         "merged": merged,
-        "merge_strategy": "rebase + --no-ff",
+        # A sprint branch that already contains main is not rebased.
+        "merge_strategy": "--no-ff" if fast_forward else "rebase + --no-ff",
+        "fast_forward": fast_forward,
         "merge_target": main_branch,
         "tags_pushed": tags_pushed,
         "branch_deleted": branch_deleted,
         "branch_name": branch_name,
     }
+    if test_summary is not None:
+        result["test_summary"] = test_summary
+    result["steps"] = journal.timings
 
     return json.dumps(result, indent=2)
 
@@ -1416,6 +1925,42 @@ def move_todo_to_done(
 
 
 @server.tool()
+def query_events(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    kind: Optional[str] = None,
+    name: Optional[str] = None,
+    agent: Optional[str] = None,
+    sprint_id: Optional[str] = None,
+    limit: int = 100,
+) -> str:
+    """Query the structured event log (docs/clasi/log/events.db).
+
+    Events cover hook decisions, MCP tool calls, dispatches and
+    subagent/task completions, with durations where known.
+
+    Args:
+        since: Only events at or after this ISO timestamp (a prefix such
+            as '2026-10-18' works)
+        until: Only events before this ISO timestamp
+        kind: hook, tool, dispatch, dispatch-result, subagent or task
+        name: Hook event, tool or agent name
+        agent: Agent that produced the event
+        sprint_id: Sprint the event belongs to
+        limit: Maximum number of events (0 for no limit)
+
+    Returns JSON array of events, newest first: {id, ts, kind, name,
+    agent, tier, sprint, outcome, duration_ms, data}.
+    """
+    from clasi.event_log import query
+
+    return json.dumps(query(
+        get_project().log_dir, since=since, until=until, kind=kind,
+        name=name, agent=agent, sprint=sprint_id, limit=limit,
+    ), indent=2)
+
+
+@background_tool(exclusive=True)
 def create_github_issue(title: str, body: str, labels: list[str] | None = None) -> str:
     """Create a GitHub issue in the current repository.
 
@@ -1592,7 +2137,7 @@ def _check_gh_access(repo: str | None = None) -> tuple[bool, str]:
         return (False, "gh CLI not found. Install it from https://cli.github.com/")
 
 
-@server.tool()
+@background_tool()
 def list_github_issues(
     repo: str | None = None,
     labels: str | None = None,
@@ -1639,7 +2184,7 @@ def list_github_issues(
         return json.dumps({"error": f"Failed to parse gh output: {exc}"})
 
 
-@server.tool()
+@background_tool(exclusive=True)
 def close_github_issue(issue_number: int, repo: str | None = None) -> str:
     """Close a GitHub issue using the gh CLI.
 
@@ -1847,21 +2392,13 @@ def _is_template_placeholder(file_path: Path, template_str: str) -> bool:
 
 def _check_git_branch() -> str:
     """Return the current git branch name."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True, text=True, check=True,
-        )
-        return result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return ""
+    return git_refs.current_branch()
 
 
-def _collect_tickets(sprint_dir: Path) -> list:
-    """Collect all tickets from a sprint directory with their metadata."""
-    sprint = Sprint(sprint_dir, get_project())
+def _collect_tickets(snap: SprintSnapshot) -> list:
+    """Collect all tickets from a sprint snapshot with their metadata."""
     tickets = []
-    for ticket in sprint.list_tickets():
+    for ticket in snap.tickets:
         if not ticket.id:
             continue
         tickets.append({
@@ -1869,7 +2406,7 @@ def _collect_tickets(sprint_dir: Path) -> list:
             "title": ticket.title,
             "status": ticket.status,
             "path": str(ticket.path),
-            "in_done_dir": ticket.path.parent.name == "done",
+            "in_done_dir": ticket.in_done_dir,
         })
     return tickets
 
@@ -1891,7 +2428,6 @@ def review_sprint_pre_execution(sprint_id: str) -> str:
     # Find sprint
     try:
         sprint = get_project().get_sprint(sprint_id)
-        sprint_dir = sprint.path
     except ValueError:
         return json.dumps({
             "passed": False,
@@ -1904,7 +2440,8 @@ def review_sprint_pre_execution(sprint_id: str) -> str:
             }],
         }, indent=2)
 
-    expected_branch = sprint.branch or f"sprint/{sprint_id}"
+    snap = sprint.snapshot()
+    expected_branch = snap.branch or f"sprint/{sprint_id}"
 
     # Check branch
     current_branch = _check_git_branch()
@@ -1925,7 +2462,8 @@ def review_sprint_pre_execution(sprint_id: str) -> str:
     ]
 
     for filename, filepath, template in planning_docs:
-        if not filepath.exists():
+        fm = snap.docs[filename]
+        if fm is None:
             issues.append({
                 "severity": "error",
                 "check": f"{filename.replace('.', '_')}_exists",
@@ -1935,7 +2473,6 @@ def review_sprint_pre_execution(sprint_id: str) -> str:
             })
             continue
 
-        fm = read_frontmatter(filepath)
         status = fm.get("status", "draft")
 
         if status == "draft":
@@ -1967,7 +2504,7 @@ def review_sprint_pre_execution(sprint_id: str) -> str:
             "path": str(sprint.tickets_dir),
         })
     else:
-        tickets = _collect_tickets(sprint_dir)
+        tickets = _collect_tickets(snap)
         if not tickets:
             issues.append({
                 "severity": "error",
@@ -2010,7 +2547,6 @@ def review_sprint_pre_close(sprint_id: str) -> str:
 
     try:
         sprint = get_project().get_sprint(sprint_id)
-        sprint_dir = sprint.path
     except ValueError:
         return json.dumps({
             "passed": False,
@@ -2023,7 +2559,8 @@ def review_sprint_pre_close(sprint_id: str) -> str:
             }],
         }, indent=2)
 
-    expected_branch = sprint.branch or f"sprint/{sprint_id}"
+    snap = sprint.snapshot()
+    expected_branch = snap.branch or f"sprint/{sprint_id}"
 
     # Check branch
     current_branch = _check_git_branch()
@@ -2037,7 +2574,7 @@ def review_sprint_pre_close(sprint_id: str) -> str:
         })
 
     # Check all tickets are done and in done/ directory
-    tickets = _collect_tickets(sprint_dir)
+    tickets = _collect_tickets(snap)
     if not tickets:
         issues.append({
             "severity": "error",
@@ -2075,7 +2612,8 @@ def review_sprint_pre_close(sprint_id: str) -> str:
     ]
 
     for filename, filepath, template in planning_docs_pre_close:
-        if not filepath.exists():
+        fm = snap.docs[filename]
+        if fm is None:
             issues.append({
                 "severity": "error",
                 "check": f"{filename.replace('.', '_')}_exists",
@@ -2086,7 +2624,6 @@ def review_sprint_pre_close(sprint_id: str) -> str:
             })
             continue
 
-        fm = read_frontmatter(filepath)
         status = fm.get("status", "draft")
 
         if status == "draft":
@@ -2173,8 +2710,9 @@ def review_sprint_post_close(sprint_id: str) -> str:
         })
 
     if sprint_dir:
+        snap = sprint.snapshot()
         # Check all tickets are done
-        tickets = _collect_tickets(sprint_dir)
+        tickets = _collect_tickets(snap)
         for t in tickets:
             if t["status"] != "done":
                 issues.append({
@@ -2201,8 +2739,8 @@ def review_sprint_post_close(sprint_id: str) -> str:
             ("architecture-update.md", sprint.architecture_update_md),
         ]
         for filename, filepath in post_close_docs:
-            if filepath.exists():
-                fm = read_frontmatter(filepath)
+            fm = snap.docs[filename]
+            if fm is not None:
                 status = fm.get("status", "draft")
                 if status == "draft":
                     issues.append({
@@ -0,0 +1,179 @@
+"""Precomputed tool schemas for lazy MCP tool registration.
+
+Importing the tool modules costs more than anything else in ``clasi
+mcp`` start-up after FastMCP itself. ``artifact_tools`` alone pulls in
+the artifact, sprint, versioning and GitHub code, and every
+``@server.tool()`` builds a pydantic argument model. Each subagent pays
+that before its first request.
+
+``manifest.json`` records what ``tools/list`` needs for every tool:
+name, description, input and output schema, and the module that defines
+it. ``Clasi.run`` registers a ``LazyTool`` per entry. On the first call
+to any tool from a module, the lazy entries for that module are dropped,
+the module is imported, and its real tools take their place.
+
+The manifest carries a SHA-256 of each tool module's source and the
+installed ``mcp`` version, since the schemas are FastMCP's output. If
+either has changed since the manifest was built, ``load`` rejects it
+and the server imports the tools eagerly. Regenerate it with::
+
+    python -m clasi.tools.manifest
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
+from mcp.server.fastmcp.utilities.func_metadata import ArgModelBase, FuncMetadata
+
+# Tool modules, in registration order.
+MODULES = ("clasi.tools.process_tools", "clasi.tools.artifact_tools")
+
+MANIFEST_PATH = Path(__file__).with_name("manifest.json")
+
+
+def _source_hash(module: str) -> Optional[str]:
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin:
+        return None
+    return hashlib.sha256(Path(spec.origin).read_bytes()).hexdigest()
+
+
+def _sources() -> dict[str, Optional[str]]:
+    """What the manifest was built from: tool module hashes and mcp's version."""
+    sources = {m: _source_hash(m) for m in MODULES}
+    sources["mcp"] = importlib.metadata.version("mcp")
+    return sources
+
+
+def build(server: FastMCP) -> dict[str, Any]:
+    """Import the tool modules and describe every tool they register."""
+    for module in MODULES:
+        importlib.import_module(module)
+    tools = []
+    for tool in server._tool_manager._tools.values():
+        module = getattr(tool.fn, "__module__", None)
+        if module not in MODULES:
+            continue
+        tools.append({
+            "name": tool.name,
+            "module": module,
+            "description": tool.description,
+            "parameters": tool.parameters,
+            "output_schema": tool.output_schema,
+        })
+    # Registration order within a module, modules in MODULES order.
+    tools.sort(key=lambda t: MODULES.index(t["module"]))
+    return {
+        "sources": _sources(),
+        "tools": tools,
+    }
+
+
+def write(server: FastMCP, path: Path = MANIFEST_PATH) -> None:
+    """Rebuild the manifest and write it to *path*."""
+    path.write_text(json.dumps(build(server), indent=1) + "\n", encoding="utf-8")
+
+
+def load(path: Path = MANIFEST_PATH) -> Optional[dict[str, Any]]:
+    """Return the manifest if it exists and matches the tool sources."""
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("sources") != _sources():
+        return None
+    return manifest
+
+
+class _NoArgs(ArgModelBase):
+    pass
+
+
+def _not_loaded(**kwargs: Any) -> Any:  # pragma: no cover - never called
+    raise RuntimeError("lazy tool called before its module was imported")
+
+
+class LazyTool(Tool):
+    """A tool listed from the manifest whose module is not imported yet."""
+
+    module: str
+    manager: Any = None
+
+    async def run(
+        self,
+        arguments: dict[str, Any],
+        context: Any = None,
+        convert_result: bool = False,
+    ) -> Any:
+        tool = _load(self)
+        return await tool.run(arguments, context=context, convert_result=convert_result)
+
+
+def _load(lazy: LazyTool) -> Tool:
+    """Import *lazy*'s module and return the real tool that replaces it."""
+    tools = lazy.manager._tools
+    pending = {
+        name: tool for name, tool in tools.items()
+        if isinstance(tool, LazyTool) and tool.module == lazy.module
+    }
+    for name in pending:
+        del tools[name]
+    try:
+        importlib.import_module(lazy.module)
+    except BaseException:
+        tools.update(pending)
+        raise
+    for name, tool in pending.items():
+        # The module was imported earlier without registering this tool.
+        tools.setdefault(name, tool)
+    real = tools[lazy.name]
+    if isinstance(real, LazyTool):
+        raise RuntimeError(f"{lazy.module} did not register tool {lazy.name!r}")
+    return real
+
+
+def register_lazy_tools(server: FastMCP, manifest: dict[str, Any]) -> int:
+    """Register a LazyTool for every manifest entry not already present.
+
+    Returns the number of lazy tools registered.
+    """
+    manager = server._tool_manager
+    count = 0
+    for entry in manifest["tools"]:
+        if entry["name"] in manager._tools:
+            continue
+        manager._tools[entry["name"]] = LazyTool.model_construct(
+            fn=_not_loaded,
+            name=entry["name"],
+            title=None,
+            description=entry["description"],
+            parameters=entry["parameters"],
+            fn_metadata=FuncMetadata.model_construct(
+                arg_model=_NoArgs, output_schema=entry["output_schema"],
+            ),
+            is_async=True,
+            context_kwarg=None,
+            annotations=None,
+            icons=None,
+            meta=None,
+            module=entry["module"],
+            manager=manager,
+        )
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    from clasi.mcp_server import server
+
+    write(server)
+    print(f"wrote {MANIFEST_PATH}")
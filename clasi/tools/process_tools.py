@@ -8,22 +8,18 @@ import json
 from pathlib import Path
 
 from clasi import __version__
+from clasi.content_catalog import Catalog, Entry, get_catalog
 from clasi.frontmatter import read_document, read_frontmatter
 from clasi.mcp_server import server, content_path, get_project
 
 
+def _entry_dict(entry: Entry) -> dict[str, str]:
+    return {"name": entry.name, "description": entry.description}
+
+
 def _list_definitions(directory: Path) -> list[dict[str, str]]:
     """List all .md files in a directory, returning name and description from frontmatter."""
-    results = []
-    if not directory.exists():
-        return results
-    for path in sorted(directory.glob("*.md")):
-        fm, _ = read_document(path)
-        results.append({
-            "name": fm.get("name", path.stem),
-            "description": fm.get("description", ""),
-        })
-    return results
+    return [_entry_dict(e) for e in get_catalog(directory).top_level()]
 
 
 def _list_agents_recursive(agents_dir: Path) -> list[dict[str, str]]:
@@ -33,78 +29,67 @@ def _list_agents_recursive(agents_dir: Path) -> list[dict[str, str]]:
     Skips the old/ subdirectory so archived agents are not listed.
     """
     results = []
-    if not agents_dir.exists():
-        return results
-    for agent_md in sorted(agents_dir.rglob("agent.md")):
+    for entry in get_catalog(agents_dir).named("agent.md"):
         # Skip archived agents in the old/ subdirectory
-        if "old" in agent_md.parts:
+        if "old" in entry.path.parts:
             continue
-        fm, _ = read_document(agent_md)
-        # Agent name comes from the parent directory name
-        agent_name = agent_md.parent.name
+        # Agent name defaults to the parent directory name
         results.append({
-            "name": fm.get("name", agent_name),
-            "description": fm.get("description", ""),
+            "name": entry.name_or(entry.path.parent.name),
+            "description": entry.description,
         })
     return results
 
 
-def _find_agent_dir(agents_dir: Path, name: str) -> Path | None:
-    """Find the directory for a named agent in the tree."""
-    if not agents_dir.exists():
-        return None
-    for agent_md in agents_dir.rglob("agent.md"):
-        agent_name = agent_md.parent.name
-        fm, _ = read_document(agent_md)
-        if agent_name == name or fm.get("name") == name:
-            return agent_md.parent
+def _find_agent_entry(agents_dir: Path, name: str) -> Entry | None:
+    """Find the agent.md catalog entry for a named agent."""
+    for entry in get_catalog(agents_dir).named("agent.md"):
+        if entry.path.parent.name == name or (entry.has_name and entry.name == name):
+            return entry
     return None
 
 
+def _find_named(catalog: Catalog, name: str) -> Entry | None:
+    """Return the first ``{name}.md`` at any depth in *catalog*."""
+    return next(catalog.named(f"{name}.md"), None)
+
+
 def _list_all_skills(skills_dir: Path, agents_dir: Path) -> list[dict[str, str]]:
     """List skills from both global skills/ and agent subdirectories."""
     results = _list_definitions(skills_dir)
     # Also include skills in subdirectories (SKILL.md pattern)
-    if skills_dir.exists():
-        for skill_md in sorted(skills_dir.rglob("SKILL.md")):
-            fm, _ = read_document(skill_md)
-            if fm.get("name") or fm.get("description"):
-                results.append({
-                    "name": fm.get("name", skill_md.parent.name),
-                    "description": fm.get("description", ""),
-                })
-    if agents_dir.exists():
-        for md_path in sorted(agents_dir.rglob("*.md")):
-            if md_path.name == "agent.md":
-                continue
-            if md_path.name.endswith("-legacy.md"):
-                continue
-            fm, _ = read_document(md_path)
-            # Only include files that look like skills (have a name in frontmatter
-            # or are .md files that aren't agent definitions)
-            if fm.get("name") or fm.get("description"):
-                results.append({
-                    "name": fm.get("name", md_path.stem),
-                    "description": fm.get("description", ""),
-                })
+    for entry in get_catalog(skills_dir).named("SKILL.md"):
+        if entry.described:
+            results.append({
+                "name": entry.name_or(entry.path.parent.name),
+                "description": entry.description,
+            })
+    for entry in get_catalog(agents_dir).markdown():
+        if entry.path.name == "agent.md":
+            continue
+        if entry.path.name.endswith("-legacy.md"):
+            continue
+        # Only include files that look like skills (have a name in frontmatter
+        # or are .md files that aren't agent definitions)
+        if entry.described:
+            results.append(_entry_dict(entry))
     return sorted(results, key=lambda x: x["name"])
 
 
 def _find_definition_in_tree(agents_dir: Path, skills_dir: Path,
                               instructions_dir: Path, name: str) -> str | None:
     """Search for a named definition across agents, skills, and instructions."""
-    # Check global skills
-    path = skills_dir / f"{name}.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    # Check global instructions
-    path = instructions_dir / f"{name}.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
+    # Check global skills, then global instructions
+    for directory in (skills_dir, instructions_dir):
+        catalog = get_catalog(directory)
+        entry = catalog.get(f"{name}.md")
+        if entry is not None:
+            return catalog.read(entry)
     # Search agent directories
-    if agents_dir.exists():
-        for md_path in agents_dir.rglob(f"{name}.md"):
-            return md_path.read_text(encoding="utf-8")
+    catalog = get_catalog(agents_dir)
+    entry = _find_named(catalog, name)
+    if entry is not None:
+        return catalog.read(entry)
     return None
 
 
@@ -114,27 +99,29 @@ def _get_definition(directory: Path, name: str) -> str:
     Searches the given directory first, then falls back to searching
     the agent tree if the directory is agents/.
     """
+    catalog = get_catalog(directory)
+
     # Direct lookup
-    path = directory / f"{name}.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
+    entry = catalog.get(f"{name}.md")
+    if entry is not None:
+        return catalog.read(entry)
 
     # For agents, search the tree for agent.md in a matching directory
     if directory.name == "agents":
-        agent_dir = _find_agent_dir(directory, name)
-        if agent_dir:
-            return (agent_dir / "agent.md").read_text(encoding="utf-8")
+        entry = _find_agent_entry(directory, name)
+        if entry is not None:
+            return catalog.read(entry)
 
     # Search recursively in the directory
-    matches = list(directory.rglob(f"{name}.md"))
-    if matches:
-        return matches[0].read_text(encoding="utf-8")
+    entry = _find_named(catalog, name)
+    if entry is not None:
+        return catalog.read(entry)
 
     # Build available list for error message
     if directory.name == "agents":
         available = [d["name"] for d in _list_agents_recursive(directory)]
     else:
-        available = [p.stem for p in sorted(directory.glob("*.md"))]
+        available = [e.path.stem for e in catalog.top_level()]
     raise ValueError(
         f"'{name}' not found in {directory.name}/. "
         f"Available: {', '.join(available)}"
@@ -221,15 +208,16 @@ def get_agent_definition(name: str) -> str:
     Args:
         name: The agent name (e.g., 'code-monkey', 'sprint-planner')
     """
-    agent_content = _get_definition(content_path("plugin", "agents"), name)
+    agents_dir = content_path("plugin", "agents")
+    agent_content = _get_definition(agents_dir, name)
 
     # Try to find and append contract.yaml
-    agents_dir = content_path("plugin", "agents")
-    agent_dir = _find_agent_dir(agents_dir, name)
-    if agent_dir:
-        contract_path = agent_dir / "contract.yaml"
-        if contract_path.exists():
-            contract_text = contract_path.read_text(encoding="utf-8")
+    entry = _find_agent_entry(agents_dir, name)
+    if entry is not None:
+        catalog = get_catalog(agents_dir)
+        contract = catalog.get(str(entry.path.parent / "contract.yaml"))
+        if contract is not None:
+            contract_text = catalog.read(contract)
             agent_content += (
                 "\n\n---\n\n"
                 "## Contract\n\n"
@@ -251,19 +239,16 @@ def get_skill_definition(name: str) -> str:
         name: The skill name (e.g., 'execute-ticket', 'plan-sprint')
     """
     # Try global skills: direct .md file or subdirectory SKILL.md
-    skills_dir = content_path("plugin", "skills")
-    path = skills_dir / f"{name}.md"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    skill_md = skills_dir / name / "SKILL.md"
-    if skill_md.exists():
-        return skill_md.read_text(encoding="utf-8")
+    skills = get_catalog(content_path("plugin", "skills"))
+    for relpath in (f"{name}.md", f"{name}/SKILL.md"):
+        entry = skills.get(relpath)
+        if entry is not None:
+            return skills.read(entry)
     # Search agent directories
-    agents_dir = content_path("plugin", "agents")
-    if agents_dir.exists():
-        matches = list(agents_dir.rglob(f"{name}.md"))
-        if matches:
-            return matches[0].read_text(encoding="utf-8")
+    agents = get_catalog(content_path("plugin", "agents"))
+    entry = _find_named(agents, name)
+    if entry is not None:
+        return agents.read(entry)
     raise ValueError(
         f"'{name}' not found in skills/ or agent directories."
     )
@@ -499,3 +484,19 @@ def get_version() -> str:
         "metadata_version": metadata_version,
         "source_path": source_path,
     }, indent=2)
+
+
+@server.tool()
+def get_server_metrics() -> str:
+    """Return per-tool latency and resource metrics for this MCP server.
+
+    For every tool called since the server started: call and error
+    counts, wall-time and CPU-time histograms (count, total, mean, max,
+    approximate p50/p95 and bucket counts in ms), and the totals of
+    files read, bytes parsed, DB queries and subprocesses spawned.
+    Tools are ordered by total wall time, so the ones agents spend the
+    most time waiting on come first.
+    """
+    from clasi.metrics import registry
+
+    return json.dumps(registry.snapshot(), indent=2)
@@ -0,0 +1,168 @@
+"""TranscriptStore: content-addressed, gzip-compressed transcript blobs.
+
+Subagent and task logs used to embed the full raw JSON transcript in a
+fenced block. The log directory then grew large, and so did every scan
+of it. The hooks now store each transcript once, under
+``docs/clasi/log/transcripts/<aa>/<sha256>.jsonl.gz``. The key is the
+SHA-256 of the transcript's raw JSONL bytes, so the same transcript
+logged twice is stored once. The markdown log keeps only a reference
+line::
+
+    transcript: sha256:<hex> (`transcripts/<aa>/<hex>.jsonl.gz`)
+
+``expand()`` turns those references back into the raw JSON blocks the
+logs used to contain, and ``iter_messages()`` streams a stored
+transcript without decompressing it all into memory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+STORE_DIRNAME = "transcripts"
+
+_CHUNK = 1 << 20
+
+_REF_RE = re.compile(r"^transcript: sha256:([0-9a-f]{64})\b.*$", re.MULTILINE)
+
+
+def iter_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    """Yield the JSON objects of a JSONL stream, skipping blank or bad lines."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(msg, dict):
+            yield msg
+
+
+def reference_line(digest: str) -> str:
+    """Return the markdown line that stands in for a stored transcript."""
+    return (
+        f"transcript: sha256:{digest} "
+        f"(`{STORE_DIRNAME}/{digest[:2]}/{digest}.jsonl.gz`)"
+    )
+
+
+def find_references(text: str) -> list[str]:
+    """Return the transcript digests referenced in a markdown log."""
+    return _REF_RE.findall(text)
+
+
+class TranscriptStore:
+    """Transcript blobs under ``<log_dir>/transcripts/``."""
+
+    def __init__(self, log_dir: str | Path):
+        self._root = Path(log_dir) / STORE_DIRNAME
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def path_for(self, digest: str) -> Path:
+        return self._root / digest[:2] / f"{digest}.jsonl.gz"
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    # --- Writing ---
+
+    def put_file(self, source: str | Path) -> str:
+        """Store a transcript file and return its SHA-256 digest.
+
+        The file is hashed and compressed in one streaming pass. If the
+        blob already exists, the new copy is discarded.
+        """
+        with open(source, "rb") as src:
+            return self._put_stream(src)
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store an in-memory transcript and return its digest."""
+        import io
+
+        return self._put_stream(io.BytesIO(data))
+
+    def _put_stream(self, src: IO[bytes]) -> str:
+        self._root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._root, prefix=".tmp-", suffix=".gz")
+        h = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                # Fixed name and mtime keep identical transcripts byte-identical.
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+                    for chunk in iter(lambda: src.read(_CHUNK), b""):
+                        h.update(chunk)
+                        gz.write(chunk)
+            digest = h.hexdigest()
+            dest = self.path_for(digest)
+            if dest.exists():
+                os.unlink(tmp)
+            else:
+                dest.parent.mkdir(exist_ok=True)
+                os.replace(tmp, dest)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        return digest
+
+    # --- Reading ---
+
+    def open_text(self, digest: str) -> IO[str]:
+        """Open a stored transcript as a text stream of JSONL lines.
+
+        Raises FileNotFoundError if no blob exists for *digest*.
+        """
+        return gzip.open(self.path_for(digest), "rt", encoding="utf-8")
+
+    def iter_messages(self, digest: str) -> Iterator[dict]:
+        """Yield the messages of a stored transcript one at a time."""
+        with self.open_text(digest) as f:
+            yield from iter_jsonl(f)
+
+    def read_bytes(self, digest: str) -> bytes:
+        """Return the original transcript bytes."""
+        with gzip.open(self.path_for(digest), "rb") as f:
+            return f.read()
+
+    def expand(self, text: str) -> str:
+        """Replace transcript references in a log with raw JSON blocks.
+
+        Each reference becomes the ``json.dumps(messages, indent=2)`` block
+        that logs used to embed. References to missing blobs are left as
+        they are.
+        """
+
+        def _replace(match: re.Match) -> str:
+            digest = match.group(1)
+            if not self.exists(digest):
+                return match.group(0)
+            messages = list(self.iter_messages(digest))
+            return "```json\n" + json.dumps(messages, indent=2) + "\n```"
+
+        return _REF_RE.sub(_replace, text)
+
+    def expand_file(self, log_file: str | Path) -> str:
+        """Return a log file's text with its transcript references expanded."""
+        return self.expand(Path(log_file).read_text(encoding="utf-8"))
+
+    def digests(self) -> list[str]:
+        """Return the digests of every stored transcript, sorted."""
+        if not self._root.exists():
+            return []
+        return sorted(
+            p.name[: -len(".jsonl.gz")]
+            for p in self._root.glob("*/*.jsonl.gz")
+        )
@@ -33,6 +33,8 @@ from pathlib import Path
 
 import yaml
 
+from clasi import git_refs
+
 DEFAULT_FORMAT = "X+.YYYYMMDD.R+"
 
 # Priority-ordered list of version file names and their types.
@@ -278,15 +280,7 @@ VERSION_PATTERN = re.compile(r"^v?(\d+)\.(\d{8})\.(\d+)$")
 
 def _get_existing_tags() -> list[str]:
     """Return all git tags in the current repository."""
-    result = subprocess.run(
-        ["git", "tag", "-l"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    if result.returncode != 0:
-        return []
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    return git_refs.list_tags()
 
 
 def compute_next_version(major: int = 0) -> str:
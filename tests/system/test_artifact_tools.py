@@ -9,6 +9,10 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from clasi.tools.artifact_tools import (
+    _branch_commits,
+    _test_cache_key,
+    _worktree_tree_hash,
+    batch_update_tickets,
     close_sprint,
     create_sprint,
     create_ticket,
@@ -22,6 +26,9 @@ from clasi.tools.artifact_tools import (
 )
 from clasi.frontmatter import read_frontmatter, write_frontmatter
 from clasi.mcp_server import set_project
+from clasi.project import Project
+from clasi.state_db_class import StateDB
+from clasi.versioning import update_version_file
 from clasi.state_db import (
     acquire_lock,
     advance_phase,
@@ -308,6 +315,73 @@ class TestMoveTicketToDone:
         assert "plan_new_path" in result
 
 
+class TestBatchUpdateTickets:
+    def _tickets(self, work_dir, n, todo=None):
+        create_sprint("Sprint")
+        _advance_to_ticketing(work_dir, "001")
+        return [
+            json.loads(create_ticket("001", f"Task {i}", todo=todo))["path"]
+            for i in range(1, n + 1)
+        ]
+
+    def test_updates_and_moves(self, work_dir):
+        paths = self._tickets(work_dir, 3)
+        result = json.loads(batch_update_tickets([
+            {"path": paths[0], "status": "done", "move_to_done": True},
+            {"path": paths[1], "status": "in-progress"},
+            {"path": paths[2], "status": "done", "move_to_done": True},
+        ]))
+        r = result["results"]
+        assert [x["old_status"] for x in r] == ["todo", "todo", "todo"]
+        assert [x["new_status"] for x in r] == ["done", "in-progress", "done"]
+        assert "/done/" in r[0]["new_path"] and os.path.exists(r[0]["new_path"])
+        assert r[1]["new_path"] == paths[1]
+        assert read_frontmatter(r[2]["new_path"])["status"] == "done"
+        assert read_frontmatter(paths[1])["status"] == "in-progress"
+        assert result["completed_todos"] == []
+
+    def test_validates_before_applying(self, work_dir):
+        paths = self._tickets(work_dir, 2)
+        with pytest.raises(ValueError, match="Invalid status"):
+            batch_update_tickets([
+                {"path": paths[0], "status": "done", "move_to_done": True},
+                {"path": paths[1], "status": "bogus"},
+            ])
+        assert os.path.exists(paths[0])
+        assert read_frontmatter(paths[0])["status"] == "todo"
+
+    def test_rejects_duplicate_paths(self, work_dir):
+        paths = self._tickets(work_dir, 1)
+        with pytest.raises(ValueError, match="more than once"):
+            batch_update_tickets([
+                {"path": paths[0], "status": "done", "move_to_done": True},
+                {"path": paths[0], "status": "in-progress"},
+            ])
+        assert os.path.exists(paths[0])
+        assert read_frontmatter(paths[0])["status"] == "todo"
+
+    def test_missing_ticket(self, work_dir):
+        self._tickets(work_dir, 1)
+        with pytest.raises(ValueError, match="Ticket not found"):
+            batch_update_tickets([{"path": "nope.md", "status": "done"}])
+
+    def test_archives_todo_once_all_tickets_done(self, work_dir):
+        todo_dir = work_dir / "docs" / "clasi" / "todo"
+        todo_dir.mkdir(parents=True, exist_ok=True)
+        create_sprint("Sprint")
+        _advance_to_ticketing(work_dir, "001")
+        (todo_dir / "idea.md").write_text("---\nstatus: pending\n---\n\n# Idea\n")
+        paths = [
+            json.loads(create_ticket("001", f"Part {i}", todo="idea.md"))["path"]
+            for i in (1, 2)
+        ]
+        result = json.loads(batch_update_tickets([
+            {"path": p, "status": "done", "move_to_done": True} for p in paths
+        ]))
+        assert result["completed_todos"] == ["idea.md"]
+        assert (todo_dir / "done" / "idea.md").exists()
+
+
 class TestCloseSprint:
     def test_closes_sprint(self, work_dir):
         create_sprint("Sprint")
@@ -672,6 +746,7 @@ class TestCloseSprintFull:
         assert "done" in result["new_path"]
         assert "status" not in result
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -687,23 +762,27 @@ class TestCloseSprintFull:
         update_ticket_status(ticket["path"], "done")
         move_ticket_to_done(ticket["path"])
 
-        # Mock subprocess calls: pytest, git add -A (version bump), git commit (version bump),
-        # git status --porcelain (.clasi.db guard, clean→no-op), git rev-parse --verify branch
-        # (merge check), git merge-base --is-ancestor, git rebase, git checkout master,
-        # git merge --no-ff, git push --tags, git rev-parse --verify branch (delete check),
-        # git branch -d
+        # Mock subprocess calls: merge pre-check (git merge-base x2, git merge-tree),
+        # pytest, git add -A (version bump), git commit (version bump),
+        # git status --porcelain (.clasi.db guard, clean→no-op),
+        # merge check again, git rebase, git checkout master,
+        # git merge --no-ff, git push --tags, git branch -d.
+        # Branch existence is read from the ref store (patched above).
         mock_run.side_effect = [
+            self._make_subprocess_result(1),  # git merge-base --is-ancestor (precondition)
+            self._make_subprocess_result(1),  # git merge-base --is-ancestor (not a fast-forward)
+            self._make_subprocess_result(0),  # git merge-tree --write-tree (clean)
             self._make_subprocess_result(0, "all tests passed"),  # pytest
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(0),  # git rev-parse --verify branch (merge check)
             self._make_subprocess_result(1),  # git merge-base --is-ancestor (not yet merged)
+            self._make_subprocess_result(1),  # git merge-base --is-ancestor (not a fast-forward)
+            self._make_subprocess_result(0),  # git merge-tree --write-tree (clean)
             self._make_subprocess_result(0),  # git rebase master sprint/001-sprint
             self._make_subprocess_result(0),  # git checkout master
             self._make_subprocess_result(0),  # git merge --no-ff
             self._make_subprocess_result(0),  # git push --tags
-            self._make_subprocess_result(0),  # git rev-parse --verify branch (delete check)
             self._make_subprocess_result(0),  # git branch -d
         ]
 
@@ -713,6 +792,44 @@ class TestCloseSprintFull:
         assert result["git"]["merged"] is True
         assert result["git"]["merge_target"] == "master"
         assert result["git"]["branch_name"] == "sprint/001-sprint"
+        assert result["git"]["merge_strategy"] == "rebase + --no-ff"
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_fast_forward_reports_no_rebase(self, mock_run, mock_ver, mock_tag, work_dir):
+        """A branch that already contains main is merged without a rebase."""
+        create_sprint("Sprint")
+        _advance_to_executing(work_dir, "001")
+        (work_dir / "pyproject.toml").write_text(
+            '[project]\nname = "test"\nversion = "0.0.0"\n'
+        )
+        ticket = json.loads(create_ticket("001", "Task"))
+        update_ticket_status(ticket["path"], "done")
+        move_ticket_to_done(ticket["path"])
+
+        mock_run.side_effect = [
+            self._make_subprocess_result(1),  # git merge-base --is-ancestor (precondition)
+            self._make_subprocess_result(0),  # git merge-base --is-ancestor (fast-forward)
+            self._make_subprocess_result(0, "all tests passed"),  # pytest
+            self._make_subprocess_result(0),  # git add -A (version bump)
+            self._make_subprocess_result(0),  # git commit (version bump)
+            self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
+            self._make_subprocess_result(1),  # git merge-base --is-ancestor (not yet merged)
+            self._make_subprocess_result(0),  # git merge-base --is-ancestor (fast-forward)
+            self._make_subprocess_result(0),  # git checkout master
+            self._make_subprocess_result(0),  # git merge --no-ff
+            self._make_subprocess_result(0),  # git push --tags
+            self._make_subprocess_result(0),  # git branch -d
+        ]
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert result["git"]["fast_forward"] is True
+        assert result["git"]["merge_strategy"] == "--no-ff"
+        commands = [call.args[0][:2] for call in mock_run.call_args_list]
+        assert ["git", "rebase"] not in commands
 
     @patch("subprocess.run")
     def test_test_failure_returns_error(self, mock_run, work_dir):
@@ -734,11 +851,12 @@ class TestCloseSprintFull:
         assert "tests" not in result["completed_steps"]
         assert result["error"]["recovery"]["instruction"] is not None
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
     def test_merge_conflict_returns_error(self, mock_run, mock_ver, mock_tag, work_dir):
-        """When merge has conflicts, return structured error."""
+        """When the merge check at the merge step finds conflicts, return structured error."""
         create_sprint("Sprint")
         _advance_to_executing(work_dir, "001")
         (work_dir / "pyproject.toml").write_text(
@@ -749,17 +867,16 @@ class TestCloseSprintFull:
         move_ticket_to_done(ticket["path"])
 
         mock_run.side_effect = [
+            self._make_subprocess_result(1),  # git merge-base (precondition: not ancestor)
+            self._make_subprocess_result(1),  # git merge-base (not a fast-forward)
+            self._make_subprocess_result(0),  # git merge-tree (clean before version bump)
             self._make_subprocess_result(0, "all tests passed"),  # pytest
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(0),  # git rev-parse --verify
             self._make_subprocess_result(1),  # git merge-base (not ancestor)
-            self._make_subprocess_result(0),  # git rebase master sprint/001-sprint
-            self._make_subprocess_result(0),  # git checkout master
-            self._make_subprocess_result(1, "", "CONFLICT in foo.py"),  # git merge --no-ff
-            self._make_subprocess_result(0, "foo.py\n"),  # git diff --name-only
-            self._make_subprocess_result(0),  # git merge --abort
+            self._make_subprocess_result(1),  # git merge-base (not a fast-forward)
+            self._make_subprocess_result(1, "4b825dc\nfoo.py\n"),  # git merge-tree (conflict)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -773,7 +890,36 @@ class TestCloseSprintFull:
         recovery = get_recovery_state(db_path)
         assert recovery is not None
         assert recovery["step"] == "merge"
+        # The conflict was found without a rebase, checkout or merge
+        commands = [c.args[0][:2] for c in mock_run.call_args_list]
+        assert ["git", "rebase"] not in commands
+        assert ["git", "checkout"] not in commands
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("subprocess.run")
+    def test_merge_precheck_conflict_stops_before_tests(self, mock_run, work_dir):
+        """A conflict found by the merge pre-check fails the precondition step."""
+        create_sprint("Sprint")
+        _advance_to_executing(work_dir, "001")
+        ticket = json.loads(create_ticket("001", "Task"))
+        update_ticket_status(ticket["path"], "done")
+        move_ticket_to_done(ticket["path"])
+
+        mock_run.side_effect = [
+            self._make_subprocess_result(1),  # git merge-base (not ancestor)
+            self._make_subprocess_result(1),  # git merge-base (not a fast-forward)
+            self._make_subprocess_result(1, "4b825dc\nfoo.py\nbar.py\n"),  # git merge-tree
+        ]
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "error"
+        assert result["error"]["step"] == "precondition"
+        assert result["error"]["conflicted_files"] == ["foo.py", "bar.py"]
+        assert result["completed_steps"] == []
+        assert mock_run.call_count == 3  # tests never ran
+        assert (work_dir / "docs" / "clasi" / "sprints" / "001-sprint").exists()
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -793,9 +939,7 @@ class TestCloseSprintFull:
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(1),  # git rev-parse --verify (branch gone, merge check)
             self._make_subprocess_result(0),  # git push --tags
-            self._make_subprocess_result(1),  # git rev-parse --verify (branch gone, delete check)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -815,6 +959,7 @@ class TestCloseSprintFull:
         assert result["error"]["step"] == "precondition"
         assert "in-progress" in result["error"]["message"]
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -834,15 +979,14 @@ class TestCloseSprintFull:
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(1),  # git rev-parse --verify (merge: branch gone)
             self._make_subprocess_result(0),  # git push --tags
-            self._make_subprocess_result(1),  # git rev-parse --verify (delete: branch gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
         assert result["status"] == "success"
         assert any("moved ticket" in r for r in result["repairs"])
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -862,9 +1006,7 @@ class TestCloseSprintFull:
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(1),  # git rev-parse --verify (merge: branch gone)
             self._make_subprocess_result(0),  # git push --tags
-            self._make_subprocess_result(1),  # git rev-parse --verify (delete: branch gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -880,6 +1022,7 @@ class TestCloseSprintFull:
         assert "branch_deleted" in result["git"]
         assert "branch_name" in result["git"]
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -903,9 +1046,7 @@ class TestCloseSprintFull:
             self._make_subprocess_result(0),  # git add -A (version bump)
             self._make_subprocess_result(0),  # git commit (version bump)
             self._make_subprocess_result(0, ""),  # git status --porcelain .clasi.db (clean)
-            self._make_subprocess_result(1),  # git rev-parse --verify (merge: branch gone)
             self._make_subprocess_result(0),  # git push --tags
-            self._make_subprocess_result(1),  # git rev-parse --verify (delete: branch gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -916,6 +1057,435 @@ class TestCloseSprintFull:
         assert recovery is None
 
 
+    def _setup_closable_sprint(self, work_dir):
+        create_sprint("Sprint")
+        _advance_to_executing(work_dir, "001")
+        (work_dir / "pyproject.toml").write_text(
+            '[project]\nname = "test"\nversion = "0.0.0"\n'
+        )
+        ticket = json.loads(create_ticket("001", "Task"))
+        update_ticket_status(ticket["path"], "done")
+        move_ticket_to_done(ticket["path"])
+        return work_dir / "docs" / "clasi" / ".clasi.db"
+
+    def _lifecycle_results(self, run_tests):
+        """subprocess results for a successful close; see test_full_lifecycle_success."""
+        results = [self._make_subprocess_result(rc) for rc in (1, 1, 0)]
+        if run_tests:
+            results.append(self._make_subprocess_result(0, "all tests passed"))
+        results += [self._make_subprocess_result(rc) for rc in (0, 0)]
+        results.append(self._make_subprocess_result(0, ""))
+        results += [self._make_subprocess_result(rc) for rc in (1, 1, 0, 0, 0, 0, 0, 0)]
+        return results
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_passing_tests_are_recorded(self, mock_run, mock_ver, mock_tag, mock_hash, work_dir):
+        """A passing test run is recorded against the tree hash and command."""
+        db_path = self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = self._lifecycle_results(run_tests=True)
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        recorded = StateDB(db_path).get_test_result("tree1", "uv run pytest")
+        assert recorded["returncode"] == 0
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", side_effect=["before", "after"])
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_pass_is_recorded_under_tree_left_by_run(
+        self, mock_run, mock_ver, mock_tag, mock_hash, work_dir,
+    ):
+        """Files the run rewrites (coverage reports) are part of the key."""
+        db_path = self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = self._lifecycle_results(run_tests=True)
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert StateDB(db_path).get_test_result("before", "uv run pytest") is None
+        assert StateDB(db_path).get_test_result("after", "uv run pytest") is not None
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("subprocess.run")
+    def test_failing_tests_are_not_recorded(self, mock_run, mock_hash, work_dir):
+        db_path = self._setup_closable_sprint(work_dir)
+        mock_run.return_value = self._make_subprocess_result(1, "FAILED", "1 failed")
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["error"]["step"] == "tests"
+        assert StateDB(db_path).get_test_result("tree1", "uv run pytest") is None
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_cached_pass_skips_tests(self, mock_run, mock_ver, mock_tag, mock_hash, work_dir):
+        """A retry on a tree whose tests already passed does not rerun them."""
+        db_path = self._setup_closable_sprint(work_dir)
+        StateDB(db_path).record_test_result("tree1", "uv run pytest", 0, 42.0)
+        mock_run.side_effect = self._lifecycle_results(run_tests=False)
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert any("passed on tree tree1" in r for r in result["repairs"])
+        assert not any(c.args[0][:1] == ["uv"] for c in mock_run.call_args_list)
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_serial_run_ignores_sharded_pass(
+        self, mock_run, mock_ver, mock_tag, mock_hash, work_dir,
+    ):
+        db_path = self._setup_closable_sprint(work_dir)
+        StateDB(db_path).record_test_result("tree1", "uv run pytest --shards=4", 0, 42.0)
+        mock_run.side_effect = self._lifecycle_results(run_tests=True)
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert mock_run.call_args_list[3].args[0] == ["uv", "run", "pytest"]
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("clasi.tools.artifact_tools.run_sharded")
+    @patch("subprocess.run")
+    def test_sharded_run_reuses_serial_pass(
+        self, mock_run, mock_sharded, mock_ver, mock_tag, mock_hash, work_dir,
+    ):
+        db_path = self._setup_closable_sprint(work_dir)
+        StateDB(db_path).record_test_result("tree1", "uv run pytest", 0, 42.0)
+        mock_run.side_effect = self._lifecycle_results(run_tests=False)
+
+        result = json.loads(close_sprint(
+            "001", branch_name="sprint/001-sprint", test_shards=4,
+        ))
+        assert result["status"] == "success"
+        mock_sharded.assert_not_called()
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", return_value="tree1")
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_force_tests_ignores_cache(self, mock_run, mock_ver, mock_tag, mock_hash, work_dir):
+        db_path = self._setup_closable_sprint(work_dir)
+        StateDB(db_path).record_test_result("tree1", "uv run pytest", 0, 42.0)
+        mock_run.side_effect = self._lifecycle_results(run_tests=True)
+
+        result = json.loads(close_sprint(
+            "001", branch_name="sprint/001-sprint", force_tests=True,
+        ))
+        assert result["status"] == "success"
+        assert mock_run.call_args_list[3].args[0] == ["uv", "run", "pytest"]
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_retry_resumes_at_failed_step(self, mock_run, mock_ver, mock_tag, work_dir):
+        """A retry after a merge failure starts at the merge, not from scratch."""
+        db_path = self._setup_closable_sprint(work_dir)
+        first = self._lifecycle_results(run_tests=True)[:10]
+        first[-1] = self._make_subprocess_result(1, "4b825dc\nfoo.py\n")  # conflict
+        mock_run.side_effect = first
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["error"]["step"] == "merge"
+        journal = {e["step"]: e for e in StateDB(db_path).get_close_journal("001")}
+        assert sorted(journal) == sorted([
+            "precondition_verification", "tests", "archive", "db_update", "version_bump",
+        ])
+        assert journal["version_bump"]["outputs"] == {"version": "0.20260329.1"}
+
+        mock_run.reset_mock()
+        mock_run.side_effect = self._lifecycle_results(run_tests=False)[5:]
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert result["version"] == "0.20260329.1"
+        # No second test run, version bump or tag
+        assert mock_ver.call_count == 1
+        assert mock_tag.call_count == 1
+        commands = [c.args[0][:2] for c in mock_run.call_args_list]
+        assert ["uv", "run"] not in commands
+        assert ["git", "commit"] not in commands
+        steps = {s["step"]: s for s in result["steps"]}
+        assert steps["version_bump"]["resumed"] is True
+        assert steps["merge"]["resumed"] is False
+        assert all(s["duration"] >= 0 for s in result["steps"])
+        # A finished close leaves no journal behind
+        assert StateDB(db_path).get_close_journal("001") == []
+
+    def _fail_at_merge(self, mock_run):
+        first = self._lifecycle_results(run_tests=True)[:10]
+        first[-1] = self._make_subprocess_result(1, "4b825dc\nfoo.py\n")  # conflict
+        mock_run.side_effect = first
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["error"]["step"] == "merge"
+        mock_run.reset_mock()
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash",
+           side_effect=["tree1", "tree1", "tree2", "tree2"])
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_retry_on_changed_tree_reruns_tests(
+        self, mock_run, mock_ver, mock_tag, mock_hash, work_dir,
+    ):
+        """Sources changed since the journaled test run are tested again."""
+        self._setup_closable_sprint(work_dir)
+        self._fail_at_merge(mock_run)
+
+        mock_run.side_effect = (
+            [self._make_subprocess_result(0, "all tests passed")]
+            + self._lifecycle_results(run_tests=False)[5:]
+        )
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert result["status"] == "success"
+        assert mock_run.call_args_list[0].args[0] == ["uv", "run", "pytest"]
+        steps = {s["step"]: s for s in result["steps"]}
+        assert steps["precondition_verification"]["resumed"] is True
+        assert steps["tests"]["resumed"] is False
+        assert steps["version_bump"]["resumed"] is True
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_journal_is_dropped_when_branches_move(
+        self, mock_run, mock_ver, mock_tag, work_dir,
+    ):
+        """A journal written against other commits is not resumed."""
+        db_path = self._setup_closable_sprint(work_dir)
+        commits = {"sprint/001-sprint": "a" * 40, "master": "m" * 40}
+        with patch("clasi.tools.artifact_tools._branch_commits",
+                   side_effect=lambda root, *names, **kw: dict(commits)):
+            self._fail_at_merge(mock_run)
+            # Someone moved main since the failed attempt.
+            commits["master"] = "n" * 40
+            mock_run.side_effect = self._lifecycle_results(run_tests=True)
+            result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+
+        assert result["status"] == "success"
+        assert not any(s["resumed"] for s in result["steps"])
+        assert mock_ver.call_count == 2
+        assert StateDB(db_path).get_close_journal("001") == []
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_retry_follows_own_commits(self, mock_run, mock_ver, mock_tag, work_dir):
+        """The version bump commit moves the branch without voiding the journal."""
+        self._setup_closable_sprint(work_dir)
+        commits = {"sprint/001-sprint": "a" * 40, "master": "m" * 40}
+
+        def branch_commits(root, *names, **kw):
+            # After the version bump commit the sprint branch has moved on.
+            if mock_run.call_count >= 5:
+                commits["sprint/001-sprint"] = "b" * 40
+            return dict(commits)
+
+        with patch("clasi.tools.artifact_tools._branch_commits",
+                   side_effect=branch_commits):
+            self._fail_at_merge(mock_run)
+            mock_run.side_effect = self._lifecycle_results(run_tests=False)[5:]
+            result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+
+        assert result["status"] == "success"
+        assert mock_ver.call_count == 1
+        steps = {s["step"]: s for s in result["steps"]}
+        assert steps["version_bump"]["resumed"] is True
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("subprocess.run")
+    def test_success_reports_step_durations(self, mock_run, mock_ver, mock_tag, work_dir):
+        self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = self._lifecycle_results(run_tests=True)
+
+        result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
+        assert [s["step"] for s in result["steps"]] == [
+            "precondition_verification", "tests", "archive", "db_update",
+            "version_bump", "merge", "push_tags", "delete_branch",
+        ]
+        assert not any(s["resumed"] for s in result["steps"])
+
+    @patch("clasi.tools.artifact_tools._worktree_tree_hash", side_effect=["before", "after"])
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.create_version_tag")
+    @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
+    @patch("clasi.tools.artifact_tools.run_sharded")
+    @patch("subprocess.run")
+    def test_sharded_pass_is_recorded(
+        self, mock_run, mock_sharded, mock_ver, mock_tag, mock_hash, work_dir,
+    ):
+        """A passing sharded run is cached under its own key."""
+        db_path = self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = self._lifecycle_results(run_tests=False)
+        mock_sharded.return_value = {
+            "passed": True, "tests": 3, "failures": 0, "skipped": 0,
+            "failed_tests": [], "slowest": [], "duration": 1.0, "shards": [],
+        }
+
+        result = json.loads(close_sprint(
+            "001", branch_name="sprint/001-sprint", test_shards=2,
+        ))
+        assert result["status"] == "success"
+        db = StateDB(db_path)
+        assert db.get_test_result("after", "uv run pytest --shards=2")["returncode"] == 0
+        # A serial run checks coverage; it must not reuse the sharded pass.
+        assert db.get_test_result("after", "uv run pytest") is None
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.run_sharded")
+    @patch("subprocess.run")
+    def test_sharded_test_failure_returns_summary(self, mock_run, mock_sharded, work_dir):
+        """test_shards runs the suite through run_sharded and reports its summary."""
+        self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = self._lifecycle_results(run_tests=False)[:3]
+        summary = {
+            "passed": False, "tests": 3, "failures": 1, "skipped": 0,
+            "failed_tests": ["tests.test_x::test_bad"], "slowest": [],
+            "duration": 1.0,
+            "shards": [{
+                "shard": 1, "files": 1, "tests": 3, "failed": 1, "skipped": 0,
+                "returncode": 1, "duration": 1.0, "log": "shard-1.log", "passed": False,
+            }],
+        }
+        mock_sharded.return_value = summary
+
+        result = json.loads(close_sprint(
+            "001", branch_name="sprint/001-sprint", test_shards=4,
+        ))
+        assert result["error"]["step"] == "tests"
+        assert result["error"]["test_summary"] == summary
+        assert "FAILED tests.test_x::test_bad" in result["error"]["output"]
+        cmd, shards, log_dir = mock_sharded.call_args.args
+        assert cmd == ["uv", "run", "pytest"]
+        assert shards == 4
+        assert log_dir == work_dir / "docs" / "clasi" / "log" / "tests" / "sprint-001"
+
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
+    @patch("clasi.tools.artifact_tools.run_sharded")
+    @patch("subprocess.run")
+    def test_sharding_needs_pytest(self, mock_run, mock_sharded, work_dir):
+        self._setup_closable_sprint(work_dir)
+        mock_run.side_effect = (
+            self._lifecycle_results(run_tests=False)[:3]
+            + [self._make_subprocess_result(1, "npm ERR!")]
+        )
+
+        result = json.loads(close_sprint(
+            "001", branch_name="sprint/001-sprint",
+            test_command="npm test", test_shards=4,
+        ))
+        assert result["error"]["message"] == "Tests failed (exit code 1)"
+        mock_sharded.assert_not_called()
+
+    def test_worktree_tree_hash_ignores_clasi_docs(self, tmp_path):
+        """The cache key tracks source changes, not CLASI's own artifacts."""
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=tmp_path, capture_output=True, text=True, check=True,
+            ).stdout
+        git("init", "-b", "master")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "Test")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        clasi_dir = tmp_path / "docs" / "clasi"
+        clasi_dir.mkdir(parents=True)
+        (clasi_dir / "sprint.md").write_text("planning\n")
+        git("add", "-A")
+        git("commit", "-m", "initial")
+
+        first = _worktree_tree_hash(tmp_path, clasi_dir)
+        assert first is not None
+        (clasi_dir / "sprint.md").write_text("closed\n")
+        (clasi_dir / ".clasi.db").write_bytes(b"state")
+        assert _worktree_tree_hash(tmp_path, clasi_dir) == first
+
+        objects = git("count-objects", "-v")
+        (tmp_path / "new_module.py").write_text("y = 2\n")
+        assert _worktree_tree_hash(tmp_path, clasi_dir) != first
+        # Hashing never stages anything nor writes objects.
+        assert git("diff", "--cached", "--name-only") == ""
+        assert git("count-objects", "-v") == objects
+
+        (tmp_path / "new_module.py").unlink()
+        (tmp_path / "app.py").unlink()
+        assert _worktree_tree_hash(tmp_path, clasi_dir) != first
+        (tmp_path / "app.py").write_text("x = 1\n")
+        assert _worktree_tree_hash(tmp_path, clasi_dir) == first
+
+    def test_test_cache_key_survives_version_bump(self, tmp_path):
+        """The version bump close_sprint commits does not change the key."""
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=tmp_path, capture_output=True, text=True, check=True,
+            ).stdout
+        git("init", "-b", "master")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "Test")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        pyproject = tmp_path / "pyproject.toml"
+        pyproject.write_text('[project]\nname = "test"\nversion = "0.1.0"\n')
+        (tmp_path / "docs" / "clasi").mkdir(parents=True)
+        git("add", "-A")
+        git("commit", "-m", "initial")
+        project = Project(tmp_path)
+
+        before = _test_cache_key(project)
+        assert before is not None
+        update_version_file(pyproject, "pyproject", "0.20260329.1")
+        git("add", "-A")
+        git("commit", "-m", "chore: bump version to 0.20260329.1")
+        assert _test_cache_key(project) == before
+
+        (tmp_path / "app.py").write_text("x = 2\n")
+        assert _test_cache_key(project) != before
+
+    def test_branch_commits_skip_state_db_commits(self, tmp_path):
+        """Commits that only update .clasi.db do not move the journal key."""
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=tmp_path, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        git("init", "-b", "master")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "Test")
+        (tmp_path / "app.py").write_text("x = 1\n")
+        db_file = tmp_path / "docs" / "clasi" / ".clasi.db"
+        db_file.parent.mkdir(parents=True)
+        db_file.write_bytes(b"state")
+        git("add", "-A")
+        git("commit", "-m", "initial")
+        source = git("rev-parse", "HEAD")
+
+        db_file.write_bytes(b"journal")
+        git("commit", "-am", "chore: update .clasi.db")
+        assert _branch_commits(tmp_path, "master", ignore=db_file) == {"master": source}
+        assert _branch_commits(tmp_path, "master")["master"] == git("rev-parse", "HEAD")
+
+        (tmp_path / "app.py").write_text("x = 2\n")
+        git("commit", "-am", "change")
+        assert _branch_commits(tmp_path, "master", ignore=db_file) == {
+            "master": git("rev-parse", "HEAD"),
+        }
+
+    def test_worktree_tree_hash_outside_repository(self, tmp_path):
+        assert _worktree_tree_hash(tmp_path, tmp_path / "docs" / "clasi") is None
+
+
 class TestCloseSprintLockAndDbGuard:
     """Tests for .clasi.db commit guard (step 5b) and lock release on merge failure."""
 
@@ -926,6 +1496,8 @@ class TestCloseSprintLockAndDbGuard:
         result.stderr = stderr
         return result
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
+    @patch("clasi.git_refs.current_branch", MagicMock(return_value="sprint/001-sprint"))
     @patch("subprocess.run")
     def test_dirty_db_guard_commits_when_versioning_disabled(self, mock_run, work_dir):
         """Guard stages and commits .clasi.db when dirty and versioning is manual."""
@@ -941,18 +1513,13 @@ class TestCloseSprintLockAndDbGuard:
         move_ticket_to_done(ticket["path"])
 
         # Call sequence (no version bump with manual trigger):
-        # pytest, git status --porcelain (dirty), git rev-parse --abbrev-ref HEAD
-        # (on sprint branch), git add .clasi.db, git commit,
-        # git rev-parse --verify (branch gone), git push --tags (skipped),
-        # git rev-parse --verify (delete, branch gone)
+        # pytest, git status --porcelain (dirty), git add .clasi.db, git commit
+        # (on sprint branch), git push --tags (skipped); the branch is gone.
         mock_run.side_effect = [
             self._make_subprocess_result(0, ""),        # pytest (pass)
             self._make_subprocess_result(0, " M docs/clasi/.clasi.db\n"),  # git status --porcelain (dirty)
-            self._make_subprocess_result(0, "sprint/001-sprint\n"),  # git rev-parse --abbrev-ref HEAD
             self._make_subprocess_result(0),            # git add .clasi.db
             self._make_subprocess_result(0),            # git commit
-            self._make_subprocess_result(1),            # git rev-parse --verify (branch gone)
-            self._make_subprocess_result(1),            # git rev-parse --verify (delete, branch gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -966,6 +1533,7 @@ class TestCloseSprintLockAndDbGuard:
         assert len(add_calls) == 1, "Expected one git add .clasi.db call"
         assert len(commit_calls) == 1, "Expected one git commit chore: update .clasi.db call"
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260329.1")
     @patch("subprocess.run")
@@ -985,15 +1553,13 @@ class TestCloseSprintLockAndDbGuard:
         # Call sequence (with version bump):
         # pytest, git add -A (version bump), git commit (version bump),
         # git status --porcelain (empty = clean, guard is no-op),
-        # git rev-parse --verify (branch gone), git push --tags, git rev-parse --verify (delete)
+        # git push --tags; the branch is gone.
         mock_run.side_effect = [
             self._make_subprocess_result(0),        # pytest
             self._make_subprocess_result(0),        # git add -A (version bump)
             self._make_subprocess_result(0),        # git commit (version bump)
             self._make_subprocess_result(0, ""),    # git status --porcelain (clean)
-            self._make_subprocess_result(1),        # git rev-parse --verify (branch gone)
             self._make_subprocess_result(0),        # git push --tags
-            self._make_subprocess_result(1),        # git rev-parse --verify (delete, gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -1007,6 +1573,7 @@ class TestCloseSprintLockAndDbGuard:
         assert len(db_add_calls) == 0, "Guard should not run git add .clasi.db when tree is clean"
         assert len(db_commit_calls) == 0, "Guard should not commit .clasi.db when tree is clean"
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
     @patch("subprocess.run")
     def test_lock_released_after_merge_failure(self, mock_run, work_dir):
         """Execution lock is released in finally block even when merge raises RuntimeError."""
@@ -1028,14 +1595,18 @@ class TestCloseSprintLockAndDbGuard:
         assert state_before["lock"] is not None
 
         # Call sequence (no version bump):
-        # pytest, git status --porcelain (clean), git rev-parse --verify (branch exists),
-        # git merge-base (not ancestor), git rebase (fails with non-zero) -> abort,
+        # merge pre-check (branch exists, clean), pytest, git status --porcelain (clean),
+        # merge check again, git rebase (fails with non-zero) -> abort,
         # (merge raises RuntimeError, finally block runs release_lock)
         mock_run.side_effect = [
+            self._make_subprocess_result(1),        # git merge-base (precondition)
+            self._make_subprocess_result(1),        # git merge-base (not a fast-forward)
+            self._make_subprocess_result(0),        # git merge-tree (clean)
             self._make_subprocess_result(0, ""),    # pytest (pass)
             self._make_subprocess_result(0, ""),    # git status --porcelain (clean)
-            self._make_subprocess_result(0),        # git rev-parse --verify (branch exists)
             self._make_subprocess_result(1),        # git merge-base (not ancestor)
+            self._make_subprocess_result(1),        # git merge-base (not a fast-forward)
+            self._make_subprocess_result(0),        # git merge-tree (clean)
             self._make_subprocess_result(1, "", "conflict during rebase"),  # git rebase (fails)
             self._make_subprocess_result(0),        # git rebase --abort
         ]
@@ -1048,6 +1619,8 @@ class TestCloseSprintLockAndDbGuard:
         state_after = get_sprint_state(str(db_path), "001")
         assert state_after["lock"] is None, "Lock must be released after merge failure"
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=False))
+    @patch("clasi.git_refs.current_branch", MagicMock(return_value="master"))
     @patch("subprocess.run")
     def test_db_guard_skipped_when_not_on_sprint_branch(self, mock_run, work_dir):
         """Guard does not commit .clasi.db when HEAD is not the sprint branch."""
@@ -1066,10 +1639,7 @@ class TestCloseSprintLockAndDbGuard:
         mock_run.side_effect = [
             self._make_subprocess_result(0, ""),        # pytest (pass)
             self._make_subprocess_result(0, " M docs/clasi/.clasi.db\n"),  # git status --porcelain (dirty)
-            self._make_subprocess_result(0, "master\n"),  # git rev-parse --abbrev-ref HEAD (wrong branch)
             # Guard skipped — no git add or git commit for .clasi.db
-            self._make_subprocess_result(1),            # git rev-parse --verify (branch gone)
-            self._make_subprocess_result(1),            # git rev-parse --verify (delete, branch gone)
         ]
 
         result = json.loads(close_sprint("001", branch_name="sprint/001-sprint"))
@@ -0,0 +1,244 @@
+"""Tests for clasi.artifact_index module."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from clasi import artifact_index
+from clasi.artifact_index import ArtifactIndex
+from clasi.project import Project
+
+
+def _write_sprint(project, sprint_id, slug, status="active", done=False, todos=None):
+    base = project.sprints_dir / "done" if done else project.sprints_dir
+    d = base / f"{sprint_id}-{slug}"
+    (d / "tickets" / "done").mkdir(parents=True, exist_ok=True)
+    lines = [
+        "---",
+        f'id: "{sprint_id}"',
+        f'title: "{slug.title()}"',
+        f"status: {status}",
+        f"branch: sprint/{sprint_id}-{slug}",
+    ]
+    if todos:
+        lines.append("todos:")
+        lines.extend(f"  - {t}" for t in todos)
+    lines += ["---", "", f"# Sprint {sprint_id}", ""]
+    (d / "sprint.md").write_text("\n".join(lines), encoding="utf-8")
+    return d
+
+
+def _write_ticket(sprint_dir, ticket_id, status="todo", done=False, todo=None):
+    base = sprint_dir / "tickets" / "done" if done else sprint_dir / "tickets"
+    path = base / f"{ticket_id}-ticket-{ticket_id}.md"
+    lines = ["---", f'id: "{ticket_id}"', f'title: "Ticket {ticket_id}"',
+             f"status: {status}"]
+    if todo:
+        lines.append(f"todo: {todo}")
+    lines += ["---", "", "Body", ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def _age(path, seconds=60):
+    """Push a file's mtime into the past so it is outside the racy window."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    proj = Project(tmp_path)
+    proj.clasi_dir.mkdir(parents=True)
+    return proj
+
+
+class TestScans:
+    def test_sprints_active_then_done(self, project):
+        _write_sprint(project, "002", "beta", status="done", done=True)
+        _write_sprint(project, "001", "alpha", todos=["a.md", "b.md"])
+        entries = ArtifactIndex(project).sprints()
+        assert [e["artifact_id"] for e in entries] == ["001", "002"]
+        assert entries[0]["title"] == "Alpha"
+        assert entries[0]["branch"] == "sprint/001-alpha"
+        assert entries[0]["todos"] == ["a.md", "b.md"]
+        assert entries[1]["status"] == "done"
+
+    def test_tickets_open_then_done(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        _write_ticket(d, "002", status="done", done=True)
+        _write_ticket(d, "001", todo="idea.md")
+        entries = ArtifactIndex(project).tickets(d)
+        assert [e["artifact_id"] for e in entries] == ["001", "002"]
+        assert entries[0]["todos"] == ["idea.md"]
+
+    def test_missing_fields_are_none(self, project):
+        d = project.sprints_dir / "001-bare"
+        d.mkdir(parents=True)
+        (d / "sprint.md").write_text("# no frontmatter\n", encoding="utf-8")
+        [entry] = ArtifactIndex(project).sprints()
+        assert entry["artifact_id"] is None
+        assert entry["status"] is None
+        assert entry["todos"] == []
+
+
+class TestIncrementalRefresh:
+    def test_unchanged_files_are_not_reparsed(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        t = _write_ticket(d, "001")
+        _age(d / "sprint.md")
+        _age(t)
+        index = ArtifactIndex(project)
+        index.sprints()
+        index.tickets(d)
+
+        with patch.object(artifact_index, "read_frontmatter") as mock_read:
+            index.sprints()
+            index.tickets(d)
+        mock_read.assert_not_called()
+
+    def test_modified_file_is_reparsed(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        t = _write_ticket(d, "001")
+        _age(t)
+        index = ArtifactIndex(project)
+        assert index.tickets(d)[0]["status"] == "todo"
+
+        _write_ticket(d, "001", status="in-progress")
+        assert index.tickets(d)[0]["status"] == "in-progress"
+
+    def test_racy_same_size_rewrite_is_detected(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        t = _write_ticket(d, "001", status="todo")
+        index = ArtifactIndex(project)
+        index.tickets(d)
+        st = t.stat()
+
+        # Same size, same mtime: only the racy rule catches this.
+        t.write_text(t.read_text().replace("status: todo", "status: done"))
+        os.utime(t, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert index.tickets(d)[0]["status"] == "done"
+
+    def test_removed_files_are_dropped(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        t = _write_ticket(d, "001")
+        index = ArtifactIndex(project)
+        index.tickets(d)
+        t.unlink()
+        assert index.tickets(d) == []
+        assert index._scope_entries(str(d / "tickets")) == {}
+
+    def test_moved_ticket_is_reindexed(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        t = _write_ticket(d, "001")
+        index = ArtifactIndex(project)
+        index.tickets(d)
+        t.rename(d / "tickets" / "done" / t.name)
+        [entry] = index.tickets(d)
+        assert entry["scope"] == str(d / "tickets" / "done")
+
+
+class TestLookups:
+    def test_find_sprint_uses_index_without_scan(self, project):
+        _write_sprint(project, "001", "alpha")
+        d = _write_sprint(project, "002", "beta")
+        _age(d / "sprint.md")
+        index = ArtifactIndex(project)
+        index.sprints()
+
+        with patch.object(index, "sprints") as mock_scan:
+            entry = index.find_sprint("002")
+        mock_scan.assert_not_called()
+        assert entry["path"] == str(d / "sprint.md")
+
+    def test_find_sprint_falls_back_to_scan(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        entry = ArtifactIndex(project).find_sprint("001")
+        assert entry["path"] == str(d / "sprint.md")
+
+    def test_find_sprint_missing(self, project):
+        _write_sprint(project, "001", "alpha")
+        assert ArtifactIndex(project).find_sprint("999") is None
+
+    def test_find_ticket_is_scoped_to_sprint(self, project):
+        d1 = _write_sprint(project, "001", "alpha")
+        d2 = _write_sprint(project, "002", "beta")
+        _write_ticket(d1, "001")
+        t2 = _write_ticket(d2, "001")
+        index = ArtifactIndex(project)
+        index.tickets(d1)
+        index.tickets(d2)
+        assert index.find_ticket(d2, "001")["path"] == str(t2)
+
+    def test_stale_lookup_after_move(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        _age(d / "sprint.md")
+        index = ArtifactIndex(project)
+        index.sprints()
+        done_dir = project.sprints_dir / "done"
+        done_dir.mkdir()
+        new_dir = done_dir / d.name
+        d.rename(new_dir)
+        assert index.find_sprint("001")["path"] == str(new_dir / "sprint.md")
+
+
+class TestStorage:
+    def test_index_does_not_touch_state_db(self, project):
+        _write_sprint(project, "001", "alpha")
+        index = ArtifactIndex(project)
+        index.sprints()
+        assert index.db_path == project.log_dir / "artifact-index.db"
+        assert index.db_path.exists()
+        assert not (project.clasi_dir / ".clasi.db").exists()
+
+    def test_index_persists_across_instances(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        _age(d / "sprint.md")
+        ArtifactIndex(project).sprints()
+        with patch.object(artifact_index, "read_frontmatter") as mock_read:
+            ArtifactIndex(project).sprints()
+        mock_read.assert_not_called()
+
+
+class TestDatabaseFallback:
+    def test_scan_works_when_db_unavailable(self, project):
+        _write_sprint(project, "001", "alpha")
+        # Make the db path a directory so sqlite cannot open it.
+        project.log_dir.mkdir(parents=True)
+        (project.log_dir / artifact_index.INDEX_DB_NAME).mkdir()
+        entries = ArtifactIndex(project).sprints()
+        assert [e["artifact_id"] for e in entries] == ["001"]
+        assert ArtifactIndex(project).find_sprint("001") is not None
+
+
+class TestTicketRefIndex:
+    def test_resolve_and_is_done(self, project):
+        d1 = _write_sprint(project, "001", "alpha")
+        d2 = _write_sprint(project, "002", "beta", done=True)
+        _write_ticket(d1, "001", status="done", done=True)
+        _write_ticket(d1, "002", status="in-progress")
+        _write_ticket(d2, "001", status="todo")
+        refs = artifact_index.TicketRefIndex(ArtifactIndex(project))
+        assert refs.is_done("001-001") is True
+        assert refs.is_done("001-002") is False
+        assert refs.is_done("002-001") is False
+        assert refs.resolve("001-002")["status"] == "in-progress"
+
+    def test_unknown_refs(self, project):
+        _write_sprint(project, "001", "alpha")
+        refs = artifact_index.TicketRefIndex(ArtifactIndex(project))
+        assert refs.resolve("999-001") is None
+        assert refs.resolve("001-999") is None
+        assert refs.resolve("malformed") is None
+        assert refs.is_done("malformed") is False
+
+    def test_each_sprint_loaded_once(self, project):
+        d = _write_sprint(project, "001", "alpha")
+        for i in range(1, 4):
+            _write_ticket(d, f"00{i}", status="done")
+        index = ArtifactIndex(project)
+        refs = artifact_index.TicketRefIndex(index)
+        with patch.object(index, "tickets", wraps=index.tickets) as spy:
+            assert all(refs.is_done(f"001-00{i}") for i in range(1, 4))
+        assert spy.call_count == 1
@@ -0,0 +1,191 @@
+"""Tests for clasi.background: worker-thread tools, progress, cancellation."""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from clasi import background
+from clasi.background import ToolCancelled, as_async, report, run_subprocess
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class TestOutsideJob:
+    def test_report_is_noop(self):
+        report("tests", 1, 8)
+        assert background.current_job() is None
+
+    def test_run_subprocess_delegates(self):
+        result = run_subprocess(
+            [sys.executable, "-c", "print('hi')"], capture_output=True, text=True,
+        )
+        assert result.stdout.strip() == "hi"
+
+
+class TestAsAsync:
+    def test_runs_on_worker_thread(self):
+        def tool(x: int) -> str:
+            assert background.current_job().name == "tool"
+            return f"{x}:{threading.current_thread() is threading.main_thread()}"
+
+        assert asyncio.run(as_async(tool)(x=3)) == "3:False"
+
+    def test_keeps_signature_and_doc(self):
+        import inspect
+
+        def tool(sprint_id: str, flag: bool = True) -> str:
+            """Doc."""
+            return ""
+
+        wrapped = as_async(tool)
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        assert wrapped.__doc__ == "Doc."
+        assert inspect.iscoroutinefunction(wrapped)
+
+    def test_event_loop_keeps_serving(self):
+        release = threading.Event()
+
+        def slow() -> bool:
+            return release.wait(timeout=10)
+
+        async def main():
+            task = asyncio.create_task(as_async(slow)())
+            await asyncio.sleep(0.05)
+            release.set()  # only reached if slow() is not blocking the loop
+            return await task
+
+        assert asyncio.run(main()) is True
+
+    def test_cancel_terminates_subprocess(self):
+        outcome = {}
+        finished = threading.Event()
+
+        def tool() -> str:
+            start = time.monotonic()
+            try:
+                run_subprocess(SLEEP, capture_output=True)
+            except ToolCancelled:
+                outcome["cancelled"] = True
+            outcome["elapsed"] = time.monotonic() - start
+            finished.set()
+            return "done"
+
+        async def main():
+            task = asyncio.create_task(as_async(tool)())
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert finished.wait(timeout=10)
+        assert outcome["cancelled"] is True
+        assert outcome["elapsed"] < 10
+
+    def test_report_raises_after_cancel_unless_not_cancellable(self):
+        job = background.Job("close_sprint")
+        job.cancel()
+        token = background._job.set(job)
+        try:
+            report("merge", 5, 8, cancellable=False)
+            with pytest.raises(ToolCancelled):
+                report("tests", 1, 8)
+            with pytest.raises(ToolCancelled):
+                run_subprocess([sys.executable, "-c", "pass"])
+        finally:
+            background._job.reset(token)
+
+    def test_run_subprocess_timeout_in_job(self, monkeypatch):
+        monkeypatch.setattr(background, "_POLL_SECONDS", 0.05)
+        token = background._job.set(background.Job("close_sprint"))
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                run_subprocess(SLEEP, timeout=0.2, capture_output=True)
+        finally:
+            background._job.reset(token)
+
+    def test_run_subprocess_in_job_captures_output(self):
+        token = background._job.set(background.Job("close_sprint"))
+        try:
+            result = run_subprocess(
+                [sys.executable, "-c", "import sys; print('out'); sys.exit(3)"],
+                capture_output=True, text=True,
+            )
+        finally:
+            background._job.reset(token)
+        assert (result.returncode, result.stdout.strip()) == (3, "out")
+
+    def test_exclusive_tools_run_one_at_a_time(self):
+        running = []
+        overlaps = []
+
+        def close(n: int) -> int:
+            running.append(n)
+            overlaps.append(len(running))
+            time.sleep(0.1)
+            running.remove(n)
+            return n
+
+        async def main():
+            calls = [as_async(close, exclusive=True)(n=n) for n in range(3)]
+            return await asyncio.gather(*calls)
+
+        assert asyncio.run(main()) == [0, 1, 2]
+        assert overlaps == [1, 1, 1]
+
+    def test_cancelled_while_waiting_never_runs(self, monkeypatch):
+        monkeypatch.setattr(background, "_POLL_SECONDS", 0.05)
+        ran = []
+
+        def close() -> str:
+            ran.append(True)
+            return "closed"
+
+        async def main():
+            task = asyncio.create_task(as_async(close, exclusive=True)())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        background._exclusive_lock.acquire()
+        try:
+            asyncio.run(main())
+        finally:
+            background._exclusive_lock.release()
+        time.sleep(0.2)
+        assert ran == []
+        assert background._exclusive_lock.acquire(blocking=False)
+        background._exclusive_lock.release()
+
+
+class TestBackgroundToolRegistration:
+    def test_registered_tool_is_async_and_callable_directly(self):
+        from clasi.mcp_server import Clasi
+
+        app = Clasi()
+
+        @app.background_tool()
+        def probe(n: int) -> str:
+            """Probe tool."""
+            report("working", 1, 2)
+            return str(n * 2)
+
+        assert probe(n=2) == "4"
+        tool = app.server._tool_manager._tools["probe"]
+        assert tool.is_async
+        assert list(tool.parameters["properties"]) == ["n"]
+        result = asyncio.run(app.server._tool_manager.call_tool("probe", {"n": 5}))
+        assert result == "10"
+
+    def test_close_sprint_runs_in_background(self):
+        from clasi.mcp_server import server
+        import clasi.tools.artifact_tools  # noqa: F401
+
+        tools = server._tool_manager._tools
+        assert tools["close_sprint"].is_async
+        assert not tools["list_todos"].is_async
@@ -0,0 +1,144 @@
+"""
+tests/unit/test_bundle.py
+
+Unit tests for clasi/platforms/_bundle.py.
+
+Uses real filesystem operations via the ``tmp_path`` pytest fixture.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from clasi.init_command import run_init
+from clasi.platforms import _bundle
+
+
+def _output(path: str, content: bytes = b"hello\n") -> _bundle.Output:
+    return _bundle.Output(path, hashlib.sha256(content).hexdigest(), content)
+
+
+# ---------------------------------------------------------------------------
+# build
+# ---------------------------------------------------------------------------
+
+
+def test_build_is_computed_once() -> None:
+    assert _bundle.build() is _bundle.build()
+
+
+def test_build_hashes_match_content() -> None:
+    for outputs in _bundle.build().values():
+        for output in outputs:
+            assert output.sha256 == hashlib.sha256(output.content).hexdigest()
+
+
+def test_build_covers_every_skill() -> None:
+    bundle = _bundle.build()
+    plugin_skills = sorted(
+        p.parent.name for p in (_bundle._PLUGIN_DIR / "skills").glob("*/SKILL.md")
+    )
+    canonical = [o.path for o in bundle[_bundle.SKILLS]]
+    assert canonical == [f".agents/skills/{n}/SKILL.md" for n in plugin_skills]
+    aliases = bundle[_bundle.CLAUDE_SKILLS]
+    assert [a.alias_of for a in aliases] == canonical
+    assert all(a.path.startswith(".claude/skills/") for a in aliases)
+
+
+def test_build_renders_platform_agents() -> None:
+    bundle = _bundle.build()
+    assert ".codex/agents/team-lead.toml" in [
+        o.path for o in bundle[_bundle.CODEX_AGENTS]
+    ]
+    assert ".github/agents/team-lead.agent.md" in [
+        o.path for o in bundle[_bundle.COPILOT_AGENTS]
+    ]
+    assert ".claude/agents/team-lead/agent.md" in [
+        o.path for o in bundle[_bundle.CLAUDE_AGENTS]
+    ]
+
+
+# ---------------------------------------------------------------------------
+# install_file
+# ---------------------------------------------------------------------------
+
+
+def test_install_file_create_unchanged_update(tmp_path: Path) -> None:
+    output = _output("a/b.txt")
+    assert _bundle.install_file(tmp_path, output) == "create"
+    assert (tmp_path / "a" / "b.txt").read_bytes() == b"hello\n"
+    assert _bundle.install_file(tmp_path, output) == "unchanged"
+    (tmp_path / "a" / "b.txt").write_bytes(b"jello\n")
+    assert _bundle.install_file(tmp_path, output) == "update"
+    assert (tmp_path / "a" / "b.txt").read_bytes() == b"hello\n"
+
+
+def test_install_file_replaces_symlink(tmp_path: Path) -> None:
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"hello\n")
+    dest = tmp_path / "dest.txt"
+    os.symlink(source, dest)
+    assert _bundle.install_file(tmp_path, _output("dest.txt")) == "update"
+    assert not dest.is_symlink()
+
+
+# ---------------------------------------------------------------------------
+# install_alias
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def alias_output(tmp_path: Path) -> _bundle.Output:
+    canonical = _output("canonical/SKILL.md")
+    _bundle.install_file(tmp_path, canonical)
+    return _bundle.Output(
+        "alias/SKILL.md", canonical.sha256, canonical.content, canonical.path,
+    )
+
+
+def test_install_alias_symlink_then_unchanged(tmp_path: Path, alias_output) -> None:
+    assert _bundle.install_alias(tmp_path, alias_output) == "symlink"
+    assert _bundle.install_alias(tmp_path, alias_output) == "unchanged"
+    assert (tmp_path / "alias" / "SKILL.md").is_symlink()
+
+
+def test_install_alias_copy_then_unchanged(tmp_path: Path, alias_output) -> None:
+    assert _bundle.install_alias(tmp_path, alias_output, copy=True) == "copy"
+    assert _bundle.install_alias(tmp_path, alias_output, copy=True) == "unchanged"
+
+
+def test_install_alias_replaces_stale_symlink(tmp_path: Path, alias_output) -> None:
+    elsewhere = tmp_path / "elsewhere.md"
+    elsewhere.write_bytes(b"other\n")
+    alias = tmp_path / "alias" / "SKILL.md"
+    alias.parent.mkdir()
+    os.symlink(elsewhere, alias)
+    assert _bundle.install_alias(tmp_path, alias_output) == "symlink"
+    assert alias.resolve() == (tmp_path / "canonical" / "SKILL.md").resolve()
+
+
+# ---------------------------------------------------------------------------
+# Re-running init
+# ---------------------------------------------------------------------------
+
+
+def test_reinstall_leaves_bundle_outputs_untouched(tmp_path: Path) -> None:
+    run_init(str(tmp_path), claude=True, codex=True, copilot=True)
+    old = 1_000_000_000
+    paths = [
+        tmp_path / o.path
+        for outputs in _bundle.build().values()
+        for o in outputs
+        if o.alias_of is None
+    ]
+    for path in paths:
+        os.utime(path, (old, old))
+
+    run_init(str(tmp_path), claude=True, codex=True, copilot=True)
+
+    rewritten = [p for p in paths if p.stat().st_mtime != old]
+    assert rewritten == []
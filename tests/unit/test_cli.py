@@ -61,3 +61,49 @@ class TestMcpCommand:
             result = runner.invoke(cli, ["mcp"])
             assert result.exit_code == 0
             mock_run_server.assert_called_once()
+
+
+class TestHookServerCommand:
+    def test_start_launches_when_not_running(self):
+        with patch("clasi.hook_server.status", return_value=None), \
+                patch("clasi.hook_server.start", return_value=4321) as mock_start:
+            result = CliRunner().invoke(cli, ["hook-server", "start"])
+        assert result.exit_code == 0
+        assert "4321" in result.output
+        mock_start.assert_called_once_with(idle_timeout=3600.0)
+
+    def test_start_is_noop_when_running(self):
+        info = {"ok": True, "pid": 99, "root": "/x"}
+        with patch("clasi.hook_server.status", return_value=info), \
+                patch("clasi.hook_server.start") as mock_start:
+            result = CliRunner().invoke(cli, ["hook-server", "start"])
+        assert "already running" in result.output
+        mock_start.assert_not_called()
+
+    def test_stop_and_status_without_server(self):
+        with patch("clasi.hook_server.stop", return_value=False), \
+                patch("clasi.hook_server.status", return_value=None):
+            runner = CliRunner()
+            assert "No hook server" in runner.invoke(cli, ["hook-server", "stop"]).output
+            assert "No hook server" in runner.invoke(cli, ["hook-server", "status"]).output
+
+
+class TestLogQueryCommand:
+    def test_query_prints_matching_events(self, tmp_path, monkeypatch):
+        from clasi.event_log import record
+
+        monkeypatch.chdir(tmp_path)
+        log_dir = tmp_path / "docs" / "clasi" / "log"
+        record(log_dir, "tool", "close_sprint", sprint="003", outcome="ok",
+               duration_ms=41.7)
+        record(log_dir, "hook", "role-guard", outcome="allowed")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["log", "query", "--kind", "tool"])
+        assert result.exit_code == 0
+        assert "close_sprint" in result.output
+        assert "42ms" in result.output
+        assert "role-guard" not in result.output
+
+        result = runner.invoke(cli, ["log", "query", "--json", "--sprint", "003"])
+        assert '"name": "close_sprint"' in result.output
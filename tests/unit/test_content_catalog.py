@@ -0,0 +1,119 @@
+"""Tests for clasi.content_catalog."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from clasi.content_catalog import clear_catalogs, get_catalog
+from clasi.frontmatter import read_document
+from clasi.mcp_server import content_path
+from clasi.tools import process_tools
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "agents"
+    (root / "alpha").mkdir(parents=True)
+    (root / "alpha" / "agent.md").write_text(
+        "---\nname: alpha\ndescription: First agent\n---\n\n# Alpha\n"
+    )
+    (root / "alpha" / "contract.yaml").write_text("name: alpha\n")
+    (root / "alpha" / "helper.md").write_text(
+        "---\ndescription: A helper skill\n---\n\nHelp.\n"
+    )
+    (root / "alpha" / "notes.md").write_text("No frontmatter here.\n")
+    (root / "alpha" / "template.md.j2").write_text("{{ x }}\n")
+    yield root
+    clear_catalogs()
+
+
+class TestCatalog:
+    def test_entries_have_names_descriptions_and_hashes(self, tree):
+        catalog = get_catalog(tree)
+        entry = catalog.get("alpha/agent.md")
+        assert entry.name == "alpha"
+        assert entry.description == "First agent"
+        data = (tree / "alpha" / "agent.md").read_bytes()
+        assert entry.sha256 == hashlib.sha256(data).hexdigest()
+        assert catalog.read(entry) == data.decode()
+
+    def test_name_defaults_to_stem(self, tree):
+        catalog = get_catalog(tree)
+        helper = catalog.get("alpha/helper.md")
+        assert helper.name == "helper"
+        assert not helper.has_name
+        assert helper.described
+        assert helper.name_or("other") == "other"
+        assert not catalog.get("alpha/notes.md").described
+
+    def test_only_text_files_are_indexed(self, tree):
+        paths = [str(e.path) for e in get_catalog(tree).entries]
+        assert "alpha/contract.yaml" in paths
+        assert "alpha/template.md.j2" not in paths
+        assert paths == sorted(paths)
+
+    def test_missing_directory_is_empty(self, tmp_path):
+        catalog = get_catalog(tmp_path / "missing")
+        assert catalog.entries == []
+        assert catalog.get("x.md") is None
+
+    def test_built_once_per_directory(self, tree):
+        assert get_catalog(tree) is get_catalog(tree / "alpha" / "..")
+
+    def test_clear_catalogs_rebuilds(self, tree):
+        first = get_catalog(tree)
+        (tree / "beta.md").write_text("# Beta\n")
+        assert get_catalog(tree) is first
+        clear_catalogs()
+        assert get_catalog(tree).get("beta.md") is not None
+
+    def test_undecodable_file_is_skipped(self, tree, caplog):
+        (tree / "alpha" / "latin1.md").write_bytes("caf\xe9\n".encode("latin-1"))
+        catalog = get_catalog(tree)
+        assert catalog.get("alpha/latin1.md") is None
+        assert catalog.get("alpha/agent.md").name == "alpha"
+        assert "latin1.md" in caplog.text
+
+    def test_lookups_do_not_touch_disk(self, tree, monkeypatch):
+        get_catalog(tree)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("content tree walked at request time")
+
+        monkeypatch.setattr(Path, "rglob", fail)
+        monkeypatch.setattr(Path, "read_text", fail)
+        assert process_tools._get_definition(tree, "alpha").startswith("---")
+        assert "Help." in process_tools._get_definition(tree, "helper")
+
+
+class TestProcessToolsUseCatalog:
+    def test_plugin_lookups_after_warmup_do_not_touch_disk(self, monkeypatch):
+        process_tools.list_skills()
+        process_tools.list_instructions()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("content tree walked at request time")
+
+        monkeypatch.setattr(Path, "rglob", fail)
+        monkeypatch.setattr(Path, "read_text", fail)
+        monkeypatch.setattr(Path, "read_bytes", fail)
+        assert "execute-ticket" in process_tools.list_skills()
+        assert "Execute Ticket" in process_tools.get_skill_definition("execute-ticket")
+        assert "## Contract" in process_tools.get_agent_definition("team-lead")
+        assert process_tools._find_definition_in_tree(
+            content_path("plugin", "agents"),
+            content_path("plugin", "skills"),
+            content_path("plugin", "instructions"),
+            "testing",
+        )
+
+    def test_skill_listing_matches_files(self):
+        skills_dir = content_path("plugin", "skills")
+        names = {s["name"] for s in process_tools._list_all_skills(
+            skills_dir, content_path("plugin", "agents"),
+        )}
+        for skill_md in skills_dir.glob("*/SKILL.md"):
+            fm, _ = read_document(skill_md)
+            if fm.get("name") or fm.get("description"):
+                assert fm.get("name", skill_md.parent.name) in names
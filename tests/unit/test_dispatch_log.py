@@ -2,15 +2,16 @@
 
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 from clasi.dispatch_log import (
     _auto_context_documents,
     _log_dir,
-    _next_sequence,
     log_dispatch,
     update_dispatch_result,
 )
 from clasi.frontmatter import read_document
+from clasi.log_sequence import next_log_number
 from clasi.mcp_server import set_project
 
 
@@ -27,35 +28,44 @@ class TestLogDir:
         assert _log_dir() == expected
 
 
-class TestNextSequence:
+class TestNextLogNumber:
     def test_returns_1_when_directory_missing(self, tmp_path):
-        assert _next_sequence(tmp_path / "nonexistent") == 1
+        assert next_log_number(tmp_path / "nonexistent") == 1
 
     def test_returns_1_when_directory_empty(self, tmp_path):
         d = tmp_path / "logs"
         d.mkdir()
-        assert _next_sequence(d) == 1
+        assert next_log_number(d) == 1
 
     def test_returns_next_after_existing(self, tmp_path):
         d = tmp_path / "logs"
         d.mkdir()
         (d / "001-sprint-planner.md").write_text("x")
         (d / "002-sprint-planner.md").write_text("x")
-        assert _next_sequence(d) == 3
+        assert next_log_number(d) == 3
 
     def test_counts_all_md_files(self, tmp_path):
         d = tmp_path / "logs"
         d.mkdir()
         (d / "001-ticket-001.md").write_text("x")
         (d / "002-sprint-planner.md").write_text("x")
-        assert _next_sequence(d) == 3
+        assert next_log_number(d) == 3
 
     def test_handles_gaps(self, tmp_path):
         d = tmp_path / "logs"
         d.mkdir()
         (d / "001-sprint-planner.md").write_text("x")
         (d / "005-architect.md").write_text("x")
-        assert _next_sequence(d) == 6
+        assert next_log_number(d) == 6
+
+    def test_counter_scans_directory_once(self, tmp_path):
+        d = tmp_path / "logs"
+        d.mkdir()
+        (d / "004-architect.md").write_text("x")
+        assert next_log_number(d, tmp_path) == 5
+        with patch("clasi.log_sequence.highest_log_number") as mock_scan:
+            assert next_log_number(d, tmp_path) == 6
+        mock_scan.assert_not_called()
 
 
 class TestLogDispatch:
@@ -241,6 +251,19 @@ class TestUpdateDispatchResult:
         # Original prompt still present
         assert "Do the work." in body
 
+    def test_dispatch_and_result_are_recorded_as_events(self, tmp_path):
+        from clasi.event_log import query
+
+        path = log_dispatch(parent="se", child="cm", scope="src/",
+                            prompt="Go.", sprint_name="001-sprint")
+        update_dispatch_result(path, result="success", files_modified=[])
+        result, dispatch = query(tmp_path / "docs" / "clasi" / "log")
+        assert (dispatch["kind"], dispatch["name"], dispatch["agent"]) == (
+            "dispatch", "cm", "se")
+        assert dispatch["sprint"] == "001-sprint"
+        assert dispatch["data"]["log_file"] == str(path)
+        assert (result["kind"], result["outcome"]) == ("dispatch-result", "success")
+
     def test_preserves_existing_frontmatter(self, tmp_path):
         path = log_dispatch(
             parent="se",
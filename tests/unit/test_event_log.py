@@ -0,0 +1,129 @@
+"""Tests for clasi.event_log."""
+
+import sqlite3
+
+import pytest
+
+from clasi import event_log
+from clasi.event_log import append, query, record
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("CLASI_AGENT_NAME", raising=False)
+    monkeypatch.delenv("CLASI_AGENT_TIER", raising=False)
+    return tmp_path / "log"
+
+
+class TestRecord:
+    def test_round_trip(self, log_dir):
+        record(log_dir, "tool", "close_sprint", sprint="003", outcome="ok",
+               duration_ms=12.5, data={"x": 1})
+        [event] = query(log_dir)
+        assert event["kind"] == "tool"
+        assert event["name"] == "close_sprint"
+        assert event["agent"] == "team-lead"
+        assert event["tier"] == "0"
+        assert event["sprint"] == "003"
+        assert event["duration_ms"] == 12.5
+        assert event["data"] == {"x": 1}
+        assert event["ts"].endswith("Z")
+
+    def test_agent_from_environment(self, log_dir, monkeypatch):
+        monkeypatch.setenv("CLASI_AGENT_NAME", "programmer")
+        monkeypatch.setenv("CLASI_AGENT_TIER", "2")
+        record(log_dir, "hook", "role-guard")
+        [event] = query(log_dir)
+        assert (event["agent"], event["tier"]) == ("programmer", "2")
+        assert "data" not in event
+
+    def test_errors_are_swallowed(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        record(blocker / "log", "hook", "role-guard")  # cannot create dir
+
+    def test_indexes_exist(self, log_dir):
+        record(log_dir, "hook", "role-guard")
+        conn = sqlite3.connect(log_dir / event_log.EVENTS_DB)
+        indexes = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM events WHERE kind = ? AND ts >= ?",
+            ("hook", "2026"),
+        ).fetchall()
+        conn.close()
+        assert {"events_ts", "events_kind_ts", "events_agent_ts",
+                "events_sprint_ts"} <= indexes
+        assert "events_kind_ts" in str(plan)
+
+
+class TestAppend:
+    def test_queued_event_is_imported_once(self, log_dir, monkeypatch):
+        times = iter([1_800_000_000.0, 1_800_000_060.0, 1_800_000_120.0])
+        monkeypatch.setattr(event_log.time, "time", lambda: next(times))
+        log_dir.mkdir()
+        append(log_dir, "hook", "role-guard", outcome="allow", data={"exit_code": 0})
+        assert not (log_dir / event_log.EVENTS_DB).exists()
+        record(log_dir, "tool", "list_todos")
+
+        events = query(log_dir)
+        assert [e["name"] for e in events] == ["list_todos", "role-guard"]
+        hook = events[1]
+        assert (hook["agent"], hook["tier"]) == ("team-lead", "0")
+        assert hook["data"] == {"exit_code": 0}
+        assert len(query(log_dir)) == 2
+
+        append(log_dir, "hook", "mcp-guard")
+        assert [e["name"] for e in query(log_dir, kind="hook")] == [
+            "mcp-guard", "role-guard",
+        ]
+
+    def test_partial_line_waits(self, log_dir):
+        log_dir.mkdir()
+        append(log_dir, "hook", "role-guard")
+        queue = log_dir / event_log.QUEUE_FILE
+        line = queue.read_bytes()
+        with open(queue, "ab") as f:
+            f.write(line[:20])
+        assert len(query(log_dir)) == 1
+        with open(queue, "ab") as f:
+            f.write(line[20:])
+        assert len(query(log_dir)) == 2
+
+    def test_truncated_queue_starts_over(self, log_dir):
+        log_dir.mkdir()
+        append(log_dir, "hook", "role-guard")
+        append(log_dir, "hook", "role-guard")
+        assert len(query(log_dir)) == 2
+        (log_dir / event_log.QUEUE_FILE).unlink()
+        append(log_dir, "hook", "mcp-guard")
+        assert [e["name"] for e in query(log_dir)][0] == "mcp-guard"
+        assert len(query(log_dir)) == 3
+
+    def test_missing_directory_is_ignored(self, log_dir):
+        append(log_dir, "hook", "role-guard")
+        assert not log_dir.exists()
+
+
+class TestQuery:
+    def test_missing_db_is_empty(self, log_dir):
+        assert query(log_dir) == []
+        assert not log_dir.exists()
+
+    def test_filters(self, log_dir, monkeypatch):
+        times = iter([1_800_000_000.0, 1_800_000_060.0, 1_800_000_120.0])
+        monkeypatch.setattr(event_log.time, "time", lambda: next(times))
+        record(log_dir, "hook", "role-guard", agent="programmer")
+        record(log_dir, "tool", "create_ticket", sprint="001")
+        record(log_dir, "tool", "close_sprint", sprint="002")
+
+        names = lambda **kw: [e["name"] for e in query(log_dir, **kw)]
+        assert names() == ["close_sprint", "create_ticket", "role-guard"]
+        assert names(kind="tool") == ["close_sprint", "create_ticket"]
+        assert names(agent="programmer") == ["role-guard"]
+        assert names(sprint="001") == ["create_ticket"]
+        assert names(name="close_sprint") == ["close_sprint"]
+        assert names(since="2027-01-15T08:01") == ["close_sprint", "create_ticket"]
+        assert names(until="2027-01-15T08:01") == ["role-guard"]
+        assert names(limit=1) == ["close_sprint"]
+        assert len(query(log_dir, limit=0)) == 3
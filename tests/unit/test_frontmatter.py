@@ -1,8 +1,11 @@
 """Tests for clasi.frontmatter module."""
 
+import os
+
 import pytest
 from pathlib import Path
 
+from clasi import frontmatter as fm_mod
 from clasi.frontmatter import read_document, read_frontmatter, write_frontmatter
 
 
@@ -101,3 +104,104 @@ class TestWriteFrontmatter:
         fm, body = read_document(p)
         assert fm == {"status": "new"}
         assert body == "Plain content.\n"
+
+
+class TestParseCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        fm_mod.cache_clear()
+        yield
+        fm_mod.cache_clear()
+
+    def _aged(self, p):
+        st = p.stat()
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns - 60_000_000_000))
+        return p
+
+    def test_second_read_is_a_hit(self, tmp_md):
+        p = self._aged(tmp_md("---\ntitle: Hello\n---\nBody\n"))
+        read_frontmatter(p)
+        read_frontmatter(p)
+        info = fm_mod.cache_info()
+        assert info["misses"] == 1
+        assert info["hits"] == 1
+        assert info["size"] == 1
+
+    def test_hit_returns_private_copy(self, tmp_md):
+        p = self._aged(tmp_md("---\ntags:\n- a\n---\nBody\n"))
+        fm = read_frontmatter(p)
+        fm["tags"].append("b")
+        assert read_frontmatter(p) == {"tags": ["a"]}
+
+    def test_external_change_is_detected(self, tmp_md):
+        p = self._aged(tmp_md("---\nstatus: todo\n---\nBody\n"))
+        read_frontmatter(p)
+        p.write_text("---\nstatus: in-progress\n---\nBody\n", encoding="utf-8")
+        assert read_frontmatter(p)["status"] == "in-progress"
+
+    def test_recently_modified_file_is_not_served_from_cache(self, tmp_md):
+        p = tmp_md("---\nstatus: todo\n---\nBody\n")
+        st = p.stat()
+        read_frontmatter(p)
+        # Same size and mtime: only the racy-window rule catches this.
+        p.write_text("---\nstatus: done\n---\nBody\n", encoding="utf-8")
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert read_frontmatter(p)["status"] == "done"
+        assert fm_mod.cache_info()["hits"] == 0
+
+    def test_write_invalidates(self, tmp_md):
+        p = self._aged(tmp_md("---\nstatus: todo\n---\nBody\n"))
+        read_frontmatter(p)
+        write_frontmatter(p, {"status": "done"})
+        assert read_frontmatter(p) == {"status": "done"}
+
+    def test_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fm_mod, "_CACHE_MAXSIZE", 2)
+        for i in range(4):
+            p = tmp_path / f"{i}.md"
+            p.write_text(f"---\nid: {i}\n---\n", encoding="utf-8")
+            read_frontmatter(p)
+        assert fm_mod.cache_info()["size"] == 2
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            read_document(tmp_path / "missing.md")
+
+
+class TestStreamingHeader:
+    @pytest.mark.parametrize("content", [
+        "---\ntitle: Hello\nstatus: draft\n---\nBody\n",
+        "---\nid: '001'\ntodos:\n- a.md\n---\n\n# T\n\n---\nmore\n",
+        "----\nkey: value\n----  \nBody\n",
+        "---\n---\nBody\n",
+        "---\n- a\n- b\n---\nBody\n",
+        "---\nkey: value\nno closing delimiter\n",
+        "Plain file\n---\nkey: value\n---\n",
+        "",
+    ])
+    def test_matches_full_parse(self, tmp_md, content):
+        p = tmp_md(content)
+        fm_mod.cache_clear()
+        expected, _ = read_document(p)
+        fm_mod.cache_clear()
+        assert read_frontmatter(p) == expected
+
+    def test_does_not_read_body(self, tmp_path):
+        p = tmp_path / "big.md"
+        # A body that is not valid UTF-8 would make a full read fail.
+        p.write_bytes(b"---\nid: '007'\n---\n" + b"x" * 65536 + b"\xff\xfe" * 16)
+        assert read_frontmatter(p) == {"id": "007"}
+        with pytest.raises(UnicodeDecodeError):
+            read_document(p)
+
+    def test_header_entry_does_not_satisfy_full_read(self, tmp_md):
+        p = tmp_md("---\ntitle: Hello\n---\nBody\n")
+        st = p.stat()
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns - 60_000_000_000))
+        fm_mod.cache_clear()
+        read_frontmatter(p)
+        assert read_document(p) == ({"title": "Hello"}, "Body\n")
+        assert read_frontmatter(p) == {"title": "Hello"}
+        assert fm_mod.cache_info() == {
+            "hits": 1, "misses": 2, "size": 1, "maxsize": fm_mod._CACHE_MAXSIZE,
+        }
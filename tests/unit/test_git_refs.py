@@ -0,0 +1,86 @@
+"""Tests for clasi.git_refs against real git repositories."""
+
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from clasi import git_refs
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, cwd=cwd, check=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    _git(root, "init", "-b", "master")
+    _git(root, "config", "user.email", "test@example.com")
+    _git(root, "config", "user.name", "Test")
+    _git(root, "commit", "--allow-empty", "-m", "initial")
+    _git(root, "tag", "v0.1")
+    _git(root, "branch", "sprint/001-alpha")
+    _git(root, "pack-refs", "--all")  # v0.1 and the branch are now packed
+    _git(root, "tag", "v0.2")
+    return root
+
+
+@pytest.fixture
+def no_git_processes():
+    """Fail the test if git_refs shells out."""
+    with patch("clasi.git_refs._git", side_effect=AssertionError("spawned git")):
+        yield
+
+
+class TestRefReader:
+    def test_current_branch(self, repo, no_git_processes):
+        assert git_refs.current_branch(repo) == "master"
+        assert git_refs.current_branch(repo / "sub" / "dir") == "master"
+
+    def test_matches_git_for_branches_and_tags(self, repo, no_git_processes):
+        expected_tags = _git(repo, "tag", "-l").splitlines()
+        head = _git(repo, "rev-parse", "HEAD")
+        assert git_refs.list_tags(repo) == expected_tags == ["v0.1", "v0.2"]
+        repo_refs = git_refs.open_repo(repo)
+        assert repo_refs.resolve("sprint/001-alpha") == head
+        assert repo_refs.resolve("v0.2") == head
+        assert repo_refs.resolve("refs/heads/master") == head
+        assert git_refs.rev_exists("HEAD", repo)
+        assert not git_refs.rev_exists("sprint/002-missing", repo)
+
+    def test_detached_head(self, repo, no_git_processes):
+        _git(repo, "checkout", "--detach")
+        assert git_refs.current_branch(repo) == "HEAD"
+
+    def test_linked_worktree(self, repo, no_git_processes):
+        worktree = repo.parent / "wt"
+        _git(repo, "worktree", "add", str(worktree), "sprint/001-alpha")
+        assert (worktree / ".git").is_file()
+        assert git_refs.current_branch(worktree) == "sprint/001-alpha"
+        assert git_refs.rev_exists("master", worktree)
+        assert git_refs.list_tags(worktree) == ["v0.1", "v0.2"]
+
+    def test_outside_a_repository(self, tmp_path, no_git_processes):
+        assert git_refs.open_repo(tmp_path) is None
+        assert git_refs.current_branch(tmp_path) == ""
+        assert git_refs.list_tags(tmp_path) == []
+        assert git_refs.rev_exists("master", tmp_path) is False
+
+
+class TestCliFallback:
+    def test_revision_expressions_use_git(self, repo):
+        assert git_refs.rev_exists("HEAD~0", repo)
+        assert not git_refs.rev_exists("HEAD~5", repo)
+
+    def test_reftable_repositories_use_git(self, repo):
+        (repo / ".git" / "reftable").mkdir()
+        with patch("clasi.git_refs._git") as mock_git:
+            mock_git.return_value.returncode = 0
+            mock_git.return_value.stdout = "main\n"
+            assert git_refs.current_branch(repo) == "main"
+        mock_git.assert_called_once_with(["rev-parse", "--abbrev-ref", "HEAD"], repo)
@@ -0,0 +1,240 @@
+"""Tests for the role-guard and mcp-guard hooks in clasi.guards."""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from clasi import guards
+from clasi.guards import handle_mcp_guard, handle_role_guard, read_payload_text
+from clasi.state_db import register_active_agent, write_recovery_state
+
+DB = "docs/clasi/.clasi.db"
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "docs" / "clasi").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CLASI_AGENT_TIER", raising=False)
+    monkeypatch.delenv("CLASI_AGENT_NAME", raising=False)
+    return tmp_path
+
+
+def _exit_code(handler, payload):
+    with pytest.raises(SystemExit) as exc:
+        handler(payload)
+    return exc.value.code
+
+
+class TestReadPayloadText:
+    def test_valid(self):
+        assert read_payload_text('{"a": 1}') == {"a": 1}
+
+    @pytest.mark.parametrize("text", ["", "  ", "not json", "[1, 2]"])
+    def test_invalid_is_empty(self, text):
+        assert read_payload_text(text) == {}
+
+
+class TestRoleGuard:
+    @pytest.mark.parametrize("tier,path,code", [
+        ("", "src/app.py", 2),
+        ("0", "docs/clasi/sprints/001-x/sprint.md", 2),
+        ("0", "docs/clasi/todo/idea.md", 0),
+        ("0", ".claude/settings.json", 0),
+        ("0", "CLAUDE.md", 0),
+        ("1", "docs/clasi/sprints/001-x/sprint.md", 0),
+        ("1", "src/app.py", 2),
+        ("2", "src/app.py", 0),
+    ])
+    def test_matrix(self, project, monkeypatch, tier, path, code):
+        if tier:
+            monkeypatch.setenv("CLASI_AGENT_TIER", tier)
+        assert _exit_code(handle_role_guard, {"file_path": path}) == code
+
+    def test_no_path_allows(self, project):
+        assert _exit_code(handle_role_guard, {}) == 0
+
+    def test_oop_bypass(self, project):
+        (project / ".clasi-oop").touch()
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 0
+
+    def test_tier_from_db(self, project):
+        register_active_agent(DB, "a1", "programmer", "2")
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 0
+
+    def test_recovery_paths_allowed(self, project):
+        write_recovery_state(DB, "001", "merge", ["src/app.py"], "conflict")
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 0
+        assert _exit_code(handle_role_guard, {"file_path": "src/other.py"}) == 2
+
+    def test_stale_recovery_ignored(self, project):
+        write_recovery_state(DB, "001", "merge", ["src/app.py"], "conflict")
+        old = (datetime.now(timezone.utc) - timedelta(hours=25)).isoformat()
+        conn = sqlite3.connect(DB)
+        conn.execute("UPDATE recovery_state SET recorded_at = ?", (old,))
+        conn.commit()
+        conn.close()
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 2
+
+    def test_unreadable_db_is_ignored(self, project):
+        (project / DB).write_text("not a database")
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 2
+
+    def test_does_not_create_schema(self, project):
+        sqlite3.connect(DB).close()
+        _exit_code(handle_role_guard, {"file_path": "src/app.py"})
+        conn = sqlite3.connect(DB)
+        tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+        conn.close()
+        assert tables == []
+
+    def test_logs_event(self, project):
+        _exit_code(handle_role_guard, {"file_path": "src/app.py"})
+        log = (project / "docs" / "clasi" / "log" / "hooks.log").read_text()
+        assert "role-guard" in log
+        assert "blk-write" in log
+
+    def test_records_structured_event(self, project):
+        from clasi.event_log import query
+
+        _exit_code(handle_role_guard, {"file_path": "src/app.py"})
+        log_dir = project / "docs" / "clasi" / "log"
+        # The guard only queues the event; query() imports it.
+        assert not (log_dir / "events.db").exists()
+        [event] = query(log_dir, kind="hook")
+        assert event["name"] == "role-guard"
+        assert event["outcome"] == "blk-write"
+        assert event["data"] == {"exit_code": 2, "file_path": "src/app.py"}
+
+
+class TestMcpGuard:
+    def test_team_lead_blocked(self, project, capsys):
+        assert _exit_code(handle_mcp_guard, {"tool_name": "create_ticket"}) == 2
+        assert "create_ticket" in capsys.readouterr().err
+
+    def test_planner_allowed(self, project, monkeypatch):
+        monkeypatch.setenv("CLASI_AGENT_TIER", "1")
+        assert _exit_code(handle_mcp_guard, {"tool_name": "create_ticket"}) == 0
+
+    def test_tier_from_db(self, project):
+        register_active_agent(DB, "a1", "sprint-planner", "1")
+        assert _exit_code(handle_mcp_guard, {"tool_name": "create_ticket"}) == 0
+
+
+class TestPolicy:
+    def test_longest_prefix_wins(self):
+        policy = guards.compile_policy(guards.DEFAULT_RULES)
+        assert guards.evaluate(policy, "0", "docs/clasi/todo/a.md") == (True, "clasi-docs")
+        assert guards.evaluate(policy, "0", "docs/clasi/sprints/a.md") == (False, "blk-sprint")
+        assert guards.evaluate(policy, "1", "docs/clasi/sprints/a.md") == (True, "tier-1")
+        assert guards.evaluate(policy, "1", "docs/clasi/todo/a.md") == (False, "blk-write")
+        assert guards.evaluate(policy, "7", ".claude/x") == (True, "safe-prefix")
+        assert guards.evaluate(policy, "0", "x") == (False, "blk-write")
+
+    def test_later_rule_replaces_same_prefix(self):
+        policy = guards.compile_policy([
+            {"prefix": "src/", "allow": ["0"]},
+            {"prefix": "src/", "allow": ["1"], "reason": "src"},
+        ])
+        assert guards.evaluate(policy, "1", "src/a.py") == (True, "src")
+        assert guards.evaluate(policy, "0", "src/a.py") == (False, "blk-write")
+
+    def test_invalid_rules_are_skipped(self):
+        policy = guards.compile_policy(["nope", {"allow": ["0"]}, {"prefix": 3}])
+        assert list(policy["table"]) == [""]
+
+    def test_project_rules_from_settings(self, project):
+        (project / "docs" / "clasi" / "settings.yaml").write_text(
+            "role_guard:\n"
+            "  rules:\n"
+            "    - prefix: docs/design/\n"
+            "      allow: ['0', '1']\n"
+            "      reason: design-docs\n",
+            encoding="utf-8",
+        )
+        assert _exit_code(handle_role_guard, {"file_path": "docs/design/a.md"}) == 0
+        assert _exit_code(handle_role_guard, {"file_path": "src/app.py"}) == 2
+        log = (project / "docs" / "clasi" / "log" / "hooks.log").read_text()
+        assert "design-docs" in log
+
+    def test_compiled_policy_is_cached(self, project):
+        settings = project / "docs" / "clasi" / "settings.yaml"
+        settings.write_text("role_guard:\n  rules: []\n", encoding="utf-8")
+        guards.load_policy()
+        with patch.object(guards, "_project_rules") as mock_rules:
+            guards.load_policy()
+        mock_rules.assert_not_called()
+
+        settings.write_text(
+            "role_guard:\n  rules:\n    - {prefix: src/, allow: '*'}\n",
+            encoding="utf-8",
+        )
+        assert guards.evaluate(guards.load_policy(), "0", "src/a.py")[0] is True
+
+    @pytest.mark.parametrize("path", [
+        "docs/clasi/settings.yaml",
+        "docs/clasi/log/role-guard-policy.json",
+        "docs/clasi/log/guard-state.json",
+    ])
+    def test_policy_inputs_are_protected(self, project, monkeypatch, path):
+        # A project rule opening up docs/clasi/ (or the file itself) to
+        # every tier does not open up the policy's own inputs.
+        (project / "docs" / "clasi" / "settings.yaml").write_text(
+            "role_guard:\n"
+            "  rules:\n"
+            "    - {prefix: docs/clasi/, allow: '*'}\n"
+            f"    - {{prefix: '{path}', allow: '*'}}\n",
+            encoding="utf-8",
+        )
+        assert _exit_code(handle_role_guard, {"file_path": "docs/clasi/todo/a.md"}) == 0
+        assert _exit_code(handle_role_guard, {"file_path": path}) == 2
+        monkeypatch.setenv("CLASI_AGENT_TIER", "1")
+        assert _exit_code(handle_role_guard, {"file_path": path}) == 2
+        monkeypatch.setenv("CLASI_AGENT_TIER", "2")
+        assert _exit_code(handle_role_guard, {"file_path": path}) == 0
+
+    def test_cache_from_older_format_is_ignored(self, project):
+        settings = project / "docs" / "clasi" / "settings.yaml"
+        settings.write_text("role_guard:\n  rules: []\n", encoding="utf-8")
+        key = guards._stat_key(guards.SETTINGS_PATH)
+        cache = project / "docs" / "clasi" / "log" / "role-guard-policy.json"
+        cache.parent.mkdir(parents=True)
+        loose = guards.compile_policy([{"prefix": "", "allow": "*"}])
+        cache.write_text(json.dumps({"key": key, "policy": loose}), encoding="utf-8")
+        assert guards.evaluate(guards.load_policy(), "0", "src/a.py")[0] is False
+
+    def test_no_settings_uses_defaults(self, project):
+        assert guards.load_policy() == guards.compile_policy(
+            guards.DEFAULT_RULES + guards.PROTECTED_RULES
+        )
+        assert not (project / "docs" / "clasi" / "log" / "role-guard-policy.json").exists()
+
+
+class TestGuardState:
+    def test_no_db(self, project):
+        assert guards.guard_state()["tier"] == ""
+
+    def test_reused_within_ttl(self, project):
+        register_active_agent(DB, "a1", "programmer", "2")
+        assert guards.guard_state()["tier"] == "2"
+        with patch.object(guards, "_read_state_db") as mock_read:
+            assert guards.guard_state()["tier"] == "2"
+        mock_read.assert_not_called()
+
+    def test_db_change_invalidates(self, project):
+        register_active_agent(DB, "a1", "sprint-planner", "1")
+        assert guards.guard_state()["tier"] == "1"
+        write_recovery_state(DB, "001", "merge", ["src/app.py"], "conflict")
+        assert guards.guard_state()["allowed_paths"] == ["src/app.py"]
+
+    def test_expires_after_ttl(self, project, monkeypatch):
+        register_active_agent(DB, "a1", "programmer", "2")
+        guards.guard_state()
+        monkeypatch.setattr(guards, "_STATE_TTL_SECONDS", 0)
+        with patch.object(guards, "_read_state_db", return_value=dict(
+            guards._EMPTY_STATE)) as mock_read:
+            guards.guard_state()
+        mock_read.assert_called_once()
@@ -19,8 +19,12 @@ from clasi.hook_handlers import (
     _get_active_tickets,
     _render_transcript_lines,
     _ext_to_language,
+    _append_log_sections,
+    _iter_transcript,
+    _raw_json_lines,
 )
 from clasi.state_db import init_db, register_sprint, acquire_lock, get_active_agent
+from clasi.transcript_store import TranscriptStore, find_references
 
 
 # ---------------------------------------------------------------------------
@@ -143,6 +147,24 @@ class TestHandleTaskCreated:
         # Verify it refers to the same filename as the created log file.
         assert Path(record["log_file"]).name == log_files[0].name
 
+    def test_never_overwrites_existing_log_when_counter_is_behind(self, tmp_path):
+        """A stale sequence counter moves past existing logs instead of reusing them."""
+        import sqlite3
+        from clasi.log_sequence import SEQUENCE_DB, next_log_number
+
+        log_dir = _make_log_dir(tmp_path)
+        assert next_log_number(log_dir, log_dir) == 1
+        (log_dir / "002-implement-feature-x.md").write_text("keep")
+
+        with pytest.raises(SystemExit):
+            _run_with_cwd(tmp_path, handle_task_created, _task_created_payload())
+
+        assert (log_dir / "002-implement-feature-x.md").read_text() == "keep"
+        assert "task_id: t-001" in (log_dir / "003-implement-feature-x.md").read_text()
+        conn = sqlite3.connect(log_dir / SEQUENCE_DB)
+        assert conn.execute("SELECT last FROM log_sequences").fetchone() == (3,)
+        conn.close()
+
     def test_exits_zero_when_log_dir_missing(self, tmp_path):
         """task_created exits 0 gracefully if docs/clasi/log does not exist."""
         payload = _task_created_payload()
@@ -194,6 +216,22 @@ class TestHandleTaskCompleted:
         assert "stopped_at:" in content
         assert "duration_seconds:" in content
 
+    def test_records_task_event_with_duration(self, tmp_path):
+        """task_completed records a structured ``task`` event."""
+        from clasi.event_log import query
+
+        _make_log_dir(tmp_path)
+        self._setup_active_task(tmp_path, task_id="t-009", task_subject="Build")
+        payload = _task_completed_payload(task_id="t-009")
+        payload["task_subject"] = "Build"
+        with pytest.raises(SystemExit):
+            _run_with_cwd(tmp_path, handle_task_completed, payload)
+
+        [event] = query(tmp_path / "docs" / "clasi" / "log", kind="task")
+        assert event["name"] == "Build"
+        assert event["duration_ms"] >= 0
+        assert event["data"]["task_id"] == "t-009"
+
     def test_removes_active_marker_after_completion(self, tmp_path):
         """task_completed removes the DB record for the task."""
         _make_log_dir(tmp_path)
@@ -211,7 +249,7 @@ class TestHandleTaskCompleted:
         assert get_active_agent(db_path, "task-t-002") is None
 
     def test_appends_transcript_content(self, tmp_path):
-        """task_completed appends the transcript as a JSON code block."""
+        """task_completed appends the transcript and stores the raw JSON."""
         _make_log_dir(tmp_path)
         self._setup_active_task(tmp_path, task_id="t-003")
 
@@ -234,9 +272,14 @@ class TestHandleTaskCompleted:
         log_files = list(log_dir.glob("[0-9][0-9][0-9]-*.md"))
         content = log_files[0].read_text()
         assert "## Transcript" in content
-        assert "```json" in content
+        assert "```json" not in content
         assert "Do this task." in content
 
+        store = TranscriptStore(log_dir)
+        [digest] = find_references(content)
+        assert store.read_bytes(digest) == transcript_file.read_bytes()
+        assert "```json" in store.expand(content)
+
     def test_extracts_prompt_from_transcript(self, tmp_path):
         """task_completed extracts the first user message as prompt."""
         _make_log_dir(tmp_path)
@@ -700,6 +743,87 @@ class TestRenderTranscriptLines:
         assert "```json" in output
 
 
+class TestStreamingTranscript:
+    """The transcript section is rendered and written incrementally."""
+
+    @pytest.mark.parametrize("count", [0, 1, 3])
+    def test_raw_json_matches_full_dump(self, count):
+        messages = [
+            {"type": "user", "message": {"content": f"m{i}"}, "n": [i, {"k": i}]}
+            for i in range(count)
+        ]
+        assert "\n".join(_raw_json_lines(iter(messages))) == json.dumps(
+            messages, indent=2
+        )
+
+    def test_iter_transcript_skips_blank_and_malformed_lines(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        path.write_text('{"a": 1}\n\nnot json\n[1]\n{"b": 2}\n')
+        assert list(_iter_transcript(path)) == [{"a": 1}, {"b": 2}]
+
+    def test_iter_transcript_missing_file(self, tmp_path):
+        assert list(_iter_transcript(tmp_path / "missing.jsonl")) == []
+
+    def test_append_matches_list_rendering(self, tmp_path):
+        messages = [
+            _make_message_with_tool_use(_make_tool_use_block("Bash", {"command": "ls"})),
+            {"type": "user", "message": {"content": "hello"}},
+        ]
+        transcript = tmp_path / "t.jsonl"
+        transcript.write_text("\n".join(json.dumps(m) for m in messages))
+        log_file = tmp_path / "log.md"
+        log_file.write_text("head\n")
+
+        _append_log_sections(log_file, "the prompt", "the result", str(transcript))
+
+        expected = "\n".join(
+            ["## Prompt", "", "the prompt", "", "## Result", "", "the result", ""]
+            + _render_transcript_lines(messages)
+        )
+        assert log_file.read_text() == "head\n" + expected
+
+    def test_append_with_store_references_blob(self, tmp_path):
+        messages = [{"type": "user", "message": {"content": "hello"}}]
+        transcript = tmp_path / "t.jsonl"
+        transcript.write_text("\n".join(json.dumps(m) for m in messages))
+        log_file = tmp_path / "log.md"
+        log_file.write_text("")
+
+        _append_log_sections(log_file, "", "", str(transcript), tmp_path)
+
+        store = TranscriptStore(tmp_path)
+        content = log_file.read_text()
+        assert find_references(content) == store.digests()
+        assert store.expand(content) == "\n".join(_render_transcript_lines(messages))
+
+    def test_nothing_to_append(self, tmp_path):
+        log_file = tmp_path / "log.md"
+        log_file.write_text("head\n")
+        _append_log_sections(log_file, "", "", str(tmp_path / "missing.jsonl"))
+        assert log_file.read_text() == "head\n"
+
+    def test_memory_is_bounded_by_message_size(self, tmp_path):
+        import tracemalloc
+
+        transcript = tmp_path / "big.jsonl"
+        msg = {"type": "assistant", "message": {"content": "x" * 2000}}
+        line = json.dumps(msg) + "\n"
+        with open(transcript, "w", encoding="utf-8") as f:
+            for _ in range(2500):  # ~5 MB
+                f.write(line)
+        log_file = tmp_path / "log.md"
+        log_file.write_text("")
+
+        tracemalloc.start()
+        try:
+            _append_log_sections(log_file, "", "", str(transcript))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert log_file.stat().st_size > 2 * transcript.stat().st_size
+        assert peak < 1_000_000
+
+
 # ---------------------------------------------------------------------------
 # handle_hook dispatcher tests
 # ---------------------------------------------------------------------------
@@ -799,8 +923,7 @@ class TestHandleCommitCheck:
     def test_prints_reminder_on_master_with_git_commit(self, capsys, monkeypatch):
         """Prints reminder when TOOL_INPUT has 'git commit' and branch is master."""
         monkeypatch.setenv("TOOL_INPUT", "git commit -m 'fix: something'")
-        with patch("clasi.hook_handlers.subprocess.run") as mock_run:
-            mock_run.return_value = type("R", (), {"stdout": "master\n"})()
+        with patch("clasi.git_refs.current_branch", return_value="master"):
             with pytest.raises(SystemExit) as exc:
                 handle_commit_check({})
         assert exc.value.code == 0
@@ -810,8 +933,7 @@ class TestHandleCommitCheck:
     def test_prints_reminder_on_main_with_git_commit(self, capsys, monkeypatch):
         """Prints reminder when TOOL_INPUT has 'git commit' and branch is main."""
         monkeypatch.setenv("TOOL_INPUT", "git commit -m 'feat: new thing'")
-        with patch("clasi.hook_handlers.subprocess.run") as mock_run:
-            mock_run.return_value = type("R", (), {"stdout": "main\n"})()
+        with patch("clasi.git_refs.current_branch", return_value="main"):
             with pytest.raises(SystemExit) as exc:
                 handle_commit_check({})
         assert exc.value.code == 0
@@ -821,8 +943,7 @@ class TestHandleCommitCheck:
     def test_silent_when_not_on_master(self, capsys, monkeypatch):
         """No output when TOOL_INPUT has 'git commit' but branch is not master/main."""
         monkeypatch.setenv("TOOL_INPUT", "git commit -m 'fix: bug'")
-        with patch("clasi.hook_handlers.subprocess.run") as mock_run:
-            mock_run.return_value = type("R", (), {"stdout": "feature/my-feature\n"})()
+        with patch("clasi.git_refs.current_branch", return_value="feature/my-feature"):
             with pytest.raises(SystemExit) as exc:
                 handle_commit_check({})
         assert exc.value.code == 0
@@ -830,13 +951,13 @@ class TestHandleCommitCheck:
         assert captured.out == ""
 
     def test_silent_when_tool_input_lacks_git_commit(self, capsys, monkeypatch):
-        """No subprocess call and no output when TOOL_INPUT has no 'git commit'."""
+        """No branch lookup and no output when TOOL_INPUT has no 'git commit'."""
         monkeypatch.setenv("TOOL_INPUT", "git status")
-        with patch("clasi.hook_handlers.subprocess.run") as mock_run:
+        with patch("clasi.git_refs.current_branch") as mock_branch:
             with pytest.raises(SystemExit) as exc:
                 handle_commit_check({})
         assert exc.value.code == 0
-        mock_run.assert_not_called()
+        mock_branch.assert_not_called()
         captured = capsys.readouterr()
         assert captured.out == ""
 
@@ -0,0 +1,77 @@
+"""Import-time regression benchmark for the clasi-hook fast path.
+
+role-guard runs before every Edit/Write, so whatever ``clasi-hook``
+imports is paid on each tool call. These tests run
+``python -X importtime`` in a fresh interpreter and fail if the guard
+path starts importing anything beyond json/os/sys/sqlite3 (and their
+own dependencies), or if its import time exceeds the budget.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import clasi
+
+# Generous compared with the ~10 ms this takes today, but far below the
+# cost of pulling in click, yaml or the MCP stack by accident.
+IMPORT_BUDGET_US = 50_000
+
+# Top-level packages the fast path may add on top of interpreter start-up.
+ALLOWED_ROOTS = {
+    "clasi", "json", "sqlite3", "datetime", "time", "zlib", "collections",
+}
+
+# The interpreter runs isolated and without ``site`` (``-I -S``): what
+# site and .pth files import differs between environments (an editable
+# install pulls in ``typing``, for example) and must not count as the
+# baseline. The baseline is the standard library the guards are allowed,
+# and the package is put on the path by hand.
+_BASELINE = (
+    f"import sys; sys.path.insert(0, {str(Path(clasi.__file__).parent.parent)!r}); "
+    "import json, os, sqlite3, time"
+)
+_FAST_PATH = _BASELINE + "; import clasi.hook_client, clasi.guards"
+
+
+def _importtime(code: str) -> list[tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, name) rows; name keeps its indent."""
+    proc = subprocess.run(
+        [sys.executable, "-I", "-S", "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative), name[1:]))
+    return rows
+
+
+def _module_names(rows) -> set[str]:
+    return {name.strip() for _, _, name in rows}
+
+
+def test_fast_path_imports_only_allowed_modules():
+    baseline = _module_names(_importtime(_BASELINE))
+    added = _module_names(_importtime(_FAST_PATH)) - baseline
+    unexpected = sorted(
+        m for m in added if m.split(".")[0].lstrip("_") not in ALLOWED_ROOTS
+    )
+    assert unexpected == []
+    assert "clasi.hook_handlers" not in added
+
+
+def test_fast_path_import_time_within_budget():
+    best = None
+    for _ in range(3):
+        rows = _importtime(_FAST_PATH)
+        total = sum(
+            cumulative for _, cumulative, name in rows
+            if name == name.lstrip() and name.startswith("clasi")
+        )
+        best = total if best is None else min(best, total)
+    assert best <= IMPORT_BUDGET_US, (
+        f"clasi-hook imports took {best} us (budget {IMPORT_BUDGET_US} us)"
+    )
@@ -0,0 +1,225 @@
+"""Tests for clasi.hook_server and the clasi-hook client."""
+
+import json
+import os
+import stat
+import threading
+import time
+
+import pytest
+
+from clasi import hook_client, hook_server
+from clasi.hook_server import HookServer, run_event
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project dir as cwd, with sockets in a private short TMPDIR."""
+    root = tmp_path / "proj"
+    root.mkdir()
+    sock_dir = tmp_path / "s"
+    sock_dir.mkdir()
+    monkeypatch.setenv("TMPDIR", str(sock_dir))
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.delenv("CLASI_AGENT_TIER", raising=False)
+    monkeypatch.chdir(root)
+    return root
+
+
+@pytest.fixture
+def server(project):
+    srv = HookServer(project, idle_timeout=30)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(srv.path):
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    yield srv
+    hook_server.stop(project)
+    thread.join(timeout=5)
+
+
+def _blocked_write():
+    return json.dumps({"file_path": "src/app.py"})
+
+
+class TestSocketPath:
+    def test_keyed_by_root(self, project, tmp_path):
+        other = tmp_path / "other"
+        other.mkdir()
+        assert hook_client.socket_path(project) != hook_client.socket_path(other)
+        assert hook_client.socket_path() == hook_client.socket_path(project)
+
+    def test_in_private_dir_under_tmpdir(self, project):
+        directory = os.path.dirname(hook_client.socket_path())
+        assert directory == os.path.join(
+            os.environ["TMPDIR"], f"clasi-hook-{os.getuid()}",
+        )
+
+    def test_prefers_runtime_dir(self, project, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert os.path.dirname(hook_client.socket_path()) == str(tmp_path)
+
+
+class TestRunEvent:
+    def test_block_exit_code_and_stderr(self, project):
+        result = run_event("role-guard", _blocked_write(), str(project),
+                           {"CLASI_AGENT_TIER": "0"})
+        assert result["exit_code"] == 2
+        assert "CLASI" in result["stderr"]
+
+    def test_allow(self, project):
+        result = run_event("role-guard", "{}", str(project), {})
+        assert result["exit_code"] == 0
+
+    def test_unknown_event(self, project):
+        result = run_event("no-such-event", "{}", str(project), {})
+        assert result["exit_code"] == 1
+        assert "unknown event" in result["stderr"]
+
+    def test_restores_process_state(self, project, tmp_path):
+        other = tmp_path / "other"
+        other.mkdir()
+        env_before = dict(os.environ)
+        run_event("role-guard", "{}", str(other), {"CLASI_AGENT_TIER": "2"})
+        assert os.getcwd() == str(project)
+        assert dict(os.environ) == env_before
+
+    def test_forwarded_variables_replace_the_servers(self, project, monkeypatch):
+        # The server's own tier would allow the write; the client's blocks it.
+        monkeypatch.setenv("CLASI_AGENT_TIER", "2")
+        result = run_event("role-guard", _blocked_write(), str(project),
+                           {"CLASI_AGENT_TIER": "0", "PATH": "/nowhere"})
+        assert result["exit_code"] == 2
+        assert os.environ["CLASI_AGENT_TIER"] == "2"
+
+
+class TestForwardedEnvironment:
+    def test_only_handler_variables_are_sent(self, project, monkeypatch):
+        sent = {}
+        monkeypatch.setattr(hook_client, "request",
+                            lambda message, root=None: sent.update(message))
+        monkeypatch.setenv("CLASI_AGENT_TIER", "2")
+        monkeypatch.setenv("TOOL_INPUT", "git commit")
+        monkeypatch.setenv("GITHUB_TOKEN", "secret")
+        hook_client.forward("role-guard", "{}")
+        assert sent["env"]["CLASI_AGENT_TIER"] == "2"
+        assert sent["env"]["TOOL_INPUT"] == "git commit"
+        assert "GITHUB_TOKEN" not in sent["env"]
+        assert "PATH" not in sent["env"]
+
+
+class TestClientWithoutServer:
+    def test_forward_returns_none(self, project):
+        assert hook_client.forward("role-guard", "{}") is None
+
+    def test_main_falls_back_in_process(self, project, monkeypatch, capsys):
+        import io
+
+        monkeypatch.setenv("CLASI_AGENT_TIER", "0")
+        monkeypatch.setattr("sys.stdin", io.StringIO(_blocked_write()))
+        with pytest.raises(SystemExit) as exc:
+            hook_client.main(["role-guard"])
+        assert exc.value.code == 2
+
+    def test_main_usage(self, project):
+        with pytest.raises(SystemExit) as exc:
+            hook_client.main([])
+        assert exc.value.code == 1
+
+
+class TestServerRoundTrip:
+    def test_status(self, server, project):
+        info = hook_server.status(project)
+        assert info["pid"] == os.getpid()
+        assert info["root"] == os.path.realpath(project)
+
+    def test_forward_block(self, server, monkeypatch):
+        monkeypatch.setenv("CLASI_AGENT_TIER", "0")
+        exit_code, _out, err = hook_client.forward("role-guard", _blocked_write())
+        assert exit_code == 2
+        assert "CLASI" in err
+
+    def test_forward_allow(self, server, monkeypatch):
+        monkeypatch.setenv("CLASI_AGENT_TIER", "2")
+        assert hook_client.forward("role-guard", _blocked_write())[0] == 0
+
+    def test_other_root_falls_back(self, server, project):
+        reply = server.handle_request(
+            {"command": "hook", "event": "role-guard", "cwd": "/", "stdin": ""}
+        )
+        assert reply["fallback"] is True
+
+    def test_source_change_shuts_down(self, server, project, monkeypatch):
+        monkeypatch.setattr(hook_server, "_source_signature", lambda: ())
+        assert hook_client.forward("role-guard", "{}") is None
+        deadline = time.monotonic() + 5
+        while os.path.exists(server.path):
+            assert time.monotonic() < deadline, "server did not exit"
+            time.sleep(0.01)
+
+    def test_sources_checked_at_most_once_per_second(self, server, project,
+                                                      monkeypatch):
+        scans = []
+        monkeypatch.setattr(hook_server, "_source_signature",
+                            lambda: scans.append(1) or server._signature)
+        for _ in range(3):
+            assert hook_client.forward("role-guard", "{}")[0] == 0
+        assert len(scans) == 1
+
+    def test_socket_and_directory_are_private(self, server):
+        assert stat.S_IMODE(os.stat(server.path).st_mode) & 0o077 == 0
+        directory = os.path.dirname(server.path)
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+    def test_client_refuses_socket_others_can_use(self, server):
+        os.chmod(server.path, 0o666)
+        assert hook_client.forward("role-guard", "{}") is None
+        os.chmod(server.path, 0o600)
+        os.chmod(os.path.dirname(server.path), 0o755)
+        assert hook_client.forward("role-guard", "{}") is None
+        os.chmod(os.path.dirname(server.path), 0o700)
+        assert hook_client.forward("role-guard", "{}")[0] == 0
+
+    def test_server_refuses_shared_directory(self, project):
+        srv = HookServer(project, idle_timeout=0.05)
+        os.mkdir(os.path.dirname(srv.path), 0o777)
+        os.chmod(os.path.dirname(srv.path), 0o777)
+        with pytest.raises(RuntimeError):
+            srv.serve_forever()
+
+    def test_source_signature_covers_subpackages(self):
+        names = [name for name, _ in hook_server._source_signature()]
+        assert "hook_handlers.py" in names
+        assert "tools/artifact_tools.py" in names
+        assert "platforms/claude.py" in names
+
+    def test_stop(self, server, project):
+        assert hook_server.stop(project) is True
+        deadline = time.monotonic() + 5
+        while os.path.exists(server.path):
+            assert time.monotonic() < deadline, "server did not exit"
+            time.sleep(0.01)
+        assert hook_server.status(project) is None
+
+
+class TestIdleTimeout:
+    def test_exits_when_idle(self, project):
+        srv = HookServer(project, idle_timeout=0.05)
+        srv.serve_forever()
+        assert not os.path.exists(srv.path)
+
+
+def test_plugin_hooks_all_use_clasi_hook():
+    """Every Claude hook goes through clasi-hook, so the server can serve it."""
+    hooks_json = hook_server._PACKAGE_DIR / "plugin" / "hooks" / "hooks.json"
+    hooks = json.loads(hooks_json.read_text(encoding="utf-8"))["hooks"]
+    commands = [
+        hook["command"]
+        for entries in hooks.values()
+        for entry in entries
+        for hook in entry["hooks"]
+    ]
+    assert len(commands) == 8
+    assert all(command.startswith("clasi-hook ") for command in commands)
@@ -361,8 +361,8 @@ class TestHooksConfig:
             for h in entry.get("hooks", [])
         ]
         assert not any("python3" in cmd for cmd in all_commands)
-        # New clasi hook role-guard command is present
-        assert any("clasi hook role-guard" in cmd for cmd in all_commands)
+        # New clasi-hook role-guard command is present
+        assert any("clasi-hook role-guard" in cmd for cmd in all_commands)
 
     def test_hooks_unchanged_when_already_correct(self, target_dir):
         """Running init on a directory that already has correct hooks does not change settings.json."""
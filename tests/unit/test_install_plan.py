@@ -0,0 +1,143 @@
+"""Tests for incremental clasi init: clasi/platforms/_plan.py and --dry-run."""
+
+import json
+
+from click.testing import CliRunner
+
+from clasi.cli import cli
+from clasi.init_command import run_init
+from clasi.platforms import _plan
+
+
+def _tree(root):
+    """Map of relative path -> bytes for every file under *root*."""
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+def _manifest(root):
+    return json.loads((root / _plan.MANIFEST_PATH).read_text())["files"]
+
+
+class TestPlanHelpers:
+    def test_write_text_actions(self, tmp_path):
+        path = tmp_path / "a" / "b.txt"
+        with _plan.planning(tmp_path) as plan:
+            assert _plan.write_text(path, "one\n") == "create"
+            assert _plan.write_text(path, "one\n") == "unchanged"
+            assert _plan.write_text(path, "two\n") == "update"
+        assert path.read_text() == "two\n"
+        assert plan.actions == {"a/b.txt": "create"}
+
+    def test_dry_run_writes_to_overlay_only(self, tmp_path):
+        path = tmp_path / "x.txt"
+        with _plan.planning(tmp_path, dry_run=True) as plan:
+            assert _plan.write_text(path, "hello\n") == "create"
+            assert _plan.read_text(path) == "hello\n"
+            assert _plan.write_text(path, "hello\n") == "unchanged"
+        assert not path.exists()
+        assert plan.changes() == [("create", "x.txt")]
+
+    def test_helpers_work_without_a_plan(self, tmp_path):
+        path = tmp_path / "x.txt"
+        assert _plan.write_text(path, "hello\n") == "create"
+        assert _plan.write_text(path, "hello\n") == "unchanged"
+
+
+class TestRunInitIncremental:
+    def test_second_run_changes_nothing(self, tmp_path, capsys):
+        run_init(str(tmp_path), claude=True, codex=True, copilot=True)
+        assert (tmp_path / _plan.MANIFEST_PATH).exists()
+        before = _tree(tmp_path)
+        capsys.readouterr()
+
+        run_init(str(tmp_path), claude=True, codex=True, copilot=True)
+
+        out = capsys.readouterr().out
+        assert "Changes: 0 created, 0 updated, 0 deleted" in out
+        assert _tree(tmp_path) == before
+
+    def test_manifest_records_sections_and_ownership(self, tmp_path):
+        run_init(str(tmp_path), claude=True, codex=True)
+        files = _manifest(tmp_path)
+        assert files[".codex/agents/team-lead.toml"]["sections"] == ["codex"]
+        assert files[".codex/agents/team-lead.toml"]["owned"] is True
+        assert files["AGENTS.md"]["owned"] is False
+        assert files["AGENTS.md"]["sections"] == ["claude", "codex"]
+        assert files[".claude/skills/se/SKILL.md"]["link"] == ".agents/skills/se/SKILL.md"
+
+    def test_stale_owned_file_is_pruned(self, tmp_path, capsys):
+        run_init(str(tmp_path), codex=True)
+        stale = tmp_path / ".codex" / "agents" / "retired.toml"
+        stale.write_text("name = \"retired\"\n")
+        files = _manifest(tmp_path)
+        files[".codex/agents/retired.toml"] = {
+            "sections": ["codex"],
+            "owned": True,
+            "sha256": _plan._digest(stale.read_bytes()),
+        }
+        (tmp_path / _plan.MANIFEST_PATH).write_text(json.dumps({"files": files}))
+        capsys.readouterr()
+
+        run_init(str(tmp_path), codex=True)
+
+        assert not stale.exists()
+        assert "Deleted: .codex/agents/retired.toml" in capsys.readouterr().out
+        assert ".codex/agents/retired.toml" not in _manifest(tmp_path)
+
+    def test_modified_file_is_kept(self, tmp_path, capsys):
+        run_init(str(tmp_path), codex=True)
+        stale = tmp_path / ".codex" / "agents" / "retired.toml"
+        stale.write_text("edited by hand\n")
+        files = _manifest(tmp_path)
+        files[".codex/agents/retired.toml"] = {
+            "sections": ["codex"],
+            "owned": True,
+            "sha256": _plan._digest(b"original\n"),
+        }
+        (tmp_path / _plan.MANIFEST_PATH).write_text(json.dumps({"files": files}))
+        capsys.readouterr()
+
+        run_init(str(tmp_path), codex=True)
+
+        assert stale.exists()
+        assert "Kept (modified since install): .codex/agents/retired.toml" in (
+            capsys.readouterr().out
+        )
+
+    def test_other_sections_are_not_pruned(self, tmp_path):
+        run_init(str(tmp_path), claude=True, codex=True)
+        run_init(str(tmp_path), codex=True)
+        assert (tmp_path / ".claude" / "agents" / "team-lead" / "agent.md").exists()
+        assert ".claude/agents/team-lead/agent.md" in _manifest(tmp_path)
+
+
+class TestDryRun:
+    def test_dry_run_on_empty_project_writes_nothing(self, tmp_path, capsys):
+        run_init(str(tmp_path), claude=True, codex=True, dry_run=True)
+        assert _tree(tmp_path) == {}
+        out = capsys.readouterr().out
+        assert "Dry run: no files were changed." in out
+        assert "create: .codex/config.toml" in out
+        assert "create: CLAUDE.md" in out
+
+    def test_dry_run_after_install_reports_no_changes(self, tmp_path, capsys):
+        run_init(str(tmp_path), claude=True)
+        before = _tree(tmp_path)
+        capsys.readouterr()
+
+        run_init(str(tmp_path), claude=True, dry_run=True)
+
+        assert _tree(tmp_path) == before
+        assert "Plan: 0 created, 0 updated, 0 deleted" in capsys.readouterr().out
+
+    def test_cli_dry_run_flag(self, tmp_path):
+        result = CliRunner().invoke(
+            cli, ["init", "--codex", "--dry-run", str(tmp_path)],
+        )
+        assert result.exit_code == 0, result.output
+        assert "Dry run: no files were changed." in result.output
+        assert not (tmp_path / ".codex").exists()
@@ -0,0 +1,75 @@
+"""Tests for clasi.log_sequence."""
+
+import sqlite3
+import subprocess
+import sys
+
+from clasi.log_sequence import SEQUENCE_DB, create_log_file, next_log_number
+
+
+def _counters(log_root):
+    conn = sqlite3.connect(log_root / SEQUENCE_DB)
+    try:
+        return dict(conn.execute("SELECT directory, last FROM log_sequences"))
+    finally:
+        conn.close()
+
+
+def test_counter_lives_in_log_root_keyed_by_directory(tmp_path):
+    (tmp_path / "sprint-001").mkdir()
+    (tmp_path / "sprint-001" / "003-programmer.md").write_text("x")
+    assert next_log_number(tmp_path, tmp_path) == 1
+    assert next_log_number(tmp_path / "sprint-001", tmp_path) == 4
+    assert next_log_number(tmp_path, tmp_path) == 2
+    assert _counters(tmp_path) == {".": 2, "sprint-001": 4}
+
+
+def test_missing_log_root_falls_back_to_scan(tmp_path):
+    (tmp_path / "002-x.md").write_text("x")
+    assert next_log_number(tmp_path, tmp_path / "missing") == 3
+    assert not (tmp_path / "missing").exists()
+
+
+def test_create_never_overwrites_when_counter_is_behind(tmp_path):
+    assert create_log_file(tmp_path, lambda n: f"{n:03d}-a.md", "first",
+                           log_root=tmp_path).name == "001-a.md"
+    # Files that the counter does not know about, e.g. copied in by hand.
+    (tmp_path / "002-a.md").write_text("keep")
+    (tmp_path / "003-b.md").write_text("keep")
+
+    path = create_log_file(tmp_path, lambda n: f"{n:03d}-a.md", "new",
+                           log_root=tmp_path)
+
+    assert path.name == "004-a.md"
+    assert path.read_text() == "new"
+    assert (tmp_path / "002-a.md").read_text() == "keep"
+    assert _counters(tmp_path) == {".": 4}
+    assert next_log_number(tmp_path, tmp_path) == 5
+
+
+def test_create_without_log_root_uses_scan(tmp_path):
+    (tmp_path / "001-a.md").write_text("keep")
+    path = create_log_file(tmp_path, lambda n: f"{n:03d}.md")
+    assert path.name == "002.md"
+    assert not (tmp_path / SEQUENCE_DB).exists()
+
+
+def test_concurrent_processes_get_distinct_numbers(tmp_path):
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from clasi.log_sequence import next_log_number\n"
+        "root = Path(sys.argv[1])\n"
+        "print(*[next_log_number(root, root) for _ in range(25)])\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code, str(tmp_path)],
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    numbers = []
+    for proc in procs:
+        out, _ = proc.communicate(timeout=60)
+        assert proc.returncode == 0
+        numbers += [int(n) for n in out.split()]
+    assert sorted(numbers) == list(range(1, 101))
@@ -47,6 +47,7 @@ class TestToolRegistration:
     EXPECTED_PROCESS_TOOLS = {
         "get_use_case_coverage",
         "get_version",
+        "get_server_metrics",
     }
 
     EXPECTED_ARTIFACT_TOOLS = {
@@ -58,6 +59,7 @@ class TestToolRegistration:
         "get_sprint_status",
         "update_ticket_status",
         "move_ticket_to_done",
+        "batch_update_tickets",
         "reopen_ticket",
         "close_sprint",
         "clear_sprint_recovery",
@@ -68,6 +70,7 @@ class TestToolRegistration:
         "release_execution_lock",
         "list_todos",
         "move_todo_to_done",
+        "query_events",
         "create_github_issue",
         "close_github_issue",
         "list_github_issues",
@@ -101,7 +104,7 @@ class TestToolRegistration:
 
     def test_tool_count(self):
         registered = self._registered_tool_names()
-        assert len(registered) == 29
+        assert len(registered) == 32
 
     def test_process_tools_registered(self):
         registered = self._registered_tool_names()
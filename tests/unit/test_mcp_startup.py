@@ -0,0 +1,92 @@
+"""Start-up cost of ``clasi mcp``: lazy tool registration from the manifest.
+
+The registration checks run in fresh interpreters because the test
+process has usually imported the tool modules already.
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+
+from clasi.mcp_server import server
+from clasi.tools import manifest
+
+# Registering the tools lazily takes ~6 ms here against ~90 ms for
+# importing the tool modules; the budget leaves room for slow machines.
+REGISTER_BUDGET_S = 0.05
+
+
+def _run(code: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_manifest_is_current():
+    """Regenerate with ``python -m clasi.tools.manifest`` if this fails."""
+    on_disk = json.loads(manifest.MANIFEST_PATH.read_text(encoding="utf-8"))
+    assert on_disk == json.loads(json.dumps(manifest.build(server)))
+    assert manifest.load() is not None
+
+
+def test_stale_manifest_is_rejected(tmp_path):
+    data = json.loads(manifest.MANIFEST_PATH.read_text(encoding="utf-8"))
+    data["sources"]["clasi.tools.artifact_tools"] = "0" * 64
+    stale = tmp_path / "manifest.json"
+    stale.write_text(json.dumps(data))
+    assert manifest.load(stale) is None
+    assert manifest.load(tmp_path / "missing.json") is None
+
+
+def test_manifest_from_other_mcp_version_is_rejected(tmp_path):
+    data = json.loads(manifest.MANIFEST_PATH.read_text(encoding="utf-8"))
+    data["sources"]["mcp"] = "0.0.1"
+    stale = tmp_path / "manifest.json"
+    stale.write_text(json.dumps(data))
+    assert manifest.load(stale) is None
+
+
+def test_lazy_listing_matches_eager_and_loads_on_call():
+    result = _run("""
+        import asyncio, json, sys, time
+        from clasi.mcp_server import app
+        start = time.perf_counter()
+        app._register_tools()
+        elapsed = time.perf_counter() - start
+        loaded_at_ready = "clasi.tools.artifact_tools" in sys.modules
+        lazy = [t.model_dump(mode="json") for t in asyncio.run(app.server.list_tools())]
+        version = asyncio.run(app.server._tool_manager.call_tool("get_version", {}))
+        loaded_after_process_call = "clasi.tools.artifact_tools" in sys.modules
+        asyncio.run(app.server._tool_manager.call_tool("list_todos", {}))
+        eager = [t.model_dump(mode="json") for t in asyncio.run(app.server.list_tools())]
+        print(json.dumps({
+            "elapsed": elapsed,
+            "loaded_at_ready": loaded_at_ready,
+            "loaded_after_process_call": loaded_after_process_call,
+            "version": json.loads(version)["version"],
+            "lazy": lazy,
+            "eager": eager,
+        }))
+    """)
+    assert result["loaded_at_ready"] is False
+    assert result["loaded_after_process_call"] is False
+    assert result["version"]
+    assert result["lazy"] == result["eager"]
+    assert len(result["lazy"]) == len(manifest.build(server)["tools"])
+    assert result["elapsed"] < REGISTER_BUDGET_S
+
+
+def test_startup_imports_no_tool_implementation_modules():
+    result = _run("""
+        import json, sys
+        from clasi.mcp_server import app
+        app._register_tools()
+        print(json.dumps(sorted(sys.modules)))
+    """)
+    # jsonschema and urllib come with FastMCP itself.
+    for module in ("clasi.tools.artifact_tools", "clasi.tools.process_tools",
+                   "clasi.versioning", "clasi.sprint", "clasi.ticket", "jinja2"):
+        assert module not in result
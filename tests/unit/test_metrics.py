@@ -0,0 +1,147 @@
+"""Tests for clasi.metrics and the MCP server's per-tool instrumentation."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from clasi import frontmatter, metrics
+from clasi.metrics import Histogram, Metrics
+from clasi.state_db_class import StateDB
+
+
+def _burn(seconds: float) -> None:
+    """Spin on the CPU for *seconds* of this thread's CPU time."""
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestHistogram:
+    def test_buckets_and_percentiles(self):
+        h = Histogram()
+        for ms in (0.5, 3, 3, 40, 20000):
+            h.add(ms)
+        d = h.to_dict()
+        assert d["count"] == 5
+        assert d["max_ms"] == 20000
+        assert d["buckets"] == {"<=1": 1, "<=5": 2, "<=50": 1, ">10000": 1}
+        assert d["p50_ms"] == 5.0
+        assert d["p95_ms"] == 20000
+
+    def test_empty(self):
+        assert Histogram().to_dict()["p50_ms"] is None
+
+
+class TestMetrics:
+    def test_call_records_timing_and_counters(self):
+        m = Metrics()
+        with m.call("list_tickets") as sample:
+            metrics.count("files_read", 2)
+            metrics.count("bytes_parsed", 100)
+        assert sample["wall_ms"] >= 0 and sample["cpu_ms"] >= 0
+        stats = m.snapshot()["tools"]["list_tickets"]
+        assert stats["calls"] == 1
+        assert stats["errors"] == 0
+        assert stats["files_read"] == 2
+        assert stats["bytes_parsed"] == 100
+        assert stats["db_queries"] == 0
+
+    def test_count_outside_call_is_ignored(self):
+        m = Metrics()
+        metrics.count("files_read")
+        assert m.snapshot()["tools"] == {}
+
+    def test_errors_counted(self):
+        m = Metrics()
+        with pytest.raises(ValueError):
+            with m.call("close_sprint"):
+                raise ValueError("boom")
+        assert m.snapshot()["tools"]["close_sprint"]["errors"] == 1
+
+    def test_tools_ordered_by_total_wall_time(self):
+        m = Metrics()
+        m._add("fast", {"wall_ms": 1.0, "cpu_ms": 1.0}, False)
+        m._add("slow", {"wall_ms": 900.0, "cpu_ms": 1.0}, False)
+        assert list(m.snapshot()["tools"]) == ["slow", "fast"]
+
+    def test_cpu_excludes_other_threads(self):
+        m = Metrics()
+        with m.call("list_tickets") as sample:
+            worker = threading.Thread(target=_burn, args=(0.3,))
+            worker.start()
+            worker.join()
+        assert sample["cpu_ms"] < 150
+
+    def test_background_tool_cpu_is_measured_on_worker(self):
+        from clasi.background import as_async
+
+        def close_sprint() -> None:
+            _burn(0.2)
+
+        m = Metrics()
+        with m.call("close_sprint") as sample:
+            asyncio.run(as_async(close_sprint)())
+        assert sample["cpu_ms"] >= 100
+
+    def test_instrumented_sources(self, tmp_path):
+        doc = tmp_path / "t.md"
+        doc.write_text("---\nid: '001'\n---\nbody\n")
+        frontmatter.cache_clear()
+        metrics.install_audit_hook()
+        m = Metrics()
+        with m.call("probe"):
+            frontmatter.read_frontmatter(doc)
+            frontmatter.read_document(doc)
+            StateDB(tmp_path / ".clasi.db").get_active_tier()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+        stats = m.snapshot()["tools"]["probe"]
+        assert stats["files_read"] == 2
+        assert stats["bytes_parsed"] > 0
+        assert stats["db_queries"] >= 1
+        assert stats["subprocesses"] == 1
+        StateDB(tmp_path / ".clasi.db").close()
+
+    def test_dump(self, tmp_path):
+        m = Metrics()
+        with m.call("get_version"):
+            pass
+        m.dump(tmp_path / "log" / "mcp-metrics.json")
+        data = json.loads((tmp_path / "log" / "mcp-metrics.json").read_text())
+        assert data["tools"]["get_version"]["calls"] == 1
+
+
+class TestServerInstrumentation:
+    def test_run_measures_calls_and_dumps_on_shutdown(self, tmp_path, monkeypatch):
+        from clasi.event_log import query
+        from clasi.mcp_server import Clasi, logger
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(metrics, "registry", Metrics())
+        app = Clasi()
+
+        @app.server.tool()
+        def probe() -> str:
+            return "ok"
+
+        def fake_run(transport):
+            asyncio.run(app.server._tool_manager.call_tool("probe", {}))
+
+        monkeypatch.setattr(app.server, "run", fake_run)
+        handlers = list(logger.handlers)
+        try:
+            app.run()
+        finally:
+            for h in logger.handlers[len(handlers):]:
+                logger.removeHandler(h)
+                h.close()
+
+        log_dir = tmp_path / "docs" / "clasi" / "log"
+        dumped = json.loads((log_dir / "mcp-metrics.json").read_text())
+        assert dumped["tools"]["probe"]["calls"] == 1
+        [event] = query(log_dir, kind="tool")
+        assert (event["name"], event["outcome"]) == ("probe", "ok")
@@ -1,8 +1,11 @@
 """Tests for the Sprint class and Project sprint management."""
 
+import dataclasses
 from pathlib import Path
 from unittest.mock import MagicMock, patch, call
 
+import pytest
+
 from clasi.artifact import Artifact
 from clasi.project import Project
 from clasi.sprint import Sprint, MergeConflictError
@@ -435,13 +438,18 @@ def _make_run_result(returncode: int, stdout: str = "", stderr: str = "") -> Mag
     return result
 
 
+def _branch_exists(exists: bool):
+    """Patch the ref-store lookup Sprint uses to see whether a branch exists."""
+    return patch("clasi.sprint.git_refs.rev_exists", return_value=exists)
+
+
 class TestSprintCreateBranch:
     """Tests for Sprint.create_branch()."""
 
     def test_create_branch_success(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(False), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.return_value = _make_run_result(0)
             branch = s.create_branch()
         assert branch == "sprint/001-test-sprint"
@@ -451,26 +459,24 @@ class TestSprintCreateBranch:
             text=True,
         )
 
-    def test_create_branch_already_exists_falls_back_to_checkout(self, tmp_path):
+    def test_create_branch_already_exists_checks_it_out(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
-            mock_run.side_effect = [
-                _make_run_result(1, stderr="already exists"),  # checkout -b fails
-                _make_run_result(0),  # checkout succeeds
-            ]
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
+            mock_run.return_value = _make_run_result(0)
             branch = s.create_branch()
         assert branch == "sprint/001-test-sprint"
-        assert mock_run.call_count == 2
+        mock_run.assert_called_once_with(
+            ["git", "checkout", "sprint/001-test-sprint"],
+            capture_output=True,
+            text=True,
+        )
 
     def test_create_branch_raises_on_failure(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
-            mock_run.side_effect = [
-                _make_run_result(1, stderr="error A"),
-                _make_run_result(1, stderr="error B"),
-            ]
+        with _branch_exists(False), patch("clasi.sprint.subprocess.run") as mock_run:
+            mock_run.return_value = _make_run_result(1, stderr="error B")
             try:
                 s.create_branch()
                 assert False, "Expected RuntimeError"
@@ -500,10 +506,11 @@ class TestSprintMergeBranch:
     def test_merge_branch_success(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # git rev-parse --verify (branch exists)
                 _make_run_result(1),  # git merge-base --is-ancestor (not yet merged)
+                _make_run_result(1),  # git merge-base --is-ancestor (not a fast-forward)
+                _make_run_result(0),  # git merge-tree --write-tree (clean)
                 _make_run_result(0),  # git rebase master sprint/001-test-sprint
                 _make_run_result(0),  # git checkout master
                 _make_run_result(0),  # git merge --no-ff
@@ -516,8 +523,7 @@ class TestSprintMergeBranch:
     def test_merge_branch_branch_already_gone(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
-            mock_run.return_value = _make_run_result(1)  # rev-parse: branch gone
+        with _branch_exists(False), patch("clasi.sprint.subprocess.run") as mock_run:
             result = s.merge_branch("master")
         assert result["merged"] is True
         assert result["already_merged"] is True
@@ -526,9 +532,8 @@ class TestSprintMergeBranch:
     def test_merge_branch_already_ancestor(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
                 _make_run_result(0),  # merge-base: already ancestor
             ]
             result = s.merge_branch("master")
@@ -539,10 +544,11 @@ class TestSprintMergeBranch:
     def test_merge_branch_rebase_failure_raises(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
-                _make_run_result(1),  # merge-base: not ancestor
+                _make_run_result(1),  # merge-base: branch not in master
+                _make_run_result(1),  # merge-base: master not in branch
+                _make_run_result(0),  # git merge-tree: clean
                 _make_run_result(1, stderr="rebase conflict"),  # rebase fails
                 _make_run_result(0),  # git rebase --abort
             ]
@@ -556,10 +562,11 @@ class TestSprintMergeBranch:
     def test_merge_branch_conflict_raises_merge_conflict_error(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
-                _make_run_result(1),  # merge-base: not ancestor
+                _make_run_result(1),  # merge-base: branch not in master
+                _make_run_result(1),  # merge-base: master not in branch
+                _make_run_result(129),  # git merge-tree: unsupported (git < 2.38)
                 _make_run_result(0),  # git rebase master sprint/001-test-sprint
                 _make_run_result(0),  # checkout master
                 _make_run_result(1, stderr="Automatic merge failed"),  # git merge --no-ff
@@ -574,6 +581,36 @@ class TestSprintMergeBranch:
                 assert "foo.py" in e.conflicted_files
                 assert "bar.py" in e.conflicted_files
 
+    def test_merge_branch_predicted_conflict_leaves_tree_alone(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        s = Sprint(sprint_dir, proj)
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
+            mock_run.side_effect = [
+                _make_run_result(1),  # merge-base: branch not in master
+                _make_run_result(1),  # merge-base: master not in branch
+                _make_run_result(1, stdout="4b825dc\nfoo.py\nfoo.py\nbar.py\n"),
+            ]
+            with pytest.raises(MergeConflictError) as exc:
+                s.merge_branch("master")
+        assert exc.value.conflicted_files == ["foo.py", "bar.py"]
+        commands = [c.args[0][1] for c in mock_run.call_args_list]
+        assert commands == ["merge-base", "merge-base", "merge-tree"]
+
+    def test_merge_branch_fast_forward_skips_rebase(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        s = Sprint(sprint_dir, proj)
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
+            mock_run.side_effect = [
+                _make_run_result(1),  # merge-base: branch not in master
+                _make_run_result(0),  # merge-base: master is in branch
+                _make_run_result(0),  # checkout master
+                _make_run_result(0),  # git merge --no-ff
+            ]
+            result = s.merge_branch("master")
+        assert result["fast_forward"] is True
+        commands = [c.args[0][1] for c in mock_run.call_args_list]
+        assert "rebase" not in commands
+
     def test_merge_conflict_error_is_subclass_of_runtime_error(self, tmp_path):
         err = MergeConflictError("test", conflicted_files=["a.py"])
         assert isinstance(err, RuntimeError)
@@ -582,10 +619,11 @@ class TestSprintMergeBranch:
     def test_merge_branch_checkout_failure_raises(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
-                _make_run_result(1),  # merge-base: not ancestor
+                _make_run_result(1),  # merge-base: branch not in master
+                _make_run_result(1),  # merge-base: master not in branch
+                _make_run_result(0),  # git merge-tree: clean
                 _make_run_result(0),  # git rebase master sprint/001-test-sprint
                 _make_run_result(1, stderr="not a git repo"),  # checkout fails
             ]
@@ -696,6 +734,48 @@ class TestSprintMergeBranch:
             f"Sprint commit not reachable from master: {full_subjects}"
         )
 
+    def test_check_merge_reports_conflicts_without_touching_tree(
+        self, tmp_path, monkeypatch,
+    ):
+        """Integration test: check_merge uses merge-tree on a real repo."""
+        import subprocess as sp
+
+        git = lambda *args: sp.run(  # noqa: E731
+            ["git", *args], capture_output=True, text=True, cwd=tmp_path, check=True
+        ).stdout
+
+        git("init", "-b", "master")
+        git("config", "user.email", "test@example.com")
+        git("config", "user.name", "Test")
+        (tmp_path / "shared.txt").write_text("base\n", encoding="utf-8")
+        git("add", "shared.txt")
+        git("commit", "-m", "initial commit")
+        git("checkout", "-b", "sprint/001-test-sprint")
+        (tmp_path / "shared.txt").write_text("sprint\n", encoding="utf-8")
+        git("commit", "-am", "sprint change")
+        git("checkout", "master")
+        (tmp_path / "shared.txt").write_text("master\n", encoding="utf-8")
+        git("commit", "-am", "master change")
+
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        s = Sprint(sprint_dir, proj)
+        monkeypatch.chdir(tmp_path)
+        head_before = git("rev-parse", "HEAD")
+
+        check = s.check_merge("master")
+
+        assert check["branch_exists"] is True
+        assert check["fast_forward"] is False
+        if check["clean"] is None:
+            pytest.skip("git merge-tree --write-tree needs git 2.38+")
+        assert check["clean"] is False
+        assert check["conflicted_files"] == ["shared.txt"]
+        assert git("rev-parse", "HEAD") == head_before
+        assert (tmp_path / "shared.txt").read_text(encoding="utf-8") == "master\n"
+        with pytest.raises(MergeConflictError):
+            s.merge_branch("master")
+        assert git("rev-parse", "--abbrev-ref", "HEAD").strip() == "master"
+
 
 class TestSprintDeleteBranch:
     """Tests for Sprint.delete_branch()."""
@@ -703,9 +783,8 @@ class TestSprintDeleteBranch:
     def test_delete_branch_success(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
                 _make_run_result(0),  # git branch -d succeeds
             ]
             deleted = s.delete_branch()
@@ -714,17 +793,15 @@ class TestSprintDeleteBranch:
     def test_delete_branch_not_present(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
-            mock_run.return_value = _make_run_result(1)  # rev-parse: doesn't exist
+        with _branch_exists(False), patch("clasi.sprint.subprocess.run") as mock_run:
             deleted = s.delete_branch()
         assert deleted is False
 
     def test_delete_branch_raises_on_git_failure(self, tmp_path):
         proj, sprint_dir = _make_sprint_dir(tmp_path)
         s = Sprint(sprint_dir, proj)
-        with patch("clasi.sprint.subprocess.run") as mock_run:
+        with _branch_exists(True), patch("clasi.sprint.subprocess.run") as mock_run:
             mock_run.side_effect = [
-                _make_run_result(0),  # rev-parse: branch exists
                 _make_run_result(1, stderr="not fully merged"),  # git branch -d fails
             ]
             try:
@@ -858,3 +935,94 @@ class TestSprintArchive:
         # No architecture-update.md was created, should not raise
         result = s.archive()
         assert "new_path" in result
+
+
+class TestSprintSnapshot:
+    """Tests for Sprint.snapshot()."""
+
+    def _write_todo(self, proj, name, sprint=None, status="pending", in_progress=False):
+        subdir = proj.todo_dir / ("in-progress" if in_progress else "")
+        subdir.mkdir(parents=True, exist_ok=True)
+        lines = ["---", f"status: {status}"]
+        if sprint:
+            lines.append(f'sprint: "{sprint}"')
+        lines += ["---", f"# {name}", ""]
+        path = subdir / name
+        path.write_text("\n".join(lines), encoding="utf-8")
+        return path
+
+    def test_sprint_fields_and_docs(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path, title="Snap")
+        (sprint_dir / "usecases.md").write_text(
+            "---\nstatus: final\n---\n", encoding="utf-8"
+        )
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert snap.id == "001"
+        assert snap.title == "Snap"
+        assert snap.branch == "sprint/001-test-sprint"
+        assert snap.docs["usecases.md"]["status"] == "final"
+        assert snap.docs["architecture-update.md"] is None
+        assert snap.archived is False
+
+    def test_tickets_and_counts(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        _add_ticket(sprint_dir, "001", "Open", status="in-progress")
+        _add_ticket(sprint_dir, "002", "Closed", status="done", done=True)
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert [t.id for t in snap.tickets] == ["001", "002"]
+        assert [t.in_done_dir for t in snap.tickets] == [False, True]
+        assert snap.ticket_counts() == {"todo": 0, "in_progress": 1, "done": 1}
+
+    def test_linked_todos(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        ticket = _add_ticket(sprint_dir, "001", "Linked")
+        ticket.write_text(
+            ticket.read_text().replace('todo: ""', "todo: linked.md"),
+            encoding="utf-8",
+        )
+        self._write_todo(proj, "linked.md")
+        self._write_todo(proj, "tagged.md", sprint="001", in_progress=True)
+        self._write_todo(proj, "other.md", sprint="002")
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert sorted(t.filename for t in snap.todos) == ["linked.md", "tagged.md"]
+        tagged = next(t for t in snap.todos if t.filename == "tagged.md")
+        assert tagged.in_progress is True
+        assert tagged.sprint == "001"
+
+    def test_todo_is_deferred(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        ticket = _add_ticket(sprint_dir, "001", "Partial")
+        ticket.write_text(
+            ticket.read_text().replace(
+                'todo: ""', "todo: big.md\ncompletes_todo: false"
+            ),
+            encoding="utf-8",
+        )
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert snap.todo_is_deferred("big.md") is True
+        assert snap.todo_is_deferred("small.md") is False
+
+    def test_db_state(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        proj.db.register_sprint("001", "test-sprint")
+        proj.db.acquire_lock("001")
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert snap.phase == "planning-docs"
+        assert snap.locked is True
+
+    def test_db_state_absent(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        snap = Sprint(sprint_dir, proj).snapshot()
+        assert snap.db_state is None
+        assert snap.phase is None
+        assert snap.locked is False
+
+    def test_snapshot_is_immutable(self, tmp_path):
+        proj, sprint_dir = _make_sprint_dir(tmp_path)
+        _add_ticket(sprint_dir)
+        snap = Sprint(sprint_dir, proj).snapshot()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snap.tickets = ()
+        with pytest.raises(TypeError):
+            snap.tickets[0].frontmatter["status"] = "done"
+        assert not hasattr(snap, "__dict__")
@@ -1,7 +1,11 @@
 """Tests for the StateDB class wrapper."""
 
+import threading
+import time
+
 import pytest
 
+from clasi import state_db_class
 from clasi.state_db_class import StateDB
 from clasi.project import Project
 
@@ -109,6 +113,30 @@ class TestStateDB:
         result = db.clear_recovery_state()
         assert result["cleared"] is False
 
+    def test_close_journal(self, db):
+        assert db.get_close_journal("001") == []
+        db.record_close_step("001", "tests", "h1", {}, 1.5)
+        db.record_close_step("001", "version_bump", "h2", {"version": "1.2"}, 0.2)
+        db.record_close_step("002", "tests", "h1", {}, 1.0)
+        journal = db.get_close_journal("001")
+        assert [e["step"] for e in journal] == ["tests", "version_bump"]
+        assert journal[1]["outputs"] == {"version": "1.2"}
+        assert journal[1]["inputs_hash"] == "h2"
+
+        assert db.clear_close_journal("001") == {"cleared": 2}
+        assert db.get_close_journal("001") == []
+        assert len(db.get_close_journal("002")) == 1
+
+    def test_record_and_get_test_result(self, db):
+        assert db.get_test_result("tree1", "uv run pytest") is None
+        db.record_test_result("tree1", "uv run pytest", 1, 2.5)
+        db.record_test_result("tree1", "uv run pytest", 0, 3.0)
+        result = db.get_test_result("tree1", "uv run pytest")
+        assert result["returncode"] == 0
+        assert result["duration"] == 3.0
+        assert db.get_test_result("tree1", "pytest -x") is None
+        assert db.get_test_result("tree2", "uv run pytest") is None
+
 
 class TestActiveAgents:
     """Test active_agents table methods."""
@@ -220,3 +248,139 @@ class TestProjectDbIntegration:
         db.register_sprint("001", "test")
         state = db.get_sprint_state("001")
         assert state["phase"] == "planning-docs"
+
+
+class TestConnectionPool:
+    """Pooled connections, the transaction API and idle reaping."""
+
+    @pytest.fixture()
+    def db(self, tmp_path):
+        sdb = StateDB(tmp_path / ".clasi.db")
+        sdb.init()
+        yield sdb
+        sdb.close()
+
+    def test_instances_share_one_connection(self, db):
+        other = StateDB(db.path)
+        with db.transaction() as a, other.transaction() as b:
+            assert a is b
+
+    def test_schema_created_once(self, db):
+        entry = state_db_class._pooled(db.path)
+        assert entry.schema_ready
+        db.register_sprint("001", "a")
+        assert state_db_class._pooled(db.path) is entry
+
+    def test_transaction_commits(self, db):
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO sprints (id, slug, created_at, updated_at) "
+                "VALUES ('001', 'a', 'now', 'now')"
+            )
+        assert db.get_sprint_state("001")["slug"] == "a"
+
+    def test_transaction_rolls_back_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.register_sprint("001", "a")
+                db.register_sprint("002", "b")
+                raise RuntimeError("boom")
+        with pytest.raises(ValueError):
+            db.get_sprint_state("001")
+
+    def test_failed_method_leaves_no_open_transaction(self, db):
+        db.register_sprint("001", "a")
+        with pytest.raises(ValueError):
+            db.register_sprint("001", "a")
+        with db.transaction() as conn:
+            assert not conn.in_transaction
+
+    def test_rename_inside_transaction(self, db):
+        db.register_sprint("001", "a")
+        db.record_gate("001", "architecture_review", "passed")
+        with db.transaction():
+            db.rename_sprint("001", "002")
+        state = db.get_sprint_state("002")
+        assert [g["gate_name"] for g in state["gates"]] == ["architecture_review"]
+
+    def test_replaced_file_is_reopened(self, db):
+        db.register_sprint("001", "a")
+        db.close()
+        db.path.unlink()
+        db.register_sprint("002", "b")
+        with pytest.raises(ValueError):
+            db.get_sprint_state("001")
+
+    def test_close_checkpoints_wal(self, db):
+        db.register_sprint("001", "a")
+        db.close()
+        wal = db.path.with_name(db.path.name + "-wal")
+        assert not wal.exists() or wal.stat().st_size == 0
+
+    def test_idle_connections_are_reaped(self, db, monkeypatch):
+        db.register_sprint("001", "a")
+        entry = state_db_class._pooled(db.path)
+        monkeypatch.setattr(state_db_class, "_IDLE_SECONDS", -1)
+        state_db_class._reap_idle()
+        assert entry.closed
+        assert db.get_sprint_state("001")["slug"] == "a"
+
+    def test_pool_is_bounded(self, tmp_path):
+        dbs = [StateDB(tmp_path / f"{i}.db") for i in range(
+            state_db_class._POOL_MAXSIZE + 2)]
+        for sdb in dbs:
+            sdb.init()
+        assert len(state_db_class._pool) <= state_db_class._POOL_MAXSIZE
+        for sdb in dbs:
+            sdb.close()
+
+    def test_concurrent_threads(self, db):
+        def worker(n):
+            for i in range(20):
+                db.register_active_agent(f"a{n}-{i}", "programmer", "2")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with db.transaction() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM active_agents").fetchone()[0]
+        assert count == 80
+
+
+class TestConnectionPoolBenchmark:
+    """Microbenchmark: pooled StateDB vs. a connection per operation."""
+
+    OPS = 200
+
+    @staticmethod
+    def _ops_per_sec(fn, ops):
+        start = time.perf_counter()
+        for _ in range(ops):
+            fn()
+        return ops / (time.perf_counter() - start)
+
+    @pytest.mark.slow
+    def test_pooled_is_faster_than_connect_per_call(self, tmp_path):
+        db = StateDB(tmp_path / ".clasi.db")
+        db.register_sprint("001", "a")
+
+        def unpooled():
+            # The pre-pool behaviour: connect, PRAGMAs and schema per call.
+            conn = state_db_class._connect(db.path)
+            try:
+                conn.executescript(state_db_class._SCHEMA)
+                conn.execute("SELECT phase FROM sprints WHERE id = '001'").fetchone()
+            finally:
+                conn.close()
+
+        def pooled():
+            StateDB(db.path).get_sprint_state("001")
+
+        before = self._ops_per_sec(unpooled, self.OPS)
+        after = self._ops_per_sec(pooled, self.OPS)
+        db.close()
+        assert after > before * 2, (
+            f"pooled {after:,.0f} ops/s vs. unpooled {before:,.0f} ops/s"
+        )
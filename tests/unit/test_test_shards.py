@@ -0,0 +1,152 @@
+"""Tests for clasi.test_shards."""
+
+import json
+import sys
+
+import pytest
+
+from clasi import test_shards
+
+PYTEST = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider"]
+
+
+@pytest.fixture
+def suite(tmp_path):
+    """A small pytest project: three files, one failing and one slow test."""
+    root = tmp_path / "proj"
+    tests = root / "tests"
+    tests.mkdir(parents=True)
+    (root / "pytest.ini").write_text("[pytest]\n")
+    (tests / "test_a.py").write_text(
+        "def test_one():\n    pass\n\n"
+        "def test_two():\n    pass\n\n"
+        "def test_three():\n    pass\n"
+    )
+    (tests / "test_b.py").write_text(
+        "import time\n\n"
+        "def test_slow():\n    time.sleep(0.2)\n"
+    )
+    (tests / "test_c.py").write_text(
+        "import pytest\n\n"
+        "def test_bad():\n    assert 1 == 2\n\n"
+        "@pytest.mark.skip\n"
+        "def test_skipped():\n    pass\n"
+    )
+    return root
+
+
+def test_is_pytest_command():
+    assert test_shards.is_pytest_command(["uv", "run", "pytest"])
+    assert test_shards.is_pytest_command(["python", "-m", "pytest", "-x"])
+    assert test_shards.is_pytest_command(["/venv/bin/pytest"])
+    assert not test_shards.is_pytest_command(["npm", "test"])
+
+
+def test_split_paths():
+    assert test_shards.split_paths(["uv", "run", "pytest", "tests"]) == (
+        ["uv", "run", "pytest"], ["tests"],
+    )
+    assert test_shards.split_paths(
+        ["python", "-m", "pytest", "-x", "-k", "slow", "tests/a.py::test_b", "--cov", "clasi"]
+    ) == (["python", "-m", "pytest", "-x", "-k", "slow", "--cov", "clasi"], ["tests/a.py::test_b"])
+    assert test_shards.split_paths(["pytest", "-p", "no:cacheprovider"]) == (
+        ["pytest", "-p", "no:cacheprovider"], [],
+    )
+
+
+def test_plan_balances_by_test_count():
+    counts = {"a.py": 10, "b.py": 6, "c.py": 5, "d.py": 1}
+    groups = test_shards.plan(counts, 2)
+    sizes = sorted(sum(counts[f] for f in group) for group in groups)
+    assert sizes == [11, 11]
+    assert sorted(f for group in groups for f in group) == sorted(counts)
+
+
+def test_plan_never_makes_empty_shards():
+    assert test_shards.plan({"a.py": 3}, 4) == [["a.py"]]
+
+
+def test_run_sharded(suite):
+    log_dir = suite / "docs" / "clasi" / "log" / "tests" / "sprint-001"
+    summary = test_shards.run_sharded(PYTEST, 2, log_dir, cwd=suite, timeout=120)
+
+    assert summary["passed"] is False
+    assert summary["tests"] == 6
+    assert summary["failures"] == 1
+    assert summary["skipped"] == 1
+    assert summary["failed_tests"] == ["tests.test_c::test_bad"]
+    assert summary["slowest"][0]["test"] == "tests.test_b::test_slow"
+    assert len(summary["shards"]) == 2
+    for shard in summary["shards"]:
+        assert (log_dir / f"shard-{shard['shard']}.log").read_text()
+    assert json.loads((log_dir / "summary.json").read_text()) == summary
+    assert "FAILED tests.test_c::test_bad" in test_shards.format_summary(summary)
+
+
+def test_run_sharded_passes_without_failures(suite):
+    (suite / "tests" / "test_c.py").unlink()
+    summary = test_shards.run_sharded(PYTEST, 3, suite / "log", cwd=suite, timeout=120)
+    assert summary["passed"] is True
+    assert summary["tests"] == 4
+    assert all(shard["returncode"] == 0 for shard in summary["shards"])
+
+
+def test_positional_path_only_selects_what_is_collected(suite):
+    (suite / "tests" / "test_c.py").unlink()
+    summary = test_shards.run_sharded(
+        [*PYTEST, "tests"], 2, suite / "log", cwd=suite, timeout=120,
+    )
+    assert summary["passed"] is True
+    # Each shard ran its own files, not the whole "tests" directory.
+    assert summary["tests"] == 4
+    assert sum(shard["tests"] for shard in summary["shards"]) == 4
+
+
+def test_collection_error_fails_without_running_shards(suite):
+    (suite / "tests" / "test_d.py").write_text("import not_a_module\n")
+    summary = test_shards.run_sharded(PYTEST, 2, suite / "log", cwd=suite, timeout=120)
+    assert summary["passed"] is False
+    assert summary["shards"] == []
+    assert "not_a_module" in summary["collection_output"]
+    assert list((suite / "log").glob("shard-*")) == []
+
+
+def test_no_tests_collected_fails(suite):
+    for path in (suite / "tests").glob("test_*.py"):
+        path.unlink()
+    summary = test_shards.run_sharded(PYTEST, 2, suite / "log", cwd=suite, timeout=120)
+    assert summary["passed"] is False
+    assert summary["shards"] == []
+
+
+def test_shard_exit_code_counts(suite):
+    (suite / "tests" / "test_c.py").unlink()
+    (suite / "tests" / "conftest.py").write_text(
+        "def pytest_sessionfinish(session):\n    session.exitstatus = 3\n"
+    )
+    summary = test_shards.run_sharded(PYTEST, 2, suite / "log", cwd=suite, timeout=120)
+    assert summary["failures"] == 0
+    assert summary["passed"] is False
+    assert all(shard["returncode"] == 3 for shard in summary["shards"])
+
+
+def test_shards_run_without_coverage(suite):
+    pytest.importorskip("pytest_cov")
+    (suite / "tests" / "test_c.py").unlink()
+    (suite / "pytest.ini").write_text(
+        "[pytest]\n"
+        "addopts = --cov=tests --cov-report=lcov:lcov.info --cov-fail-under=100\n"
+    )
+    summary = test_shards.run_sharded(PYTEST, 2, suite / "log", cwd=suite, timeout=120)
+    assert summary["passed"] is True
+    assert not (suite / ".coverage").exists()
+    assert not (suite / "lcov.info").exists()
+
+
+def test_runs_without_pytest_cov(suite):
+    (suite / "tests" / "test_c.py").unlink()
+    summary = test_shards.run_sharded(
+        [*PYTEST, "-p", "no:cov"], 2, suite / "log", cwd=suite, timeout=120,
+    )
+    assert summary["passed"] is True
+    assert summary["tests"] == 4
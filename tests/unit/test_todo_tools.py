@@ -403,6 +403,7 @@ class TestCloseSprintTodoHandling:
         assert "unresolved_todos" in result
         assert "unresolved.md" in result["unresolved_todos"]
 
+    @patch("clasi.git_refs.rev_exists", MagicMock(return_value=True))
     @patch("clasi.tools.artifact_tools.create_version_tag")
     @patch("clasi.tools.artifact_tools.compute_next_version", return_value="0.20260425.1")
     @patch("subprocess.run")
@@ -450,14 +451,13 @@ class TestCloseSprintTodoHandling:
             return r
 
         mock_run.side_effect = [
+            _ok(0),  # git merge-base --is-ancestor (precondition: already merged)
             _ok(0, "all tests passed"),  # pytest
             _ok(0),  # git add -A (version bump)
             _ok(0),  # git commit (version bump)
             _ok(0, ""),  # git status --porcelain .clasi.db (clean)
-            _ok(0),  # git rev-parse --verify branch (merge check)
             _ok(0),  # git merge-base --is-ancestor (already merged)
             _ok(0),  # git push --tags
-            _ok(0),  # git rev-parse --verify branch (delete check)
             _ok(0),  # git branch -d
         ]
 
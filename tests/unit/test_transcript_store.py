@@ -0,0 +1,85 @@
+"""Tests for clasi.transcript_store."""
+
+import hashlib
+import json
+
+import pytest
+
+from clasi.transcript_store import (
+    TranscriptStore,
+    find_references,
+    iter_jsonl,
+    reference_line,
+)
+
+MESSAGES = [
+    {"type": "user", "message": {"content": "hello"}},
+    {"type": "assistant", "message": {"content": "hi"}},
+]
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "t.jsonl"
+    path.write_text("\n".join(json.dumps(m) for m in MESSAGES) + "\n")
+    return path
+
+
+class TestPut:
+    def test_digest_is_sha256_of_raw_bytes(self, tmp_path, transcript):
+        store = TranscriptStore(tmp_path / "log")
+        digest = store.put_file(transcript)
+        assert digest == hashlib.sha256(transcript.read_bytes()).hexdigest()
+        assert store.path_for(digest).parent.name == digest[:2]
+        assert store.read_bytes(digest) == transcript.read_bytes()
+
+    def test_same_content_stored_once(self, tmp_path, transcript):
+        store = TranscriptStore(tmp_path / "log")
+        first = store.put_file(transcript)
+        blob = store.path_for(first).read_bytes()
+        assert store.put_bytes(transcript.read_bytes()) == first
+        assert store.digests() == [first]
+        assert store.path_for(first).read_bytes() == blob
+        assert not list(store.root.glob(".tmp-*"))
+
+    def test_blob_is_compressed(self, tmp_path):
+        store = TranscriptStore(tmp_path)
+        data = (json.dumps({"content": "x" * 200}) + "\n").encode() * 500
+        digest = store.put_bytes(data)
+        assert store.path_for(digest).stat().st_size < len(data) // 10
+
+    def test_missing_source_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            TranscriptStore(tmp_path).put_file(tmp_path / "missing.jsonl")
+
+
+class TestRead:
+    def test_iter_messages(self, tmp_path, transcript):
+        store = TranscriptStore(tmp_path)
+        assert list(store.iter_messages(store.put_file(transcript))) == MESSAGES
+
+    def test_iter_jsonl_skips_bad_lines(self):
+        assert list(iter_jsonl(['{"a": 1}', "", "nope", "[1]", '{"b": 2}'])) == [
+            {"a": 1}, {"b": 2},
+        ]
+
+    def test_expand_restores_inline_dump(self, tmp_path, transcript):
+        store = TranscriptStore(tmp_path)
+        digest = store.put_file(transcript)
+        text = f"# Raw JSON Transcript\n\n{reference_line(digest)}\n"
+        assert find_references(text) == [digest]
+        expected = "```json\n" + json.dumps(MESSAGES, indent=2) + "\n```"
+        assert store.expand(text) == f"# Raw JSON Transcript\n\n{expected}\n"
+
+    def test_expand_leaves_missing_blob_reference(self, tmp_path):
+        text = reference_line("0" * 64)
+        assert TranscriptStore(tmp_path).expand(text) == text
+
+    def test_expand_file(self, tmp_path, transcript):
+        store = TranscriptStore(tmp_path)
+        log = tmp_path / "001-x.md"
+        log.write_text(reference_line(store.put_file(transcript)) + "\n")
+        assert '"hello"' in store.expand_file(log)
+
+    def test_digests_empty_store(self, tmp_path):
+        assert TranscriptStore(tmp_path).digests() == []